@@ -8,7 +8,7 @@ Main entry point for the REST API serving legal queries.
 
 from fastapi import FastAPI, HTTPException, Depends
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from pydantic import BaseModel, Field
 from typing import List, Dict, Optional, Any
@@ -27,15 +27,25 @@ try:
     sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
     
     from models.legal_rag import VietnameseLegalRAG
-    from services.pinecone_service import PineconeService
+    from services.pinecone_service import PineconeServiceFactory
     from services.serp_service import SerpAPIService
     from utils.text_processing import VietnameseTextProcessor
+    try:
+        from app.utils.client_registry import get_client_registry
+    except ImportError:
+        from utils.client_registry import get_client_registry
     RAG_AVAILABLE = True
 except ImportError as e:
     RAG_AVAILABLE = False
     logging.warning(f"RAG system not available: {e}")
     print(f"Warning: RAG system import failed: {e}")
 
+# Per-stage latency histograms (same module instance as the RAG system)
+try:
+    from app.utils.metrics import format_prometheus_gauge, get_stage_metrics
+except ImportError:
+    from utils.metrics import format_prometheus_gauge, get_stage_metrics
+
 # Pydantic Models for API
 class LegalQuery(BaseModel):
     """Model for legal query requests"""
@@ -138,13 +148,8 @@ async def initialize_rag_system():
                 config = None
                 
             if config and hasattr(config, 'pinecone_api_key'):
-                # Initialize Pinecone service
-                pinecone_service = PineconeService(
-                    api_key=config.pinecone_api_key,
-                    environment=config.pinecone_environment,
-                    index_name=config.pinecone_index_name,
-                    openai_api_key=config.openai_embedding_api_key
-                )
+                # Initialize the configured vector store (Pinecone or local, VECTOR_STORE_BACKEND)
+                pinecone_service = PineconeServiceFactory.create_from_settings(config)
                 
                 # Initialize SerpAPI service
                 serp_service = SerpAPIService(
@@ -165,7 +170,8 @@ async def initialize_rag_system():
                     chat_model=chat_model,
                     embedding_api_key=config.openai_embedding_api_key,
                     embedding_api_base=config.openai_embedding_api_base,
-                    serp_service=serp_service
+                    serp_service=serp_service,
+                    speculative_fallback=os.getenv("SPECULATIVE_WEB_FALLBACK", "false").lower() in ("1", "true", "yes")
                 )
                 logger.info("RAG system initialized with real Pinecone connection")
             else:
@@ -187,6 +193,17 @@ async def startup_event():
     """App startup event"""
     await initialize_rag_system()
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """App shutdown event"""
+    if pinecone_service is not None:
+        await pinecone_service.aclose()
+    if RAG_AVAILABLE:
+        # Shared OpenAI/Pinecone/SerpAPI connection pools
+        registry = get_client_registry()
+        await registry.aclose()
+        registry.close()
+
 # Vietnamese Legal Domains Configuration
 VIETNAMESE_LEGAL_DOMAINS = {
     "dan_su": {
@@ -260,8 +277,10 @@ async def root():
         "compliance": "Tuân thủ Thông tư 20/2018/TT-BTTTT",
         "endpoints": {
             "legal_query": "/api/legal-query",
+            "legal_query_stream": "/api/legal-query/stream",
             "legal_domains": "/api/legal-domains",
-            "chat_history": "/api/chat-history"
+            "chat_history": "/api/chat-history",
+            "metrics": "/metrics"
         }
     }
 
@@ -275,6 +294,23 @@ async def health_check():
         "version": "2.0.0"
     }
 
+@app.get("/metrics", response_class=PlainTextResponse, tags=["Health"])
+async def metrics():
+    """
+    Prometheus metrics: per-stage latency histograms of the RAG pipeline
+    Số liệu Prometheus: độ trễ từng bước của pipeline RAG
+    """
+    body = get_stage_metrics().render_prometheus()
+    if rag_system is not None:
+        rag_metrics = rag_system.get_performance_metrics()["metrics"]
+        body += format_prometheus_gauge(
+            "legal_rag_queries_total", rag_metrics["total_queries"], "Legal queries answered."
+        )
+        body += format_prometheus_gauge(
+            "legal_rag_avg_confidence", rag_metrics["avg_confidence"], "Average answer confidence."
+        )
+    return PlainTextResponse(body, media_type="text/plain; version=0.0.4")
+
 @app.post("/api/legal-query", response_model=LegalResponse, tags=["Legal"])
 async def process_legal_query(query: LegalQuery):
     """
@@ -322,6 +358,34 @@ async def process_legal_query(query: LegalQuery):
         logger.error(f"Error processing legal query: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
+@app.post("/api/legal-query/stream", tags=["Legal"])
+async def stream_legal_query(query: LegalQuery):
+    """
+    Stream legal answer tokens as Server-Sent Events
+    Trả về câu trả lời dạng luồng (SSE): sự kiện "token" rồi sự kiện "final" kèm trích dẫn
+    """
+    if query.domain not in VIETNAMESE_LEGAL_DOMAINS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid legal domain. Supported: {list(VIETNAMESE_LEGAL_DOMAINS.keys())}"
+        )
+    if query.region not in VIETNAMESE_REGIONS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid region. Supported: {list(VIETNAMESE_REGIONS.keys())}"
+        )
+    
+    detected_domain = auto_detect_legal_domain(query.question)
+    if detected_domain and query.domain == "dan_su":  # Default domain
+        query.domain = detected_domain
+    
+    # Sync generator: Starlette iterates it in a worker thread, so blocking LLM I/O is fine
+    return StreamingResponse(
+        stream_legal_response(query),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @app.get("/api/legal-domains", tags=["Legal"])
 async def get_legal_domains():
     """
@@ -416,6 +480,46 @@ def auto_detect_legal_domain(question: str) -> Optional[str]:
     
     return None
 
+def rag_result_to_response(rag_result) -> LegalResponse:
+    """Convert a LegalQueryResult into the API response model"""
+    return LegalResponse(
+        content=rag_result.answer,
+        citations=[{
+            "title": str(citation),
+            "article": citation.article or "N/A",
+            "content": citation.document_name,
+            "authority": "RAG System",
+            "source": citation.document_type
+        } for citation in rag_result.citations],
+        confidence=rag_result.confidence_score,
+        domain=rag_result.legal_domain,
+        warnings=rag_result.warnings or []
+    )
+
+def sse_event(event: str, data: Dict[str, Any]) -> str:
+    """Format one Server-Sent Events frame"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+
+def stream_legal_response(query: LegalQuery):
+    """Yield SSE frames: token events while the answer is generated, then a final event"""
+    if rag_system is not None and RAG_AVAILABLE:
+        for frame in rag_system.query_stream(
+            question=query.question,
+            legal_domain=query.domain,
+            max_results=5,
+            confidence_threshold=0.7
+        ):
+            if frame["type"] == "token":
+                yield sse_event("token", {"content": frame["content"]})
+            else:
+                yield sse_event("final", rag_result_to_response(frame["result"]).model_dump(mode="json"))
+        return
+    
+    # No RAG system: run the non-streaming path and send it as a single token
+    response = asyncio.run(generate_legal_response(query))
+    yield sse_event("token", {"content": response.content})
+    yield sse_event("final", response.model_dump(mode="json"))
+
 async def generate_legal_response(query: LegalQuery) -> LegalResponse:
     """Generate AI legal response using RAG system"""
     global rag_system, pinecone_service
@@ -425,35 +529,23 @@ async def generate_legal_response(query: LegalQuery) -> LegalResponse:
         if rag_system is not None and RAG_AVAILABLE:
             logger.info("Using RAG system for legal query processing")
             
-            # Process query through RAG
-            rag_result = rag_system.query(
+            # Process query through RAG without blocking the event loop
+            rag_result = await rag_system.aquery(
                 question=query.question,
                 legal_domain=query.domain,
                 max_results=5,
                 confidence_threshold=0.7
             )
             
-            return LegalResponse(
-                content=rag_result.answer,
-                citations=[{
-                    "title": str(citation),
-                    "article": citation.article or "N/A",
-                    "content": citation.document_name,
-                    "authority": "RAG System",
-                    "source": citation.document_type
-                } for citation in rag_result.citations],
-                confidence=rag_result.confidence_score,
-                domain=rag_result.legal_domain,
-                warnings=rag_result.warnings or []
-            )
+            return rag_result_to_response(rag_result)
             
         # Fallback to Pinecone direct search
         elif pinecone_service is not None:
             logger.info("Using direct Pinecone search for legal query")
             
             # Search for relevant documents
-            search_results = await pinecone_service.search_similar_documents(
-                query_text=query.question,
+            search_results = await pinecone_service.asearch_similar_documents(
+                query=query.question,
                 legal_domain=query.domain,
                 top_k=3
             )
@@ -6,9 +6,9 @@ Handles LLM integration with OpenAI and local models.
 Xử lý tích hợp LLM với OpenAI và các mô hình cục bộ.
 """
 
-from openai import OpenAI
-from typing import Dict, List, Optional, Any
+from typing import Dict, Iterator, List, Optional, Any
 from abc import ABC, abstractmethod
+import asyncio
 import logging
 
 try:
@@ -18,6 +18,11 @@ except Exception:
     from app.utils.demo_config import demo_settings
     settings = demo_settings
 
+try:
+    from app.utils.client_registry import get_client_registry
+except ImportError:
+    from utils.client_registry import get_client_registry
+
 # Configure logging
 logger = logging.getLogger(__name__)
 
@@ -33,6 +38,22 @@ class BaseChatModel(ABC):
     def get_embedding(self, text: str) -> List[float]:
         """Get text embedding"""
         pass
+    
+    async def agenerate_response(self, prompt: str, context: str = None) -> str:
+        """
+        Async response generation.
+        Models without a native async client run generate_response in a worker thread.
+        """
+        return await asyncio.to_thread(self.generate_response, prompt, context)
+    
+    def generate_response_stream(self, prompt: str, context: str = None) -> Iterator[str]:
+        """
+        Stream the response as text chunks.
+        Models without native streaming yield the full response as a single chunk.
+        """
+        response = self.generate_response(prompt, context)
+        if response:
+            yield response
 
 class OpenAIChatModel(BaseChatModel):
     """OpenAI chat model implementation"""
@@ -52,46 +73,60 @@ class OpenAIChatModel(BaseChatModel):
         self.temperature = temperature if temperature is not None else demo_settings.temperature
         self.max_tokens = max_tokens or demo_settings.max_tokens
         
-        # Configure OpenAI client for chat
-        chat_client_kwargs = {
-            "api_key": self.api_key,
-            "base_url": self.api_base
-        }
-            
-        self.chat_client = OpenAI(**chat_client_kwargs)
+        # Clients come from the process-wide registry: one pooled, keep-alive
+        # connection set per API endpoint shared by every service
+        registry = get_client_registry()
+        self.chat_client = registry.openai_client(self.api_key, self.api_base)
+        self.async_chat_client = registry.async_openai_client(self.api_key, self.api_base)
         
-        # Configure separate OpenAI client for embeddings
-        embedding_client_kwargs = {
-            "api_key": demo_settings.openai_embedding_api_key,
-            "base_url": demo_settings.openai_embedding_api_base
-        }
-            
-        self.embedding_client = OpenAI(**embedding_client_kwargs)
+        # Separate endpoint for embeddings (same client when key and base URL match)
+        self.embedding_client = registry.openai_client(
+            demo_settings.openai_embedding_api_key,
+            demo_settings.openai_embedding_api_base
+        )
         
         logger.info(f"Initialized OpenAI chat model: {self.model_name}")
         logger.info(f"Chat API: {self.api_base}")
         logger.info(f"Embedding API: {demo_settings.openai_embedding_api_base}")
     
+    def _build_messages(self, prompt: str, context: str = None) -> List[Dict[str, str]]:
+        """Prepare chat messages"""
+        messages = []
+        
+        if context:
+            messages.append({
+                "role": "system",
+                "content": f"Bạn là một chuyên gia pháp lý Việt Nam. Sử dụng thông tin sau để trả lời câu hỏi: {context}"
+            })
+        
+        messages.append({
+            "role": "user", 
+            "content": prompt
+        })
+        return messages
+    
     def generate_response(self, prompt: str, context: str = None) -> str:
         """Generate response using OpenAI"""
         try:
-            # Prepare messages
-            messages = []
-            
-            if context:
-                messages.append({
-                    "role": "system",
-                    "content": f"Bạn là một chuyên gia pháp lý Việt Nam. Sử dụng thông tin sau để trả lời câu hỏi: {context}"
-                })
+            response = self.chat_client.chat.completions.create(
+                model=self.model_name,
+                messages=self._build_messages(prompt, context),
+                temperature=self.temperature,
+                max_tokens=self.max_tokens
+            )
             
-            messages.append({
-                "role": "user", 
-                "content": prompt
-            })
+            return response.choices[0].message.content
             
-            response = self.chat_client.chat.completions.create(
+        except Exception as e:
+            logger.error(f"Error generating OpenAI response: {e}")
+            raise e
+    
+    async def agenerate_response(self, prompt: str, context: str = None) -> str:
+        """Generate response using the AsyncOpenAI client"""
+        try:
+            response = await self.async_chat_client.chat.completions.create(
                 model=self.model_name,
-                messages=messages,
+                messages=self._build_messages(prompt, context),
                 temperature=self.temperature,
                 max_tokens=self.max_tokens
             )
@@ -102,6 +137,25 @@ class OpenAIChatModel(BaseChatModel):
             logger.error(f"Error generating OpenAI response: {e}")
             raise e
     
+    def generate_response_stream(self, prompt: str, context: str = None) -> Iterator[str]:
+        """Stream response tokens using OpenAI"""
+        try:
+            stream = self.chat_client.chat.completions.create(
+                model=self.model_name,
+                messages=self._build_messages(prompt, context),
+                temperature=self.temperature,
+                max_tokens=self.max_tokens,
+                stream=True
+            )
+            
+            for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+            
+        except Exception as e:
+            logger.error(f"Error streaming OpenAI response: {e}")
+            raise e
+    
     def get_embedding(self, text: str) -> List[float]:
         """Get text embedding using separate embedding API"""
         try:
@@ -7,9 +7,18 @@ Hệ thống tạo văn bản tăng cường truy xuất cho tài liệu pháp l
 """
 
 import re
+import copy
 import json
+import time
+import uuid
+import heapq
 import logging
-from typing import Dict, List, Optional, Tuple, Any, Union
+import asyncio
+import inspect
+import threading
+from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FuturesTimeoutError, wait
+from typing import Dict, Iterator, List, Optional, Tuple, Any, Union
 from dataclasses import dataclass, field
 from abc import ABC, abstractmethod
 from datetime import datetime
@@ -68,9 +77,80 @@ except ImportError:
         def process_legal_document(self, text):
             return text
     
+try:
+    from app.utils.embedding_cache import EmbeddingCache, get_shared_embedding_cache
+except ImportError:
+    from utils.embedding_cache import EmbeddingCache, get_shared_embedding_cache
+
+try:
+    from app.services.bm25_index import BM25Index, load_default_bm25_index
+except ImportError:
+    from services.bm25_index import BM25Index, load_default_bm25_index
+
+try:
+    from app.services.citation_index import LegalCitationIndex
+except ImportError:
+    from services.citation_index import LegalCitationIndex
+
+try:
+    from app.utils.answer_cache import SemanticAnswerCache, create_answer_cache_from_env
+except ImportError:
+    from utils.answer_cache import SemanticAnswerCache, create_answer_cache_from_env
+
+try:
+    from app.utils.context_packer import ContextPacker, PackedContext, create_context_packer
+except ImportError:
+    from utils.context_packer import ContextPacker, PackedContext, create_context_packer
+
+try:
+    from app.utils.single_flight import SingleFlight, normalize_question
+except ImportError:
+    from utils.single_flight import SingleFlight, normalize_question
+
+try:
+    from app.utils.client_registry import get_client_registry
+except ImportError:
+    from utils.client_registry import get_client_registry
+
+try:
+    from app.utils.fallback_predictor import FallbackPredictor
+except ImportError:
+    from utils.fallback_predictor import FallbackPredictor
+
+try:
+    from app.utils.metrics import StageMetrics, get_stage_metrics
+except ImportError:
+    from utils.metrics import StageMetrics, get_stage_metrics
+
+try:
+    from app.utils.aho_corasick import KeywordHits
+except ImportError:
+    from utils.aho_corasick import KeywordHits
+
+try:
+    from app.utils.query_stats import QueryHistory, QueryStats
+except ImportError:
+    from utils.query_stats import QueryHistory, QueryStats
+
+try:
+    from app.utils.text_processing import (
+        CONTEXT_KEYWORDS, LEGAL_STRUCTURE_INDICATORS, PROHIBITED_RESPONSE_TERMS, QUERY_LEGAL_TERMS,
+        QUERY_TYPE_VOCABULARY, RESPONSE_TERMINOLOGY, ROUTING_DOMAIN_KEYWORDS, expand_legal_abbreviations,
+        get_keyword_matcher
+    )
+except ImportError:
+    from utils.text_processing import (
+        CONTEXT_KEYWORDS, LEGAL_STRUCTURE_INDICATORS, PROHIBITED_RESPONSE_TERMS, QUERY_LEGAL_TERMS,
+        QUERY_TYPE_VOCABULARY, RESPONSE_TERMINOLOGY, ROUTING_DOMAIN_KEYWORDS, expand_legal_abbreviations,
+        get_keyword_matcher
+    )
+
 # Logger setup
 logger = logging.getLogger(__name__)
 
+# Domain keywords for query routing (matched by the shared keyword automaton)
+LEGAL_DOMAIN_KEYWORDS = ROUTING_DOMAIN_KEYWORDS
+
 class LegalQueryType(Enum):
     """Types of legal queries supported"""
     GENERAL = "general"
@@ -80,6 +160,11 @@ class LegalQueryType(Enum):
     INTERPRETATION = "interpretation"
     PROCEDURE = "procedure"
 
+# Query-type keywords, in classification priority order
+QUERY_TYPE_KEYWORDS = {
+    LegalQueryType(value): keywords for value, keywords in QUERY_TYPE_VOCABULARY.items()
+}
+
 class ConfidenceLevel(Enum):
     """Confidence levels for legal responses"""
     HIGH = "high"
@@ -150,6 +235,29 @@ class LegalQueryResult:
             "related_topics": self.related_topics
         }
 
+@dataclass
+class LegalRetrievalContext:
+    """Retrieval-only result: documents, citations and scores without a generated answer"""
+    query: str
+    processed_query: str
+    legal_domain: str
+    query_type: LegalQueryType
+    documents: List[Dict[str, Any]]
+    citations: List[LegalCitation]
+    context_text: str
+    context_tokens: int = 0
+    tokens_dropped: int = 0
+    
+    @property
+    def scores(self) -> List[float]:
+        """Retrieval score of each document"""
+        return [doc.get("score", 0.0) for doc in self.documents]
+    
+    @property
+    def retrieval_confidence(self) -> float:
+        """Best retrieval score (0.0 when nothing was found)"""
+        return max(self.scores, default=0.0)
+
 @dataclass
 class DocumentChunk:
     """Enhanced structure for Vietnamese legal document chunks"""
@@ -188,6 +296,10 @@ class ILegalRAGStrategy(ABC):
     def get_strategy_name(self) -> str:
         """Get strategy identification"""
         pass
+    
+    def select_documents(self, query: str, documents: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Documents used as generation context (all retrieved documents by default)"""
+        return documents
 
 class VietnameseLegalPromptTemplates:
     """Vietnamese legal-specific prompt templates"""
@@ -294,13 +406,84 @@ class VietnameseLegalRAG:
         text_processor: Optional[Any] = None,
         embedding_api_key: Optional[str] = None,
         embedding_api_base: Optional[str] = None,
-        serp_service: Optional[Any] = None
+        serp_service: Optional[Any] = None,
+        embedding_cache: Optional[EmbeddingCache] = None,
+        retrieval_timeout: float = 5.0,
+        retrieval_workers: int = 4,
+        lexical_index: Optional[BM25Index] = None,
+        rrf_k: int = 60,
+        citation_shortcut_coverage: float = 0.5,
+        citation_index: Optional[LegalCitationIndex] = None,
+        answer_cache: Optional[SemanticAnswerCache] = None,
+        context_packer: Optional[ContextPacker] = None,
+        single_flight: Optional[SingleFlight] = None,
+        speculative_fallback: bool = False,
+        fallback_predictor: Optional[FallbackPredictor] = None,
+        low_coverage_chunks: int = 20,
+        stage_metrics: Optional[StageMetrics] = None,
+        history_size: int = 1000
     ):
         """Initialize Vietnamese Legal RAG system with full OOP design"""
         self.pinecone_service = pinecone_service
         self.chat_model = chat_model
         self.serp_service = serp_service  # Add SerpAPI service
         
+        # Primary and related-domain searches run concurrently under one deadline
+        self.retrieval_timeout = retrieval_timeout
+        self._retrieval_executor = ThreadPoolExecutor(
+            max_workers=retrieval_workers,
+            thread_name_prefix="legal-retrieval"
+        )
+        
+        # BM25 index over the same chunks; fused with vector results by reciprocal rank
+        self.lexical_index = lexical_index if lexical_index is not None else load_default_bm25_index()
+        self.rrf_k = rrf_k
+        self.citation_shortcut_coverage = citation_shortcut_coverage
+        
+        # (law, article, clause, point) -> chunks, for O(1) answers to citation-shaped questions
+        if citation_index is None:
+            citation_index = LegalCitationIndex()
+            citation_index.add_documents(self.lexical_index.documents())
+        self.citation_index = citation_index
+        
+        # Near-identical questions reuse the stored answer and skip retrieval and generation
+        self.answer_cache = answer_cache if answer_cache is not None else create_answer_cache_from_env()
+        if self.answer_cache is not None and hasattr(pinecone_service, "add_write_listener"):
+            # Writes made directly on the vector store (scripts, other services) also drop stale answers
+            pinecone_service.add_write_listener(self.invalidate_answer_cache)
+        
+        # Web fallback started in parallel with vector search for queries predicted to miss
+        self.speculative_fallback = speculative_fallback
+        self.fallback_predictor = fallback_predictor or FallbackPredictor(
+            low_coverage_domains=self._low_coverage_domains(low_coverage_chunks)
+        )
+        # cancelled: dropped before it started; wasted: already running when dropped (the call still completes)
+        self.speculative_stats = {"launched": 0, "used": 0, "cancelled": 0, "wasted": 0, "timed_out": 0}
+        self._speculative_lock = threading.Lock()
+        self._fallback_executor = ThreadPoolExecutor(
+            max_workers=retrieval_workers,
+            thread_name_prefix="legal-fallback"
+        ) if speculative_fallback else None
+        
+        # Concurrent identical questions await one in-flight execution
+        self.single_flight = single_flight or SingleFlight()
+        
+        # Per-stage latency histograms (p50/p95/p99), exported on /metrics
+        self.stage_metrics = stage_metrics or get_stage_metrics()
+        
+        # Retrieved documents are packed into a per-model prompt token budget
+        if context_packer is None:
+            model_name = getattr(chat_model, "model_name", None)
+            max_output_tokens = getattr(chat_model, "max_tokens", None)
+            context_packer = create_context_packer(
+                model_name if isinstance(model_name, str) else "gpt-4o-mini",
+                max_output_tokens if isinstance(max_output_tokens, int) else 0
+            )
+        self.context_packer = context_packer
+        
+        # Shared with PineconeService so a query is embedded at most once
+        self.embedding_cache = embedding_cache or get_shared_embedding_cache()
+        
         # Initialize embedding model with separate API configuration
         if embedding_model:
             self.embedding_model = embedding_model
@@ -313,9 +496,12 @@ class VietnameseLegalRAG:
                 embedding_kwargs['openai_api_base'] = embedding_api_base
             
             try:
-                # Use text-embedding-3-small (compatible with API key)
+                # Use text-embedding-3-small (compatible with API key), on the shared connection pools
+                registry = get_client_registry()
                 self.embedding_model = OpenAIEmbeddings(
                     model="text-embedding-3-small",
+                    http_client=registry.http_client(),
+                    http_async_client=registry.async_http_client(),
                     **embedding_kwargs
                 )
                 logger.info("Successfully initialized text-embedding-3-small")
@@ -326,10 +512,11 @@ class VietnameseLegalRAG:
             self.embedding_model = None
             
         self.text_processor = text_processor or VietnameseTextProcessor()
+        self._keyword_matcher = get_keyword_matcher()
         
         # Initialize components
         self.prompt_templates = VietnameseLegalPromptTemplates()
-        self.citation_extractor = LegalCitationExtractor()
+        self.citation_extractor = LegalCitationExtractor(self.stage_metrics)
         self.validator = VietnameseLegalValidator()
         self.legal_domains = VietnameseLegalDomains()
         
@@ -337,13 +524,8 @@ class VietnameseLegalRAG:
         self._strategies: Dict[LegalQueryType, ILegalRAGStrategy] = {}
         self._init_strategies()
         
-        # Performance tracking
-        self.query_history: List[LegalQueryResult] = []
-        self.performance_metrics = {
-            "total_queries": 0,
-            "avg_confidence": 0.0,
-            "domain_distribution": {}
-        }
+        # Performance tracking: bounded history of compact records plus sharded aggregates
+        self.query_stats = QueryStats(history_size=history_size)
         
         logger.info("VietnameseLegalRAG initialized successfully")
     
@@ -381,53 +563,402 @@ class VietnameseLegalRAG:
         Returns:
             LegalQueryResult: Comprehensive structured result
         """
-        try:
-            # Step 1: Preprocess and analyze query
-            processed_query = self._preprocess_vietnamese_query(question)
-            detected_domain = legal_domain or self._detect_legal_domain(question)
-            detected_query_type = query_type or self._classify_query_type(question)
+        # Identical concurrent questions share one execution
+        key = self._single_flight_key(question, legal_domain, query_type, max_results,
+                                      confidence_threshold, include_related)
+        result = self.single_flight.do(key, lambda: self._execute_query(
+            question, legal_domain, query_type, max_results, confidence_threshold, include_related
+        ))
+        return copy.deepcopy(result)
+    
+    def _execute_query(
+        self,
+        question: str,
+        legal_domain: Optional[str],
+        query_type: Optional[LegalQueryType],
+        max_results: int,
+        confidence_threshold: float,
+        include_related: bool
+    ) -> LegalQueryResult:
+        """Run the full query pipeline (see query())"""
+        with self.stage_metrics.time("total"):
+            try:
+                context, query_embedding, cached = self._prepare_query(
+                    question, legal_domain, query_type, max_results, confidence_threshold
+                )
+                if cached is not None:
+                    return cached
             
-            logger.info(f"Processing query - Domain: {detected_domain}, Type: {detected_query_type}")
+                # Step 3: Select and execute appropriate strategy
+                strategy = self._strategies.get(context["query_type"], self._strategies[LegalQueryType.GENERAL])
+                result = strategy.process_query(context["processed_query"], context)
             
-            # Step 2: Retrieve relevant documents using advanced search
-            relevant_docs = self._retrieve_documents(
-                processed_query,
-                detected_domain,
-                max_results,
-                confidence_threshold
-            )
+                return self._finalize_result(result, context, include_related, query_embedding)
             
-            # Step 3: Select and execute appropriate strategy
-            strategy = self._strategies.get(detected_query_type, self._strategies[LegalQueryType.GENERAL])
+            except Exception as e:
+                logger.error(f"Error processing query: {str(e)}")
+                return self._create_error_result(question, str(e))
+    
+    async def aquery(
+        self,
+        question: str,
+        legal_domain: Optional[str] = None,
+        query_type: Optional[LegalQueryType] = None,
+        max_results: int = 5,
+        confidence_threshold: float = 0.7,
+        include_related: bool = True
+    ) -> LegalQueryResult:
+        """
+        Async variant of query(): embedding, vector search and generation are awaited,
+        so many questions can be in flight on one event loop.
+        """
+        key = self._single_flight_key(question, legal_domain, query_type, max_results,
+                                      confidence_threshold, include_related)
+        result = await self.single_flight.ado(key, lambda: self._aexecute_query(
+            question, legal_domain, query_type, max_results, confidence_threshold, include_related
+        ))
+        return copy.deepcopy(result)
+    
+    async def _aexecute_query(
+        self,
+        question: str,
+        legal_domain: Optional[str],
+        query_type: Optional[LegalQueryType],
+        max_results: int,
+        confidence_threshold: float,
+        include_related: bool
+    ) -> LegalQueryResult:
+        """Run the full query pipeline asynchronously (see aquery())"""
+        with self.stage_metrics.time("total"):
+            try:
+                context, query_embedding, cached = await self._aprepare_query(
+                    question, legal_domain, query_type, max_results, confidence_threshold
+                )
+                if cached is not None:
+                    return cached
+            
+                strategy = self._strategies.get(context["query_type"], self._strategies[LegalQueryType.GENERAL])
+                documents = strategy.select_documents(context["processed_query"], context["documents"])
+                prompt = self._build_generation_prompt(
+                    context["processed_query"], documents, context["legal_domain"], context["query_type"]
+                )
             
-            context = {
-                "original_query": question,
-                "processed_query": processed_query,
-                "documents": relevant_docs,
-                "legal_domain": detected_domain,
-                "query_type": detected_query_type
-            }
+                # Generate asynchronously, then let the strategy post-process without another LLM call
+                agenerate = getattr(self.chat_model, "agenerate_response", None)
+                with self.stage_metrics.time("llm"):
+                    if inspect.iscoroutinefunction(agenerate):
+                        context["generated_response"] = await agenerate(prompt)
+                    else:
+                        context["generated_response"] = await asyncio.to_thread(
+                            self.chat_model.generate_response, prompt
+                        )
             
-            result = strategy.process_query(processed_query, context)
+                result = strategy.process_query(context["processed_query"], context)
+                return self._finalize_result(result, context, include_related, query_embedding)
             
-            # Step 4: Post-process and enhance result
-            if include_related:
-                result.related_topics = self._find_related_topics(question, detected_domain)
+            except Exception as e:
+                logger.error(f"Error processing query: {str(e)}")
+                return self._create_error_result(question, str(e))
+    
+    @staticmethod
+    def _single_flight_key(
+        question: str,
+        legal_domain: Optional[str],
+        query_type: Optional[LegalQueryType],
+        *options: Any
+    ) -> Tuple[Any, ...]:
+        """Coalescing key: normalized question, domain, query type and query options"""
+        return (normalize_question(question), legal_domain, query_type, *options)
+    
+    def query_stream(
+        self,
+        question: str,
+        legal_domain: Optional[str] = None,
+        query_type: Optional[LegalQueryType] = None,
+        max_results: int = 5,
+        confidence_threshold: float = 0.7,
+        include_related: bool = True
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Streaming variant of query().
+        
+        Yields {"type": "token", "content": str} frames as the model generates, then one
+        {"type": "final", "result": LegalQueryResult} frame with citations and confidence.
+        The final answer is authoritative: strategies may append to the streamed text
+        (e.g. the compliance summary).
+        """
+        try:
+            context, query_embedding, cached = self._prepare_query(
+                question, legal_domain, query_type, max_results, confidence_threshold
+            )
+            if cached is not None:
+                yield {"type": "token", "content": cached.answer}
+                yield {"type": "final", "result": cached}
+                return
             
-            # Step 5: Validate and add warnings
-            validation_result = self.validator.validate_response(result.answer, relevant_docs)
-            result.warnings.extend(validation_result.get("warnings", []))
+            strategy = self._strategies.get(context["query_type"], self._strategies[LegalQueryType.GENERAL])
+            documents = strategy.select_documents(context["processed_query"], context["documents"])
+            prompt = self._build_generation_prompt(
+                context["processed_query"], documents, context["legal_domain"], context["query_type"]
+            )
             
-            # Step 6: Update performance metrics
-            self._update_metrics(result)
-            self.query_history.append(result)
+            chunks = []
+            with self.stage_metrics.time("llm"):
+                for token in self.chat_model.generate_response_stream(prompt):
+                    chunks.append(token)
+                    yield {"type": "token", "content": token}
             
-            logger.info(f"Query processed successfully - Confidence: {result.confidence_score}")
-            return result
+            # Strategy post-processing runs on the streamed text without a second LLM call
+            context["generated_response"] = "".join(chunks)
+            result = strategy.process_query(context["processed_query"], context)
+            result = self._finalize_result(result, context, include_related, query_embedding)
+            yield {"type": "final", "result": result}
             
         except Exception as e:
-            logger.error(f"Error processing query: {str(e)}")
-            return self._create_error_result(question, str(e))
+            logger.error(f"Error streaming query: {str(e)}")
+            yield {"type": "final", "result": self._create_error_result(question, str(e))}
+    
+    def _prepare_query(
+        self,
+        question: str,
+        legal_domain: Optional[str],
+        query_type: Optional[LegalQueryType],
+        max_results: int,
+        confidence_threshold: float
+    ) -> Tuple[Dict[str, Any], Optional[List[float]], Optional[LegalQueryResult]]:
+        """
+        Analyze the question, check the answer cache and retrieve documents.
+        Returns (strategy context, query embedding for the answer cache, cached result or None).
+        """
+        context = self._analyze_query(question, legal_domain, query_type)
+        
+        # Step 1b: Citation-shaped questions are answered from the indexes, before any embedding call
+        documents = self._citation_shortcut(question, context["legal_domain"], max_results)
+        if documents:
+            context["documents"] = documents
+            return context, None, None
+        
+        # Step 1c: Semantic answer cache
+        query_embedding = self._answer_cache_embedding(context["processed_query"])
+        cached = self._cached_answer(context, query_embedding)
+        if cached is not None:
+            return context, query_embedding, cached
+        
+        context["documents"] = self._retrieve_documents(
+            context["processed_query"],
+            context["legal_domain"],
+            max_results,
+            confidence_threshold,
+            question=question,
+            citation_shortcut=False
+        )
+        
+        return context, query_embedding, None
+    
+    def _gather_documents(
+        self,
+        question: str,
+        context: Dict[str, Any],
+        max_results: int,
+        confidence_threshold: float
+    ) -> List[Dict[str, Any]]:
+        """Step 2: Citation-shaped questions are answered from the citation and BM25 indexes;
+        everything else goes through hybrid search"""
+        relevant_docs = self._citation_shortcut(question, context["legal_domain"], max_results)
+        if not relevant_docs:
+            relevant_docs = self._retrieve_documents(
+                context["processed_query"],
+                context["legal_domain"],
+                max_results,
+                confidence_threshold,
+                question=question,
+                citation_shortcut=False
+            )
+        return relevant_docs
+    
+    def _citation_shortcut(self, question: str, legal_domain: str, max_results: int) -> List[Dict[str, Any]]:
+        """Citation index first, then the BM25 citation lookup; [] for questions without an exact citation"""
+        documents = self._lookup_citations(question, max_results)
+        if documents:
+            return documents
+        documents = self._citation_lookup(question, legal_domain, max_results)
+        if documents:
+            logger.info(f"Citation query answered from BM25 index ({len(documents)} chunks)")
+        return documents
+    
+    def retrieve_context(
+        self,
+        question: str,
+        legal_domain: Optional[str] = None,
+        query_type: Optional[LegalQueryType] = None,
+        max_results: int = 5,
+        confidence_threshold: float = 0.7
+    ) -> LegalRetrievalContext:
+        """
+        Retrieval-only variant of query(): runs analysis and retrieval but no LLM call.
+        Callers that build their own prompt (e.g. the chatbot with conversation history)
+        use this to generate the answer in a single pass.
+        
+        Returns:
+            LegalRetrievalContext: Documents, citations, scores and formatted context
+        """
+        context = self._analyze_query(question, legal_domain, query_type)
+        documents = self._gather_documents(question, context, max_results, confidence_threshold)
+        
+        strategy = self._strategies.get(context["query_type"], self._strategies[LegalQueryType.GENERAL])
+        documents = strategy.select_documents(context["processed_query"], documents)
+        packed, context_text = self._pack_context(documents)
+        
+        return LegalRetrievalContext(
+            query=question,
+            processed_query=context["processed_query"],
+            legal_domain=context["legal_domain"],
+            query_type=context["query_type"],
+            documents=packed.documents,
+            citations=self.citation_extractor.extract_citations_from_documents(packed.documents),
+            context_text=context_text,
+            context_tokens=packed.tokens_used,
+            tokens_dropped=packed.tokens_dropped
+        )
+    
+    async def _aprepare_query(
+        self,
+        question: str,
+        legal_domain: Optional[str],
+        query_type: Optional[LegalQueryType],
+        max_results: int,
+        confidence_threshold: float
+    ) -> Tuple[Dict[str, Any], Optional[List[float]], Optional[LegalQueryResult]]:
+        """Async variant of _prepare_query"""
+        context = self._analyze_query(question, legal_domain, query_type)
+        
+        documents = self._citation_shortcut(question, context["legal_domain"], max_results)
+        if documents:
+            context["documents"] = documents
+            return context, None, None
+        
+        query_embedding = None
+        if self.answer_cache is not None and self.embedding_model:
+            try:
+                with self.stage_metrics.time("embed"):
+                    query_embedding = await self.embedding_cache.aembed_query(
+                        self.embedding_model, context["processed_query"]
+                    )
+            except Exception as e:
+                logger.warning(f"Answer cache embedding failed: {e}")
+        cached = self._cached_answer(context, query_embedding)
+        if cached is not None:
+            return context, query_embedding, cached
+        
+        context["documents"] = await self._aretrieve_documents(
+            context["processed_query"],
+            context["legal_domain"],
+            max_results,
+            confidence_threshold,
+            question=question,
+            citation_shortcut=False
+        )
+        
+        return context, query_embedding, None
+    
+    def _analyze_query(
+        self,
+        question: str,
+        legal_domain: Optional[str],
+        query_type: Optional[LegalQueryType]
+    ) -> Dict[str, Any]:
+        """Step 1: Preprocess and analyze query into the strategy context"""
+        started_at = time.perf_counter()
+        with self.stage_metrics.time("preprocess"):
+            processed_query = self._preprocess_vietnamese_query(question)
+        with self.stage_metrics.time("domain_detect"):
+            hits = self._keyword_matcher.scan(question)
+            detected_domain = legal_domain or self._detect_legal_domain(question, hits)
+            detected_query_type = query_type or self._classify_query_type(question, hits)
+        
+        logger.info(f"Processing query - Domain: {detected_domain}, Type: {detected_query_type}")
+        
+        return {
+            "original_query": question,
+            "processed_query": processed_query,
+            "started_at": started_at,
+            "documents": [],
+            "legal_domain": detected_domain,
+            "query_type": detected_query_type,
+            # Part of the answer-cache key: "Điều 34" and "Điều 35" embed almost identically
+            "citation_key": tuple(sorted(self.lexical_index.citation_terms(question)))
+        }
+    
+    def _cached_answer(
+        self,
+        context: Dict[str, Any],
+        query_embedding: Optional[List[float]]
+    ) -> Optional[LegalQueryResult]:
+        """Serve a cached answer for a near-identical question, recording it as a query"""
+        if query_embedding is None:
+            return None
+        cached = self.answer_cache.get(
+            query_embedding, context["legal_domain"], context["query_type"], scope=context["citation_key"]
+        )
+        if cached is None:
+            return None
+        
+        logger.info("Answer cache hit")
+        # Callers may mutate the result (sources, citations, warnings); the cached copy stays intact
+        result = copy.deepcopy(cached)
+        result.timestamp = datetime.now()
+        self._update_metrics(result, context)
+        return result
+    
+    def _finalize_result(
+        self,
+        result: LegalQueryResult,
+        context: Dict[str, Any],
+        include_related: bool,
+        query_embedding: Optional[List[float]]
+    ) -> LegalQueryResult:
+        """Add related topics and validation warnings, record metrics and cache the answer"""
+        # Step 4: Post-process and enhance result
+        if include_related:
+            result.related_topics = self._find_related_topics(context["original_query"], context["legal_domain"])
+        
+        # Step 5: Validate and add warnings
+        with self.stage_metrics.time("validation"):
+            validation_result = self.validator.validate_response(result.answer, context["documents"])
+        result.warnings.extend(validation_result.get("warnings", []))
+        
+        # Step 6: Update performance metrics
+        self._update_metrics(result, context)
+        
+        if query_embedding is not None:
+            self.answer_cache.put(
+                query_embedding, context["legal_domain"], context["query_type"], copy.deepcopy(result),
+                scope=context["citation_key"]
+            )
+        
+        logger.info(f"Query processed successfully - Confidence: {result.confidence_score}")
+        return result
+    
+    def _answer_cache_embedding(self, query: str) -> Optional[List[float]]:
+        """Query embedding for the answer cache (shared with retrieval via the embedding cache)"""
+        if self.answer_cache is None or not self.embedding_model:
+            return None
+        try:
+            with self.stage_metrics.time("embed"):
+                return self.embedding_cache.embed_query(self.embedding_model, query)
+        except Exception as e:
+            logger.warning(f"Answer cache embedding failed: {e}")
+            return None
+    
+    def invalidate_answer_cache(self, legal_domains: Optional[List[str]] = None):
+        """Drop cached answers for the given domains (all domains when None)"""
+        if self.answer_cache is None:
+            return
+        if legal_domains is None:
+            self.answer_cache.clear()
+        else:
+            for domain in legal_domains:
+                self.answer_cache.invalidate_domain(domain)
     
     def _preprocess_vietnamese_query(self, query: str) -> str:
         """Advanced Vietnamese legal query preprocessing"""
@@ -435,8 +966,7 @@ class VietnameseLegalRAG:
             # Normalize Vietnamese text
             normalized = self.text_processor.normalize_vietnamese_text(query)
             
-            # Extract and expand legal terms
-            legal_terms = self._extract_legal_terms(normalized)
+            # Expand legal abbreviations
             expanded_query = self._expand_legal_abbreviations(normalized)
             
             # Add context keywords based on detected intent
@@ -453,86 +983,134 @@ class VietnameseLegalRAG:
         query: str,
         legal_domain: str,
         max_results: int,
-        confidence_threshold: float
+        confidence_threshold: float,
+        question: Optional[str] = None,
+        citation_shortcut: bool = True
     ) -> List[Dict[str, Any]]:
-        """Retrieve relevant documents with advanced filtering and ranking"""
+        """
+        Retrieve relevant documents with advanced filtering and ranking.
+        `question` is the user's original text: exact citations are detected on it, because the
+        processed query is lower-cased and abbreviation-expanded. Callers that already tried
+        _citation_shortcut pass citation_shortcut=False.
+        """
         try:
-            # Generate query embedding (handle missing embedding model)
-            if self.embedding_model:
-                query_embedding = self.embedding_model.embed_query(query)
-            else:
-                query_embedding = None
+            # Exact citation lookups ("Điều 34", "145/2020/NĐ-CP") are answered lexically
+            # without an embedding call
+            citation_hits = self._citation_lookup(question or query, legal_domain, max_results) if citation_shortcut else []
+            if citation_hits:
+                logger.info(f"Citation query answered from BM25 index ({len(citation_hits)} chunks)")
+                return citation_hits
             
-            # Prepare metadata filters
-            metadata_filter = {
-                "legal_domain": legal_domain,
-                "language": "vietnamese"
-            }
+            # Queries likely to miss start the web fallback now, in parallel with vector search
+            predicted_miss = self._predict_fallback(legal_domain)
+            speculative = None
+            if predicted_miss:
+                speculative = self._fallback_executor.submit(self._serp_fallback, query, legal_domain, max_results)
+                self._count_speculative("launched")
             
-            # Search with multiple strategies
-            results = []
+            try:
+                # Generate query embedding (handle missing embedding model)
+                if self.embedding_model:
+                    with self.stage_metrics.time("embed"):
+                        query_embedding = self.embedding_cache.embed_query(self.embedding_model, query)
+                else:
+                    query_embedding = None
+                
+                # Search primary and related domains concurrently, reusing the query embedding
+                with self.stage_metrics.time("vector_search"):
+                    results = self._search_domains(query, query_embedding, legal_domain, max_results)
+                
+                filtered_results = self._rank_results(query, results, legal_domain, max_results, confidence_threshold)
+            except Exception:
+                if speculative is not None:
+                    self._drop_speculative(speculative)
+                raise
             
-            # Primary search: Exact domain match
-            primary_results = self.pinecone_service.similarity_search(
-                query_text=query,
-                k=max_results,
-                metadata_filter=metadata_filter
-            )
-            results.extend(primary_results)
+            # If vector search has insufficient results, use SerpAPI as fallback
+            needs_fallback = len(filtered_results) < max_results // 2
+            self._record_fallback_prediction(legal_domain, predicted_miss, needs_fallback)
+            if needs_fallback and self.serp_service:
+                missing = max_results - len(filtered_results)
+                if speculative is not None:
+                    try:
+                        web_results = speculative.result(timeout=self._serp_deadline())
+                    except FuturesTimeoutError:
+                        logger.warning("⚠️ Speculative SerpAPI fallback missed its deadline")
+                        self._count_speculative("timed_out")
+                    else:
+                        self._count_speculative("used")
+                        filtered_results.extend(web_results[:missing])
+                else:
+                    filtered_results.extend(self._serp_fallback(query, legal_domain, missing))
+            elif speculative is not None:
+                # Vector results are sufficient: drop the speculative web search
+                self._drop_speculative(speculative)
             
-            # Secondary search: Related domains if insufficient results
-            if len(results) < max_results // 2:
-                related_domains = self._get_related_domains(legal_domain)
-                for domain in related_domains:
-                    metadata_filter["legal_domain"] = domain
-                    secondary_results = self.pinecone_service.similarity_search(
-                        query_text=query,
-                        k=max_results - len(results),
-                        metadata_filter=metadata_filter
-                    )
-                    results.extend(secondary_results)
+            return filtered_results[:max_results]
             
-            # Filter by confidence and rank
-            filtered_results = [
-                doc for doc in results 
-                if doc.get("score", 0) >= confidence_threshold
-            ]
+        except Exception as e:
+            logger.error(f"Document retrieval failed: {e}")
+            return []
+    
+    async def _aretrieve_documents(
+        self,
+        query: str,
+        legal_domain: str,
+        max_results: int,
+        confidence_threshold: float,
+        question: Optional[str] = None,
+        citation_shortcut: bool = True
+    ) -> List[Dict[str, Any]]:
+        """Async variant of _retrieve_documents: embedding and searches never block the event loop"""
+        try:
+            citation_hits = self._citation_lookup(question or query, legal_domain, max_results) if citation_shortcut else []
+            if citation_hits:
+                logger.info(f"Citation query answered from BM25 index ({len(citation_hits)} chunks)")
+                return citation_hits
             
-            # Sort by relevance score
-            filtered_results.sort(key=lambda x: x.get("score", 0), reverse=True)
+            predicted_miss = self._predict_fallback(legal_domain)
+            speculative = None
+            if predicted_miss:
+                # Submitted to the fallback pool (not to_thread) so cancel() reports whether the call was avoided
+                speculative = self._fallback_executor.submit(self._serp_fallback, query, legal_domain, max_results)
+                self._count_speculative("launched")
             
-            # If vector search has insufficient results, use SerpAPI as fallback
-            if len(filtered_results) < max_results // 2 and self.serp_service:
-                logger.info(f"Vector search returned only {len(filtered_results)} results, using SerpAPI fallback")
+            try:
+                if self.embedding_model:
+                    with self.stage_metrics.time("embed"):
+                        query_embedding = await self.embedding_cache.aembed_query(self.embedding_model, query)
+                else:
+                    query_embedding = None
                 
-                try:
-                    # Search with SerpAPI for additional results
-                    serp_results = self.serp_service.search_legal_documents(
-                        question=query, 
-                        max_results=max_results - len(filtered_results)
-                    )
-                    
-                    # Convert SerpAPI results to compatible format
-                    for serp_doc in serp_results:
-                        formatted_doc = {
-                            "page_content": serp_doc.get("content", ""),
-                            "metadata": {
-                                "document_name": serp_doc.get("title", ""),
-                                "legal_reference": serp_doc.get("article", ""),
-                                "source": serp_doc.get("source", ""),
-                                "authority": serp_doc.get("authority", "SerpAPI"),
-                                "legal_domain": legal_domain,
-                                "search_type": "serp_api"
-                            },
-                            "score": serp_doc.get("relevance_score", 0.8),
-                            "search_type": "serp_api"
-                        }
-                        filtered_results.append(formatted_doc)
-                    
-                    logger.info(f"Added {len(serp_results)} documents from SerpAPI search")
-                    
-                except Exception as serp_error:
-                    logger.error(f"SerpAPI fallback search failed: {serp_error}")
+                with self.stage_metrics.time("vector_search"):
+                    results = await self._asearch_domains(query, query_embedding, legal_domain, max_results)
+                filtered_results = self._rank_results(query, results, legal_domain, max_results, confidence_threshold)
+            except BaseException:
+                if speculative is not None:
+                    self._drop_speculative(speculative)
+                raise
+            
+            needs_fallback = len(filtered_results) < max_results // 2
+            self._record_fallback_prediction(legal_domain, predicted_miss, needs_fallback)
+            if needs_fallback and self.serp_service:
+                missing = max_results - len(filtered_results)
+                if speculative is not None:
+                    try:
+                        web_results = await asyncio.wait_for(
+                            asyncio.wrap_future(speculative), timeout=self._serp_deadline()
+                        )
+                    except asyncio.TimeoutError:
+                        logger.warning("⚠️ Speculative SerpAPI fallback missed its deadline")
+                        self._count_speculative("timed_out")
+                    else:
+                        self._count_speculative("used")
+                        filtered_results.extend(web_results[:missing])
+                else:
+                    filtered_results.extend(await asyncio.to_thread(
+                        self._serp_fallback, query, legal_domain, missing
+                    ))
+            elif speculative is not None:
+                self._drop_speculative(speculative)
             
             return filtered_results[:max_results]
             
@@ -540,76 +1118,417 @@ class VietnameseLegalRAG:
             logger.error(f"Document retrieval failed: {e}")
             return []
     
-    def _generate_contextual_response(
+    def _predict_fallback(self, legal_domain: str) -> bool:
+        """Whether to start the web fallback speculatively (speculative mode only)"""
+        if not (self.speculative_fallback and self.serp_service):
+            return False
+        return self.fallback_predictor.predict_miss(legal_domain)
+    
+    def _serp_deadline(self) -> float:
+        """How long to wait for a speculative web search: the SerpAPI deadline, else the retrieval timeout"""
+        deadline = getattr(self.serp_service, "deadline", None)
+        return deadline if isinstance(deadline, (int, float)) else self.retrieval_timeout
+    
+    def _count_speculative(self, outcome: str):
+        """Increment a speculative-fallback counter (retrievals run on many threads)"""
+        with self._speculative_lock:
+            self.speculative_stats[outcome] += 1
+    
+    def _speculative_snapshot(self) -> Dict[str, int]:
+        """Consistent copy of the speculative-fallback counters"""
+        with self._speculative_lock:
+            return dict(self.speculative_stats)
+    
+    def _drop_speculative(self, speculative: Future):
+        """Cancel an unneeded web search; a call that already started cannot be stopped and is counted as wasted"""
+        self._count_speculative("cancelled" if speculative.cancel() else "wasted")
+    
+    def _record_fallback_prediction(self, legal_domain: str, predicted_miss: bool, missed: bool):
+        """Track prediction accuracy against the actual vector-search outcome"""
+        if self.speculative_fallback and self.serp_service:
+            self.fallback_predictor.record(legal_domain, predicted_miss, missed)
+    
+    def _low_coverage_domains(self, min_chunks: int) -> List[str]:
+        """Domains with fewer than min_chunks indexed chunks (unknown when the lexical index is empty)"""
+        counts = Counter(
+            (doc.get("metadata") or {}).get("legal_domain") for doc in self.lexical_index.documents()
+        )
+        if not counts:
+            return []
+        return [domain for domain in VietnameseLegalDomains.get_all_domains() if counts.get(domain, 0) < min_chunks]
+    
+    def _rank_results(
         self,
         query: str,
-        context_docs: List[Dict[str, Any]],
+        results: List[Dict[str, Any]],
         legal_domain: str,
-        query_type: LegalQueryType
-    ) -> Tuple[str, str, float]:
-        """Generate contextual response with reasoning and confidence"""
+        max_results: int,
+        confidence_threshold: float
+    ) -> List[Dict[str, Any]]:
+        """Fuse vector results with BM25 results and drop those below the confidence threshold"""
+        # Reciprocal-rank fusion with BM25 results (no-op when the lexical index is empty)
+        lexical_results = self._lexical_search(query, legal_domain, max_results)
+        if lexical_results:
+            results = self._fuse_rankings([results, lexical_results], max_results)
+        else:
+            # Sort by relevance score
+            results.sort(key=lambda x: x.get("score", 0), reverse=True)
+        
+        # Filter by confidence, keeping the ranking order
+        return [
+            doc for doc in results 
+            if doc.get("score", 0) >= confidence_threshold
+        ]
+    
+    def _serp_fallback(self, query: str, legal_domain: str, max_results: int) -> List[Dict[str, Any]]:
+        """Search SerpAPI when the knowledge base has too few results"""
+        logger.info(f"Using SerpAPI fallback for up to {max_results} documents")
+        
+        formatted_docs = []
         try:
-            # Build context from retrieved documents
-            context = self._build_document_context(context_docs)
-            logger.info(f"Built context from {len(context_docs)} documents, context length: {len(context)}")
+            # Search with SerpAPI for additional results
+            with self.stage_metrics.time("serp_fallback"):
+                serp_results = self.serp_service.search_legal_documents(
+                    question=query, 
+                    max_results=max_results
+                )
             
-            # Select appropriate prompt template
-            template = self._select_prompt_template(query_type, legal_domain)
+            # Convert SerpAPI results to compatible format
+            for serp_doc in serp_results:
+                formatted_doc = {
+                    "page_content": serp_doc.get("content", ""),
+                    "metadata": {
+                        "document_name": serp_doc.get("title", ""),
+                        "legal_reference": serp_doc.get("article", ""),
+                        "source": serp_doc.get("source", ""),
+                        "authority": serp_doc.get("authority", "SerpAPI"),
+                        "legal_domain": legal_domain,
+                        "search_type": "serp_api"
+                    },
+                    "score": serp_doc.get("relevance_score", 0.8),
+                    "search_type": "serp_api"
+                }
+                formatted_docs.append(formatted_doc)
             
-            # Generate response using LLM
-            prompt = template.format(
-                context=context,
-                question=query,
-                legal_domain=legal_domain
-            )
+            logger.info(f"Added {len(serp_results)} documents from SerpAPI search")
             
-            response = self.chat_model.generate_response(prompt)
+        except Exception as serp_error:
+            logger.error(f"SerpAPI fallback search failed: {serp_error}")
+        
+        return formatted_docs
+    
+    def _search_domains(
+        self,
+        query: str,
+        query_embedding: Optional[List[float]],
+        legal_domain: str,
+        max_results: int
+    ) -> List[Dict[str, Any]]:
+        """
+        Search the primary domain and, speculatively, its related domains concurrently under
+        one deadline. Related-domain results are only merged in when the primary domain is
+        sparse (fewer than max_results // 2 hits); otherwise searches still queued are cancelled.
+        """
+        def search(domain: str) -> List[Dict[str, Any]]:
+            return self.pinecone_service.similarity_search(
+                query_text=query,
+                k=max_results,
+                metadata_filter={"legal_domain": domain, "language": "vietnamese"},
+                query_vector=query_embedding,
+                return_documents=True
+            )
+        
+        def collect(futures: List[Future], timeout: float) -> List[Dict[str, Any]]:
+            done, pending = wait(futures, timeout=timeout)
+            for future in pending:
+                future.cancel()
+            if pending:
+                logger.warning(f"{len(pending)} domain searches missed the {self.retrieval_timeout}s deadline")
+            results = []
+            for future in futures:
+                if future not in done:
+                    continue
+                try:
+                    results.extend(future.result() or [])
+                except Exception as e:
+                    logger.error(f"Domain search failed: {e}")
+            return results
+        
+        deadline = time.monotonic() + self.retrieval_timeout
+        primary = self._retrieval_executor.submit(search, legal_domain)
+        secondary = [self._retrieval_executor.submit(search, domain) for domain in self._get_related_domains(legal_domain)]
+        
+        results = collect([primary], self.retrieval_timeout)
+        if len(results) >= max_results // 2:
+            # Dense primary: related-domain results are not needed
+            for future in secondary:
+                future.cancel()
+        else:
+            results.extend(collect(secondary, max(deadline - time.monotonic(), 0)))
+        
+        return self._merge_top_k(results, max_results)
+    
+    def _lookup_citations(self, question: str, max_results: int) -> List[Dict[str, Any]]:
+        """
+        Direct lookup for questions citing an article (optionally clause/point) of a known law.
+        Returns [] when the question is not citation-shaped or the citation is not indexed.
+        """
+        if not len(self.citation_index):
+            return []
+        try:
+            references = [
+                citation for citation in self.citation_extractor.extract_citations_from_text(question)
+                if citation.article
+            ]
+            if not references:
+                return []
+            law = self.citation_index.resolve_law(question)
+            if not law:
+                return []
             
-            # Extract reasoning and calculate confidence
-            reasoning = self._extract_reasoning(response, context_docs)
-            confidence = self._calculate_confidence(response, context_docs)
+            documents = []
+            for reference in references:
+                documents.extend(self.citation_index.lookup(law, reference.article, reference.clause, reference.point))
+            documents = self._merge_top_k(documents, max_results)
+            if documents:
+                logger.info(f"Citation lookup hit {len(documents)} chunks for {law}")
+            return documents
+        except Exception as e:
+            logger.error(f"Citation lookup failed: {e}")
+            return []
+    
+    async def _asearch_domains(
+        self,
+        query: str,
+        query_embedding: Optional[List[float]],
+        legal_domain: str,
+        max_results: int
+    ) -> List[Dict[str, Any]]:
+        """Async variant of _search_domains using the vector store's async search"""
+        asimilarity_search = getattr(self.pinecone_service, "asimilarity_search", None)
+        
+        async def search(domain: str) -> List[Dict[str, Any]]:
+            kwargs = dict(
+                query_text=query,
+                k=max_results,
+                metadata_filter={"legal_domain": domain, "language": "vietnamese"},
+                query_vector=query_embedding,
+                return_documents=True
+            )
+            if inspect.iscoroutinefunction(asimilarity_search):
+                return await asimilarity_search(**kwargs)
+            return await asyncio.to_thread(self.pinecone_service.similarity_search, **kwargs)
+        
+        async def collect(tasks: List[asyncio.Future], timeout: float) -> List[Dict[str, Any]]:
+            if not tasks:
+                return []
+            done, pending = await asyncio.wait(tasks, timeout=timeout)
+            for task in pending:
+                task.cancel()
+            if pending:
+                logger.warning(f"{len(pending)} domain searches missed the {self.retrieval_timeout}s deadline")
+            results = []
+            for task in tasks:
+                if task not in done:
+                    continue
+                try:
+                    results.extend(task.result() or [])
+                except Exception as e:
+                    logger.error(f"Domain search failed: {e}")
+            return results
+        
+        deadline = time.monotonic() + self.retrieval_timeout
+        primary = asyncio.ensure_future(search(legal_domain))
+        secondary = [asyncio.ensure_future(search(domain)) for domain in self._get_related_domains(legal_domain)]
+        
+        results = await collect([primary], self.retrieval_timeout)
+        if len(results) >= max_results // 2:
+            for task in secondary:
+                task.cancel()
+        else:
+            results.extend(await collect(secondary, max(deadline - time.monotonic(), 0)))
+        
+        return self._merge_top_k(results, max_results)
+    
+    def _lexical_filter(self, legal_domain: str) -> Dict[str, Any]:
+        return {"legal_domain": {"$in": [legal_domain, *self._get_related_domains(legal_domain)]}}
+    
+    def _lexical_search(self, query: str, legal_domain: str, max_results: int) -> List[Dict[str, Any]]:
+        """BM25 search over the primary and related domains"""
+        if not len(self.lexical_index):
+            return []
+        try:
+            return self.lexical_index.search(query, top_k=max_results, metadata_filter=self._lexical_filter(legal_domain))
+        except Exception as e:
+            logger.error(f"Lexical search failed: {e}")
+            return []
+    
+    def _citation_lookup(self, query: str, legal_domain: str, max_results: int) -> List[Dict[str, Any]]:
+        """
+        Chunks containing every citation in the query (article/clause/document number).
+        Returns [] unless the best chunk also covers enough of the remaining query terms.
+        """
+        if not len(self.lexical_index):
+            return []
+        citation_terms = self.lexical_index.citation_terms(query)
+        if not citation_terms:
+            return []
+        try:
+            hits = self.lexical_index.search(
+                query,
+                top_k=max_results,
+                metadata_filter=self._lexical_filter(legal_domain),
+                required_terms=citation_terms
+            )
+        except Exception as e:
+            logger.error(f"Citation lookup failed: {e}")
+            return []
+        if not hits or hits[0]["term_coverage"] < self.citation_shortcut_coverage:
+            return []
+        for hit in hits:
+            # Every hit contains the cited article/document verbatim
+            hit["score"] = 1.0
+            hit["search_type"] = "citation"
+        return hits
+    
+    def _fuse_rankings(self, rankings: List[List[Dict[str, Any]]], k: int) -> List[Dict[str, Any]]:
+        """
+        Reciprocal-rank fusion: sum of 1 / (rrf_k + rank) over the rankings a chunk appears in.
+        The fused document keeps its highest per-ranking score for confidence filtering.
+        """
+        fused: Dict[Any, Dict[str, Any]] = {}
+        rrf_scores: Dict[Any, float] = {}
+        for ranking in rankings:
+            for rank, doc in enumerate(ranking, start=1):
+                metadata = doc.get("metadata") or {}
+                key = doc.get("id") or metadata.get("chunk_id") or doc.get("page_content") or id(doc)
+                rrf_scores[key] = rrf_scores.get(key, 0.0) + 1.0 / (self.rrf_k + rank)
+                current = fused.get(key)
+                if current is None:
+                    fused[key] = dict(doc)
+                elif doc.get("score", 0) > current.get("score", 0):
+                    fused[key]["score"] = doc["score"]
+        for key, doc in fused.items():
+            doc["rrf_score"] = rrf_scores[key]
+        return heapq.nlargest(k, fused.values(), key=lambda doc: doc["rrf_score"])
+    
+    def index_lexical_chunks(self, chunks: List[Dict[str, Any]]) -> int:
+        """
+        Add chunks from LegalDocumentProcessor.process_legal_document to the BM25 and
+        citation indexes (for documents already stored in the vector index)
+        """
+        self.citation_index.add_documents(chunks)
+        added = self.lexical_index.add_documents(chunks)
+        self.invalidate_answer_cache(self._document_domains(chunks))
+        return added
+    
+    @staticmethod
+    def _merge_top_k(documents: List[Dict[str, Any]], k: int) -> List[Dict[str, Any]]:
+        """Heap-based top-k by score, keeping the best-scoring copy of each chunk"""
+        best: Dict[Any, Dict[str, Any]] = {}
+        for doc in documents:
+            metadata = doc.get("metadata") or {}
+            key = doc.get("id") or metadata.get("chunk_id") or doc.get("page_content") or id(doc)
+            current = best.get(key)
+            if current is None or doc.get("score", 0) > current.get("score", 0):
+                best[key] = doc
+        return heapq.nlargest(k, best.values(), key=lambda doc: doc.get("score", 0))
+    
+    def _generate_contextual_response(
+        self,
+        query: str,
+        context_docs: List[Dict[str, Any]],
+        legal_domain: str,
+        query_type: LegalQueryType,
+        response: Optional[str] = None
+    ) -> Tuple[str, str, float]:
+        """
+        Generate contextual response with reasoning and confidence.
+        An already generated (streamed) response is scored without calling the LLM again.
+        """
+        try:
+            if response is None:
+                prompt = self._build_generation_prompt(query, context_docs, legal_domain, query_type)
+                with self.stage_metrics.time("llm"):
+                    response = self.chat_model.generate_response(prompt)
             
+            reasoning, confidence = self._score_response(response, context_docs)
             return response, reasoning, confidence
             
         except Exception as e:
             logger.error(f"Response generation failed: {e}")
             return "Xin lỗi, tôi không thể xử lý câu hỏi này hiện tại.", "Lỗi hệ thống", 0.0
     
+    def _build_generation_prompt(
+        self,
+        query: str,
+        context_docs: List[Dict[str, Any]],
+        legal_domain: str,
+        query_type: LegalQueryType
+    ) -> str:
+        """Build the LLM prompt from retrieved documents and the query-type template"""
+        # Build context from retrieved documents
+        context = self._build_document_context(context_docs)
+        logger.info(f"Built context from {len(context_docs)} documents, context length: {len(context)}")
+        
+        # Select appropriate prompt template
+        template = self._select_prompt_template(query_type, legal_domain)
+        
+        return template.format(
+            context=context,
+            question=query,
+            legal_domain=legal_domain
+        )
+    
+    def _score_response(self, response: str, context_docs: List[Dict[str, Any]]) -> Tuple[str, float]:
+        """Extract reasoning and calculate confidence"""
+        reasoning = self._extract_reasoning(response, context_docs)
+        confidence = self._calculate_confidence(response, context_docs)
+        return reasoning, confidence
+    
     def _build_document_context(self, documents: List[Dict[str, Any]]) -> str:
-        """Build structured context from retrieved documents"""
+        """Build structured context from retrieved documents, packed into the prompt token budget"""
+        return self._pack_context(documents)[1]
+    
+    def _pack_context(self, documents: List[Dict[str, Any]]) -> Tuple[PackedContext, str]:
+        """Pack the highest-scoring documents into the token budget and format them"""
         if not documents:
-            return "Không tìm thấy tài liệu pháp lý liên quan."
-        
-        logger.info(f"Building context from {len(documents)} documents")
-        context_parts = []
+            return PackedContext(documents=[], budget=self.context_packer.budget), "Không tìm thấy tài liệu pháp lý liên quan."
         
-        for i, doc in enumerate(documents, 1):
-            content = doc.get("page_content", "")
-            metadata = doc.get("metadata", {})
-            search_type = doc.get("search_type", "vector")
-            
-            logger.info(f"Document {i}: type={search_type}, content_length={len(content)}, title={metadata.get('document_name', 'N/A')}")
-            
-            # Format document with legal structure
-            doc_section = f"--- Tài liệu {i} "
-            if search_type == "serp_api":
-                doc_section += "(Nguồn: Tìm kiếm internet) ---\n"
-            else:
-                doc_section += "(Nguồn: Cơ sở dữ liệu) ---\n"
-                
-            if metadata.get("document_name"):
-                doc_section += f"Tiêu đề: {metadata['document_name']}\n"
-            if metadata.get("legal_reference"):
-                doc_section += f"Tham chiếu: {metadata['legal_reference']}\n"
-            if metadata.get("source"):
-                doc_section += f"Link: {metadata['source']}\n"
-            doc_section += f"Nội dung:\n{content}\n"
-            
-            context_parts.append(doc_section)
+        with self.stage_metrics.time("context_build"):
+            packed = self.context_packer.pack(documents, render=lambda doc: self._format_document_section(1, doc))
+            context_parts = [
+                self._format_document_section(i, doc) for i, doc in enumerate(packed.documents, 1)
+            ]
+            built_context = "\n".join(context_parts)
+        self.query_stats.add_tokens_dropped(packed.tokens_dropped)
         
-        built_context = "\n".join(context_parts)
+        logger.info(f"Building context from {len(packed.documents)} of {len(documents)} documents "
+                    f"({packed.tokens_used}/{packed.budget} tokens, {packed.tokens_dropped} dropped)")
         logger.info(f"Final context length: {len(built_context)}")
-        return built_context
+        return packed, built_context
+    
+    def _format_document_section(self, index: int, doc: Dict[str, Any]) -> str:
+        """Format one document with its legal structure for the prompt"""
+        content = doc.get("page_content", "")
+        metadata = doc.get("metadata", {})
+        search_type = doc.get("search_type", "vector")
+        
+        # Format document with legal structure
+        doc_section = f"--- Tài liệu {index} "
+        if search_type == "serp_api":
+            doc_section += "(Nguồn: Tìm kiếm internet) ---\n"
+        else:
+            doc_section += "(Nguồn: Cơ sở dữ liệu) ---\n"
+            
+        if metadata.get("document_name"):
+            doc_section += f"Tiêu đề: {metadata['document_name']}\n"
+        if metadata.get("legal_reference"):
+            doc_section += f"Tham chiếu: {metadata['legal_reference']}\n"
+        if metadata.get("source"):
+            doc_section += f"Link: {metadata['source']}\n"
+        doc_section += f"Nội dung:\n{content}\n"
+        return doc_section
     
     def _select_prompt_template(self, query_type: LegalQueryType, legal_domain: str):
         """Select appropriate prompt template based on query type"""
@@ -706,77 +1625,35 @@ Trả lời chi tiết:"""
         text_lower = text.lower()
         return any(re.search(pattern, text_lower) for pattern in citation_patterns)
     
-    def _extract_legal_terms(self, text: str) -> List[str]:
+    def _extract_legal_terms(self, text: str, hits: Optional[KeywordHits] = None) -> List[str]:
         """Extract Vietnamese legal terminology"""
-        legal_terms = [
-            "điều luật", "quy định", "nghị định", "thông tư", "quyết định",
-            "bộ luật", "hiến pháp", "pháp luật", "văn bản pháp luật",
-            "trách nhiệm", "quyền lợi", "nghĩa vụ", "xử phạt", "vi phạm"
-        ]
-        
-        found_terms = []
-        text_lower = text.lower()
-        
-        for term in legal_terms:
-            if term in text_lower:
-                found_terms.append(term)
-        
-        return found_terms
+        hits = hits or self._keyword_matcher.scan(text)
+        found = hits.keywords("query_term")
+        return [term for term in QUERY_LEGAL_TERMS if term in found]
     
     def _expand_legal_abbreviations(self, text: str) -> str:
-        """Expand Vietnamese legal abbreviations"""
-        abbreviations = {
-            "bldđ": "bộ luật lao động",
-            "blhs": "bộ luật hình sự",
-            "blds": "bộ luật dân sự",
-            "hp": "hiến pháp",
-            "nd": "nghị định",
-            "tt": "thông tư",
-            "qđ": "quyết định"
-        }
-        
-        expanded_text = text.lower()
-        for abbr, full_form in abbreviations.items():
-            expanded_text = expanded_text.replace(abbr, full_form)
-        
-        return expanded_text
+        """Expand Vietnamese legal abbreviations (shared table, whole words only, one pass)"""
+        return expand_legal_abbreviations(text).lower()
     
-    def _add_context_keywords(self, query: str) -> str:
+    def _add_context_keywords(self, query: str, hits: Optional[KeywordHits] = None) -> str:
         """Add contextual keywords to enhance search"""
         # Detect query intent and add relevant keywords
-        intent_keywords = {
-            "quyền": ["quyền lợi", "nghĩa vụ", "bảo vệ"],
-            "trách nhiệm": ["nghĩa vụ", "vi phạm", "xử phạt"],
-            "thủ tục": ["quy trình", "hồ sơ", "điều kiện"],
-            "hợp đồng": ["thỏa thuận", "cam kết", "nghĩa vụ"],
-            "tranh chấp": ["giải quyết", "tòa án", "trọng tài"]
-        }
+        hits = hits or self._keyword_matcher.scan(query)
         
         enhanced_query = query
-        for keyword, related in intent_keywords.items():
-            if keyword in query.lower():
+        for keyword, related in CONTEXT_KEYWORDS.items():
+            if hits.has("context", keyword):
                 enhanced_query += " " + " ".join(related)
         
         return enhanced_query
     
-    def _detect_legal_domain(self, query: str) -> str:
+    def _detect_legal_domain(self, query: str, hits: Optional[KeywordHits] = None) -> str:
         """Detect legal domain from query content"""
-        domain_keywords = {
-            "dan_su": ["hợp đồng", "tài sản", "thừa kế", "kết hôn", "ly hôn"],
-            "hinh_su": ["tội phạm", "án phạt", "tù giam", "vi phạm hình sự"],
-            "lao_dong": ["lương", "bảo hiểm", "nghỉ việc", "sa thải", "hợp đồng lao động"],
-            "thuong_mai": ["kinh doanh", "doanh nghiệp", "thương mại", "đầu tư"],
-            "hanh_chinh": ["thủ tục", "giấy phép", "hành chính", "cơ quan nhà nước"],
-            "thue": ["thuế", "khai thuế", "miễn thuế", "nộp thuế"],
-            "bat_dong_san": ["nhà đất", "bất động sản", "quyền sử dụng đất"],
-            "hien_phap": ["hiến pháp", "quyền công dân", "nghĩa vụ công dân"]
-        }
-        
-        query_lower = query.lower()
+        hits = hits or self._keyword_matcher.scan(query)
         domain_scores = {}
         
-        for domain, keywords in domain_keywords.items():
-            score = sum(1 for keyword in keywords if keyword in query_lower)
+        for domain in LEGAL_DOMAIN_KEYWORDS:
+            score = hits.count("routing_domain", domain)
             if score > 0:
                 domain_scores[domain] = score
         
@@ -785,23 +1662,15 @@ Trả lời chi tiết:"""
         else:
             return "general"
     
-    def _classify_query_type(self, query: str) -> LegalQueryType:
+    def _classify_query_type(self, query: str, hits: Optional[KeywordHits] = None) -> LegalQueryType:
         """Classify query type for strategy selection"""
-        query_lower = query.lower()
+        hits = hits or self._keyword_matcher.scan(query)
         
-        # Pattern-based classification
-        if any(word in query_lower for word in ["là gì", "định nghĩa", "khái niệm"]):
-            return LegalQueryType.INTERPRETATION
-        elif any(word in query_lower for word in ["thủ tục", "quy trình", "làm thế nào"]):
-            return LegalQueryType.PROCEDURE
-        elif any(word in query_lower for word in ["vi phạm", "tuân thủ", "có được phép"]):
-            return LegalQueryType.COMPLIANCE
-        elif any(word in query_lower for word in ["điều", "luật", "quy định cụ thể"]):
-            return LegalQueryType.SPECIFIC_LAW
-        elif any(word in query_lower for word in ["trường hợp", "tình huống", "phân tích"]):
-            return LegalQueryType.CASE_ANALYSIS
-        else:
-            return LegalQueryType.GENERAL
+        # Pattern-based classification, first matching type wins
+        for query_type in QUERY_TYPE_KEYWORDS:
+            if hits.has("query_type", query_type.value):
+                return query_type
+        return LegalQueryType.GENERAL
     
     def _get_related_domains(self, domain: str) -> List[str]:
         """Get related legal domains for enhanced search"""
@@ -838,20 +1707,25 @@ Trả lời chi tiết:"""
         
         return list(set(related_topics))  # Remove duplicates
     
-    def _update_metrics(self, result: LegalQueryResult):
-        """Update performance metrics"""
-        self.performance_metrics["total_queries"] += 1
-        
-        # Update average confidence
-        total_confidence = self.performance_metrics["avg_confidence"] * (self.performance_metrics["total_queries"] - 1)
-        self.performance_metrics["avg_confidence"] = (total_confidence + result.confidence_score) / self.performance_metrics["total_queries"]
-        
-        # Update domain distribution
-        domain = result.legal_domain
-        if domain in self.performance_metrics["domain_distribution"]:
-            self.performance_metrics["domain_distribution"][domain] += 1
-        else:
-            self.performance_metrics["domain_distribution"][domain] = 1
+    def _update_metrics(self, result: LegalQueryResult, context: Dict[str, Any]):
+        """Record the query in the bounded history and streaming aggregates"""
+        self.query_stats.record(
+            legal_domain=result.legal_domain,
+            query_type=result.query_type.value,
+            confidence_score=result.confidence_score,
+            latency=time.perf_counter() - context["started_at"],
+            num_sources=len(result.sources)
+        )
+    
+    @property
+    def performance_metrics(self) -> Dict[str, Any]:
+        """total_queries, avg_confidence, domain_distribution, context_tokens_dropped"""
+        return self.query_stats.summary()
+    
+    @property
+    def query_history(self) -> QueryHistory:
+        """Ring buffer of the most recent query records"""
+        return self.query_stats.history
     
     def _create_error_result(self, query: str, error: str) -> LegalQueryResult:
         """Create error result for failed queries"""
@@ -870,7 +1744,7 @@ Trả lời chi tiết:"""
     def add_legal_documents(self, documents: List[DocumentChunk]) -> bool:
         """Add new legal documents to the knowledge base"""
         try:
-            processed_docs = []
+            processed_contents = []
             
             for doc in documents:
                 # Process document content
@@ -879,17 +1753,34 @@ Trả lời chi tiết:"""
                 # Extract legal structure
                 legal_structure = self._extract_legal_structure(processed_content)
                 doc.legal_structure = legal_structure
-                
-                # Generate embedding (handle missing embedding model)
-                if not doc.embedding and self.embedding_model:
-                    doc.embedding = self.embedding_model.embed_documents([processed_content])[0]
-                
-                processed_docs.append(doc)
+                processed_contents.append(processed_content)
+            
+            # Generate embeddings in one batch (handle missing embedding model)
+            pending = [i for i, doc in enumerate(documents) if not doc.embedding]
+            if pending and self.embedding_model:
+                embeddings = self.embedding_cache.embed_documents(
+                    self.embedding_model, [processed_contents[i] for i in pending]
+                )
+                for i, embedding in zip(pending, embeddings):
+                    documents[i].embedding = embedding
+            
+            processed_docs = [
+                {
+                    "id": doc.chunk_id or str(uuid.uuid4()),
+                    "content": content,
+                    "metadata": {**doc.metadata, "legal_structure": json.dumps(doc.legal_structure, ensure_ascii=False)},
+                    "embedding": doc.embedding
+                }
+                for doc, content in zip(documents, processed_contents)
+            ]
             
             # Store in Pinecone
             success = self.pinecone_service.upsert_documents(processed_docs)
             
             if success:
+                self.lexical_index.add_documents(processed_docs)
+                self.citation_index.add_documents(processed_docs)
+                self.invalidate_answer_cache(self._document_domains(processed_docs))
                 logger.info(f"Successfully added {len(documents)} legal documents")
                 return True
             else:
@@ -900,6 +1791,24 @@ Trả lời chi tiết:"""
             logger.error(f"Error adding documents: {e}")
             return False
     
+    def delete_legal_documents(self, document_ids: List[str], legal_domain: Optional[str] = None) -> bool:
+        """Remove documents from the knowledge base and drop affected cached answers"""
+        try:
+            success = self.pinecone_service.delete_documents(document_ids)
+            self.lexical_index.remove_documents(document_ids)
+            self.citation_index.remove_documents(document_ids)
+            self.invalidate_answer_cache([legal_domain] if legal_domain else None)
+            return bool(success)
+        except Exception as e:
+            logger.error(f"Error deleting documents: {e}")
+            return False
+    
+    @staticmethod
+    def _document_domains(documents: List[Dict[str, Any]]) -> Optional[List[str]]:
+        """Legal domains touched by the documents; None when any document has no domain"""
+        domains = {(doc.get("metadata") or {}).get("legal_domain") for doc in documents}
+        return None if None in domains or "" in domains else sorted(domains)
+    
     def _extract_legal_structure(self, content: str) -> Dict[str, Any]:
         """Extract Vietnamese legal document structure"""
         structure = {}
@@ -933,20 +1842,24 @@ Trả lời chi tiết:"""
     
     def get_performance_metrics(self) -> Dict[str, Any]:
         """Get system performance metrics"""
+        last_query = self.query_history.last()
         return {
             "metrics": self.performance_metrics,
+            "single_flight": self.single_flight.get_stats(),
+            "stage_latency": self.stage_metrics.snapshot(),
+            "speculative_fallback": {
+                **self._speculative_snapshot(),
+                "predictor": self.fallback_predictor.get_stats()
+            },
+            "query_rate": self.query_stats.rates(),
+            "quantiles": self.query_stats.quantiles(),
             "recent_queries": len(self.query_history),
-            "last_query_time": self.query_history[-1].timestamp.isoformat() if self.query_history else None
+            "last_query_time": last_query.timestamp.isoformat() if last_query else None
         }
     
     def clear_history(self):
         """Clear query history and reset metrics"""
-        self.query_history.clear()
-        self.performance_metrics = {
-            "total_queries": 0,
-            "avg_confidence": 0.0,
-            "domain_distribution": {}
-        }
+        self.query_stats.reset()
 
 # ============================================================================
 # Strategy Pattern Implementation for Different RAG Approaches
@@ -965,7 +1878,8 @@ class GeneralLegalRAGStrategy(ILegalRAGStrategy):
         
         # Generate response using general template
         response, reasoning, confidence = self.rag_system._generate_contextual_response(
-            query, documents, legal_domain, LegalQueryType.GENERAL
+            query, documents, legal_domain, LegalQueryType.GENERAL,
+            context.get("generated_response")
         )
         
         # Extract citations
@@ -1011,10 +1925,11 @@ class SpecificLawRAGStrategy(ILegalRAGStrategy):
         legal_domain = context["legal_domain"]
         
         # Enhanced document filtering for specific laws
-        specific_docs = self._filter_specific_documents(documents, query)
+        specific_docs = self.select_documents(query, documents)
         
         response, reasoning, confidence = self.rag_system._generate_contextual_response(
-            query, specific_docs, legal_domain, LegalQueryType.SPECIFIC_LAW
+            query, specific_docs, legal_domain, LegalQueryType.SPECIFIC_LAW,
+            context.get("generated_response")
         )
         
         # Enhanced citation extraction for specific laws
@@ -1031,6 +1946,10 @@ class SpecificLawRAGStrategy(ILegalRAGStrategy):
             query_type=LegalQueryType.SPECIFIC_LAW
         )
     
+    def select_documents(self, query: str, documents: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Generation context is restricted to documents with specific legal references"""
+        return self._filter_specific_documents(documents, query)
+    
     def _filter_specific_documents(self, documents: List[Dict], query: str) -> List[Dict]:
         """Filter documents for specific legal references"""
         # Look for specific law names, article numbers in query
@@ -1078,7 +1997,9 @@ class CaseAnalysisRAGStrategy(ILegalRAGStrategy):
         legal_domain = context["legal_domain"]
         
         # Analyze case from multiple legal perspectives
-        analysis_results = self._multi_perspective_analysis(query, documents, legal_domain)
+        analysis_results = self._multi_perspective_analysis(
+            query, documents, legal_domain, context.get("generated_response")
+        )
         
         return LegalQueryResult(
             answer=analysis_results["answer"],
@@ -1092,12 +2013,18 @@ class CaseAnalysisRAGStrategy(ILegalRAGStrategy):
             warnings=analysis_results.get("warnings", [])
         )
     
-    def _multi_perspective_analysis(self, query: str, documents: List[Dict], domain: str) -> Dict[str, Any]:
+    def _multi_perspective_analysis(
+        self,
+        query: str,
+        documents: List[Dict],
+        domain: str,
+        generated_response: Optional[str] = None
+    ) -> Dict[str, Any]:
         """Analyze case from multiple legal perspectives"""
         # This would implement sophisticated case analysis
         # For now, using enhanced general approach
         response, reasoning, confidence = self.rag_system._generate_contextual_response(
-            query, documents, domain, LegalQueryType.CASE_ANALYSIS
+            query, documents, domain, LegalQueryType.CASE_ANALYSIS, generated_response
         )
         
         citations = self.rag_system.citation_extractor.extract_citations_from_documents(documents)
@@ -1142,7 +2069,8 @@ class ComplianceRAGStrategy(ILegalRAGStrategy):
         
         # Generate compliance-focused response
         response, reasoning, confidence = self.rag_system._generate_contextual_response(
-            query, documents, legal_domain, LegalQueryType.COMPLIANCE
+            query, documents, legal_domain, LegalQueryType.COMPLIANCE,
+            context.get("generated_response")
         )
         
         # Add compliance-specific analysis
@@ -1205,7 +2133,8 @@ class InterpretationRAGStrategy(ILegalRAGStrategy):
         legal_domain = context["legal_domain"]
         
         response, reasoning, confidence = self.rag_system._generate_contextual_response(
-            query, documents, legal_domain, LegalQueryType.INTERPRETATION
+            query, documents, legal_domain, LegalQueryType.INTERPRETATION,
+            context.get("generated_response")
         )
         
         # Add interpretation-specific enhancements
@@ -1263,7 +2192,8 @@ class ProcedureRAGStrategy(ILegalRAGStrategy):
         legal_domain = context["legal_domain"]
         
         response, reasoning, confidence = self.rag_system._generate_contextual_response(
-            query, documents, legal_domain, LegalQueryType.PROCEDURE
+            query, documents, legal_domain, LegalQueryType.PROCEDURE,
+            context.get("generated_response")
         )
         
         # Structure response as step-by-step procedure
@@ -1337,8 +2267,9 @@ class ProcedureRAGStrategy(ILegalRAGStrategy):
 class LegalCitationExtractor:
     """Advanced Vietnamese legal citation extraction with OOP design"""
     
-    def __init__(self):
+    def __init__(self, stage_metrics: Optional[StageMetrics] = None):
         """Initialize citation extractor with Vietnamese legal patterns"""
+        self.stage_metrics = stage_metrics or get_stage_metrics()
         self.citation_patterns = self._init_citation_patterns()
         self.legal_document_types = [
             "Hiến pháp", "Luật", "Bộ luật", "Nghị định", 
@@ -1363,6 +2294,10 @@ class LegalCitationExtractor:
     
     def extract_citations_from_documents(self, documents: List[Dict[str, Any]]) -> List[LegalCitation]:
         """Extract structured citations from document list"""
+        with self.stage_metrics.time("citation_extraction"):
+            return self._extract_citations_from_documents(documents)
+    
+    def _extract_citations_from_documents(self, documents: List[Dict[str, Any]]) -> List[LegalCitation]:
         citations = []
         
         for doc in documents:
@@ -1532,6 +2467,8 @@ class VietnameseLegalValidator:
         """Initialize validator with Vietnamese legal validation rules"""
         self.validation_rules = self._init_validation_rules()
         self.legal_terminology = self._load_legal_terminology()
+        # Structure, terminology and prohibited phrases are categories of the shared automaton
+        self._keyword_matcher = get_keyword_matcher()
         
         logger.info("VietnameseLegalValidator initialized")
     
@@ -1540,18 +2477,14 @@ class VietnameseLegalValidator:
         return {
             "min_response_length": 50,
             "required_elements": ["căn cứ", "quy định", "theo"],
-            "prohibited_terms": ["chắc chắn 100%", "hoàn toàn chính xác"],
+            "prohibited_terms": list(PROHIBITED_RESPONSE_TERMS),
             "citation_patterns": [r'điều\s+\d+', r'khoản\s+\d+', r'luật\s+\w+'],
-            "legal_structure_indicators": ["điều", "khoản", "điểm", "chương", "mục"]
+            "legal_structure_indicators": list(LEGAL_STRUCTURE_INDICATORS)
         }
     
     def _load_legal_terminology(self) -> List[str]:
         """Load Vietnamese legal terminology for validation"""
-        return [
-            "quyền", "nghĩa vụ", "trách nhiệm", "vi phạm", "xử phạt",
-            "hợp đồng", "thỏa thuận", "tranh chấp", "giải quyết",
-            "tòa án", "cơ quan", "thẩm quyền", "pháp luật", "văn bản"
-        ]
+        return list(RESPONSE_TERMINOLOGY)
     
     def validate_response(self, response: str, sources: List[Dict]) -> Dict[str, Any]:
         """Comprehensive validation of legal response"""
@@ -1567,8 +2500,11 @@ class VietnameseLegalValidator:
             validation_result["warnings"].append("Phản hồi quá ngắn, có thể thiếu thông tin")
             validation_result["confidence_adjustment"] -= 0.1
         
+        # One keyword pass serves the structure, terminology and prohibited-phrase checks
+        hits = self._keyword_matcher.scan(response)
+        
         # Legal structure validation
-        if not self._has_legal_structure(response):
+        if not self._has_legal_structure(response, hits):
             validation_result["warnings"].append("Thiếu cấu trúc pháp lý chuẩn (điều, khoản, điểm)")
             validation_result["confidence_adjustment"] -= 0.05
         
@@ -1579,12 +2515,12 @@ class VietnameseLegalValidator:
             validation_result["confidence_adjustment"] -= 0.1
         
         # Terminology validation
-        if not self._has_appropriate_terminology(response):
+        if not self._has_appropriate_terminology(response, hits):
             validation_result["warnings"].append("Thiếu thuật ngữ pháp lý chuyên môn")
             validation_result["confidence_adjustment"] -= 0.05
         
         # Prohibited terms check
-        if self._has_prohibited_terms(response):
+        if self._has_prohibited_terms(response, hits):
             validation_result["warnings"].append("Chứa các thuật ngữ tuyệt đối không phù hợp với tư vấn pháp lý")
             validation_result["confidence_adjustment"] -= 0.15
         
@@ -1597,14 +2533,10 @@ class VietnameseLegalValidator:
         
         return validation_result
     
-    def _has_legal_structure(self, text: str) -> bool:
+    def _has_legal_structure(self, text: str, hits: Optional[KeywordHits] = None) -> bool:
         """Check if text contains proper Vietnamese legal structure"""
-        text_lower = text.lower()
-        structure_count = sum(
-            1 for indicator in self.validation_rules["legal_structure_indicators"]
-            if indicator in text_lower
-        )
-        return structure_count >= 1
+        hits = hits or self._keyword_matcher.scan(text)
+        return hits.count("structure") >= 1
     
     def _validate_citations(self, response: str, sources: List[Dict]) -> float:
         """Validate citation quality and relevance"""
@@ -1635,22 +2567,15 @@ class VietnameseLegalValidator:
         
         return min(citation_score, 1.0)
     
-    def _has_appropriate_terminology(self, text: str) -> bool:
+    def _has_appropriate_terminology(self, text: str, hits: Optional[KeywordHits] = None) -> bool:
         """Check if text uses appropriate Vietnamese legal terminology"""
-        text_lower = text.lower()
-        terminology_count = sum(
-            1 for term in self.legal_terminology
-            if term in text_lower
-        )
-        return terminology_count >= 2
+        hits = hits or self._keyword_matcher.scan(text)
+        return hits.count("terminology") >= 2
     
-    def _has_prohibited_terms(self, text: str) -> bool:
+    def _has_prohibited_terms(self, text: str, hits: Optional[KeywordHits] = None) -> bool:
         """Check for prohibited absolute terms in legal advice"""
-        text_lower = text.lower()
-        return any(
-            prohibited in text_lower
-            for prohibited in self.validation_rules["prohibited_terms"]
-        )
+        hits = hits or self._keyword_matcher.scan(text)
+        return hits.has("prohibited")
     
     def _generate_improvement_suggestions(self, response: str, warnings: List[str]) -> List[str]:
         """Generate suggestions for improving response quality"""
@@ -18,15 +18,15 @@ from dataclasses import dataclass, asdict
 import logging
 
 from app.models.chat_model import OpenAIChatModel
-from app.models.legal_rag import VietnameseLegalRAG
+from app.models.legal_rag import VietnameseLegalRAG, LegalRetrievalContext
 from app.utils.text_processing import (
     preprocess_vietnamese_query,
     get_legal_domain,
     extract_legal_citations,
-    VietnameseTextProcessor
+    get_text_processor
 )
 from app.utils.demo_config import demo_settings
-from app.services.pinecone_service import PineconeService
+from app.services.pinecone_service import PineconeService, PineconeServiceFactory
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -99,11 +99,7 @@ class VietnameseLegalChatbot:
             max_tokens=demo_settings.max_tokens
         )
         
-        self.pinecone_service = pinecone_service or PineconeService(
-            api_key=demo_settings.pinecone_api_key,
-            environment=demo_settings.pinecone_environment,
-            index_name=demo_settings.pinecone_index_name
-        )
+        self.pinecone_service = pinecone_service or PineconeServiceFactory.create_from_settings(demo_settings)
         
         # Initialize RAG system with required dependencies
         self.rag_system = rag_system or VietnameseLegalRAG(
@@ -113,7 +109,7 @@ class VietnameseLegalChatbot:
             embedding_api_base=demo_settings.openai_embedding_api_base
         )
         
-        self.text_processor = VietnameseTextProcessor()
+        self.text_processor = get_text_processor()
         
         # Session management
         self.sessions: Dict[str, ChatSession] = {}
@@ -268,15 +264,16 @@ Tôi khuyên bạn nên:
         # Get conversation context
         conversation_history = self._get_conversation_context(session)
         
-        # Use RAG system to get relevant documents
+        # Retrieve documents only; the answer is generated once below with the
+        # conversation history and the documents in the same prompt
         try:
-            rag_result = self.rag_system.query(user_message)
+            retrieval = self.rag_system.retrieve_context(user_message)
             
             # Build enhanced prompt with Vietnamese context
             enhanced_prompt = self._build_vietnamese_legal_prompt(
                 user_message=user_message,
                 query_analysis=query_analysis,
-                rag_result=rag_result,
+                retrieval=retrieval,
                 conversation_history=conversation_history,
                 session_context=session.context
             )
@@ -286,6 +283,7 @@ Tôi khuyên bạn nên:
                 prompt=enhanced_prompt,
                 context=None  # Context is already in the prompt
             )
+            _, confidence = self.rag_system._score_response(response_content, retrieval.documents)
             
             # Add legal disclaimer if needed
             if self._should_add_disclaimer(query_analysis):
@@ -294,10 +292,12 @@ Tôi khuyên bạn nên:
             return {
                 'content': response_content,
                 'metadata': {
-                    'rag_sources': rag_result.sources if hasattr(rag_result, 'sources') else [],
+                    'rag_sources': retrieval.documents,
+                    'citations': [str(citation) for citation in retrieval.citations],
+                    'retrieval_scores': retrieval.scores,
                     'legal_domain': query_analysis.get('legal_domain', 'general'),
                     'intent': query_analysis['intent'],
-                    'confidence': getattr(rag_result, 'confidence', 0.0),
+                    'confidence': confidence,
                     'response_type': 'rag_enhanced'
                 }
             }
@@ -336,7 +336,7 @@ Tôi khuyên bạn nên:
     def _build_vietnamese_legal_prompt(self, 
                                      user_message: str,
                                      query_analysis: Dict[str, Any],
-                                     rag_result: Any,
+                                     retrieval: LegalRetrievalContext,
                                      conversation_history: str,
                                      session_context: Dict[str, Any]) -> str:
         """Build enhanced prompt for Vietnamese legal consultation"""
@@ -361,9 +361,9 @@ Tôi khuyên bạn nên:
         if conversation_history:
             prompt_parts.append(f"Ngữ cảnh cuộc trò chuyện trước:\n{conversation_history}")
         
-        # Add RAG context if available
-        if hasattr(rag_result, 'answer') and rag_result.answer:
-            prompt_parts.append(f"Thông tin pháp lý liên quan:\n{rag_result.answer}")
+        # Add retrieved legal documents
+        if retrieval.documents:
+            prompt_parts.append(f"Tài liệu pháp lý liên quan:\n{retrieval.context_text}")
         
         # Add legal terms context
         if query_analysis.get('legal_terms'):
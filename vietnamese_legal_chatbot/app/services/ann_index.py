@@ -0,0 +1,346 @@
+"""
+Approximate Nearest Neighbour Index for Vietnamese Legal AI Chatbot
+Chỉ mục tìm kiếm lân cận gần đúng cho Chatbot AI Pháp lý Việt Nam
+
+HNSW (Hierarchical Navigable Small World) graph built on NumPy, used by the local
+vector backend once brute-force scoring gets too slow.
+Đồ thị HNSW dựng trên NumPy, dùng cho backend vector cục bộ khi số vector lớn.
+
+Vectors are expected to be L2-normalised; similarity is the inner product.
+The index is not thread-safe on its own: callers (LocalIndex) serialise access.
+"""
+
+import math
+import heapq
+import random
+import logging
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class HNSWIndex:
+    """
+    Chỉ mục HNSW hỗ trợ thêm tăng dần, xóa bằng tombstone và ef điều chỉnh được
+    HNSW index with incremental inserts, tombstone deletes and tunable ef
+    """
+
+    def __init__(
+        self,
+        dimension: int,
+        M: int = 16,
+        ef_construction: int = 200,
+        ef_search: int = 64,
+        seed: int = 42,
+        capacity: int = 1024
+    ):
+        """
+        Args:
+            dimension: Số chiều vector
+            M: Số liên kết tối đa mỗi node ở các tầng trên (tầng 0 dùng 2*M)
+            ef_construction: Kích thước danh sách ứng viên khi xây dựng
+            ef_search: Kích thước danh sách ứng viên mặc định khi tìm kiếm
+            seed: Seed cho việc chọn tầng ngẫu nhiên
+            capacity: Dung lượng ban đầu của ma trận vector
+        """
+        self.dimension = dimension
+        self.M = M
+        self.max_links0 = 2 * M
+        self.ef_construction = ef_construction
+        self.ef_search = ef_search
+        self.seed = seed
+        self._level_mult = 1.0 / math.log(max(M, 2))
+        self._rng = random.Random(seed)
+        self._reset(capacity)
+
+    def _reset(self, capacity: int) -> None:
+        self._vectors = np.zeros((capacity, self.dimension), dtype=np.float32)
+        self._node_labels = np.full(capacity, -1, dtype=np.int64)
+        self._deleted = np.zeros(capacity, dtype=bool)
+        self._levels: List[int] = []
+        # _links[node][level] -> neighbour node ids
+        self._links: List[List[List[int]]] = []
+        self._label_to_node: Dict[int, int] = {}
+        self._entry_point: Optional[int] = None
+        self._max_level = -1
+        self._deleted_count = 0
+
+    def __len__(self) -> int:
+        return len(self._label_to_node)
+
+    @property
+    def node_count(self) -> int:
+        return len(self._levels)
+
+    def __contains__(self, label: int) -> bool:
+        return label in self._label_to_node
+
+    def add(self, label: int, vector: np.ndarray) -> None:
+        """Thêm (hoặc cập nhật) một vector với nhãn cho trước"""
+        if label in self._label_to_node:
+            self.remove(label)
+
+        node = self.node_count
+        self._ensure_capacity(node + 1)
+        self._vectors[node] = vector
+        self._node_labels[node] = label
+        self._label_to_node[label] = node
+
+        level = int(-math.log(1.0 - self._rng.random()) * self._level_mult)
+        self._levels.append(level)
+        self._links.append([[] for _ in range(level + 1)])
+
+        if self._entry_point is None:
+            self._entry_point = node
+            self._max_level = level
+            return
+
+        query = self._vectors[node]
+        entry = self._entry_point
+        for layer in range(self._max_level, level, -1):
+            entry = self._greedy_closest(query, entry, layer)
+
+        entry_points = [entry]
+        for layer in range(min(level, self._max_level), -1, -1):
+            candidates = self._search_layer(query, entry_points, self.ef_construction, layer)
+            neighbours = self._select_neighbours(candidates, self.M)
+            self._links[node][layer] = neighbours
+
+            max_links = self.max_links0 if layer == 0 else self.M
+            for neighbour in neighbours:
+                links = self._links[neighbour][layer]
+                links.append(node)
+                if len(links) > max_links:
+                    sims = self._vectors[links] @ self._vectors[neighbour]
+                    order = np.argsort(-sims)
+                    self._links[neighbour][layer] = self._select_neighbours(
+                        [(float(sims[i]), links[i]) for i in order], max_links
+                    )
+            entry_points = [n for _, n in candidates]
+
+        if level > self._max_level:
+            self._entry_point = node
+            self._max_level = level
+
+    def remove(self, label: int) -> bool:
+        """Đánh dấu xóa (tombstone); node vẫn dùng để duyệt đồ thị cho tới khi compact"""
+        node = self._label_to_node.pop(label, None)
+        if node is None:
+            return False
+        self._deleted[node] = True
+        self._deleted_count += 1
+
+        # Khi tombstone nhiều hơn node còn sống thì xây lại đồ thị
+        if self._deleted_count > max(len(self._label_to_node), 1024):
+            self.compact()
+        return True
+
+    def compact(self) -> None:
+        """Xây lại đồ thị chỉ với các node còn sống"""
+        live = sorted(self._label_to_node.items(), key=lambda item: item[1])
+        vectors = self._vectors[[node for _, node in live]].copy() if live else None
+        logger.info(f"Compact HNSW index: {len(live)} node còn sống, bỏ {self._deleted_count} tombstone")
+
+        self._rng = random.Random(self.seed)
+        self._reset(max(len(live), 1024))
+        for i, (label, _) in enumerate(live):
+            self.add(label, vectors[i])
+
+    def search(
+        self,
+        query: np.ndarray,
+        k: int,
+        ef: Optional[int] = None,
+        allowed_labels: Optional[np.ndarray] = None
+    ) -> Tuple[List[int], List[float]]:
+        """
+        Tìm k nhãn gần nhất
+        Search the k nearest labels
+
+        Args:
+            query: Vector truy vấn (đã chuẩn hóa)
+            k: Số kết quả
+            ef: Kích thước danh sách ứng viên (mặc định ef_search)
+            allowed_labels: Mask boolean theo nhãn; chỉ nhãn True được trả về
+
+        Returns:
+            Tuple[List[int], List[float]]: Nhãn và điểm similarity, giảm dần
+        """
+        if self._entry_point is None or k <= 0:
+            return [], []
+
+        query = np.asarray(query, dtype=np.float32)
+        entry = self._entry_point
+        for layer in range(self._max_level, 0, -1):
+            entry = self._greedy_closest(query, entry, layer)
+
+        accept = None
+        if self._deleted_count or allowed_labels is not None:
+            accepted = ~self._deleted[:self.node_count]
+            if allowed_labels is not None:
+                labels = self._node_labels[:self.node_count]
+                in_range = labels < len(allowed_labels)
+                permitted = np.zeros(self.node_count, dtype=bool)
+                permitted[in_range] = allowed_labels[labels[in_range]]
+                accepted &= permitted
+            accept = accepted.__getitem__
+
+        results = self._search_layer(
+            query, [entry], max(ef or self.ef_search, k), 0, accept=accept
+        )[:k]
+        return (
+            [int(self._node_labels[node]) for _, node in results],
+            [score for score, _ in results]
+        )
+
+    def _greedy_closest(self, query: np.ndarray, entry: int, layer: int) -> int:
+        current = entry
+        current_sim = float(self._vectors[current] @ query)
+        while True:
+            neighbours = self._links[current][layer]
+            if not neighbours:
+                return current
+            sims = self._vectors[neighbours] @ query
+            best = int(np.argmax(sims))
+            if sims[best] <= current_sim:
+                return current
+            current, current_sim = neighbours[best], float(sims[best])
+
+    def _search_layer(
+        self,
+        query: np.ndarray,
+        entry_points: List[int],
+        ef: int,
+        layer: int,
+        accept: Optional[Callable[[int], bool]] = None
+    ) -> List[Tuple[float, int]]:
+        """Beam search trên một tầng, trả về tối đa ef cặp (similarity, node) giảm dần"""
+        visited = set(entry_points)
+        entry_sims = (self._vectors[entry_points] @ query).tolist()
+
+        candidates = [(-sim, node) for sim, node in zip(entry_sims, entry_points)]
+        heapq.heapify(candidates)
+        results: List[Tuple[float, int]] = []
+        for sim, node in zip(entry_sims, entry_points):
+            if accept is None or accept(node):
+                heapq.heappush(results, (sim, node))
+
+        while candidates:
+            neg_sim, current = heapq.heappop(candidates)
+            if len(results) >= ef and -neg_sim < results[0][0]:
+                break
+
+            neighbours = [n for n in self._links[current][layer] if n not in visited]
+            if not neighbours:
+                continue
+            visited.update(neighbours)
+
+            sims = (self._vectors[neighbours] @ query).tolist()
+            for sim, node in zip(sims, neighbours):
+                if len(results) < ef or sim > results[0][0]:
+                    heapq.heappush(candidates, (-sim, node))
+                    if accept is None or accept(node):
+                        heapq.heappush(results, (sim, node))
+                        if len(results) > ef:
+                            heapq.heappop(results)
+
+        return sorted(results, reverse=True)
+
+    def _select_neighbours(self, candidates: List[Tuple[float, int]], limit: int) -> List[int]:
+        """
+        Heuristic chọn láng giềng của HNSW: ưu tiên ứng viên không bị che bởi láng giềng đã chọn
+        (giữ lại các ứng viên bị loại để lấp đầy nếu thiếu)
+        """
+        if len(candidates) <= limit:
+            return [node for _, node in candidates]
+
+        nodes = [node for _, node in candidates]
+        # Ma trận similarity giữa các ứng viên, tính một lần
+        pairwise = (self._vectors[nodes] @ self._vectors[nodes].T).tolist()
+
+        selected: List[int] = []
+        pruned: List[int] = []
+        for i, (sim, node) in enumerate(candidates):
+            if len(selected) >= limit:
+                break
+            row = pairwise[i]
+            if selected and max(row[j] for j in selected) > sim:
+                pruned.append(i)
+                continue
+            selected.append(i)
+
+        for i in pruned:
+            if len(selected) >= limit:
+                break
+            selected.append(i)
+        return [nodes[i] for i in selected]
+
+    def _ensure_capacity(self, needed: int) -> None:
+        capacity = self._vectors.shape[0]
+        if needed <= capacity:
+            return
+        new_capacity = max(needed, capacity * 2)
+        vectors = np.zeros((new_capacity, self.dimension), dtype=np.float32)
+        vectors[:capacity] = self._vectors
+        labels = np.full(new_capacity, -1, dtype=np.int64)
+        labels[:capacity] = self._node_labels
+        deleted = np.zeros(new_capacity, dtype=bool)
+        deleted[:capacity] = self._deleted
+        self._vectors, self._node_labels, self._deleted = vectors, labels, deleted
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        """Xuất trạng thái đồ thị thành các mảng NumPy (liên kết dạng CSR) để lưu .npz"""
+        n = self.node_count
+        offsets = [0]
+        indices: List[int] = []
+        for node_links in self._links:
+            for layer_links in node_links:
+                indices.extend(layer_links)
+                offsets.append(len(indices))
+        return {
+            "vectors": self._vectors[:n].copy(),
+            "labels": self._node_labels[:n].copy(),
+            "deleted": self._deleted[:n].copy(),
+            "levels": np.asarray(self._levels, dtype=np.int32),
+            "link_offsets": np.asarray(offsets, dtype=np.int64),
+            "link_indices": np.asarray(indices, dtype=np.int32),
+            "params": np.asarray([
+                self.M, self.ef_construction, self.ef_search, self.seed,
+                -1 if self._entry_point is None else self._entry_point, self._max_level
+            ], dtype=np.int64)
+        }
+
+    @classmethod
+    def from_arrays(cls, dimension: int, arrays: Dict[str, np.ndarray]) -> "HNSWIndex":
+        """Khôi phục chỉ mục từ to_arrays"""
+        M, ef_construction, ef_search, seed, entry_point, max_level = (int(v) for v in arrays["params"])
+        levels = arrays["levels"].tolist()
+        index = cls(dimension, M=M, ef_construction=ef_construction, ef_search=ef_search,
+                    seed=seed, capacity=max(len(levels), 1))
+
+        n = len(levels)
+        index._vectors[:n] = arrays["vectors"]
+        index._node_labels[:n] = arrays["labels"]
+        index._deleted[:n] = arrays["deleted"]
+        index._levels = levels
+
+        offsets = arrays["link_offsets"].tolist()
+        link_indices = arrays["link_indices"].tolist()
+        pair = 0
+        for level in levels:
+            node_links = []
+            for _ in range(level + 1):
+                node_links.append(link_indices[offsets[pair]:offsets[pair + 1]])
+                pair += 1
+            index._links.append(node_links)
+
+        index._label_to_node = {
+            int(label): node for node, label in enumerate(index._node_labels[:n].tolist())
+            if not index._deleted[node]
+        }
+        index._deleted_count = int(index._deleted[:n].sum())
+        index._entry_point = None if entry_point < 0 else entry_point
+        index._max_level = max_level
+        return index
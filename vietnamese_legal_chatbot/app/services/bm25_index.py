@@ -0,0 +1,266 @@
+"""
+BM25 Index for Vietnamese Legal AI Chatbot
+Chỉ mục BM25 cho Chatbot AI Pháp lý Việt Nam
+
+In-memory inverted index with Okapi BM25 scoring over legal document chunks
+(as produced by LegalDocumentProcessor.process_legal_document). Exact citation
+lookups ("Điều 34 Bộ luật Lao động", "Nghị định 145/2020/NĐ-CP") are answered
+lexically without an embedding call.
+Chỉ mục đảo ngược trong bộ nhớ, chấm điểm BM25 cho các chunk tài liệu pháp lý.
+"""
+
+import os
+import re
+import json
+import math
+import heapq
+import logging
+import threading
+import unicodedata
+from collections import Counter
+from functools import partial
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+try:
+    from app.utils.text_processing import get_text_processor
+except ImportError:
+    from utils.text_processing import get_text_processor
+
+logger = logging.getLogger(__name__)
+
+# "Điều 34", "Khoản 2", "Điểm a", "Chương IV" -> điều_34, khoản_2, điểm_a, chương_iv
+STRUCTURE_PATTERN = re.compile(r'\b(điều|khoản|điểm|chương|mục)\s+(\d+[a-zđ]?|[ivxlcdm]+|[a-zđ])\b')
+
+# "145/2020/NĐ-CP", "91/2015/QH13" -> document number tokens
+DOCUMENT_NUMBER_PATTERN = re.compile(r'\b\d+/\d{4}/[\wđ]+(?:-[\wđ]+)*')
+
+
+class BM25Index:
+    """
+    Chỉ mục BM25 cho chunk tài liệu pháp lý
+    BM25 inverted index over legal document chunks
+    """
+
+    def __init__(
+        self,
+        k1: float = 1.5,
+        b: float = 0.75,
+        tokenizer: Optional[Callable[[str], List[str]]] = None
+    ):
+        """
+        Args:
+            k1: Tham số bão hòa tần suất từ
+            b: Tham số chuẩn hóa độ dài tài liệu
+            tokenizer: Hàm tách từ (mặc định VietnameseTextProcessor.tokenize_vietnamese,
+                kèm các từ con của từ ghép)
+        """
+        self.k1 = k1
+        self.b = b
+        self._tokenizer = tokenizer or partial(get_text_processor().tokenize_vietnamese, decompound=True)
+
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._doc_lengths: Dict[str, int] = {}
+        self._doc_terms: Dict[str, Set[str]] = {}
+        self._documents: Dict[str, Dict[str, Any]] = {}
+        self._total_length = 0
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    def analyze(self, text: str) -> List[str]:
+        """
+        Tách văn bản thành term: token từ tokenize_vietnamese (chữ thường) cộng các term
+        cấu trúc pháp lý ghép (điều_34, khoản_2) và số hiệu văn bản
+        """
+        text = unicodedata.normalize('NFC', text or "").lower()
+        terms = [token.lower() for token in self._tokenizer(text)]
+        terms.extend(f"{kind}_{number}" for kind, number in STRUCTURE_PATTERN.findall(text))
+        terms.extend(DOCUMENT_NUMBER_PATTERN.findall(text))
+        return terms
+
+    def citation_terms(self, text: str) -> Set[str]:
+        """Term trích dẫn (Điều/Khoản/số hiệu văn bản) trong câu hỏi"""
+        text = unicodedata.normalize('NFC', text or "").lower()
+        terms = {f"{kind}_{number}" for kind, number in STRUCTURE_PATTERN.findall(text)}
+        terms.update(DOCUMENT_NUMBER_PATTERN.findall(text))
+        return terms
+
+    def add_documents(self, documents: Iterable[Dict[str, Any]]) -> int:
+        """
+        Thêm (hoặc thay thế) chunk vào chỉ mục
+
+        Args:
+            documents: Chunk dạng {"id", "content", "metadata"}
+
+        Returns:
+            int: Số chunk đã thêm
+        """
+        added = 0
+        with self._lock:
+            for doc in documents:
+                content = doc.get("content") or doc.get("page_content") or ""
+                doc_id = doc.get("id")
+                if not content or not doc_id:
+                    continue
+                self._remove(doc_id)
+
+                counts = Counter(self.analyze(content))
+                for term, tf in counts.items():
+                    self._postings.setdefault(term, {})[doc_id] = tf
+                length = sum(counts.values())
+                self._doc_lengths[doc_id] = length
+                self._doc_terms[doc_id] = set(counts)
+                self._documents[doc_id] = {
+                    "content": content,
+                    "metadata": dict(doc.get("metadata") or {})
+                }
+                self._total_length += length
+                added += 1
+        return added
+
+    def remove_documents(self, document_ids: Iterable[str]) -> None:
+        """Xóa chunk khỏi chỉ mục"""
+        with self._lock:
+            for doc_id in document_ids:
+                self._remove(doc_id)
+
+    def _remove(self, doc_id: str) -> None:
+        terms = self._doc_terms.pop(doc_id, None)
+        if terms is None:
+            return
+        for term in terms:
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(doc_id, None)
+                if not postings:
+                    del self._postings[term]
+        self._total_length -= self._doc_lengths.pop(doc_id)
+        del self._documents[doc_id]
+
+    def search(
+        self,
+        query: str,
+        top_k: int = 10,
+        metadata_filter: Optional[Dict[str, Any]] = None,
+        required_terms: Optional[Iterable[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Tìm kiếm BM25
+        BM25 search
+
+        Args:
+            query: Câu hỏi
+            top_k: Số kết quả
+            metadata_filter: Lọc metadata theo bằng nhau hoặc {"$in": [...]}
+            required_terms: Chỉ giữ chunk chứa đủ các term này (ví dụ term trích dẫn)
+
+        Returns:
+            List[Dict]: Tài liệu dạng {"id", "page_content", "metadata", "score", "bm25_score",
+            "term_coverage"}; score là tỉ lệ term của câu hỏi xuất hiện trong chunk (0-1)
+        """
+        query_terms = set(self.analyze(query))
+        if not query_terms:
+            return []
+
+        with self._lock:
+            total_docs = len(self._documents)
+            if total_docs == 0:
+                return []
+            avg_length = self._total_length / total_docs
+
+            candidates: Optional[Set[str]] = None
+            for term in required_terms or ():
+                postings = self._postings.get(term)
+                if not postings:
+                    return []
+                candidates = set(postings) if candidates is None else candidates & postings.keys()
+
+            scores: Dict[str, float] = {}
+            for term in query_terms:
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                df = len(postings)
+                idf = math.log(1 + (total_docs - df + 0.5) / (df + 0.5))
+                for doc_id, tf in postings.items():
+                    if candidates is not None and doc_id not in candidates:
+                        continue
+                    norm = self.k1 * (1 - self.b + self.b * self._doc_lengths[doc_id] / avg_length)
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+
+            if metadata_filter:
+                scores = {
+                    doc_id: score for doc_id, score in scores.items()
+                    if _matches_filter(self._documents[doc_id]["metadata"], metadata_filter)
+                }
+
+            top = heapq.nlargest(top_k, scores.items(), key=lambda item: item[1])
+            results = []
+            for doc_id, score in top:
+                document = self._documents[doc_id]
+                coverage = len(query_terms & self._doc_terms[doc_id]) / len(query_terms)
+                results.append({
+                    "id": doc_id,
+                    "page_content": document["content"],
+                    "metadata": dict(document["metadata"]),
+                    "score": round(coverage, 4),
+                    "bm25_score": score,
+                    "term_coverage": coverage,
+                    "search_type": "bm25"
+                })
+            return results
+
+    def documents(self) -> List[Dict[str, Any]]:
+        """Các chunk đã index dạng {"id", "content", "metadata"}"""
+        with self._lock:
+            return [
+                {"id": doc_id, "content": doc["content"], "metadata": doc["metadata"]}
+                for doc_id, doc in self._documents.items()
+            ]
+
+    def save(self, path: str) -> None:
+        """Lưu các chunk đã index ra file JSON (chỉ mục được dựng lại khi nạp)"""
+        payload = {"k1": self.k1, "b": self.b, "documents": self.documents()}
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(payload, f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, path: str, tokenizer: Optional[Callable[[str], List[str]]] = None) -> "BM25Index":
+        """Nạp chỉ mục từ file JSON"""
+        with open(path, "r", encoding="utf-8") as f:
+            payload = json.load(f)
+        index = cls(k1=payload.get("k1", 1.5), b=payload.get("b", 0.75), tokenizer=tokenizer)
+        index.add_documents(payload.get("documents", []))
+        return index
+
+
+def _matches_filter(metadata: Dict[str, Any], metadata_filter: Dict[str, Any]) -> bool:
+    for key, condition in metadata_filter.items():
+        value = metadata.get(key)
+        if isinstance(condition, dict):
+            if "$eq" in condition and value != condition["$eq"]:
+                return False
+            if "$in" in condition and value not in condition["$in"]:
+                return False
+        elif value != condition:
+            return False
+    return True
+
+
+def load_default_bm25_index() -> BM25Index:
+    """
+    Nạp chỉ mục BM25 từ BM25_INDEX_PATH nếu có, ngược lại tạo chỉ mục rỗng
+    Load the BM25 index configured via BM25_INDEX_PATH, or start an empty one
+    """
+    path = os.getenv("BM25_INDEX_PATH")
+    if path and os.path.exists(path):
+        try:
+            index = BM25Index.load(path)
+            logger.info(f"Loaded BM25 index with {len(index)} chunks from {path}")
+            return index
+        except Exception as e:
+            logger.warning(f"Could not load BM25 index from {path}: {e}")
+    return BM25Index()
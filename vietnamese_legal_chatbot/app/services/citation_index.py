@@ -0,0 +1,210 @@
+"""
+Legal Citation Index for Vietnamese Legal AI Chatbot
+Chỉ mục trích dẫn pháp lý cho Chatbot AI Pháp lý Việt Nam
+
+Precomputed lookup from (law, article, clause, point) to chunk ids, so questions such as
+"Khoản 2 Điều 34 Bộ luật Lao động" are answered with a dictionary lookup instead of
+embedding + similarity search.
+Tra cứu trực tiếp (luật, điều, khoản, điểm) -> chunk, không cần embedding.
+"""
+
+import re
+import logging
+import threading
+import unicodedata
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+try:
+    from app.utils.text_processing import expand_legal_abbreviations
+except ImportError:
+    from utils.text_processing import expand_legal_abbreviations
+
+logger = logging.getLogger(__name__)
+
+CitationKey = Tuple[str, str, Optional[str], Optional[str]]
+
+# Đầu dòng cấu trúc trong văn bản: "Điều 34.", "2. ...", "a) ..."
+ARTICLE_HEADING = re.compile(r'điều\s+(\d+)', re.IGNORECASE)
+CLAUSE_LINE = re.compile(r'(\d+)\.\s')
+POINT_LINE = re.compile(r'([a-zđ])\)\s')
+
+DOCUMENT_NUMBER = re.compile(r'\d+/\d{4}/[\wđ]+(?:-[\wđ]+)*')
+YEAR = re.compile(r'\b(?:năm\s+)?(?:19|20)\d{2}\b')
+NON_WORD = re.compile(r'[^\w\s]')
+
+# Số từ tối đa của tên luật khi dò trong câu hỏi
+MAX_LAW_NAME_WORDS = 10
+
+
+def normalize_law_name(name: str) -> str:
+    """
+    Chuẩn hóa tên luật: chữ thường, bỏ năm, số hiệu và dấu câu
+    "Bộ luật Lao động 2019" -> "bộ luật lao động"
+    """
+    text = unicodedata.normalize('NFC', name or "").lower()
+    text = DOCUMENT_NUMBER.sub(" ", text)
+    text = re.sub(r'\bsố\b', " ", text)
+    text = YEAR.sub(" ", text)
+    text = NON_WORD.sub(" ", text)
+    return " ".join(text.split())
+
+
+class LegalCitationIndex:
+    """
+    Chỉ mục (luật, điều, khoản, điểm) -> chunk id
+    Structured citation index over legal document chunks
+    """
+
+    def __init__(self):
+        self._entries: Dict[CitationKey, List[str]] = {}
+        self._chunk_keys: Dict[str, Set[CitationKey]] = {}
+        self._documents: Dict[str, Dict[str, Any]] = {}
+        self._aliases: Dict[str, str] = {}
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    def add_documents(self, documents: Iterable[Dict[str, Any]]) -> int:
+        """
+        Đăng ký chunk vào chỉ mục
+
+        Args:
+            documents: Chunk dạng {"id", "content", "metadata"} (LegalDocumentProcessor)
+
+        Returns:
+            int: Số chunk có ít nhất một khóa trích dẫn
+        """
+        indexed = 0
+        with self._lock:
+            for doc in documents:
+                doc_id = doc.get("id")
+                content = doc.get("content") or doc.get("page_content") or ""
+                metadata = doc.get("metadata") or {}
+                if not doc_id or not content:
+                    continue
+                self._remove(doc_id)
+
+                law = self._register_law(metadata)
+                if not law:
+                    continue
+                keys = {(law, *structure) for structure in self._structure_keys(content, metadata)}
+                if not keys:
+                    continue
+
+                for key in keys:
+                    self._entries.setdefault(key, []).append(doc_id)
+                self._chunk_keys[doc_id] = keys
+                self._documents[doc_id] = {"content": content, "metadata": dict(metadata)}
+                indexed += 1
+        return indexed
+
+    def remove_documents(self, document_ids: Iterable[str]) -> None:
+        """Xóa chunk khỏi chỉ mục"""
+        with self._lock:
+            for doc_id in document_ids:
+                self._remove(doc_id)
+
+    def _remove(self, doc_id: str) -> None:
+        keys = self._chunk_keys.pop(doc_id, None)
+        if keys is None:
+            return
+        for key in keys:
+            chunk_ids = self._entries.get(key)
+            if chunk_ids is not None:
+                chunk_ids.remove(doc_id)
+                if not chunk_ids:
+                    del self._entries[key]
+        del self._documents[doc_id]
+
+    def _register_law(self, metadata: Dict[str, Any]) -> Optional[str]:
+        """Khóa luật của chunk, đồng thời ghi nhận các tên gọi khác (bỏ "bộ", số hiệu)"""
+        name = metadata.get("title") or metadata.get("document_name") or metadata.get("law_name") or ""
+        law = normalize_law_name(name)
+        if not law:
+            return None
+        self._aliases.setdefault(law, law)
+        if law.startswith("bộ luật "):
+            self._aliases.setdefault(law[len("bộ "):], law)
+        number = metadata.get("document_number") or metadata.get("number")
+        numbers = DOCUMENT_NUMBER.findall(unicodedata.normalize('NFC', f"{name} {number or ''}").lower())
+        for document_number in numbers:
+            self._aliases.setdefault(document_number, law)
+        return law
+
+    @staticmethod
+    def _structure_keys(content: str, metadata: Dict[str, Any]) -> Set[Tuple[str, Optional[str], Optional[str]]]:
+        """(điều, khoản, điểm) xuất hiện trong chunk, theo dòng tiêu đề điều/khoản/điểm"""
+        lines = [line.strip() for line in content.splitlines()]
+        has_heading = any(ARTICLE_HEADING.match(line) for line in lines)
+        article = None if has_heading else metadata.get("article_number")
+        article = str(article) if article else None
+        clause = None
+
+        keys: Set[Tuple[str, Optional[str], Optional[str]]] = set()
+        if article:
+            keys.add((article, None, None))
+        for line in lines:
+            heading = ARTICLE_HEADING.match(line)
+            if heading:
+                article, clause = heading.group(1), None
+                keys.add((article, None, None))
+                continue
+            if article is None:
+                continue
+            clause_match = CLAUSE_LINE.match(line)
+            if clause_match:
+                clause = clause_match.group(1)
+                keys.add((article, clause, None))
+                continue
+            point_match = POINT_LINE.match(line.lower())
+            if point_match and clause:
+                keys.add((article, clause, point_match.group(1)))
+        return keys
+
+    def resolve_law(self, text: str) -> Optional[str]:
+        """
+        Tìm luật được nhắc tới trong câu hỏi bằng tra cứu n-gram (ưu tiên tên dài nhất)
+        Resolve the law mentioned in a question; abbreviations ("BLLĐ") are expanded
+        through the shared LEGAL_ABBREVIATIONS table first
+        """
+        lowered = expand_legal_abbreviations(unicodedata.normalize('NFC', text or "")).lower()
+        with self._lock:
+            for document_number in DOCUMENT_NUMBER.findall(lowered):
+                if document_number in self._aliases:
+                    return self._aliases[document_number]
+
+            words = normalize_law_name(lowered).split()
+            for size in range(min(MAX_LAW_NAME_WORDS, len(words)), 0, -1):
+                for start in range(len(words) - size + 1):
+                    law = self._aliases.get(" ".join(words[start:start + size]))
+                    if law:
+                        return law
+        return None
+
+    def lookup(
+        self,
+        law: str,
+        article: str,
+        clause: Optional[str] = None,
+        point: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Tra cứu chunk theo trích dẫn
+        Look up chunks by citation
+
+        Returns:
+            List[Dict]: Tài liệu dạng {"id", "page_content", "metadata", "score", "search_type"}
+        """
+        key = (law, str(article), str(clause) if clause else None, point.lower() if point else None)
+        with self._lock:
+            return [
+                {
+                    "id": doc_id,
+                    "page_content": self._documents[doc_id]["content"],
+                    "metadata": dict(self._documents[doc_id]["metadata"]),
+                    "score": 1.0,
+                    "search_type": "citation_index"
+                }
+                for doc_id in self._entries.get(key, ())
+            ]
@@ -0,0 +1,892 @@
+"""
+Local Vector Store for Vietnamese Legal AI Chatbot
+Kho vector cục bộ cho Chatbot AI Pháp lý Việt Nam
+
+In-process drop-in replacement for PineconeService: vectors live in a contiguous float32
+NumPy matrix per namespace, metadata in columnar arrays, and search is one matrix product
+(or an HNSW graph walk when index_type="hnsw").
+Thay thế PineconeService chạy trong process, không cần mạng.
+"""
+
+import os
+import asyncio
+import json
+import logging
+import tempfile
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional
+
+try:
+    import numpy as np
+    from .ann_index import HNSWIndex
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+try:
+    from langchain_community.embeddings import OpenAIEmbeddings
+    EMBEDDINGS_AVAILABLE = True
+except ImportError:
+    EMBEDDINGS_AVAILABLE = False
+
+from .pinecone_service import (
+    PineconeService,
+    PineconeServiceError,
+    VectorSearchResult,
+    EmbeddingCache,
+    get_shared_embedding_cache
+)
+
+logger = logging.getLogger(__name__)
+
+# Trường metadata có bitmap index (các filter phổ biến của DocumentMetadata)
+DEFAULT_BITMAP_FIELDS = ("legal_domain", "language", "document_type", "issuing_authority", "article_number")
+
+# Toán tử filter được trả lời trực tiếp từ bitmap
+BITMAP_OPERATORS = ("$eq", "$ne", "$in", "$nin")
+
+
+class _ReadWriteLock:
+    """
+    Khóa đọc/ghi: nhiều truy vấn tính điểm song song, ghi/xóa độc quyền
+    Many concurrent readers or one writer; waiting writers block new readers
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer = False
+        self._writers_waiting = 0
+
+    @contextmanager
+    def read(self):
+        with self._cond:
+            while self._writer or self._writers_waiting:
+                self._cond.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._readers -= 1
+                if self._readers == 0:
+                    self._cond.notify_all()
+
+    @contextmanager
+    def write(self):
+        with self._cond:
+            self._writers_waiting += 1
+            while self._writer or self._readers:
+                self._cond.wait()
+            self._writers_waiting -= 1
+            self._writer = True
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._writer = False
+                self._cond.notify_all()
+
+
+@dataclass
+class LocalMatch:
+    """Kết quả khớp theo định dạng Pinecone (id, score, metadata)"""
+    id: str
+    score: float
+    metadata: Dict[str, Any] = field(default_factory=dict)
+    values: List[float] = field(default_factory=list)
+
+
+@dataclass
+class LocalQueryResponse:
+    """Phản hồi query theo định dạng Pinecone"""
+    matches: List[LocalMatch]
+    namespace: str = ""
+
+
+@dataclass
+class LocalNamespaceStats:
+    vector_count: int
+
+
+@dataclass
+class LocalIndexStats:
+    """Thống kê index theo định dạng describe_index_stats của Pinecone"""
+    total_vector_count: int
+    dimension: int
+    index_fullness: float
+    namespaces: Dict[str, LocalNamespaceStats]
+
+
+class _NamespaceStore:
+    """
+    Lưu trữ một namespace: ma trận vector liên tục, metadata dạng cột và bitmap index
+    Storage for one namespace: contiguous vector matrix, columnar metadata and
+    packed inverted bitmaps (one bit per row) for the configured metadata fields
+    """
+
+    def __init__(
+        self,
+        dimension: int,
+        capacity: int = 1024,
+        ann: Optional["HNSWIndex"] = None,
+        bitmap_fields: Iterable[str] = DEFAULT_BITMAP_FIELDS
+    ):
+        self.dimension = dimension
+        self.vectors = np.zeros((capacity, dimension), dtype=np.float32)
+        self.ids: List[str] = []
+        self.rows: Dict[str, int] = {}
+        # field -> object array aligned with rows; None marks a missing value
+        self.columns: Dict[str, np.ndarray] = {}
+        # Stable integer labels for the ANN graph (rows move on delete, labels do not)
+        self.labels = np.zeros(capacity, dtype=np.int64)
+        self.row_of_label: Dict[int, int] = {}
+        self.next_label = 0
+        self.ann = ann
+        # field -> value -> packed bitmap (np.packbits layout) of rows holding that value
+        self.bitmaps: Dict[str, Dict[Any, np.ndarray]] = {name: {} for name in bitmap_fields}
+
+    @property
+    def size(self) -> int:
+        return len(self.ids)
+
+    @property
+    def capacity(self) -> int:
+        return self.vectors.shape[0]
+
+    def matrix(self) -> np.ndarray:
+        return self.vectors[:self.size]
+
+    def column(self, name: str) -> Optional[np.ndarray]:
+        column = self.columns.get(name)
+        return column[:self.size] if column is not None else None
+
+    def upsert(self, vector_id: str, vector: np.ndarray, metadata: Dict[str, Any]) -> None:
+        row = self.rows.get(vector_id)
+        if row is None:
+            self._ensure_capacity(self.size + 1)
+            row = self.size
+            self.ids.append(vector_id)
+            self.rows[vector_id] = row
+            self.labels[row] = self.next_label
+            self.row_of_label[self.next_label] = row
+            self.next_label += 1
+        else:
+            self._update_bitmaps(row, row, set_bits=False)
+            for column in self.columns.values():
+                column[row] = None
+
+        self.vectors[row] = vector
+        if self.ann is not None:
+            self.ann.add(int(self.labels[row]), vector)
+        for name, value in metadata.items():
+            if value is None:
+                continue
+            column = self.columns.get(name)
+            if column is None:
+                column = np.full(self.capacity, None, dtype=object)
+                self.columns[name] = column
+            column[row] = value
+        self._update_bitmaps(row, row, set_bits=True)
+
+    def remove(self, vector_id: str) -> bool:
+        """Xóa bằng cách chuyển hàng cuối vào vị trí bị xóa để ma trận luôn liên tục"""
+        row = self.rows.pop(vector_id, None)
+        if row is None:
+            return False
+
+        label = int(self.labels[row])
+        del self.row_of_label[label]
+        if self.ann is not None:
+            self.ann.remove(label)
+
+        last = self.size - 1
+        self._update_bitmaps(row, row, set_bits=False)
+        if row != last:
+            # Bit của hàng cuối chuyển sang vị trí hàng bị xóa
+            self._update_bitmaps(last, last, set_bits=False)
+            self._update_bitmaps(last, row, set_bits=True)
+            moved_id = self.ids[last]
+            self.vectors[row] = self.vectors[last]
+            self.labels[row] = self.labels[last]
+            self.row_of_label[int(self.labels[row])] = row
+            for column in self.columns.values():
+                column[row] = column[last]
+            self.ids[row] = moved_id
+            self.rows[moved_id] = row
+
+        self.ids.pop()
+        self.vectors[last] = 0.0
+        for column in self.columns.values():
+            column[last] = None
+        return True
+
+    def _update_bitmaps(self, source_row: int, target_row: int, set_bits: bool) -> None:
+        """Bật/tắt bit target_row trong bitmap của các giá trị metadata tại source_row"""
+        byte, bit = target_row >> 3, np.uint8(0x80 >> (target_row & 7))
+        for name, bitmaps in self.bitmaps.items():
+            column = self.columns.get(name)
+            if column is None or column[source_row] is None:
+                continue
+            for value in _index_values(column[source_row]):
+                bitmap = bitmaps.get(value)
+                if bitmap is None:
+                    if not set_bits:
+                        continue
+                    bitmap = np.zeros((self.capacity + 7) // 8, dtype=np.uint8)
+                    bitmaps[value] = bitmap
+                if set_bits:
+                    bitmap[byte] |= bit
+                else:
+                    bitmap[byte] &= ~bit
+
+    def bitmap_bits(self, name: str, op: str, value: Any) -> np.ndarray:
+        """Trả lời một điều kiện filter từ bitmap, kết quả dạng packed bits"""
+        nbytes = (self.size + 7) // 8
+        bits = np.zeros(nbytes, dtype=np.uint8)
+        values = [value] if op in ("$eq", "$ne") else list(value)
+        bitmaps = self.bitmaps[name]
+        for item in values:
+            try:
+                bitmap = bitmaps.get(item)
+            except TypeError:
+                continue
+            if bitmap is not None:
+                bits |= bitmap[:nbytes]
+        return ~bits if op in ("$ne", "$nin") else bits
+
+    def metadata_at(self, row: int) -> Dict[str, Any]:
+        metadata = {}
+        for name, column in self.columns.items():
+            value = column[row]
+            if value is not None:
+                metadata[name] = value
+        return metadata
+
+    def _ensure_capacity(self, needed: int) -> None:
+        if needed <= self.capacity:
+            return
+        new_capacity = max(needed, self.capacity * 2)
+        vectors = np.zeros((new_capacity, self.dimension), dtype=np.float32)
+        vectors[:self.size] = self.vectors[:self.size]
+        self.vectors = vectors
+        labels = np.zeros(new_capacity, dtype=np.int64)
+        labels[:self.size] = self.labels[:self.size]
+        self.labels = labels
+        nbytes = (new_capacity + 7) // 8
+        for bitmaps in self.bitmaps.values():
+            for value, bitmap in bitmaps.items():
+                grown = np.zeros(nbytes, dtype=np.uint8)
+                grown[:len(bitmap)] = bitmap
+                bitmaps[value] = grown
+        for name, column in self.columns.items():
+            grown = np.full(new_capacity, None, dtype=object)
+            grown[:self.size] = column[:self.size]
+            self.columns[name] = grown
+
+
+def _index_values(value: Any) -> List[Any]:
+    """Giá trị dùng để đánh index: từng phần tử với metadata dạng danh sách"""
+    values = value if isinstance(value, (list, tuple)) else [value]
+    hashable = []
+    for item in values:
+        try:
+            hash(item)
+        except TypeError:
+            continue
+        hashable.append(item)
+    return hashable
+
+
+def _matches(stored: Any, value: Any) -> bool:
+    """So khớp bằng theo ngữ nghĩa Pinecone: trường danh sách khớp nếu chứa giá trị"""
+    if isinstance(stored, (list, tuple)):
+        return value in stored
+    return stored == value
+
+
+def _compare(column: Optional[np.ndarray], size: int, op: str, value: Any) -> np.ndarray:
+    """So sánh một cột metadata với giá trị theo toán tử filter kiểu Pinecone"""
+    if column is None:
+        return np.full(size, op in ("$ne", "$nin"), dtype=bool)
+
+    if op == "$eq":
+        return np.fromiter((_matches(v, value) for v in column), dtype=bool, count=size)
+    if op == "$ne":
+        return ~np.fromiter((_matches(v, value) for v in column), dtype=bool, count=size)
+    if op in ("$in", "$nin"):
+        values = list(value)
+        matches = np.fromiter(
+            (v is not None and any(_matches(v, item) for item in values) for v in column),
+            dtype=bool, count=size
+        )
+        return matches if op == "$in" else ~matches
+    if op in ("$gt", "$gte", "$lt", "$lte"):
+        compare = {
+            "$gt": lambda v: v > value,
+            "$gte": lambda v: v >= value,
+            "$lt": lambda v: v < value,
+            "$lte": lambda v: v <= value
+        }[op]
+
+        def safe(v: Any) -> bool:
+            try:
+                return v is not None and compare(v)
+            except TypeError:
+                return False
+
+        return np.fromiter((safe(v) for v in column), dtype=bool, count=size)
+    raise PineconeServiceError(f"Toán tử filter không được hỗ trợ: {op}", "INVALID_FILTER")
+
+
+def _filter_bits(store: _NamespaceStore, metadata_filter: Dict[str, Any]) -> np.ndarray:
+    """Đánh giá filter thành packed bits; trường có bitmap không cần quét cột"""
+    nbytes = (store.size + 7) // 8
+    bits = np.full(nbytes, 0xFF, dtype=np.uint8)
+    for key, condition in metadata_filter.items():
+        if key == "$and":
+            for sub_filter in condition:
+                bits &= _filter_bits(store, sub_filter)
+        elif key == "$or":
+            any_bits = np.zeros(nbytes, dtype=np.uint8)
+            for sub_filter in condition:
+                any_bits |= _filter_bits(store, sub_filter)
+            bits &= any_bits
+        else:
+            if not isinstance(condition, dict):
+                condition = {"$eq": condition}
+            for op, value in condition.items():
+                if key in store.bitmaps and op in BITMAP_OPERATORS:
+                    bits &= store.bitmap_bits(key, op, value)
+                else:
+                    bits &= np.packbits(_compare(store.column(key), store.size, op, value))
+    return bits
+
+
+def build_filter_mask(store: _NamespaceStore, metadata_filter: Dict[str, Any]) -> np.ndarray:
+    """
+    Tạo mask boolean cho filter metadata (hỗ trợ $eq, $ne, $in, $nin, $gt/$gte/$lt/$lte, $and, $or)
+    Build a boolean row mask from a Pinecone-style metadata filter
+
+    Điều kiện trên trường có bitmap được AND trực tiếp trên bitmap trước khi tính điểm,
+    nên truy vấn giới hạn theo domain chỉ chấm điểm các hàng thuộc domain đó.
+    """
+    bits = _filter_bits(store, metadata_filter)
+    return np.unpackbits(bits, count=store.size).astype(bool)
+
+
+class LocalIndex:
+    """
+    Index vector trong bộ nhớ với API tương thích pinecone.Index
+    In-memory vector index exposing the subset of the pinecone.Index API used by PineconeService
+    """
+
+    SUPPORTED_METRICS = ("cosine", "dotproduct")
+    SUPPORTED_INDEX_TYPES = ("flat", "hnsw")
+
+    def __init__(
+        self,
+        dimension: int,
+        metric: str = "cosine",
+        index_type: str = "flat",
+        hnsw_params: Optional[Dict[str, int]] = None,
+        exact_search_threshold: int = 10000,
+        bitmap_fields: Iterable[str] = DEFAULT_BITMAP_FIELDS
+    ):
+        """
+        Args:
+            dimension: Số chiều vector
+            metric: cosine hoặc dotproduct
+            index_type: "flat" (chính xác) hoặc "hnsw" (gần đúng)
+            hnsw_params: Tham số HNSWIndex (M, ef_construction, ef_search)
+            exact_search_threshold: Dưới ngưỡng số ứng viên này vẫn tìm chính xác, kể cả khi dùng HNSW
+            bitmap_fields: Trường metadata được đánh bitmap index để lọc trước khi tính điểm
+        """
+        if metric not in self.SUPPORTED_METRICS:
+            raise PineconeServiceError(f"Metric không được hỗ trợ: {metric}", "INVALID_METRIC")
+        if index_type not in self.SUPPORTED_INDEX_TYPES:
+            raise PineconeServiceError(f"Loại index không được hỗ trợ: {index_type}", "INVALID_INDEX_TYPE")
+        if index_type == "hnsw" and metric != "cosine":
+            raise PineconeServiceError("HNSW chỉ hỗ trợ metric cosine", "INVALID_METRIC")
+        self.dimension = dimension
+        self.metric = metric
+        self.index_type = index_type
+        self.hnsw_params = dict(hnsw_params or {})
+        self.exact_search_threshold = exact_search_threshold
+        self.bitmap_fields = tuple(bitmap_fields)
+        self._namespaces: Dict[str, _NamespaceStore] = {}
+        self._lock = _ReadWriteLock()
+
+    def _new_store(self, capacity: int = 1024) -> _NamespaceStore:
+        ann = HNSWIndex(self.dimension, **self.hnsw_params) if self.index_type == "hnsw" else None
+        return _NamespaceStore(self.dimension, capacity=capacity, ann=ann, bitmap_fields=self.bitmap_fields)
+
+    def _prepare(self, vectors: Any) -> np.ndarray:
+        matrix = np.asarray(vectors, dtype=np.float32)
+        if matrix.shape[-1] != self.dimension:
+            raise PineconeServiceError(
+                f"Vector có {matrix.shape[-1]} chiều, index yêu cầu {self.dimension}",
+                "DIMENSION_MISMATCH"
+            )
+        if self.metric == "cosine":
+            norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+            matrix = matrix / np.where(norms == 0, 1.0, norms)
+        return matrix
+
+    def upsert(self, vectors: List[Dict[str, Any]], namespace: str = "") -> Dict[str, int]:
+        if not vectors:
+            return {"upserted_count": 0}
+        matrix = self._prepare([v["values"] for v in vectors])
+        with self._lock.write():
+            store = self._namespaces.get(namespace)
+            if store is None:
+                store = self._new_store()
+                self._namespaces[namespace] = store
+            for vector, row in zip(vectors, matrix):
+                store.upsert(vector["id"], row, vector.get("metadata") or {})
+        return {"upserted_count": len(vectors)}
+
+    def query(
+        self,
+        vector: List[float],
+        top_k: int = 10,
+        include_metadata: bool = True,
+        include_values: bool = False,
+        namespace: str = "",
+        filter: Optional[Dict[str, Any]] = None,
+        ef: Optional[int] = None
+    ) -> LocalQueryResponse:
+        return self.query_many(
+            [vector], top_k=top_k, include_metadata=include_metadata,
+            include_values=include_values, namespace=namespace, filter=filter, ef=ef
+        )[0]
+
+    def query_many(
+        self,
+        vectors: List[List[float]],
+        top_k: int = 10,
+        include_metadata: bool = True,
+        include_values: bool = False,
+        namespace: str = "",
+        filter: Optional[Dict[str, Any]] = None,
+        ef: Optional[int] = None
+    ) -> List[LocalQueryResponse]:
+        """
+        Tìm top-k cho nhiều vector: một phép nhân ma trận (flat), hoặc duyệt đồ thị HNSW
+        khi số ứng viên vượt exact_search_threshold
+        """
+        queries = self._prepare(vectors).reshape(-1, self.dimension)
+        # Khóa đọc: các truy vấn tính điểm song song (NumPy nhả GIL), chỉ ghi/xóa phải chờ
+        with self._lock.read():
+            store = self._namespaces.get(namespace)
+            if store is None or store.size == 0:
+                return [LocalQueryResponse(matches=[], namespace=namespace) for _ in queries]
+
+            mask = build_filter_mask(store, filter) if filter else None
+            candidate_count = int(mask.sum()) if mask is not None else store.size
+
+            if store.ann is not None and candidate_count > self.exact_search_threshold:
+                ranked = self._search_ann(store, queries, top_k, mask, ef)
+            else:
+                ranked = self._search_exact(store, queries, top_k, mask)
+
+            return [
+                LocalQueryResponse(
+                    matches=[
+                        LocalMatch(
+                            id=store.ids[row],
+                            score=score,
+                            metadata=store.metadata_at(row) if include_metadata else {},
+                            values=store.vectors[row].tolist() if include_values else []
+                        )
+                        for row, score in rows
+                    ],
+                    namespace=namespace
+                )
+                for rows in ranked
+            ]
+
+    def _search_exact(
+        self,
+        store: _NamespaceStore,
+        queries: np.ndarray,
+        top_k: int,
+        mask: Optional[np.ndarray]
+    ) -> List[List[tuple]]:
+        candidates = None
+        matrix = store.matrix()
+        if mask is not None:
+            candidates = np.flatnonzero(mask)
+            matrix = matrix[candidates]
+
+        scores = queries @ matrix.T
+        k = min(top_k, scores.shape[1])
+        ranked = []
+        for row_scores in scores:
+            if k == 0:
+                ranked.append([])
+                continue
+            top = np.argpartition(-row_scores, k - 1)[:k]
+            top = top[np.argsort(-row_scores[top], kind="stable")]
+            rows = candidates[top] if candidates is not None else top
+            ranked.append([(int(row), float(row_scores[i])) for row, i in zip(rows, top)])
+        return ranked
+
+    def _search_ann(
+        self,
+        store: _NamespaceStore,
+        queries: np.ndarray,
+        top_k: int,
+        mask: Optional[np.ndarray],
+        ef: Optional[int]
+    ) -> List[List[tuple]]:
+        allowed_labels = None
+        if mask is not None:
+            allowed_labels = np.zeros(store.next_label, dtype=bool)
+            allowed_labels[store.labels[:store.size][mask]] = True
+
+        ranked = []
+        for query in queries:
+            labels, scores = store.ann.search(query, top_k, ef=ef, allowed_labels=allowed_labels)
+            ranked.append([(store.row_of_label[label], score) for label, score in zip(labels, scores)])
+        return ranked
+
+    def delete(
+        self,
+        ids: Optional[Iterable[str]] = None,
+        filter: Optional[Dict[str, Any]] = None,
+        namespace: str = "",
+        delete_all: bool = False
+    ) -> Dict[str, Any]:
+        with self._lock.write():
+            store = self._namespaces.get(namespace)
+            if store is None:
+                return {}
+            if delete_all:
+                del self._namespaces[namespace]
+                return {}
+            targets = list(ids or [])
+            if filter:
+                mask = build_filter_mask(store, filter)
+                targets.extend(store.ids[row] for row in np.flatnonzero(mask))
+            for vector_id in targets:
+                store.remove(vector_id)
+        return {}
+
+    def describe_index_stats(self) -> LocalIndexStats:
+        with self._lock.read():
+            namespaces = {
+                name: LocalNamespaceStats(vector_count=store.size)
+                for name, store in self._namespaces.items()
+            }
+        return LocalIndexStats(
+            total_vector_count=sum(ns.vector_count for ns in namespaces.values()),
+            dimension=self.dimension,
+            index_fullness=0.0,
+            namespaces=namespaces
+        )
+
+    def save(self, path: str) -> None:
+        """
+        Lưu index ra file .npz (vector, đồ thị HNSW và manifest JSON chứa id, metadata)
+        Ghi vào file tạm cùng thư mục rồi os.replace, nên file cũ không bao giờ bị ghi dở
+        """
+        with self._lock.read():
+            arrays = {}
+            manifest = {
+                "dimension": self.dimension,
+                "metric": self.metric,
+                "index_type": self.index_type,
+                "hnsw_params": self.hnsw_params,
+                "exact_search_threshold": self.exact_search_threshold,
+                "bitmap_fields": list(self.bitmap_fields),
+                "namespaces": []
+            }
+            for i, (name, store) in enumerate(self._namespaces.items()):
+                # Bản sao: file được ghi ngoài khóa, trong khi các lần ghi mới có thể sửa mảng gốc
+                arrays[f"vectors_{i}"] = store.matrix().copy()
+                arrays[f"labels_{i}"] = store.labels[:store.size].copy()
+                if store.ann is not None:
+                    for key, value in store.ann.to_arrays().items():
+                        arrays[f"hnsw_{i}_{key}"] = np.array(value, copy=True)
+                manifest["namespaces"].append({
+                    "name": name,
+                    "ids": list(store.ids),
+                    "next_label": store.next_label,
+                    "columns": {
+                        column_name: store.column(column_name).tolist()
+                        for column_name in store.columns
+                    }
+                })
+        arrays["manifest"] = np.array(json.dumps(manifest, ensure_ascii=False))
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(
+            dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp"
+        )
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(f, **arrays)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    @classmethod
+    def load(cls, path: str) -> "LocalIndex":
+        """Nạp index từ file .npz"""
+        with np.load(path, allow_pickle=False) as data:
+            manifest = json.loads(str(data["manifest"]))
+            index = cls(
+                dimension=manifest["dimension"],
+                metric=manifest["metric"],
+                index_type=manifest.get("index_type", "flat"),
+                hnsw_params=manifest.get("hnsw_params"),
+                exact_search_threshold=manifest.get("exact_search_threshold", 10000),
+                bitmap_fields=manifest.get("bitmap_fields", DEFAULT_BITMAP_FIELDS)
+            )
+            for i, namespace in enumerate(manifest["namespaces"]):
+                vectors = data[f"vectors_{i}"]
+                store = _NamespaceStore(
+                    index.dimension,
+                    capacity=max(len(namespace["ids"]), 1),
+                    bitmap_fields=index.bitmap_fields
+                )
+                for row, vector_id in enumerate(namespace["ids"]):
+                    metadata = {
+                        name: values[row] for name, values in namespace["columns"].items()
+                    }
+                    store.upsert(vector_id, vectors[row], metadata)
+
+                if f"labels_{i}" in data:
+                    store.labels[:store.size] = data[f"labels_{i}"]
+                    store.row_of_label = {int(label): row for row, label in enumerate(store.labels[:store.size])}
+                    store.next_label = namespace.get("next_label", store.size)
+
+                if index.index_type == "hnsw":
+                    prefix = f"hnsw_{i}_"
+                    hnsw_arrays = {key[len(prefix):]: data[key] for key in data.files if key.startswith(prefix)}
+                    if hnsw_arrays:
+                        store.ann = HNSWIndex.from_arrays(index.dimension, hnsw_arrays)
+                    else:
+                        store.ann = HNSWIndex(index.dimension, **index.hnsw_params)
+                        for row in range(store.size):
+                            store.ann.add(int(store.labels[row]), store.vectors[row])
+                index._namespaces[namespace["name"]] = store
+        return index
+
+
+class LocalVectorStore(PineconeService):
+    """
+    Kho vector cục bộ thay thế PineconeService, chạy offline
+    Offline, in-process drop-in replacement for PineconeService
+    """
+
+    def __init__(
+        self,
+        dimension: int = 1536,
+        metric: str = "cosine",
+        openai_api_key: Optional[str] = None,
+        embeddings: Optional[Any] = None,
+        embedding_cache: Optional[EmbeddingCache] = None,
+        persist_path: Optional[str] = None,
+        index_name: str = "local",
+        index_type: str = "flat",
+        hnsw_params: Optional[Dict[str, int]] = None,
+        exact_search_threshold: int = 10000,
+        bitmap_fields: Iterable[str] = DEFAULT_BITMAP_FIELDS,
+        autosave: bool = True,
+        autosave_interval: float = 5.0
+    ):
+        """
+        Khởi tạo kho vector cục bộ
+        Initialize local vector store
+
+        Args:
+            dimension: Số chiều vector
+            metric: Metric cho similarity (cosine, dotproduct)
+            openai_api_key: OpenAI API key cho embeddings
+            embeddings: Đối tượng embeddings có sẵn (ưu tiên hơn openai_api_key)
+            embedding_cache: Cache embedding (mặc định dùng cache chung của process)
+            persist_path: File .npz để nạp/lưu index
+            index_name: Tên index (chỉ dùng cho thống kê)
+            index_type: "flat" (brute-force chính xác) hoặc "hnsw" (gần đúng)
+            hnsw_params: Tham số HNSW (M, ef_construction, ef_search)
+            exact_search_threshold: Số ứng viên tối đa vẫn tìm chính xác khi dùng HNSW
+            bitmap_fields: Trường metadata được đánh bitmap index
+            autosave: Tự động lưu index vào persist_path sau khi ghi/xóa thành công
+            autosave_interval: Số giây gom các lần ghi trước khi lưu (0 = lưu ngay sau mỗi lần ghi)
+        """
+        if not NUMPY_AVAILABLE:
+            raise PineconeServiceError(
+                "Không thể khởi tạo Local Vector Store: thiếu numpy",
+                "DEPENDENCY_ERROR"
+            )
+
+        self.api_key = None
+        self.environment = "local"
+        self.index_name = index_name
+        self.dimension = dimension
+        self.metric = metric
+        self.persist_path = persist_path
+        self.autosave = autosave
+        self.autosave_interval = autosave_interval
+        self._dirty = False
+        self._save_timer: Optional[threading.Timer] = None
+        self._state_lock = threading.Lock()
+        self._save_lock = threading.Lock()
+
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+        self.pinecone_client = None
+        self.embeddings = embeddings
+        self.embedding_cache = embedding_cache or get_shared_embedding_cache()
+
+        if self.embeddings is None and openai_api_key and EMBEDDINGS_AVAILABLE:
+            try:
+                self.embeddings = OpenAIEmbeddings(
+                    openai_api_key=openai_api_key,
+                    model="text-embedding-3-small"
+                )
+            except Exception as e:
+                self.logger.error(f"Không thể khởi tạo OpenAI embeddings: {e}")
+
+        if persist_path and os.path.exists(persist_path):
+            self.index = LocalIndex.load(persist_path)
+            self.logger.info(f"Đã nạp local index từ {persist_path}")
+        else:
+            self.index = LocalIndex(
+                dimension,
+                metric,
+                index_type=index_type,
+                hnsw_params=hnsw_params,
+                exact_search_threshold=exact_search_threshold,
+                bitmap_fields=bitmap_fields
+            )
+
+    def search_by_vectors(
+        self,
+        query_vectors: List[List[float]],
+        top_k: int = 5,
+        score_threshold: float = 0.0,
+        metadata_filter: Optional[Dict[str, Any]] = None,
+        namespace: str = "",
+        include_metadata: bool = True
+    ) -> List[List[VectorSearchResult]]:
+        """
+        Tìm kiếm theo lô bằng một phép nhân ma trận
+        Batch search with a single matrix-matrix product
+        """
+        if not query_vectors:
+            return []
+        try:
+            responses = self.index.query_many(
+                query_vectors,
+                top_k=top_k,
+                include_metadata=include_metadata,
+                namespace=namespace,
+                filter=metadata_filter or None
+            )
+        except Exception as e:
+            error_msg = f"Lỗi tìm kiếm theo vector: {str(e)}"
+            self.logger.error(error_msg)
+            raise PineconeServiceError(error_msg, "SEARCH_ERROR")
+
+        return [
+            [
+                self._match_to_result(match)
+                for match in response.matches
+                if match.score >= score_threshold
+            ]
+            for response in responses
+        ]
+
+    def upsert_documents(self, documents: List[Dict[str, Any]], *args, **kwargs) -> bool:
+        """Upsert rồi lưu index (nếu bật autosave)"""
+        success = super().upsert_documents(documents, *args, **kwargs)
+        if success:
+            self._autosave()
+        return success
+
+    def delete_documents(self, document_ids: List[str], namespace: str = "") -> bool:
+        """Xóa theo ID rồi lưu index (nếu bật autosave)"""
+        success = super().delete_documents(document_ids, namespace)
+        if success and document_ids:
+            self._autosave()
+        return success
+
+    def delete_by_filter(self, filter_dict: Dict[str, Any], namespace: str = "") -> bool:
+        """Xóa theo filter rồi lưu index (nếu bật autosave)"""
+        success = super().delete_by_filter(filter_dict, namespace)
+        if success:
+            self._autosave()
+        return success
+
+    def _autosave(self) -> None:
+        """Đánh dấu index cần lưu; các lần ghi trong autosave_interval được gom vào một lần lưu"""
+        if not self.persist_path:
+            return
+        with self._state_lock:
+            self._dirty = True
+            if not self.autosave or self._save_timer is not None:
+                return
+            if self.autosave_interval > 0:
+                self._save_timer = threading.Timer(self.autosave_interval, self.flush)
+                self._save_timer.daemon = True
+                self._save_timer.start()
+                return
+        self.flush()
+
+    def flush(self) -> bool:
+        """
+        Lưu ngay các thay đổi chưa được ghi ra đĩa
+        Persist pending changes now; errors are logged, not raised
+
+        Returns:
+            bool: True nếu không còn thay đổi chưa lưu
+        """
+        # _save_lock tuần tự hóa các lần lưu để bản chụp cũ không ghi đè bản mới hơn
+        with self._save_lock:
+            with self._state_lock:
+                if self._save_timer is not None:
+                    self._save_timer.cancel()
+                    self._save_timer = None
+                if not self._dirty or not self.persist_path:
+                    return True
+                self._dirty = False
+            try:
+                self.save()
+            except Exception as e:
+                with self._state_lock:
+                    self._dirty = True
+                self.logger.error(f"Không thể lưu local index vào {self.persist_path}: {e}")
+                return False
+            return True
+
+    async def aclose(self) -> None:
+        """Lưu các thay đổi còn chờ khi tắt ứng dụng (kể cả khi tắt autosave)"""
+        await asyncio.to_thread(self.flush)
+        await super().aclose()
+
+    def save(self, path: Optional[str] = None) -> str:
+        """
+        Lưu index ra đĩa
+        Persist the index to disk
+
+        Returns:
+            str: Đường dẫn file đã lưu
+        """
+        target = path or self.persist_path
+        if not target:
+            raise PineconeServiceError("Chưa cấu hình đường dẫn lưu index", "MISSING_PERSIST_PATH")
+        self.index.save(target)
+        self.logger.info(f"Đã lưu local index vào {target}")
+        return target
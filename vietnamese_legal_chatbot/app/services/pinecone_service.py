@@ -6,12 +6,14 @@ Handles all Pinecone vector database operations for legal documents.
 Xử lý tất cả các thao tác cơ sở dữ liệu vector Pinecone cho tài liệu pháp lý.
 """
 
-from typing import List, Dict, Optional, Tuple, Any, Union
+from typing import Callable, List, Dict, Optional, Tuple, Any, Union
 import logging
 from dataclasses import dataclass, asdict
 import json
 import time
 import uuid
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 try:
@@ -46,6 +48,15 @@ except Exception as e:
             self.pinecone_dimension = 1536
             self.openai_embedding_api_key = "test-openai-key"
 
+try:
+    from app.utils.embedding_cache import EmbeddingCache, get_shared_embedding_cache, get_model_id
+    from app.utils.token_counter import batch_by_tokens
+    from app.utils.client_registry import get_client_registry
+except ImportError:
+    from utils.embedding_cache import EmbeddingCache, get_shared_embedding_cache, get_model_id
+    from utils.token_counter import batch_by_tokens
+    from utils.client_registry import get_client_registry
+
 @dataclass
 class VectorSearchResult:
     """
@@ -111,6 +122,16 @@ class PineconeService:
         "bat_dong_san": "Luật Bất động sản"
     }
     
+    # Số input tối đa trong một request embeddings của OpenAI
+    MAX_EMBEDDING_BATCH_INPUTS = 2048
+    
+    # Client asyncio của index (tạo lười trong event loop đang chạy)
+    _async_index = None
+    _async_index_lock: Optional[asyncio.Lock] = None
+    
+    # Callback nhận các domain bị ghi/xóa (None = không xác định), vd. để xóa answer cache
+    _write_listeners: Tuple[Callable[[Optional[List[str]]], None], ...] = ()
+    
     def __init__(
         self,
         api_key: str,
@@ -118,7 +139,8 @@ class PineconeService:
         index_name: str,
         dimension: int = 1536,
         metric: str = "cosine",
-        openai_api_key: Optional[str] = None
+        openai_api_key: Optional[str] = None,
+        embedding_cache: Optional[EmbeddingCache] = None
     ):
         """
         Khởi tạo dịch vụ Pinecone
@@ -131,6 +153,7 @@ class PineconeService:
             dimension: Số chiều vector (mặc định 1536 cho OpenAI)
             metric: Metric cho similarity (cosine, euclidean, dotproduct)
             openai_api_key: OpenAI API key cho embeddings
+            embedding_cache: Cache embedding (mặc định dùng cache chung của process)
         """
         if not PINECONE_AVAILABLE:
             raise PineconeServiceError(
@@ -151,6 +174,7 @@ class PineconeService:
         self.pinecone_client: Optional[Pinecone] = None
         self.index = None
         self.embeddings: Optional[OpenAIEmbeddings] = None
+        self.embedding_cache = embedding_cache or get_shared_embedding_cache()
         
         # Khởi tạo OpenAI embeddings nếu có API key
         if openai_api_key:
@@ -158,7 +182,8 @@ class PineconeService:
                 # Use text-embedding-3-small (compatible with API key)
                 self.embeddings = OpenAIEmbeddings(
                     openai_api_key=openai_api_key,
-                    model="text-embedding-3-small"
+                    model="text-embedding-3-small",
+                    http_client=get_client_registry().http_client()
                 )
                 self.logger.info(f"Đã khởi tạo OpenAI embeddings với model: text-embedding-3-small")
             except Exception as e:
@@ -190,8 +215,8 @@ class PineconeService:
         Initialize Pinecone client and index
         """
         try:
-            # Khởi tạo Pinecone client
-            self.pinecone_client = Pinecone(api_key=self.api_key)
+            # Pinecone client dùng chung trong process (giữ kết nối keep-alive)
+            self.pinecone_client = get_client_registry().pinecone_client(self.api_key, client_class=Pinecone)
             
             # Kiểm tra và tạo index nếu cần
             if self.index_name not in [index.name for index in self.pinecone_client.list_indexes()]:
@@ -292,73 +317,95 @@ class PineconeService:
         self, 
         documents: List[Dict[str, Any]], 
         batch_size: int = 100,
-        namespace: str = ""
+        namespace: str = "",
+        embedding_batch_tokens: int = 100_000,
+        max_concurrent_batches: int = 4
     ) -> bool:
         """
         Upsert tài liệu vào Pinecone theo batch
         Upsert documents to Pinecone in batches
         
+        Embeddings được tính theo batch giới hạn bởi số token (một request embed_documents
+        mỗi batch), tối đa max_concurrent_batches batch chạy đồng thời.
+        
         Args:
-            documents: Danh sách tài liệu với content và metadata
-            batch_size: Kích thước batch
+            documents: Danh sách tài liệu với content, metadata và embedding (tùy chọn)
+            batch_size: Kích thước batch khi ghi vào Pinecone
             namespace: Namespace để tổ chức dữ liệu
+            embedding_batch_tokens: Tổng số token tối đa cho mỗi request embedding
+            max_concurrent_batches: Số batch embedding chạy đồng thời tối đa
             
         Returns:
-            bool: True nếu thành công
+            bool: True nếu tất cả batch thành công
         """
         try:
             if not self.index:
                 raise PineconeServiceError("Index chưa được khởi tạo", "INDEX_NOT_INITIALIZED")
             
-            if not self.embeddings:
+            valid_docs = []
+            for doc in documents:
+                if not doc.get("content", ""):
+                    self.logger.warning(f"Document {doc.get('id', 'unknown')} không có content")
+                    continue
+                valid_docs.append(doc)
+            
+            if not self.embeddings and any(not doc.get("embedding") for doc in valid_docs):
                 raise PineconeServiceError("Embeddings chưa được khởi tạo", "EMBEDDINGS_NOT_INITIALIZED")
             
+            model = get_model_id(self.embeddings) if self.embeddings else "text-embedding-3-small"
+            batches = batch_by_tokens(
+                [doc["content"] for doc in valid_docs],
+                max_tokens=embedding_batch_tokens,
+                max_items=self.MAX_EMBEDDING_BATCH_INPUTS,
+                model=model
+            )
             total_docs = len(documents)
-            self.logger.info(f"Bắt đầu upsert {total_docs} tài liệu với batch size {batch_size}")
+            self.logger.info(
+                f"Bắt đầu upsert {total_docs} tài liệu: {len(batches)} batch embedding, "
+                f"tối đa {max_concurrent_batches} batch đồng thời"
+            )
             
-            # Xử lý documents theo batch
-            for i in range(0, total_docs, batch_size):
-                batch = documents[i:i + batch_size]
-                vectors_to_upsert = []
-                
-                for doc in batch:
-                    try:
-                        # Tạo embedding cho content
-                        content = doc.get("content", "")
-                        if not content:
-                            self.logger.warning(f"Document {doc.get('id', 'unknown')} không có content")
-                            continue
-                        
-                        # Tạo vector embedding
-                        embedding = self.embeddings.embed_query(content)
-                        
-                        # Chuẩn bị metadata
-                        metadata = doc.get("metadata", {})
-                        metadata.update({
-                            "content": content[:1000],  # Lưu một phần content trong metadata
-                            "content_length": len(content),
-                            "upserted_at": datetime.now().isoformat()
-                        })
-                        
-                        # Validate legal domain
-                        legal_domain = metadata.get("legal_domain")
-                        if legal_domain and not self._validate_legal_domain(legal_domain):
-                            self.logger.warning(f"Legal domain không hợp lệ: {legal_domain}")
-                        
-                        vectors_to_upsert.append({
-                            "id": doc.get("id", str(uuid.uuid4())),
-                            "values": embedding,
-                            "metadata": metadata
-                        })
-                        
-                    except Exception as e:
-                        self.logger.error(f"Lỗi xử lý document {doc.get('id', 'unknown')}: {e}")
-                        continue
-                
-                # Upsert batch vào Pinecone
-                if vectors_to_upsert:
-                    self.index.upsert(vectors=vectors_to_upsert, namespace=namespace)
-                    self.logger.info(f"Đã upsert batch {i//batch_size + 1}: {len(vectors_to_upsert)} vectors")
+            def process_batch(batch_number: int, indices: List[int]) -> bool:
+                try:
+                    batch_docs = [valid_docs[i] for i in indices]
+                    embeddings = [doc.get("embedding") for doc in batch_docs]
+                    pending = [n for n, embedding in enumerate(embeddings) if not embedding]
+                    if pending:
+                        computed = self.embedding_cache.embed_documents(
+                            self.embeddings, [batch_docs[n]["content"] for n in pending]
+                        )
+                        for n, embedding in zip(pending, computed):
+                            embeddings[n] = embedding
+                    vectors_to_upsert = [
+                        self._build_upsert_vector(doc, embedding)
+                        for doc, embedding in zip(batch_docs, embeddings)
+                    ]
+                    
+                    # Upsert vào Pinecone theo batch_size
+                    for start in range(0, len(vectors_to_upsert), batch_size):
+                        self.index.upsert(
+                            vectors=vectors_to_upsert[start:start + batch_size],
+                            namespace=namespace
+                        )
+                    self.logger.info(f"Đã upsert batch {batch_number}: {len(vectors_to_upsert)} vectors")
+                    return True
+                except Exception as e:
+                    self.logger.error(f"Lỗi xử lý batch {batch_number} ({len(indices)} documents): {e}")
+                    return False
+            
+            if max_concurrent_batches <= 1 or len(batches) <= 1:
+                outcomes = [process_batch(n + 1, indices) for n, indices in enumerate(batches)]
+            else:
+                with ThreadPoolExecutor(max_workers=max_concurrent_batches) as executor:
+                    outcomes = list(executor.map(process_batch, range(1, len(batches) + 1), batches))
+            
+            if any(outcomes):
+                self._notify_write(self._written_domains(valid_docs))
+            
+            failed = outcomes.count(False)
+            if failed:
+                self.logger.warning(f"Upsert hoàn thành với {failed}/{len(batches)} batch lỗi")
+                return False
             
             self.logger.info(f"Hoàn thành upsert {total_docs} tài liệu")
             return True
@@ -368,14 +415,61 @@ class PineconeService:
             self.logger.error(error_msg)
             raise PineconeServiceError(error_msg, "UPSERT_ERROR")
     
+    def add_write_listener(self, listener: Callable[[Optional[List[str]]], None]) -> None:
+        """
+        Đăng ký callback sau mỗi lần ghi/xóa thành công
+        Register a callback invoked with the affected legal domains (None when unknown) after each write
+        """
+        self._write_listeners = (*self._write_listeners, listener)
+    
+    def _notify_write(self, legal_domains: Optional[List[str]]) -> None:
+        for listener in self._write_listeners:
+            try:
+                listener(legal_domains)
+            except Exception as e:
+                self.logger.error(f"Lỗi write listener: {e}")
+    
+    @staticmethod
+    def _written_domains(documents: List[Dict[str, Any]]) -> Optional[List[str]]:
+        """Domain của các tài liệu đã ghi; None nếu có tài liệu không có domain"""
+        domains = {(doc.get("metadata") or {}).get("legal_domain") for doc in documents}
+        if not domains or None in domains:
+            return None
+        return sorted(domains)
+    
+    def _build_upsert_vector(self, doc: Dict[str, Any], embedding: List[float]) -> Dict[str, Any]:
+        """
+        Chuẩn bị vector và metadata để upsert
+        Build the Pinecone vector payload for a document
+        """
+        content = doc["content"]
+        metadata = dict(doc.get("metadata", {}))
+        metadata.update({
+            "content": content[:1000],  # Lưu một phần content trong metadata
+            "content_length": len(content),
+            "upserted_at": datetime.now().isoformat()
+        })
+        
+        # Validate legal domain
+        legal_domain = metadata.get("legal_domain")
+        if legal_domain and not self._validate_legal_domain(legal_domain):
+            self.logger.warning(f"Legal domain không hợp lệ: {legal_domain}")
+        
+        return {
+            "id": doc.get("id", str(uuid.uuid4())),
+            "values": embedding,
+            "metadata": metadata
+        }
+    
     def search_similar_documents(
         self,
-        query: str,
+        query: Optional[str] = None,
         legal_domain: Optional[str] = None,
         top_k: int = 5,
         score_threshold: float = 0.7,
         namespace: str = "",
-        include_metadata: bool = True
+        include_metadata: bool = True,
+        query_vector: Optional[List[float]] = None
     ) -> List[VectorSearchResult]:
         """
         Tìm kiếm tài liệu tương tự dựa trên query
@@ -388,65 +482,241 @@ class PineconeService:
             score_threshold: Ngưỡng điểm similarity
             namespace: Namespace để tìm kiếm
             include_metadata: Có trả về metadata không
+            query_vector: Vector truy vấn đã tính sẵn (bỏ qua bước embedding)
             
         Returns:
             List[VectorSearchResult]: Danh sách kết quả tìm kiếm
         """
         try:
-            if not self.index:
-                raise PineconeServiceError("Index chưa được khởi tạo", "INDEX_NOT_INITIALIZED")
-            
-            if not self.embeddings:
-                raise PineconeServiceError("Embeddings chưa được khởi tạo", "EMBEDDINGS_NOT_INITIALIZED")
+            if query_vector is None:
+                if not query:
+                    raise PineconeServiceError("Query text is required", "MISSING_QUERY")
+                if not self.embeddings:
+                    raise PineconeServiceError("Embeddings chưa được khởi tạo", "EMBEDDINGS_NOT_INITIALIZED")
+                self.logger.info(f"Tìm kiếm: '{query[:50]}...' trong domain: {legal_domain}")
+                query_vector = self._embed_query(query)
+            
+            return self.search_by_vector(
+                query_vector,
+                top_k=top_k,
+                score_threshold=score_threshold,
+                metadata_filter=self._domain_filter(legal_domain),
+                namespace=namespace,
+                include_metadata=include_metadata
+            )
             
-            self.logger.info(f"Tìm kiếm: '{query[:50]}...' trong domain: {legal_domain}")
+        except PineconeServiceError as e:
+            if e.error_code == "SEARCH_ERROR":
+                raise
+            error_msg = f"Lỗi tìm kiếm: {e.message}"
+            self.logger.error(error_msg)
+            raise PineconeServiceError(error_msg, "SEARCH_ERROR")
+        except Exception as e:
+            error_msg = f"Lỗi tìm kiếm: {str(e)}"
+            self.logger.error(error_msg)
+            raise PineconeServiceError(error_msg, "SEARCH_ERROR")
+    
+    async def asearch_similar_documents(
+        self,
+        query: Optional[str] = None,
+        legal_domain: Optional[str] = None,
+        top_k: int = 5,
+        score_threshold: float = 0.7,
+        namespace: str = "",
+        include_metadata: bool = True,
+        query_vector: Optional[List[float]] = None
+    ) -> List[VectorSearchResult]:
+        """
+        Phiên bản async của search_similar_documents (không chặn event loop)
+        Async variant of search_similar_documents
+        """
+        try:
+            if query_vector is None:
+                if not query:
+                    raise PineconeServiceError("Query text is required", "MISSING_QUERY")
+                if not self.embeddings:
+                    raise PineconeServiceError("Embeddings chưa được khởi tạo", "EMBEDDINGS_NOT_INITIALIZED")
+                query_vector = await self.embedding_cache.aembed_query(self.embeddings, query)
+            
+            return await self.asearch_by_vector(
+                query_vector,
+                top_k=top_k,
+                score_threshold=score_threshold,
+                metadata_filter=self._domain_filter(legal_domain),
+                namespace=namespace,
+                include_metadata=include_metadata
+            )
             
-            # Tạo query embedding
-            query_embedding = self.embeddings.embed_query(query)
+        except PineconeServiceError as e:
+            if e.error_code == "SEARCH_ERROR":
+                raise
+            error_msg = f"Lỗi tìm kiếm: {e.message}"
+            self.logger.error(error_msg)
+            raise PineconeServiceError(error_msg, "SEARCH_ERROR")
+        except Exception as e:
+            error_msg = f"Lỗi tìm kiếm: {str(e)}"
+            self.logger.error(error_msg)
+            raise PineconeServiceError(error_msg, "SEARCH_ERROR")
+    
+    def _domain_filter(self, legal_domain: Optional[str]) -> Dict[str, Any]:
+        """Chuẩn bị metadata filter theo domain pháp lý"""
+        metadata_filter = {}
+        if legal_domain:
+            if not self._validate_legal_domain(legal_domain):
+                self.logger.warning(f"Legal domain không hợp lệ: {legal_domain}")
+            else:
+                metadata_filter["legal_domain"] = legal_domain
+        return metadata_filter
+    
+    def search_by_vector(
+        self,
+        query_vector: List[float],
+        top_k: int = 5,
+        score_threshold: float = 0.0,
+        metadata_filter: Optional[Dict[str, Any]] = None,
+        namespace: str = "",
+        include_metadata: bool = True
+    ) -> List[VectorSearchResult]:
+        """
+        Tìm kiếm bằng vector truy vấn đã tính sẵn
+        Search with a precomputed query vector
+        
+        Args:
+            query_vector: Vector truy vấn
+            top_k: Số lượng kết quả trả về
+            score_threshold: Ngưỡng điểm similarity
+            metadata_filter: Bộ lọc metadata (Pinecone filter syntax)
+            namespace: Namespace để tìm kiếm
+            include_metadata: Có trả về metadata không
             
-            # Chuẩn bị metadata filter
-            metadata_filter = {}
-            if legal_domain:
-                if not self._validate_legal_domain(legal_domain):
-                    self.logger.warning(f"Legal domain không hợp lệ: {legal_domain}")
-                else:
-                    metadata_filter["legal_domain"] = legal_domain
+        Returns:
+            List[VectorSearchResult]: Danh sách kết quả tìm kiếm
+        """
+        try:
+            if not self.index:
+                raise PineconeServiceError("Index chưa được khởi tạo", "INDEX_NOT_INITIALIZED")
             
-            # Thực hiện tìm kiếm
             search_response = self.index.query(
-                vector=query_embedding,
+                vector=list(query_vector),
                 top_k=top_k,
                 include_metadata=include_metadata,
                 include_values=False,
                 namespace=namespace,
-                filter=metadata_filter if metadata_filter else None
+                filter=metadata_filter or None
             )
             
-            # Xử lý kết quả
-            results = []
-            for match in search_response.matches:
-                if match.score >= score_threshold:
-                    metadata = match.metadata or {}
-                    
-                    result = VectorSearchResult(
-                        id=match.id,
-                        score=match.score,
-                        metadata=metadata,
-                        content=metadata.get("content", ""),
-                        legal_domain=metadata.get("legal_domain"),
-                        article_number=metadata.get("article_number"),
-                        citation=self._build_citation(metadata)
-                    )
-                    results.append(result)
-            
-            self.logger.info(f"Tìm thấy {len(results)} kết quả phù hợp (score >= {score_threshold})")
-            return results
+            return self._query_results(search_response, score_threshold)
             
         except Exception as e:
-            error_msg = f"Lỗi tìm kiếm: {str(e)}"
+            error_msg = f"Lỗi tìm kiếm theo vector: {str(e)}"
+            self.logger.error(error_msg)
+            raise PineconeServiceError(error_msg, "SEARCH_ERROR")
+    
+    async def asearch_by_vector(
+        self,
+        query_vector: List[float],
+        top_k: int = 5,
+        score_threshold: float = 0.0,
+        metadata_filter: Optional[Dict[str, Any]] = None,
+        namespace: str = "",
+        include_metadata: bool = True
+    ) -> List[VectorSearchResult]:
+        """
+        Phiên bản async của search_by_vector, dùng IndexAsyncio của Pinecone.
+        Backend không có client asyncio chạy search_by_vector trong worker thread.
+        Async variant of search_by_vector
+        """
+        async_index = await self._get_async_index()
+        if async_index is None:
+            return await asyncio.to_thread(
+                self.search_by_vector,
+                query_vector,
+                top_k=top_k,
+                score_threshold=score_threshold,
+                metadata_filter=metadata_filter,
+                namespace=namespace,
+                include_metadata=include_metadata
+            )
+        
+        try:
+            search_response = await async_index.query(
+                vector=list(query_vector),
+                top_k=top_k,
+                include_metadata=include_metadata,
+                include_values=False,
+                namespace=namespace,
+                filter=metadata_filter or None
+            )
+            return self._query_results(search_response, score_threshold)
+            
+        except Exception as e:
+            error_msg = f"Lỗi tìm kiếm theo vector: {str(e)}"
             self.logger.error(error_msg)
             raise PineconeServiceError(error_msg, "SEARCH_ERROR")
     
+    async def _get_async_index(self):
+        """
+        Tạo lười IndexAsyncio trong event loop hiện tại; None nếu client không hỗ trợ
+        Lazily create the Pinecone asyncio index client
+        """
+        client = getattr(self, "pinecone_client", None)
+        if client is None or not hasattr(client, "IndexAsyncio"):
+            return None
+        if self._async_index is None:
+            if self._async_index_lock is None:
+                self._async_index_lock = asyncio.Lock()
+            async with self._async_index_lock:
+                if self._async_index is None:
+                    description = await asyncio.to_thread(client.describe_index, self.index_name)
+                    self._async_index = client.IndexAsyncio(host=description.host)
+                    self.logger.info(f"Đã khởi tạo Pinecone IndexAsyncio cho index: {self.index_name}")
+        return self._async_index
+    
+    async def aclose(self) -> None:
+        """Đóng client asyncio (gọi khi tắt ứng dụng)"""
+        if self._async_index is not None:
+            await self._async_index.close()
+            self._async_index = None
+    
+    def _query_results(self, search_response: Any, score_threshold: float) -> List[VectorSearchResult]:
+        """Chuyển kết quả query thành VectorSearchResult, lọc theo ngưỡng điểm"""
+        results = [
+            self._match_to_result(match)
+            for match in search_response.matches
+            if match.score >= score_threshold
+        ]
+        
+        self.logger.info(f"Tìm thấy {len(results)} kết quả phù hợp (score >= {score_threshold})")
+        return results
+    
+    def search_by_vectors(
+        self,
+        query_vectors: List[List[float]],
+        top_k: int = 5,
+        score_threshold: float = 0.0,
+        metadata_filter: Optional[Dict[str, Any]] = None,
+        namespace: str = "",
+        include_metadata: bool = True
+    ) -> List[List[VectorSearchResult]]:
+        """
+        Tìm kiếm theo lô nhiều vector truy vấn
+        Batch search for several precomputed query vectors
+        
+        Returns:
+            List[List[VectorSearchResult]]: Kết quả cho từng vector, cùng thứ tự đầu vào
+        """
+        return [
+            self.search_by_vector(
+                query_vector,
+                top_k=top_k,
+                score_threshold=score_threshold,
+                metadata_filter=metadata_filter,
+                namespace=namespace,
+                include_metadata=include_metadata
+            )
+            for query_vector in query_vectors
+        ]
+    
     def similarity_search(
         self,
         query_text: str = None,
@@ -455,8 +725,10 @@ class PineconeService:
         score_threshold: float = 0.7,
         filter: Optional[Dict[str, Any]] = None,
         metadata_filter: Optional[Dict[str, Any]] = None,
-        namespace: str = ""
-    ) -> List[str]:
+        namespace: str = "",
+        query_vector: Optional[List[float]] = None,
+        return_documents: bool = False
+    ) -> List[Union[str, Dict[str, Any]]]:
         """
         Tìm kiếm tương tự theo chuẩn LangChain interface
         LangChain-compatible similarity search
@@ -469,50 +741,39 @@ class PineconeService:
             filter: Bộ lọc metadata (LangChain style)
             metadata_filter: Bộ lọc metadata (legacy parameter)
             namespace: Namespace để tìm kiếm
+            query_vector: Vector truy vấn đã tính sẵn (bỏ qua bước embedding)
+            return_documents: Trả về dict (id, page_content, metadata, score) thay vì chỉ nội dung
             
         Returns:
             List[str]: Danh sách nội dung tài liệu tương tự
+            (hoặc List[Dict] khi return_documents=True)
         """
         try:
             # Handle backward compatibility for parameter names
             search_query = query_text or query
             search_filter = metadata_filter or filter
             
-            if not search_query:
-                raise PineconeServiceError("Query text is required", "MISSING_QUERY")
-            
-            if not self.index:
-                raise PineconeServiceError("Index chưa được khởi tạo", "INDEX_NOT_INITIALIZED")
-            
-            if not self.embeddings:
-                raise PineconeServiceError("Embeddings chưa được khởi tạo", "EMBEDDINGS_NOT_INITIALIZED")
-            
-            self.logger.info(f"LangChain similarity search: '{search_query[:50]}...'")
-            
-            # Tạo query embedding
-            query_embedding = self.embeddings.embed_query(search_query)
+            if query_vector is None:
+                if not search_query:
+                    raise PineconeServiceError("Query text is required", "MISSING_QUERY")
+                
+                if not self.embeddings:
+                    raise PineconeServiceError("Embeddings chưa được khởi tạo", "EMBEDDINGS_NOT_INITIALIZED")
+                
+                self.logger.info(f"LangChain similarity search: '{search_query[:50]}...'")
+                
+                # Tạo query embedding
+                query_vector = self._embed_query(search_query)
             
-            # Thực hiện tìm kiếm
-            search_response = self.index.query(
-                vector=query_embedding,
+            matches = self.search_by_vector(
+                query_vector,
                 top_k=k,
-                include_metadata=True,
-                include_values=False,
-                namespace=namespace,
-                filter=search_filter
+                score_threshold=score_threshold,
+                metadata_filter=search_filter,
+                namespace=namespace
             )
             
-            # Xử lý kết quả - chỉ trả về content
-            results = []
-            for match in search_response.matches:
-                if match.score >= score_threshold:
-                    metadata = match.metadata or {}
-                    content = metadata.get("content", "")
-                    if content:
-                        results.append(content)
-            
-            self.logger.info(f"LangChain search: Tìm thấy {len(results)} tài liệu phù hợp")
-            return results
+            return self._format_similarity_results(matches, return_documents)
             
         except Exception as e:
             error_msg = f"Lỗi LangChain similarity search: {str(e)}"
@@ -521,11 +782,76 @@ class PineconeService:
             self.logger.warning("Returning empty results for LangChain compatibility")
             return []
     
+    async def asimilarity_search(
+        self,
+        query_text: str = None,
+        query: str = None,
+        k: int = 5,
+        score_threshold: float = 0.7,
+        filter: Optional[Dict[str, Any]] = None,
+        metadata_filter: Optional[Dict[str, Any]] = None,
+        namespace: str = "",
+        query_vector: Optional[List[float]] = None,
+        return_documents: bool = False
+    ) -> List[Union[str, Dict[str, Any]]]:
+        """
+        Phiên bản async của similarity_search
+        Async variant of similarity_search
+        """
+        try:
+            search_query = query_text or query
+            search_filter = metadata_filter or filter
+            
+            if query_vector is None:
+                if not search_query:
+                    raise PineconeServiceError("Query text is required", "MISSING_QUERY")
+                if not self.embeddings:
+                    raise PineconeServiceError("Embeddings chưa được khởi tạo", "EMBEDDINGS_NOT_INITIALIZED")
+                query_vector = await self.embedding_cache.aembed_query(self.embeddings, search_query)
+            
+            matches = await self.asearch_by_vector(
+                query_vector,
+                top_k=k,
+                score_threshold=score_threshold,
+                metadata_filter=search_filter,
+                namespace=namespace
+            )
+            return self._format_similarity_results(matches, return_documents)
+            
+        except Exception as e:
+            self.logger.error(f"Lỗi LangChain similarity search: {str(e)}")
+            self.logger.warning("Returning empty results for LangChain compatibility")
+            return []
+    
+    def _format_similarity_results(
+        self,
+        matches: List[VectorSearchResult],
+        return_documents: bool
+    ) -> List[Union[str, Dict[str, Any]]]:
+        """Xử lý kết quả - mặc định chỉ trả về content"""
+        results = []
+        for match in matches:
+            if not match.content:
+                continue
+            if return_documents:
+                results.append({
+                    "id": match.id,
+                    "page_content": match.content,
+                    "metadata": match.metadata,
+                    "score": match.score
+                })
+            else:
+                results.append(match.content)
+        
+        self.logger.info(f"LangChain search: Tìm thấy {len(results)} tài liệu phù hợp")
+        return results
+    
     def search_by_metadata(
         self,
         filters: Dict[str, Any],
         top_k: int = 10,
-        namespace: str = ""
+        namespace: str = "",
+        query_vector: Optional[List[float]] = None
     ) -> List[VectorSearchResult]:
         """
         Tìm kiếm tài liệu theo metadata
@@ -535,45 +861,26 @@ class PineconeService:
             filters: Bộ lọc metadata
             top_k: Số lượng kết quả
             namespace: Namespace để tìm kiếm
+            query_vector: Vector để xếp hạng kết quả (mặc định: vector 0)
             
         Returns:
             List[VectorSearchResult]: Danh sách kết quả
         """
         try:
-            if not self.index:
-                raise PineconeServiceError("Index chưa được khởi tạo", "INDEX_NOT_INITIALIZED")
-            
             self.logger.info(f"Tìm kiếm theo metadata: {filters}")
             
-            # Tạo dummy vector (vì Pinecone yêu cầu vector cho query)
-            dummy_vector = [0.0] * self.dimension
+            # Pinecone yêu cầu vector cho query - dùng dummy vector nếu không có
+            if query_vector is None:
+                query_vector = [0.0] * self.dimension
             
-            # Thực hiện tìm kiếm với filter
-            search_response = self.index.query(
-                vector=dummy_vector,
+            results = self.search_by_vector(
+                query_vector,
                 top_k=top_k,
-                include_metadata=True,
-                include_values=False,
-                namespace=namespace,
-                filter=filters
+                score_threshold=float("-inf"),
+                metadata_filter=filters,
+                namespace=namespace
             )
             
-            # Xử lý kết quả
-            results = []
-            for match in search_response.matches:
-                metadata = match.metadata or {}
-                
-                result = VectorSearchResult(
-                    id=match.id,
-                    score=match.score,
-                    metadata=metadata,
-                    content=metadata.get("content", ""),
-                    legal_domain=metadata.get("legal_domain"),
-                    article_number=metadata.get("article_number"),
-                    citation=self._build_citation(metadata)
-                )
-                results.append(result)
-            
             self.logger.info(f"Tìm thấy {len(results)} kết quả theo metadata")
             return results
             
@@ -582,6 +889,22 @@ class PineconeService:
             self.logger.error(error_msg)
             raise PineconeServiceError(error_msg, "METADATA_SEARCH_ERROR")
     
+    def _match_to_result(self, match: Any) -> VectorSearchResult:
+        """
+        Chuyển Pinecone match thành VectorSearchResult
+        Convert a Pinecone match into a VectorSearchResult
+        """
+        metadata = match.metadata or {}
+        return VectorSearchResult(
+            id=match.id,
+            score=match.score,
+            metadata=metadata,
+            content=metadata.get("content", ""),
+            legal_domain=metadata.get("legal_domain"),
+            article_number=metadata.get("article_number"),
+            citation=self._build_citation(metadata)
+        )
+    
     def delete_documents(self, document_ids: List[str], namespace: str = "") -> bool:
         """
         Xóa tài liệu theo ID
@@ -606,6 +929,7 @@ class PineconeService:
             
             # Xóa documents khỏi Pinecone
             self.index.delete(ids=document_ids, namespace=namespace)
+            self._notify_write(None)
             
             self.logger.info(f"Đã xóa thành công {len(document_ids)} tài liệu")
             return True
@@ -635,6 +959,8 @@ class PineconeService:
             
             # Xóa theo filter
             self.index.delete(filter=filter_dict, namespace=namespace)
+            domain = filter_dict.get("legal_domain")
+            self._notify_write([domain] if isinstance(domain, str) else None)
             
             self.logger.info("Đã xóa tài liệu theo filter thành công")
             return True
@@ -684,6 +1010,20 @@ class PineconeService:
             self.logger.error(error_msg)
             raise PineconeServiceError(error_msg, "STATS_ERROR")
     
+    def _embed_query(self, text: str) -> List[float]:
+        """
+        Tạo embedding cho văn bản thông qua cache
+        Embed text through the shared embedding cache
+        """
+        return self.embedding_cache.embed_query(self.embeddings, text)
+    
+    def get_embedding_cache_stats(self) -> Dict[str, Any]:
+        """
+        Lấy thống kê embedding cache
+        Get embedding cache statistics
+        """
+        return self.embedding_cache.get_stats()
+    
     def _validate_legal_domain(self, domain: str) -> bool:
         """
         Validate legal domain
@@ -755,7 +1095,7 @@ class PineconeService:
         """
         try:
             status = {
-                "service": "PineconeService",
+                "service": self.__class__.__name__,
                 "status": "healthy",
                 "timestamp": datetime.now().isoformat(),
                 "index_name": self.index_name,
@@ -773,11 +1113,13 @@ class PineconeService:
             if self.embeddings:
                 status["embeddings_ready"] = True
             
+            status["embedding_cache"] = self.get_embedding_cache_stats()
+            
             return status
             
         except Exception as e:
             return {
-                "service": "PineconeService",
+                "service": self.__class__.__name__,
                 "status": "unhealthy",
                 "error": str(e),
                 "timestamp": datetime.now().isoformat()
@@ -1169,20 +1511,32 @@ class PineconeServiceFactory:
     @staticmethod
     def create_from_settings(settings: DemoSettings) -> PineconeService:
         """
-        Tạo PineconeService từ DemoSettings object
-        Create PineconeService from DemoSettings object
+        Tạo vector store từ DemoSettings object
+        Create the configured vector store backend from a DemoSettings object
         
         Args:
             settings: DemoSettings object chứa cấu hình
             
         Returns:
-            PineconeService: Instance đã được cấu hình
+            PineconeService: Instance đã được cấu hình (PineconeService hoặc LocalVectorStore)
         """
+        backend = getattr(settings, "vector_store_backend", "pinecone")
+        dimension = getattr(settings, "pinecone_dimension", 1536)
+        
+        if backend == "local":
+            from .local_vector_store import LocalVectorStore
+            return LocalVectorStore(
+                dimension=dimension,
+                openai_api_key=settings.openai_embedding_api_key,
+                persist_path=getattr(settings, "local_vector_store_path", None),
+                index_type=getattr(settings, "local_vector_index_type", "flat")
+            )
+        
         return PineconeService(
             api_key=settings.pinecone_api_key,
             environment=settings.pinecone_environment,
             index_name=settings.pinecone_index_name,
-            dimension=settings.pinecone_dimension,
+            dimension=dimension,
             openai_api_key=settings.openai_embedding_api_key
         )
     
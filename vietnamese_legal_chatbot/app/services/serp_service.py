@@ -3,19 +3,68 @@ SerpAPI Service for Vietnamese Legal Documents Search
 Dịch vụ SerpAPI để tìm kiếm tài liệu pháp lý Việt Nam
 """
 
+import time
 import logging
-from typing import List, Dict, Optional, Any
-from serpapi import GoogleSearch
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import List, Dict, Optional, Any, Tuple
 import traceback
 
+import requests
+
+try:
+    from app.utils.client_registry import get_client_registry
+    from app.utils.circuit_breaker import CircuitBreaker
+    from app.utils.single_flight import normalize_question
+except ImportError:
+    from utils.client_registry import get_client_registry
+    from utils.circuit_breaker import CircuitBreaker
+    from utils.single_flight import normalize_question
+
 logger = logging.getLogger(__name__)
 
+SERPAPI_BASE_URL = "https://serpapi.com"
+
 class SerpAPIService:
     """Service for searching Vietnamese legal documents using SerpAPI"""
     
-    def __init__(self, api_key: str):
-        """Initialize SerpAPI service"""
+    def __init__(
+        self,
+        api_key: str,
+        session: Optional[requests.Session] = None,
+        base_url: str = SERPAPI_BASE_URL,
+        timeout: float = 10.0,
+        deadline: float = 6.0,
+        cache_ttl: float = 3600.0,
+        cache_size: int = 256,
+        circuit_breaker: Optional[CircuitBreaker] = None
+    ):
+        """
+        Initialize SerpAPI service
+        
+        Args:
+            api_key: SerpAPI key
+            session: HTTP session (mặc định dùng session keep-alive chung của process)
+            base_url: SerpAPI endpoint
+            timeout: Timeout mỗi request (giây)
+            deadline: Thời hạn chung cho toàn bộ các truy vấn song song (giây)
+            cache_ttl: Thời gian lưu kết quả theo câu hỏi (giây, 0 để tắt)
+            cache_size: Số câu hỏi tối đa trong cache
+            circuit_breaker: Bộ ngắt mạch khi SerpAPI chậm hoặc lỗi
+        """
         self.api_key = api_key
+        self.session = session or get_client_registry().requests_session()
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.deadline = deadline
+        self.circuit_breaker = circuit_breaker or CircuitBreaker("serpapi")
+        
+        self.cache_ttl = cache_ttl
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[Tuple[str, int], Tuple[float, List[Dict]]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=5, thread_name_prefix="serpapi")
         self.is_available = bool(api_key and api_key != "demo-serp-key")
         
         if self.is_available:
@@ -27,6 +76,9 @@ class SerpAPIService:
         """
         Search for Vietnamese legal documents using SerpAPI
         
+        Query variants are issued concurrently and collected until the overall deadline;
+        results are deduplicated by URL and cached per question.
+        
         Args:
             question: Legal question to search for
             max_results: Maximum number of results to return
@@ -38,72 +90,135 @@ class SerpAPIService:
             logger.info("SerpAPI not available, returning empty results")
             return []
         
+        cache_key = (normalize_question(question), max_results)
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            logger.info(f"SerpAPI cache hit for: {question}")
+            return [dict(doc) for doc in cached]
+        
+        if not self.circuit_breaker.allow():
+            logger.warning("SerpAPI circuit open - skipping web search fallback")
+            return []
+        
         try:
-            legal_docs = []
-            
-            # Construct search queries for Vietnamese legal documents
-            search_queries = [
-                f'"{question}" thư viện pháp luật việt nam',
-                f'"{question}" luật việt nam filetype:pdf',
-                f'"{question}" bộ luật dân sự việt nam',
-                f'"{question}" site:thuvienphapluat.vn',
-                f'{question} pháp luật việt nam'
-            ]
+            search_queries = self._build_search_queries(question)
+            logger.info(f"🔍 SerpAPI: Searching with {len(search_queries)} concurrent queries for: {question}")
             
-            logger.info(f"🔍 SerpAPI: Searching with {len(search_queries)} queries for: {question}")
+            futures = [self._executor.submit(self._google_search, query) for query in search_queries]
+            done, pending = wait(futures, timeout=self.deadline)
+            for future in pending:
+                future.cancel()
             
-            for i, query in enumerate(search_queries):
+            legal_docs = []
+            seen_urls = set()
+            succeeded = 0
+            # Collect in query order so the most specific variants come first
+            for i, (query, future) in enumerate(zip(search_queries, futures)):
+                if future not in done:
+                    logger.warning(f"⚠️ SerpAPI query {i+1} missed the {self.deadline}s deadline")
+                    continue
                 try:
-                    logger.info(f"🔍 SerpAPI Query {i+1}: {query}")
-                    
-                    search = GoogleSearch({
-                        "q": query,
-                        "location": "Vietnam",
-                        "hl": "vi",
-                        "gl": "vn",
-                        "api_key": self.api_key,
-                        "num": 3
-                    })
-                    
-                    results = search.get_dict()
-                    organic_results = results.get('organic_results', [])
-                    logger.info(f"📊 SerpAPI Query {i+1} results: {len(organic_results)} items")
-                    
-                    if organic_results:
-                        for result in organic_results[:2]:  # Limit to 2 per query
-                            legal_doc = {
-                                'id': f"serp_{result.get('position', 0)}_{len(legal_docs)}",
-                                'title': result.get('title', 'Tài liệu pháp lý'),
-                                'content': self._format_serp_content(result, question),
-                                'law_type': 'tim_kiem',
-                                'article': 'Kết quả tìm kiếm',
-                                'authority': 'SerpAPI',
-                                'source': result.get('link', ''),
-                                'snippet': result.get('snippet', ''),
-                                'url': result.get('link', ''),
-                                'relevance_score': 0.8,  # Default relevance for SerpAPI results
-                                'search_query': query
-                            }
-                            legal_docs.append(legal_doc)
-                            
-                            if len(legal_docs) >= max_results:
-                                break
-                                
+                    results = future.result()
                 except Exception as search_error:
                     logger.error(f"⚠️ SerpAPI search error for query '{query}': {str(search_error)}")
                     continue
-                    
-                if len(legal_docs) >= max_results:
-                    break
-                    
+                succeeded += 1
+                
+                organic_results = results.get('organic_results', [])
+                logger.info(f"📊 SerpAPI Query {i+1} results: {len(organic_results)} items")
+                for result in organic_results[:2]:  # Limit to 2 per query
+                    url = result.get('link', '')
+                    if url and url in seen_urls:
+                        continue
+                    seen_urls.add(url)
+                    legal_docs.append(self._to_legal_doc(result, question, query, len(legal_docs)))
+            
+            # Slow (deadline missed) or failing upstream counts against the circuit
+            if succeeded and not pending:
+                self.circuit_breaker.record_success()
+            else:
+                self.circuit_breaker.record_failure()
+            
+            legal_docs = legal_docs[:max_results]
+            if succeeded:
+                self._cache_put(cache_key, legal_docs)
             logger.info(f"✅ SerpAPI search completed: {len(legal_docs)} documents found")
-            return legal_docs[:max_results]
+            return legal_docs
             
         except Exception as e:
+            self.circuit_breaker.record_failure()
             logger.error(f"❌ SerpAPI service error: {str(e)}")
             logger.error(traceback.format_exc())
             return []
     
+    @staticmethod
+    def _build_search_queries(question: str) -> List[str]:
+        """Construct search queries for Vietnamese legal documents"""
+        return [
+            f'"{question}" thư viện pháp luật việt nam',
+            f'"{question}" luật việt nam filetype:pdf',
+            f'"{question}" bộ luật dân sự việt nam',
+            f'"{question}" site:thuvienphapluat.vn',
+            f'{question} pháp luật việt nam'
+        ]
+    
+    def _to_legal_doc(self, result: Dict, question: str, query: str, index: int) -> Dict[str, Any]:
+        """Convert one organic result into a legal document"""
+        return {
+            'id': f"serp_{result.get('position', 0)}_{index}",
+            'title': result.get('title', 'Tài liệu pháp lý'),
+            'content': self._format_serp_content(result, question),
+            'law_type': 'tim_kiem',
+            'article': 'Kết quả tìm kiếm',
+            'authority': 'SerpAPI',
+            'source': result.get('link', ''),
+            'snippet': result.get('snippet', ''),
+            'url': result.get('link', ''),
+            'relevance_score': 0.8,  # Default relevance for SerpAPI results
+            'search_query': query
+        }
+    
+    def _cache_get(self, key: Tuple[str, int]) -> Optional[List[Dict]]:
+        with self._cache_lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                return None
+            expires_at, documents = entry
+            if expires_at <= time.monotonic():
+                del self._cache[key]
+                return None
+            self._cache.move_to_end(key)
+            return documents
+    
+    def _cache_put(self, key: Tuple[str, int], documents: List[Dict]) -> None:
+        if self.cache_ttl <= 0:
+            return
+        with self._cache_lock:
+            self._cache[key] = (time.monotonic() + self.cache_ttl, [dict(doc) for doc in documents])
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+    
+    def _google_search(self, query: str) -> Dict[str, Any]:
+        """Gọi SerpAPI Google engine qua session dùng chung (thay cho GoogleSearch tạo kết nối mới mỗi lần)"""
+        response = self.session.get(
+            f"{self.base_url}/search.json",
+            params={
+                "engine": "google",
+                "q": query,
+                "location": "Vietnam",
+                "hl": "vi",
+                "gl": "vn",
+                "api_key": self.api_key,
+                "num": 3,
+                "output": "json"
+            },
+            # Không chờ lâu hơn thời hạn chung: luồng bị trễ được giải phóng sớm
+            timeout=min(self.timeout, self.deadline)
+        )
+        response.raise_for_status()
+        return response.json()
+    
     def _format_serp_content(self, result: Dict, question: str) -> str:
         """Format SerpAPI result into legal document content"""
         return f"""🔍 **Kết quả tìm kiếm tự động**
@@ -332,7 +332,7 @@ def get_ai_response(question: str) -> Dict:
         }
         
         with st.spinner("🔍 Đang tìm kiếm trong cơ sở dữ liệu pháp luật..."):
-            response = requests.post(
+            response = get_http_session().post(
                 f"{backend_url}/api/legal-query",
                 json=payload,
                 timeout=30,
@@ -369,21 +369,31 @@ def get_ai_response(question: str) -> Dict:
         st.error(f"❌ Lỗi xử lý: {str(e)}")
         return get_fallback_response(question)
 
+@st.cache_resource
+def get_http_session() -> requests.Session:
+    """Session HTTP dùng chung (keep-alive) cho các lời gọi backend"""
+    try:
+        from app.utils.client_registry import get_client_registry
+        return get_client_registry().requests_session()
+    except ImportError:
+        return requests.Session()
+
+@st.cache_resource
+def get_pinecone_service():
+    """Vector store dùng chung giữa các câu hỏi thay vì tạo mới mỗi lần (theo VECTOR_STORE_BACKEND)"""
+    from app.services.pinecone_service import PineconeServiceFactory
+    from app.utils.demo_config import get_demo_config
+    
+    return PineconeServiceFactory.create_from_settings(get_demo_config())
+
 def get_direct_search_response(question: str) -> Dict:
     """Direct search using Pinecone when backend is unavailable"""
     try:
         # Import services
-        from app.services.pinecone_service import PineconeService
         from app.models.legal_rag import LegalRAG
-        from app.utils.demo_config import get_demo_config
         
-        # Initialize services with config
-        config = get_demo_config()
-        pinecone_service = PineconeService(
-            api_key=config.pinecone_api_key,
-            environment=config.pinecone_environment,
-            index_name=config.pinecone_index_name
-        )
+        # Reuse the cached service (and its warm connections)
+        pinecone_service = get_pinecone_service()
         rag_system = LegalRAG()
         
         with st.spinner("🔍 Đang tìm kiếm trực tiếp trong Pinecone..."):
@@ -426,7 +436,7 @@ def search_and_insert_to_pinecone(question: str, pinecone_service) -> Dict:
     try:
         with st.spinner("🔍 Đang tìm kiếm thông tin pháp lý từ backend..."):
             # Call backend API which will handle both vector search and SerpAPI fallback
-            response = requests.post(
+            response = get_http_session().post(
                 f"{BACKEND_URL}/api/legal-query",
                 json={
                     "question": f"Tìm kiếm và thêm tài liệu pháp lý về: {question}",
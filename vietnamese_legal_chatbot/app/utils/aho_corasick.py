@@ -0,0 +1,170 @@
+"""
+Aho-Corasick Keyword Matcher for Vietnamese Legal AI Chatbot
+Bộ so khớp nhiều từ khóa Aho-Corasick cho Chatbot AI Pháp lý Việt Nam
+
+One automaton over every keyword vocabulary (legal terms, domain keywords, intents,
+procedures, prohibited phrases...) finds all occurrences in a single pass over the text,
+instead of one substring scan per keyword.
+Quét văn bản một lần để tìm mọi từ khóa của mọi nhóm, mỗi kết quả gắn nhóm và nhãn.
+"""
+
+import logging
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class KeywordMatch:
+    """Một lần xuất hiện của từ khóa (vị trí trong văn bản đã chuyển chữ thường)"""
+    keyword: str
+    category: str
+    label: Optional[str]
+    start: int
+    end: int
+
+
+@dataclass(frozen=True)
+class _Entry:
+    keyword: str
+    category: str
+    label: Optional[str]
+    whole_word: bool
+
+
+class KeywordHits:
+    """
+    Kết quả quét một văn bản, tra cứu theo nhóm và nhãn
+    All keyword matches of one scan, indexed by category and label
+    """
+
+    def __init__(self, matches: List[KeywordMatch]):
+        self.matches = matches
+        self._keywords: Dict[Tuple[str, Optional[str]], Set[str]] = {}
+        for match in matches:
+            self._keywords.setdefault((match.category, match.label), set()).add(match.keyword)
+
+    def keywords(self, category: str, label: Optional[str] = None) -> Set[str]:
+        """Các từ khóa khác nhau đã gặp của (nhóm, nhãn)"""
+        return self._keywords.get((category, label), set())
+
+    def has(self, category: str, label: Optional[str] = None) -> bool:
+        return (category, label) in self._keywords
+
+    def count(self, category: str, label: Optional[str] = None) -> int:
+        """Số từ khóa khác nhau đã gặp (tương đương đếm `keyword in text`)"""
+        return len(self.keywords(category, label))
+
+    def labels(self, category: str) -> Set[Optional[str]]:
+        return {label for cat, label in self._keywords if cat == category}
+
+    def of(self, category: str) -> List[KeywordMatch]:
+        """Mọi lần xuất hiện thuộc nhóm, theo vị trí"""
+        return [match for match in self.matches if match.category == category]
+
+
+class AhoCorasickMatcher:
+    """
+    Automaton Aho-Corasick không phân biệt hoa thường
+    Case-insensitive Aho-Corasick automaton; failure links are folded into a full
+    transition table at build time so scanning is one dict lookup per character
+    """
+
+    def __init__(self):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._outputs: List[Tuple[int, ...]] = [()]
+        self._pending: List[List[int]] = [[]]
+        self._entries: List[_Entry] = []
+        self._built = False
+
+    def add(self, keyword: str, category: str, label: Optional[str] = None, whole_word: bool = False) -> None:
+        """Thêm từ khóa (whole_word: chỉ khớp khi không nằm giữa một từ, như \\b)"""
+        if self._built:
+            raise RuntimeError("Cannot add keywords after build()")
+        keyword = keyword.lower()
+        if not keyword:
+            return
+        state = 0
+        for char in keyword:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._pending.append([])
+            state = next_state
+        self._pending[state].append(len(self._entries))
+        self._entries.append(_Entry(keyword, category, label, whole_word))
+
+    def add_vocabulary(
+        self,
+        category: str,
+        vocabulary: Mapping[Optional[str], Iterable[str]],
+        whole_word: bool = False
+    ) -> None:
+        """Thêm một bộ từ vựng {nhãn: [từ khóa]}"""
+        for label, keywords in vocabulary.items():
+            for keyword in keywords:
+                self.add(keyword, category, label, whole_word)
+
+    def build(self) -> "AhoCorasickMatcher":
+        """Tính liên kết thất bại (BFS) và gộp vào bảng chuyển trạng thái"""
+        fail = [0] * len(self._goto)
+        outputs: List[List[int]] = [list(entries) for entries in self._pending]
+        order = deque(self._goto[0].values())
+        while order:
+            state = order.popleft()
+            for char, child in self._goto[state].items():
+                order.append(child)
+                fallback = fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = fail[fallback]
+                fail[child] = self._goto[fallback].get(char, 0) if state else 0
+                if fail[child] == child:
+                    fail[child] = 0
+                outputs[child].extend(outputs[fail[child]])
+
+        # Fold failure transitions into each state's table (children first, then inherited)
+        order = deque(self._goto[0].values())
+        while order:
+            state = order.popleft()
+            order.extend(self._goto[state].values())
+            inherited = self._goto[fail[state]]
+            for char, target in inherited.items():
+                self._goto[state].setdefault(char, target)
+
+        self._outputs = [tuple(entries) for entries in outputs]
+        self._pending = []
+        self._built = True
+        logger.debug(f"Aho-Corasick automaton built: {len(self._entries)} keywords, {len(self._goto)} states")
+        return self
+
+    def iter_matches(self, text: str) -> Iterator[KeywordMatch]:
+        """Mọi lần xuất hiện (kể cả chồng lấn), theo vị trí kết thúc"""
+        if not self._built:
+            self.build()
+        text = text.lower()
+        goto, outputs, entries = self._goto, self._outputs, self._entries
+        state = 0
+        for index, char in enumerate(text):
+            state = goto[state].get(char, 0)
+            if outputs[state]:
+                end = index + 1
+                for entry_index in outputs[state]:
+                    entry = entries[entry_index]
+                    start = end - len(entry.keyword)
+                    if entry.whole_word and not _is_whole_word(text, start, end):
+                        continue
+                    yield KeywordMatch(entry.keyword, entry.category, entry.label, start, end)
+
+    def scan(self, text: str) -> KeywordHits:
+        """Quét văn bản một lần"""
+        return KeywordHits(list(self.iter_matches(text)))
+
+
+def _is_whole_word(text: str, start: int, end: int) -> bool:
+    before = text[start - 1] if start > 0 else " "
+    after = text[end] if end < len(text) else " "
+    return not (before.isalnum() or before == "_") and not (after.isalnum() or after == "_")
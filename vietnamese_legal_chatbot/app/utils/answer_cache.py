@@ -0,0 +1,211 @@
+"""
+Semantic Answer Cache for Vietnamese Legal AI Chatbot
+Bộ nhớ đệm câu trả lời theo ngữ nghĩa cho Chatbot AI Pháp lý Việt Nam
+
+Caches full query results keyed by the query embedding within a (legal_domain, query_type, scope)
+partition. A lookup hits when a stored query's cosine similarity exceeds the threshold. The scope
+holds exact keys the embedding cannot tell apart, such as the cited articles.
+Lưu kết quả truy vấn theo embedding câu hỏi; câu hỏi gần giống nhau dùng lại câu trả lời.
+"""
+
+import os
+import time
+import threading
+import logging
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# (legal_domain, query_type, scope)
+Partition = Tuple[str, Hashable, Hashable]
+
+
+class _PartitionEntries:
+    """Vector matrix of one partition, rebuilt lazily after changes"""
+
+    def __init__(self):
+        self.entries: Dict[int, Tuple[np.ndarray, Any, float]] = {}
+        self._ids: Optional[np.ndarray] = None
+        self._matrix: Optional[np.ndarray] = None
+
+    def add(self, entry_id: int, vector: np.ndarray, value: Any, expires_at: float) -> None:
+        self.entries[entry_id] = (vector, value, expires_at)
+        self._matrix = None
+
+    def remove(self, entry_id: int) -> None:
+        if self.entries.pop(entry_id, None) is not None:
+            self._matrix = None
+
+    def best_match(self, vector: np.ndarray) -> Tuple[Optional[int], float]:
+        if not self.entries:
+            return None, 0.0
+        if self._matrix is None:
+            self._ids = np.fromiter(self.entries.keys(), dtype=np.int64, count=len(self.entries))
+            self._matrix = np.stack([entry[0] for entry in self.entries.values()])
+        similarities = self._matrix @ vector
+        best = int(np.argmax(similarities))
+        return int(self._ids[best]), float(similarities[best])
+
+
+class SemanticAnswerCache:
+    """
+    Bộ nhớ đệm câu trả lời theo độ tương đồng cosine, có TTL và LRU
+    Semantic answer cache with cosine-similarity lookup, TTL and LRU eviction
+    """
+
+    def __init__(
+        self,
+        similarity_threshold: float = 0.95,
+        ttl_seconds: float = 3600.0,
+        max_entries: int = 1000,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Args:
+            similarity_threshold: Ngưỡng cosine để coi là cùng câu hỏi
+            ttl_seconds: Thời gian sống của một câu trả lời
+            max_entries: Số câu trả lời tối đa (LRU)
+            clock: Nguồn thời gian (thay thế được khi test)
+        """
+        self.similarity_threshold = similarity_threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._clock = clock
+
+        self._partitions: Dict[Partition, _PartitionEntries] = {}
+        self._lru: "OrderedDict[int, Partition]" = OrderedDict()
+        self._next_id = 0
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+
+    @staticmethod
+    def _normalize(vector: Sequence[float]) -> Optional[np.ndarray]:
+        array = np.asarray(vector, dtype=np.float32).ravel()
+        norm = float(np.linalg.norm(array))
+        if not np.isfinite(norm) or norm == 0.0:
+            return None
+        return array / norm
+
+    def get(
+        self,
+        query_vector: Sequence[float],
+        legal_domain: str,
+        query_type: Hashable,
+        scope: Hashable = ()
+    ) -> Optional[Any]:
+        """
+        Tìm câu trả lời đã lưu cho câu hỏi tương tự
+        Return the cached value of the most similar stored query, if above the threshold.
+        Only entries stored with an equal scope (e.g. the same cited articles) can match.
+        """
+        vector = self._normalize(query_vector)
+        if vector is None:
+            return None
+
+        with self._lock:
+            partition = self._partitions.get((legal_domain, query_type, scope))
+            entry_id, similarity = partition.best_match(vector) if partition else (None, 0.0)
+            if entry_id is None or similarity < self.similarity_threshold:
+                self._stats["misses"] += 1
+                return None
+
+            _, value, expires_at = partition.entries[entry_id]
+            if expires_at <= self._clock():
+                self._remove(entry_id)
+                self._stats["misses"] += 1
+                return None
+
+            self._lru.move_to_end(entry_id)
+            self._stats["hits"] += 1
+            return value
+
+    def put(
+        self,
+        query_vector: Sequence[float],
+        legal_domain: str,
+        query_type: Hashable,
+        value: Any,
+        scope: Hashable = ()
+    ) -> None:
+        """Lưu câu trả lời cho câu hỏi"""
+        vector = self._normalize(query_vector)
+        if vector is None:
+            return
+
+        with self._lock:
+            key = (legal_domain, query_type, scope)
+            partition = self._partitions.setdefault(key, _PartitionEntries())
+
+            # Replace a near-duplicate instead of storing both
+            entry_id, similarity = partition.best_match(vector)
+            if entry_id is not None and similarity >= self.similarity_threshold:
+                self._remove(entry_id)
+                partition = self._partitions.setdefault(key, _PartitionEntries())
+
+            entry_id = self._next_id
+            self._next_id += 1
+            partition.add(entry_id, vector, value, self._clock() + self.ttl_seconds)
+            self._lru[entry_id] = key
+
+            while len(self._lru) > self.max_entries:
+                oldest = next(iter(self._lru))
+                self._remove(oldest)
+                self._stats["evictions"] += 1
+
+    def invalidate_domain(self, legal_domain: str) -> int:
+        """
+        Xóa mọi câu trả lời của một lĩnh vực (khi tài liệu thay đổi)
+        Drop every cached answer in a legal domain
+        """
+        with self._lock:
+            entry_ids = [entry_id for entry_id, key in self._lru.items() if key[0] == legal_domain]
+            for entry_id in entry_ids:
+                self._remove(entry_id)
+            self._stats["invalidations"] += len(entry_ids)
+            return len(entry_ids)
+
+    def clear(self) -> None:
+        """Xóa toàn bộ bộ nhớ đệm"""
+        with self._lock:
+            self._stats["invalidations"] += len(self._lru)
+            self._partitions.clear()
+            self._lru.clear()
+
+    def _remove(self, entry_id: int) -> None:
+        key = self._lru.pop(entry_id, None)
+        if key is None:
+            return
+        partition = self._partitions[key]
+        partition.remove(entry_id)
+        if not partition.entries:
+            del self._partitions[key]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Thống kê hit/miss của bộ nhớ đệm"""
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return {
+                **self._stats,
+                "entries": len(self._lru),
+                "hit_rate": self._stats["hits"] / lookups if lookups else 0.0
+            }
+
+    def __len__(self) -> int:
+        return len(self._lru)
+
+
+def create_answer_cache_from_env() -> Optional[SemanticAnswerCache]:
+    """
+    Tạo answer cache theo cấu hình môi trường (ENABLE_RESPONSE_CACHE, CACHE_TTL_SECONDS,
+    ANSWER_CACHE_SIZE, ANSWER_CACHE_SIMILARITY); trả về None khi bị tắt
+    """
+    if os.getenv("ENABLE_RESPONSE_CACHE", "false").lower() not in ("1", "true", "yes"):
+        return None
+    return SemanticAnswerCache(
+        similarity_threshold=float(os.getenv("ANSWER_CACHE_SIMILARITY", "0.95")),
+        ttl_seconds=float(os.getenv("CACHE_TTL_SECONDS", "300")),
+        max_entries=int(os.getenv("ANSWER_CACHE_SIZE", "1000"))
+    )
@@ -0,0 +1,102 @@
+"""
+Circuit Breaker for Vietnamese Legal AI Chatbot
+Bộ ngắt mạch cho Chatbot AI Pháp lý Việt Nam
+
+Skips calls to an upstream that keeps failing or timing out: after `failure_threshold`
+consecutive failures the circuit opens for `reset_timeout` seconds, then a single trial
+call (half-open) decides whether it closes again.
+Tạm ngừng gọi dịch vụ bên ngoài khi dịch vụ liên tục lỗi hoặc chậm.
+"""
+
+import time
+import threading
+import logging
+from typing import Any, Callable, Dict
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Bộ ngắt mạch đếm lỗi liên tiếp
+    Consecutive-failure circuit breaker (closed -> open -> half-open -> closed)
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 3,
+        reset_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Args:
+            name: Tên upstream (dùng cho log)
+            failure_threshold: Số lỗi liên tiếp để mở mạch
+            reset_timeout: Thời gian mở mạch trước khi thử lại (giây)
+            clock: Nguồn thời gian (thay thế được khi test)
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+        self._stats = {"allowed": 0, "rejected": 0, "failures": 0, "opened": 0}
+
+    @property
+    def state(self) -> str:
+        """Trạng thái hiện tại (open chuyển sang half_open khi hết reset_timeout)"""
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        if self._state == OPEN and self._clock() - self._opened_at >= self.reset_timeout:
+            self._state = HALF_OPEN
+            self._trial_in_flight = False
+        return self._state
+
+    def allow(self) -> bool:
+        """Cho phép gọi upstream hay không (half-open chỉ cho một lời gọi thử)"""
+        with self._lock:
+            state = self._current_state()
+            allowed = state == CLOSED or (state == HALF_OPEN and not self._trial_in_flight)
+            if state == HALF_OPEN and allowed:
+                self._trial_in_flight = True
+            self._stats["allowed" if allowed else "rejected"] += 1
+            return allowed
+
+    def record_success(self) -> None:
+        """Ghi nhận lời gọi thành công: đóng mạch"""
+        with self._lock:
+            if self._state != CLOSED:
+                logger.info(f"Circuit '{self.name}' closed")
+            self._state = CLOSED
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        """Ghi nhận lỗi hoặc quá hạn: mở mạch khi đủ ngưỡng (hoặc khi lời gọi thử thất bại)"""
+        with self._lock:
+            self._stats["failures"] += 1
+            self._failures += 1
+            state = self._current_state()
+            if state == HALF_OPEN or (state == CLOSED and self._failures >= self.failure_threshold):
+                self._state = OPEN
+                self._opened_at = self._clock()
+                self._trial_in_flight = False
+                self._stats["opened"] += 1
+                logger.warning(f"Circuit '{self.name}' opened after {self._failures} consecutive failures")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Thống kê của bộ ngắt mạch"""
+        with self._lock:
+            return {**self._stats, "state": self._current_state(), "consecutive_failures": self._failures}
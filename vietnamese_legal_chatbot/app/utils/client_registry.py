@@ -0,0 +1,200 @@
+"""
+Client Registry for Vietnamese Legal AI Chatbot
+Quản lý client dùng chung cho Chatbot AI Pháp lý Việt Nam
+
+Process-wide registry of pooled HTTP clients (OpenAI, Pinecone, SerpAPI) so every service
+reuses warm keep-alive connections instead of paying a TLS handshake per request.
+Các dịch vụ dùng chung connection pool (keep-alive, HTTP/2 khi có h2) thay vì tạo client mới.
+"""
+
+import os
+import threading
+import logging
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, Optional
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    import h2  # noqa: F401 - HTTP/2 support for httpx
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+try:
+    from openai import OpenAI, AsyncOpenAI
+    OPENAI_AVAILABLE = True
+except ImportError:
+    OPENAI_AVAILABLE = False
+
+try:
+    from pinecone import Pinecone
+    PINECONE_AVAILABLE = True
+except ImportError:
+    PINECONE_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+ASYNC_CLIENT_KINDS = ("httpx_async", "openai_async")
+
+
+@dataclass(frozen=True)
+class PoolSettings:
+    """Cấu hình connection pool và timeout"""
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 30.0
+    connect_timeout: float = 5.0
+    read_timeout: float = 60.0
+    pool_timeout: float = 10.0
+    http2: bool = HTTP2_AVAILABLE
+
+    @classmethod
+    def from_env(cls) -> "PoolSettings":
+        """Đọc cấu hình từ HTTP_MAX_CONNECTIONS, HTTP_MAX_KEEPALIVE, HTTP_KEEPALIVE_EXPIRY,
+        HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT"""
+        return cls(
+            max_connections=int(os.getenv("HTTP_MAX_CONNECTIONS", "100")),
+            max_keepalive_connections=int(os.getenv("HTTP_MAX_KEEPALIVE", "20")),
+            keepalive_expiry=float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30")),
+            connect_timeout=float(os.getenv("HTTP_CONNECT_TIMEOUT", "5")),
+            read_timeout=float(os.getenv("HTTP_READ_TIMEOUT", "60")),
+            http2=HTTP2_AVAILABLE and os.getenv("HTTP2_ENABLED", "true").lower() in ("1", "true", "yes")
+        )
+
+    @property
+    def limits(self) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry
+        )
+
+    @property
+    def timeout(self) -> httpx.Timeout:
+        return httpx.Timeout(
+            self.read_timeout,
+            connect=self.connect_timeout,
+            pool=self.pool_timeout
+        )
+
+
+class ClientRegistry:
+    """
+    Registry client dùng chung trong process
+    Process-wide registry of pooled API clients, created lazily and reused by all services
+    """
+
+    def __init__(self, settings: Optional[PoolSettings] = None):
+        self.settings = settings or PoolSettings.from_env()
+        self._clients: Dict[Hashable, Any] = {}
+        self._lock = threading.RLock()
+
+    def _get_or_create(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        client = self._clients.get(key)
+        if client is None:
+            with self._lock:
+                client = self._clients.get(key)
+                if client is None:
+                    client = self._clients[key] = factory()
+                    logger.info(f"Created shared client: {key[0]}")
+        return client
+
+    def http_client(self) -> httpx.Client:
+        """httpx client dùng chung (keep-alive, HTTP/2 khi có h2)"""
+        return self._get_or_create(("httpx",), lambda: httpx.Client(
+            limits=self.settings.limits,
+            timeout=self.settings.timeout,
+            http2=self.settings.http2
+        ))
+
+    def async_http_client(self) -> httpx.AsyncClient:
+        """httpx async client dùng chung"""
+        return self._get_or_create(("httpx_async",), lambda: httpx.AsyncClient(
+            limits=self.settings.limits,
+            timeout=self.settings.timeout,
+            http2=self.settings.http2
+        ))
+
+    def requests_session(self) -> requests.Session:
+        """requests.Session dùng chung (SerpAPI)"""
+        def create() -> requests.Session:
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=self.settings.max_keepalive_connections,
+                pool_maxsize=self.settings.max_connections
+            )
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            return session
+        return self._get_or_create(("requests",), create)
+
+    def openai_client(self, api_key: Optional[str], base_url: Optional[str] = None) -> "OpenAI":
+        """OpenAI client theo (api_key, base_url), dùng chung connection pool"""
+        if not OPENAI_AVAILABLE:
+            raise ImportError("openai is not installed")
+        return self._get_or_create(("openai", api_key, base_url), lambda: OpenAI(
+            api_key=api_key,
+            base_url=base_url,
+            http_client=self.http_client()
+        ))
+
+    def async_openai_client(self, api_key: Optional[str], base_url: Optional[str] = None) -> "AsyncOpenAI":
+        """AsyncOpenAI client theo (api_key, base_url), dùng chung connection pool async"""
+        if not OPENAI_AVAILABLE:
+            raise ImportError("openai is not installed")
+        return self._get_or_create(("openai_async", api_key, base_url), lambda: AsyncOpenAI(
+            api_key=api_key,
+            base_url=base_url,
+            http_client=self.async_http_client()
+        ))
+
+    def pinecone_client(self, api_key: str, client_class: Optional[Callable[..., Any]] = None) -> "Pinecone":
+        """Pinecone client theo api_key (pool_threads theo cấu hình pool)"""
+        if client_class is None:
+            if not PINECONE_AVAILABLE:
+                raise ImportError("pinecone is not installed")
+            client_class = Pinecone
+        return self._get_or_create(("pinecone", api_key, client_class), lambda: client_class(
+            api_key=api_key,
+            pool_threads=self.settings.max_keepalive_connections
+        ))
+
+    def close(self) -> None:
+        """Đóng và bỏ các client sync (client async đóng bằng aclose)"""
+        with self._lock:
+            closing = {key: client for key, client in self._clients.items() if key[0] not in ASYNC_CLIENT_KINDS}
+            for key in closing:
+                del self._clients[key]
+        for key, client in closing.items():
+            if key[0] in ("httpx", "requests"):
+                client.close()
+
+    async def aclose(self) -> None:
+        """Đóng và bỏ các client async"""
+        with self._lock:
+            closing = {key: client for key, client in self._clients.items() if key[0] in ASYNC_CLIENT_KINDS}
+            for key in closing:
+                del self._clients[key]
+        client = closing.get(("httpx_async",))
+        if client is not None:
+            await client.aclose()
+
+
+_registry: Optional[ClientRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_client_registry() -> ClientRegistry:
+    """
+    Lấy registry client dùng chung trong process
+    Get the process-wide client registry
+    """
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = ClientRegistry()
+    return _registry
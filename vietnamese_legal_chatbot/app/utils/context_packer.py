@@ -0,0 +1,213 @@
+"""
+Context Packer for Vietnamese Legal AI Chatbot
+Bộ đóng gói ngữ cảnh cho Chatbot AI Pháp lý Việt Nam
+
+Packs retrieved chunks into a per-model prompt token budget: highest-scoring chunks first,
+long chunks trimmed at sentence/clause boundaries, and the number of dropped tokens reported.
+Đóng gói tài liệu vào ngân sách token của prompt, ưu tiên tài liệu có điểm cao.
+"""
+
+import os
+import re
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+try:
+    from app.utils.token_counter import count_tokens
+except ImportError:
+    from utils.token_counter import count_tokens
+
+logger = logging.getLogger(__name__)
+
+# Cửa sổ ngữ cảnh (token) của các model chat
+MODEL_CONTEXT_WINDOWS = {
+    "gpt-4o-mini": 128000,
+    "gpt-4o": 128000,
+    "gpt-4-turbo": 128000,
+    "gpt-4.1": 1047576,
+    "gpt-4": 8192,
+    "gpt-3.5-turbo": 16385,
+}
+DEFAULT_CONTEXT_WINDOW = 8192
+
+# Giới hạn mặc định của phần tài liệu trong prompt: prefill dài làm chậm và tốn chi phí
+# ngay cả khi model có cửa sổ ngữ cảnh lớn
+DEFAULT_CONTEXT_BUDGET = 6000
+
+# Token dành cho template, câu hỏi và lịch sử hội thoại
+DEFAULT_PROMPT_RESERVE = 1500
+
+# Ranh giới câu / khoản / điểm: sau dấu kết câu, dấu chấm phẩy hoặc xuống dòng
+# (không cắt sau số thứ tự như "1." hay "Điều 35.")
+SEGMENT_BOUNDARY = re.compile(r'(?<=[^\d\s][.;:!?])\s+|\n+')
+TRUNCATION_MARKER = "[…]"
+
+
+def context_window(model: str) -> int:
+    """Cửa sổ ngữ cảnh của model (khớp theo tiền tố dài nhất)"""
+    name = (model or "").lower()
+    for prefix in sorted(MODEL_CONTEXT_WINDOWS, key=len, reverse=True):
+        if name.startswith(prefix):
+            return MODEL_CONTEXT_WINDOWS[prefix]
+    return DEFAULT_CONTEXT_WINDOW
+
+
+def prompt_token_budget(
+    model: str,
+    max_output_tokens: int = 0,
+    reserved_tokens: int = DEFAULT_PROMPT_RESERVE,
+    max_budget: int = DEFAULT_CONTEXT_BUDGET
+) -> int:
+    """
+    Ngân sách token cho tài liệu trong prompt
+    Context budget = min(max_budget, window - output - reserve)
+    """
+    available = context_window(model) - (max_output_tokens or 0) - reserved_tokens
+    return max(0, min(max_budget, available))
+
+
+@dataclass
+class PackedContext:
+    """Kết quả đóng gói: tài liệu đã chọn (có thể bị cắt) và thống kê token"""
+    documents: List[Dict[str, Any]]
+    budget: int
+    tokens_used: int = 0
+    tokens_dropped: int = 0
+    truncated_documents: int = 0
+    dropped_documents: List[Dict[str, Any]] = field(default_factory=list)
+
+
+class ContextPacker:
+    """
+    Đóng gói tài liệu vào ngân sách token
+    Greedy, score-ordered packing of document chunks into a token budget
+    """
+
+    def __init__(
+        self,
+        model: str = "gpt-4o-mini",
+        budget: Optional[int] = None,
+        min_chunk_tokens: int = 48,
+        token_counter: Optional[Callable[[str, str], int]] = None
+    ):
+        """
+        Args:
+            model: Model dùng để đếm token và tra cửa sổ ngữ cảnh
+            budget: Ngân sách token cho tài liệu (mặc định theo model)
+            min_chunk_tokens: Không đưa vào phần cắt ngắn hơn ngưỡng này
+            token_counter: Hàm đếm token (text, model) -> int
+        """
+        self.model = model
+        self.budget = budget if budget is not None else prompt_token_budget(model)
+        self.min_chunk_tokens = min_chunk_tokens
+        self._count = token_counter or count_tokens
+
+    def count(self, text: str) -> int:
+        """Đếm token của văn bản theo tokenizer của model"""
+        return self._count(text, self.model) if text else 0
+
+    def pack(
+        self,
+        documents: Sequence[Dict[str, Any]],
+        render: Optional[Callable[[Dict[str, Any]], str]] = None,
+        budget: Optional[int] = None
+    ) -> PackedContext:
+        """
+        Chọn tài liệu theo điểm giảm dần cho tới khi hết ngân sách
+
+        Args:
+            documents: Tài liệu dạng {"page_content", "metadata", "score", ...}
+            render: Hàm định dạng một tài liệu trong prompt (mặc định chỉ page_content);
+                phần ngoài page_content (tiêu đề, link) cũng được tính vào ngân sách
+            budget: Ghi đè ngân sách của packer
+
+        Returns:
+            PackedContext: Tài liệu được giữ (theo thứ tự điểm) và số token bị bỏ
+        """
+        render = render or (lambda doc: doc.get("page_content", ""))
+        budget = self.budget if budget is None else budget
+        ranked = sorted(documents, key=lambda doc: doc.get("score", 0.0) or 0.0, reverse=True)
+        packed = PackedContext(documents=[], budget=budget)
+
+        for doc in ranked:
+            remaining = budget - packed.tokens_used
+            tokens = self.count(render(doc))
+            if tokens <= remaining:
+                packed.documents.append(doc)
+                packed.tokens_used += tokens
+                continue
+
+            trimmed = self._trim(doc, render, remaining)
+            if trimmed is None:
+                packed.dropped_documents.append(doc)
+                packed.tokens_dropped += tokens
+                continue
+
+            trimmed_tokens = self.count(render(trimmed))
+            packed.documents.append(trimmed)
+            packed.tokens_used += trimmed_tokens
+            packed.tokens_dropped += max(0, tokens - trimmed_tokens)
+            packed.truncated_documents += 1
+
+        if packed.tokens_dropped:
+            logger.info(
+                f"Context packing dropped {packed.tokens_dropped} tokens "
+                f"({len(packed.dropped_documents)} documents dropped, "
+                f"{packed.truncated_documents} truncated; budget {budget})"
+            )
+        return packed
+
+    def _trim(
+        self,
+        doc: Dict[str, Any],
+        render: Callable[[Dict[str, Any]], str],
+        remaining: int
+    ) -> Optional[Dict[str, Any]]:
+        """Cắt page_content tại ranh giới câu/khoản để vừa ngân sách còn lại"""
+        overhead = self.count(render({**doc, "page_content": ""}))
+        content_budget = remaining - overhead - self.count(f" {TRUNCATION_MARKER}")
+        if content_budget < self.min_chunk_tokens:
+            return None
+
+        content = doc.get("page_content", "")
+        boundaries = [match.start() for match in SEGMENT_BOUNDARY.finditer(content)] + [len(content)]
+        # Longest prefix ending at a boundary that fits (binary search: prefix tokens grow monotonically)
+        low, high = 0, len(boundaries)
+        while low < high:
+            middle = (low + high + 1) // 2
+            if self.count(content[:boundaries[middle - 1]]) <= content_budget:
+                low = middle
+            else:
+                high = middle - 1
+
+        if low:
+            text = content[:boundaries[low - 1]].strip()
+        else:
+            # Đoạn đầu tiên quá dài: cắt theo từ
+            text = self._trim_words(content[:boundaries[0]], content_budget)
+        if not text or self.count(text) < self.min_chunk_tokens:
+            return None
+        return {**doc, "page_content": f"{text} {TRUNCATION_MARKER}", "truncated": True}
+
+    def _trim_words(self, text: str, max_tokens: int) -> str:
+        """Giữ tiền tố dài nhất (theo từ) không vượt max_tokens"""
+        words = text.split()
+        low, high = 0, len(words)
+        while low < high:
+            middle = (low + high + 1) // 2
+            if self.count(" ".join(words[:middle])) <= max_tokens:
+                low = middle
+            else:
+                high = middle - 1
+        return " ".join(words[:low])
+
+
+def create_context_packer(model: str, max_output_tokens: int = 0) -> ContextPacker:
+    """
+    Tạo packer cho model chat; CONTEXT_TOKEN_BUDGET ghi đè ngân sách mặc định
+    """
+    budget = os.getenv("CONTEXT_TOKEN_BUDGET")
+    if budget:
+        return ContextPacker(model=model, budget=int(budget))
+    return ContextPacker(model=model, budget=prompt_token_budget(model, max_output_tokens))
@@ -28,6 +28,11 @@ class DemoSettings:
     pinecone_environment: str = os.getenv("PINECONE_ENVIRONMENT", "us-east-1")
     pinecone_index_name: str = os.getenv("PINECONE_INDEX_NAME", "vietnamese-legal-docs")
     
+    # Vector Store Backend ("pinecone" hoặc "local" để chạy offline)
+    vector_store_backend: str = os.getenv("VECTOR_STORE_BACKEND", "pinecone")
+    local_vector_store_path: Optional[str] = os.getenv("LOCAL_VECTOR_STORE_PATH")
+    local_vector_index_type: str = os.getenv("LOCAL_VECTOR_INDEX_TYPE", "flat")  # flat | hnsw
+    
     # SerpAPI Configuration
     serp_api_key: str = os.getenv("SERP_API_KEY", "demo-serp-key")
     
@@ -0,0 +1,335 @@
+"""
+Embedding Cache for Vietnamese Legal AI Chatbot
+Bộ nhớ đệm Embedding cho Chatbot AI Pháp lý Việt Nam
+
+Content-addressed cache for embedding vectors, shared by the RAG system and vector store services.
+Bộ nhớ đệm theo nội dung cho vector embedding, dùng chung giữa hệ thống RAG và dịch vụ vector.
+"""
+
+import os
+import re
+import asyncio
+import inspect
+import hashlib
+import sqlite3
+import threading
+import unicodedata
+import logging
+from array import array
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# (model id, sha256 of normalized text)
+CacheKey = Tuple[str, str]
+
+
+def normalize_embedding_text(text: str) -> str:
+    """Chuẩn hóa văn bản trước khi băm (NFC + gộp khoảng trắng)"""
+    text = unicodedata.normalize('NFC', text or "")
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+def make_cache_key(model_id: str, text: str) -> CacheKey:
+    """Tạo khóa cache từ model id và hash của văn bản đã chuẩn hóa"""
+    digest = hashlib.sha256(normalize_embedding_text(text).encode('utf-8')).hexdigest()
+    return (model_id, digest)
+
+
+def get_model_id(embeddings: Any) -> str:
+    """Lấy model id từ đối tượng embeddings (LangChain hoặc tương tự)"""
+    for attr in ("model", "model_name", "deployment"):
+        value = getattr(embeddings, attr, None)
+        if isinstance(value, str) and value:
+            return value
+    # Không rõ model: chỉ chia sẻ cache trong cùng một instance
+    return f"{embeddings.__class__.__name__}:{id(embeddings)}"
+
+
+class LRUCacheTier:
+    """In-memory LRU tier for embedding vectors"""
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[CacheKey, Tuple[float, ...]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: CacheKey) -> Optional[Tuple[float, ...]]:
+        with self._lock:
+            vector = self._entries.get(key)
+            if vector is not None:
+                self._entries.move_to_end(key)
+            return vector
+
+    def put(self, key: CacheKey, vector: Tuple[float, ...]) -> None:
+        with self._lock:
+            self._entries[key] = vector
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteCacheTier:
+    """On-disk tier storing float32 vectors in a SQLite database"""
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS embeddings (
+                model_id TEXT NOT NULL,
+                text_hash TEXT NOT NULL,
+                vector BLOB NOT NULL,
+                PRIMARY KEY (model_id, text_hash)
+            )
+            """
+        )
+        self._conn.commit()
+
+    def get(self, key: CacheKey) -> Optional[Tuple[float, ...]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT vector FROM embeddings WHERE model_id = ? AND text_hash = ?",
+                key
+            ).fetchone()
+        if row is None:
+            return None
+        return tuple(array('f', row[0]))
+
+    def put(self, key: CacheKey, vector: Tuple[float, ...]) -> None:
+        blob = array('f', vector).tobytes()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO embeddings (model_id, text_hash, vector) VALUES (?, ?, ?)",
+                (key[0], key[1], blob)
+            )
+            self._conn.commit()
+
+    def put_many(self, items: Sequence[Tuple[CacheKey, Tuple[float, ...]]]) -> None:
+        """Ghi nhiều vector trong một transaction (một lần commit)"""
+        rows = [(key[0], key[1], array('f', vector).tobytes()) for key, vector in items]
+        if not rows:
+            return
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model_id, text_hash, vector) VALUES (?, ?, ?)",
+                rows
+            )
+            self._conn.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM embeddings")
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+
+class EmbeddingCache:
+    """
+    Cache embedding theo nội dung với tầng LRU trong bộ nhớ và tầng SQLite tùy chọn
+    Content-addressed embedding cache with an in-memory LRU tier and optional SQLite tier
+    """
+
+    def __init__(self, max_entries: int = 10000, disk_path: Optional[str] = None):
+        """
+        Args:
+            max_entries: Số vector tối đa giữ trong bộ nhớ
+            disk_path: Đường dẫn file SQLite cho tầng lưu trữ đĩa (tùy chọn)
+        """
+        self.memory_tier = LRUCacheTier(max_entries)
+        self.disk_tier: Optional[SQLiteCacheTier] = None
+        if disk_path:
+            try:
+                self.disk_tier = SQLiteCacheTier(disk_path)
+            except Exception as e:
+                logger.warning(f"Không thể mở embedding cache trên đĩa {disk_path}: {e}")
+
+        self._stats_lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "disk_hits": 0}
+
+    def get(self, model_id: str, text: str) -> Optional[List[float]]:
+        """Lấy vector từ cache, trả về None nếu không có"""
+        key = make_cache_key(model_id, text)
+        vector = self.memory_tier.get(key)
+
+        if vector is None and self.disk_tier is not None:
+            vector = self._disk_get(key)
+
+        self._record("hits" if vector is not None else "misses")
+        return list(vector) if vector is not None else None
+
+    async def aget(self, model_id: str, text: str) -> Optional[List[float]]:
+        """Như get(), nhưng đọc tầng SQLite trong worker thread để không chặn event loop"""
+        key = make_cache_key(model_id, text)
+        vector = self.memory_tier.get(key)
+
+        if vector is None and self.disk_tier is not None:
+            vector = await asyncio.to_thread(self._disk_get, key)
+
+        self._record("hits" if vector is not None else "misses")
+        return list(vector) if vector is not None else None
+
+    def _disk_get(self, key: CacheKey) -> Optional[Tuple[float, ...]]:
+        vector = self.disk_tier.get(key)
+        if vector is not None:
+            self.memory_tier.put(key, vector)
+            self._record("disk_hits")
+        return vector
+
+    def put(self, model_id: str, text: str, vector: Sequence[float]) -> None:
+        """Lưu vector vào cache"""
+        self.put_many(model_id, [(text, vector)])
+
+    async def aput(self, model_id: str, text: str, vector: Sequence[float]) -> None:
+        """Như put(), nhưng ghi tầng SQLite trong worker thread"""
+        items = self._store_in_memory(model_id, [(text, vector)])
+        if items and self.disk_tier is not None:
+            await asyncio.to_thread(self._disk_put_many, items)
+
+    def put_many(self, model_id: str, entries: Sequence[Tuple[str, Sequence[float]]]) -> None:
+        """Lưu nhiều vector; tầng SQLite ghi tất cả trong một transaction"""
+        items = self._store_in_memory(model_id, entries)
+        if items and self.disk_tier is not None:
+            self._disk_put_many(items)
+
+    def _store_in_memory(
+        self,
+        model_id: str,
+        entries: Sequence[Tuple[str, Sequence[float]]]
+    ) -> List[Tuple[CacheKey, Tuple[float, ...]]]:
+        items = []
+        for text, vector in entries:
+            try:
+                stored = tuple(float(value) for value in vector)
+            except TypeError:
+                logger.debug("Bỏ qua cache cho embedding không phải dãy số")
+                continue
+            key = make_cache_key(model_id, text)
+            self.memory_tier.put(key, stored)
+            items.append((key, stored))
+        return items
+
+    def _disk_put_many(self, items: Sequence[Tuple[CacheKey, Tuple[float, ...]]]) -> None:
+        try:
+            self.disk_tier.put_many(items)
+        except Exception as e:
+            logger.warning(f"Lỗi ghi embedding cache xuống đĩa: {e}")
+
+    def embed_query(self, embeddings: Any, text: str) -> List[float]:
+        """Embed một câu truy vấn qua cache"""
+        model_id = get_model_id(embeddings)
+        cached = self.get(model_id, text)
+        if cached is not None:
+            return cached
+
+        vector = embeddings.embed_query(text)
+        self.put(model_id, text, vector)
+        return vector
+
+    async def aembed_query(self, embeddings: Any, text: str) -> List[float]:
+        """
+        Embed một câu truy vấn qua cache, không chặn event loop
+        Async embed through the cache (native aembed_query when available, else a worker thread)
+        """
+        model_id = get_model_id(embeddings)
+        cached = await self.aget(model_id, text)
+        if cached is not None:
+            return cached
+
+        aembed = getattr(embeddings, "aembed_query", None)
+        if inspect.iscoroutinefunction(aembed):
+            vector = await aembed(text)
+        else:
+            vector = await asyncio.to_thread(embeddings.embed_query, text)
+        await self.aput(model_id, text, vector)
+        return vector
+
+    def embed_documents(self, embeddings: Any, texts: List[str]) -> List[List[float]]:
+        """Embed nhiều văn bản, chỉ gọi API cho các văn bản chưa có trong cache"""
+        model_id = get_model_id(embeddings)
+        results: List[Optional[List[float]]] = [None] * len(texts)
+        missing: Dict[CacheKey, List[int]] = {}
+        missing_texts: List[str] = []
+
+        for i, text in enumerate(texts):
+            cached = self.get(model_id, text)
+            if cached is not None:
+                results[i] = cached
+                continue
+            key = make_cache_key(model_id, text)
+            if key not in missing:
+                missing[key] = []
+                missing_texts.append(text)
+            missing[key].append(i)
+
+        if missing_texts:
+            vectors = embeddings.embed_documents(missing_texts)
+            self.put_many(model_id, list(zip(missing_texts, vectors)))
+            for vector, positions in zip(vectors, missing.values()):
+                for i in positions:
+                    results[i] = vector
+
+        return results
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Thống kê cache"""
+        with self._stats_lock:
+            stats = dict(self._stats)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+        stats["memory_entries"] = len(self.memory_tier)
+        stats["disk_enabled"] = self.disk_tier is not None
+        return stats
+
+    def clear(self) -> None:
+        """Xóa toàn bộ cache"""
+        self.memory_tier.clear()
+        if self.disk_tier is not None:
+            self.disk_tier.clear()
+        with self._stats_lock:
+            self._stats = {"hits": 0, "misses": 0, "disk_hits": 0}
+
+    def _record(self, counter: str) -> None:
+        with self._stats_lock:
+            self._stats[counter] += 1
+
+
+_shared_cache: Optional[EmbeddingCache] = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_shared_embedding_cache() -> EmbeddingCache:
+    """
+    Lấy cache embedding dùng chung trong process
+    Get the process-wide embedding cache (configured via EMBEDDING_CACHE_SIZE / EMBEDDING_CACHE_PATH)
+    """
+    global _shared_cache
+    if _shared_cache is None:
+        with _shared_cache_lock:
+            if _shared_cache is None:
+                _shared_cache = EmbeddingCache(
+                    max_entries=int(os.getenv("EMBEDDING_CACHE_SIZE", "10000")),
+                    disk_path=os.getenv("EMBEDDING_CACHE_PATH") or None
+                )
+    return _shared_cache
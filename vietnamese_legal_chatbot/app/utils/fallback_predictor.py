@@ -0,0 +1,83 @@
+"""
+Fallback Predictor for Vietnamese Legal AI Chatbot
+Dự đoán truy vấn cần tìm kiếm web cho Chatbot AI Pháp lý Việt Nam
+
+Cheap predictor deciding whether vector retrieval is likely to miss (too few confident
+results), so the SerpAPI fallback can start speculatively in parallel instead of after it.
+Tracks the outcome of every prediction to report precision/recall.
+Dự đoán trước khả năng cơ sở dữ liệu không đủ kết quả để chạy song song tìm kiếm web.
+"""
+
+import threading
+import logging
+from typing import Any, Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class FallbackPredictor:
+    """
+    Dự đoán truy vấn thiếu kết quả theo lĩnh vực
+    Per-domain miss predictor: static rules plus the observed miss rate
+    """
+
+    def __init__(
+        self,
+        low_coverage_domains: Optional[Iterable[str]] = None,
+        miss_rate_threshold: float = 0.5,
+        min_observations: int = 10
+    ):
+        """
+        Args:
+            low_coverage_domains: Lĩnh vực có ít tài liệu trong cơ sở dữ liệu
+            miss_rate_threshold: Tỷ lệ thiếu kết quả quan sát được để dự đoán thiếu
+            min_observations: Số lần quan sát tối thiểu trước khi dùng tỷ lệ quan sát
+        """
+        self.low_coverage_domains = set(low_coverage_domains or ())
+        self.miss_rate_threshold = miss_rate_threshold
+        self.min_observations = min_observations
+
+        self._domain_counts: Dict[str, Dict[str, int]] = {}
+        self._confusion = {"true_positive": 0, "false_positive": 0, "false_negative": 0, "true_negative": 0}
+        self._lock = threading.Lock()
+
+    def predict_miss(self, legal_domain: str) -> bool:
+        """Dự đoán vector search sẽ thiếu kết quả cho lĩnh vực này"""
+        if legal_domain == "general" or legal_domain in self.low_coverage_domains:
+            return True
+        with self._lock:
+            counts = self._domain_counts.get(legal_domain)
+            if not counts or counts["queries"] < self.min_observations:
+                return False
+            return counts["misses"] / counts["queries"] >= self.miss_rate_threshold
+
+    def record(self, legal_domain: str, predicted_miss: bool, missed: bool) -> None:
+        """Ghi nhận kết quả thực tế của một dự đoán"""
+        with self._lock:
+            counts = self._domain_counts.setdefault(legal_domain, {"queries": 0, "misses": 0})
+            counts["queries"] += 1
+            counts["misses"] += int(missed)
+
+            if predicted_miss:
+                self._confusion["true_positive" if missed else "false_positive"] += 1
+            else:
+                self._confusion["false_negative" if missed else "true_negative"] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Độ chính xác của dự đoán (precision: fallback chạy trước có được dùng; recall: miss được dự đoán)"""
+        with self._lock:
+            tp = self._confusion["true_positive"]
+            fp = self._confusion["false_positive"]
+            fn = self._confusion["false_negative"]
+            total = sum(self._confusion.values())
+            return {
+                **self._confusion,
+                "predictions": total,
+                "precision": tp / (tp + fp) if tp + fp else 0.0,
+                "recall": tp / (tp + fn) if tp + fn else 0.0,
+                "accuracy": (tp + self._confusion["true_negative"]) / total if total else 0.0,
+                "domain_miss_rates": {
+                    domain: counts["misses"] / counts["queries"]
+                    for domain, counts in self._domain_counts.items() if counts["queries"]
+                }
+            }
@@ -0,0 +1,167 @@
+"""
+Pipeline Metrics for Vietnamese Legal AI Chatbot
+Đo độ trễ theo từng bước cho Chatbot AI Pháp lý Việt Nam
+
+Per-stage latency histograms for the RAG pipeline (preprocess, embed, vector search, LLM, ...)
+with p50/p95/p99 and Prometheus text exposition for the /metrics endpoint.
+Histogram độ trễ từng bước của pipeline RAG, xuất theo định dạng Prometheus.
+"""
+
+import math
+import time
+import threading
+import logging
+from bisect import bisect_left
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+# Giới hạn bucket (giây): từ regex vài ms tới lời gọi LLM vài chục giây
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+class LatencyHistogram:
+    """
+    Histogram độ trễ: bucket tích lũy (Prometheus) + mẫu gần nhất để tính phân vị
+    Cumulative-bucket histogram with a bounded reservoir of recent samples for quantiles
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS, reservoir_size: int = 2048):
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)  # last slot: +Inf
+        self._sum = 0.0
+        self._count = 0
+        self._recent: deque = deque(maxlen=reservoir_size)
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float) -> None:
+        """Ghi nhận một mẫu độ trễ"""
+        with self._lock:
+            self._counts[bisect_left(self.buckets, seconds)] += 1
+            self._sum += seconds
+            self._count += 1
+            self._recent.append(seconds)
+
+    def quantile(self, q: float) -> float:
+        """Phân vị trên các mẫu gần nhất (nearest-rank)"""
+        with self._lock:
+            samples = sorted(self._recent)
+        if not samples:
+            return 0.0
+        rank = max(1, math.ceil(q * len(samples)))
+        return samples[rank - 1]
+
+    def snapshot(self) -> Dict[str, float]:
+        """count, sum, mean và p50/p95/p99"""
+        with self._lock:
+            count, total = self._count, self._sum
+        result = {"count": count, "sum": total, "mean": total / count if count else 0.0}
+        for q in QUANTILES:
+            result[f"p{int(q * 100)}"] = self.quantile(q)
+        return result
+
+    def cumulative_buckets(self) -> List[tuple]:
+        """[(le, cumulative count)] gồm cả +Inf"""
+        with self._lock:
+            counts = list(self._counts)
+        result, running = [], 0
+        for le, count in zip(list(self.buckets) + [math.inf], counts):
+            running += count
+            result.append((le, running))
+        return result
+
+
+class StageMetrics:
+    """
+    Bộ đo độ trễ theo bước
+    Registry of per-stage latency histograms
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self._histograms: Dict[str, LatencyHistogram] = {}
+        self._lock = threading.Lock()
+
+    def histogram(self, stage: str) -> LatencyHistogram:
+        histogram = self._histograms.get(stage)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(stage, LatencyHistogram(self.buckets))
+        return histogram
+
+    def observe(self, stage: str, seconds: float) -> None:
+        """Ghi nhận thời gian của một bước"""
+        self.histogram(stage).observe(seconds)
+
+    @contextmanager
+    def time(self, stage: str) -> Iterator[None]:
+        """Đo thời gian khối lệnh (kể cả khi có lỗi)"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start)
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        """Thống kê (count, mean, p50/p95/p99) của mọi bước đã đo"""
+        with self._lock:
+            stages = dict(self._histograms)
+        return {stage: histogram.snapshot() for stage, histogram in sorted(stages.items())}
+
+    def reset(self) -> None:
+        """Xóa mọi histogram"""
+        with self._lock:
+            self._histograms.clear()
+
+    def render_prometheus(self, prefix: str = "legal_rag") -> str:
+        """Xuất histogram theo định dạng văn bản Prometheus (text/plain; version=0.0.4)"""
+        with self._lock:
+            stages = sorted(self._histograms.items())
+
+        name = f"{prefix}_stage_duration_seconds"
+        lines = [
+            f"# HELP {name} Latency of each RAG pipeline stage.",
+            f"# TYPE {name} histogram",
+        ]
+        for stage, histogram in stages:
+            for le, count in histogram.cumulative_buckets():
+                bound = "+Inf" if math.isinf(le) else repr(float(le))
+                lines.append(f'{name}_bucket{{stage="{stage}",le="{bound}"}} {count}')
+            snapshot = histogram.snapshot()
+            lines.append(f'{name}_sum{{stage="{stage}"}} {snapshot["sum"]:.6f}')
+            lines.append(f'{name}_count{{stage="{stage}"}} {snapshot["count"]}')
+
+        quantile_name = f"{prefix}_stage_duration_quantile_seconds"
+        lines.extend([
+            f"# HELP {quantile_name} Recent p50/p95/p99 latency of each RAG pipeline stage.",
+            f"# TYPE {quantile_name} gauge",
+        ])
+        for stage, histogram in stages:
+            for q in QUANTILES:
+                lines.append(f'{quantile_name}{{stage="{stage}",quantile="{q}"}} {histogram.quantile(q):.6f}')
+        return "\n".join(lines) + "\n"
+
+
+def format_prometheus_gauge(name: str, value: float, help_text: str) -> str:
+    """Một gauge theo định dạng Prometheus"""
+    return f"# HELP {name} {help_text}\n# TYPE {name} gauge\n{name} {value}\n"
+
+
+_stage_metrics: Optional[StageMetrics] = None
+_stage_metrics_lock = threading.Lock()
+
+
+def get_stage_metrics() -> StageMetrics:
+    """
+    Lấy bộ đo độ trễ dùng chung trong process
+    Get the process-wide stage metrics registry
+    """
+    global _stage_metrics
+    if _stage_metrics is None:
+        with _stage_metrics_lock:
+            if _stage_metrics is None:
+                _stage_metrics = StageMetrics()
+    return _stage_metrics
@@ -0,0 +1,240 @@
+"""
+Query Statistics for Vietnamese Legal AI Chatbot
+Thống kê truy vấn cho Chatbot AI Pháp lý Việt Nam
+
+Bounded query history and streaming aggregates for long-running workers: a fixed-capacity
+ring buffer of compact records (no answers or sources) plus per-thread sharded counters and
+mergeable quantile sketches, so recording a query never takes a process-wide lock.
+Lịch sử truy vấn có giới hạn và số liệu tổng hợp dạng luồng, không rò rỉ bộ nhớ.
+"""
+
+import math
+import time
+import threading
+import logging
+from collections import Counter, deque
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+@dataclass(frozen=True)
+class QueryRecord:
+    """Bản ghi gọn của một truy vấn (không giữ câu trả lời và nguồn)"""
+    timestamp: datetime
+    legal_domain: str
+    query_type: str
+    confidence_score: float
+    latency: float
+    num_sources: int
+    monotonic: float = 0.0
+
+
+class QueryHistory:
+    """
+    Bộ đệm vòng các truy vấn gần nhất
+    Fixed-capacity ring buffer of recent query records (deque appends are atomic)
+    """
+
+    def __init__(self, capacity: int = 1000):
+        self.capacity = capacity
+        self._records: deque = deque(maxlen=capacity)
+
+    def append(self, record: QueryRecord) -> None:
+        self._records.append(record)
+
+    def records(self) -> List[QueryRecord]:
+        """Bản sao các bản ghi, cũ nhất trước"""
+        return list(self._records.copy())
+
+    def last(self) -> Optional[QueryRecord]:
+        try:
+            return self._records[-1]
+        except IndexError:
+            return None
+
+    def rate(self, window: float, now: Optional[float] = None) -> float:
+        """Số truy vấn mỗi giây trong `window` giây gần nhất (trong phạm vi bộ đệm)"""
+        now = time.monotonic() if now is None else now
+        count = sum(1 for record in self._records.copy() if now - record.monotonic <= window)
+        return count / window if window > 0 else 0.0
+
+    def clear(self) -> None:
+        self._records.clear()
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __iter__(self) -> Iterator[QueryRecord]:
+        return iter(self.records())
+
+
+class QuantileSketch:
+    """
+    Sketch phân vị với sai số tương đối cố định (bucket logarit, gộp được)
+    Log-bucketed quantile sketch with bounded relative error; sketches merge by adding counts
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01, min_value: float = 1e-6):
+        self.relative_accuracy = relative_accuracy
+        self.min_value = min_value
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self.buckets: Counter = Counter()
+        self.zero_count = 0
+        self.count = 0
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        if value <= self.min_value:
+            self.zero_count += 1
+        else:
+            self.buckets[math.ceil(math.log(value) / self._log_gamma)] += 1
+
+    def merge(self, other: "QuantileSketch") -> None:
+        self.buckets.update(other.buckets)
+        self.zero_count += other.zero_count
+        self.count += other.count
+
+    def quantile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(q * self.count))
+        if rank <= self.zero_count:
+            return 0.0
+        seen = self.zero_count
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                # Bucket midpoint: within relative_accuracy of every value in the bucket
+                return 2 * self._gamma ** index / (self._gamma + 1)
+        return 0.0
+
+    def copy(self) -> "QuantileSketch":
+        sketch = QuantileSketch(self.relative_accuracy, self.min_value)
+        sketch.merge(self)
+        return sketch
+
+
+class _Shard:
+    """Một phân mảnh số liệu, chỉ bị tranh chấp bởi các luồng cùng phân mảnh"""
+
+    def __init__(self, relative_accuracy: float):
+        self.lock = threading.Lock()
+        self.relative_accuracy = relative_accuracy
+        self.reset()
+
+    def reset(self) -> None:
+        self.count = 0
+        self.confidence_sum = 0.0
+        self.tokens_dropped = 0
+        self.domains: Counter = Counter()
+        self.latency = QuantileSketch(self.relative_accuracy)
+        self.confidence = QuantileSketch(self.relative_accuracy)
+
+
+class QueryStats:
+    """
+    Số liệu tổng hợp truy vấn phân mảnh theo luồng
+    Streaming query aggregates sharded by thread; reads merge all shards
+    """
+
+    def __init__(self, history_size: int = 1000, shards: int = 16, relative_accuracy: float = 0.01):
+        """
+        Args:
+            history_size: Số truy vấn gần nhất giữ trong bộ đệm vòng
+            shards: Số phân mảnh số liệu (giảm tranh chấp khóa giữa các luồng)
+            relative_accuracy: Sai số tương đối của sketch phân vị
+        """
+        self.history = QueryHistory(history_size)
+        self._shards = [_Shard(relative_accuracy) for _ in range(shards)]
+
+    def _shard(self) -> _Shard:
+        return self._shards[threading.get_ident() % len(self._shards)]
+
+    def record(
+        self,
+        legal_domain: str,
+        query_type: str,
+        confidence_score: float,
+        latency: float,
+        num_sources: int = 0
+    ) -> QueryRecord:
+        """Ghi nhận một truy vấn đã trả lời"""
+        record = QueryRecord(
+            timestamp=datetime.now(),
+            legal_domain=legal_domain,
+            query_type=query_type,
+            confidence_score=confidence_score,
+            latency=latency,
+            num_sources=num_sources,
+            monotonic=time.monotonic()
+        )
+        shard = self._shard()
+        with shard.lock:
+            shard.count += 1
+            shard.confidence_sum += confidence_score
+            shard.domains[legal_domain] += 1
+            shard.latency.add(latency)
+            shard.confidence.add(confidence_score)
+        self.history.append(record)
+        return record
+
+    def add_tokens_dropped(self, tokens: int) -> None:
+        """Cộng số token ngữ cảnh bị loại do vượt ngân sách"""
+        shard = self._shard()
+        with shard.lock:
+            shard.tokens_dropped += tokens
+
+    def _merged(self) -> Dict[str, Any]:
+        total = {"count": 0, "confidence_sum": 0.0, "tokens_dropped": 0, "domains": Counter()}
+        latency = QuantileSketch(self._shards[0].relative_accuracy)
+        confidence = QuantileSketch(self._shards[0].relative_accuracy)
+        for shard in self._shards:
+            with shard.lock:
+                total["count"] += shard.count
+                total["confidence_sum"] += shard.confidence_sum
+                total["tokens_dropped"] += shard.tokens_dropped
+                total["domains"].update(shard.domains)
+                latency.merge(shard.latency)
+                confidence.merge(shard.confidence)
+        total["latency"] = latency
+        total["confidence"] = confidence
+        return total
+
+    def summary(self) -> Dict[str, Any]:
+        """total_queries, avg_confidence, domain_distribution, context_tokens_dropped"""
+        total = self._merged()
+        return {
+            "total_queries": total["count"],
+            "avg_confidence": total["confidence_sum"] / total["count"] if total["count"] else 0.0,
+            "domain_distribution": dict(total["domains"]),
+            "context_tokens_dropped": total["tokens_dropped"]
+        }
+
+    def quantiles(self, quantiles: Sequence[float] = QUANTILES) -> Dict[str, Dict[str, float]]:
+        """Phân vị độ trễ (giây) và độ tin cậy của mọi truy vấn"""
+        total = self._merged()
+        return {
+            name: {f"p{int(q * 100)}": total[name].quantile(q) for q in quantiles}
+            for name in ("latency", "confidence")
+        }
+
+    def rates(self) -> Dict[str, float]:
+        """Số truy vấn mỗi phút trong 1 và 5 phút gần nhất"""
+        now = time.monotonic()
+        return {
+            "per_minute_1m": self.history.rate(60, now) * 60,
+            "per_minute_5m": self.history.rate(300, now) * 60
+        }
+
+    def reset(self) -> None:
+        """Xóa lịch sử và số liệu"""
+        for shard in self._shards:
+            with shard.lock:
+                shard.reset()
+        self.history.clear()
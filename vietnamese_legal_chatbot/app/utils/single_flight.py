@@ -0,0 +1,108 @@
+"""
+Single-flight Request Coalescing for Vietnamese Legal AI Chatbot
+Gộp yêu cầu trùng lặp đang xử lý cho Chatbot AI Pháp lý Việt Nam
+
+Concurrent calls with the same key share one execution: the first caller runs the work,
+later callers wait for its result (or exception) instead of repeating it.
+Các yêu cầu giống nhau đến cùng lúc chỉ được xử lý một lần.
+"""
+
+import re
+import asyncio
+import threading
+import unicodedata
+import logging
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_question(text: str) -> str:
+    """Chuẩn hóa câu hỏi làm khóa gộp (NFC, chữ thường, gộp khoảng trắng)"""
+    text = unicodedata.normalize('NFC', text or "").lower()
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+class _Call:
+    """Một lần thực thi đang chạy (đường sync)"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    Gộp các lời gọi đồng thời có cùng khóa (sync và async)
+    In-flight request coalescing for sync and async callers
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, _Call] = {}
+        self._tasks: Dict[Tuple[int, Hashable], "asyncio.Future"] = {}
+        self._lock = threading.Lock()
+        self._stats = {"executions": 0, "coalesced": 0}
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """
+        Chạy fn một lần cho mọi lời gọi đồng thời cùng khóa
+        Run fn once for all concurrent callers with the same key (threads)
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self._stats["executions"] += 1
+            else:
+                self._stats["coalesced"] += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    async def ado(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Async variant of do(): callers on the same event loop await one shared task.
+        A cancelled caller does not cancel the shared work for the others.
+        """
+        loop_key = (id(asyncio.get_running_loop()), key)
+        with self._lock:
+            task = self._tasks.get(loop_key)
+            if task is None:
+                task = asyncio.ensure_future(fn())
+                self._tasks[loop_key] = task
+                self._stats["executions"] += 1
+                task.add_done_callback(lambda _: self._forget(loop_key, task))
+            else:
+                self._stats["coalesced"] += 1
+        return await asyncio.shield(task)
+
+    def _forget(self, loop_key: Tuple[int, Hashable], task: "asyncio.Future") -> None:
+        with self._lock:
+            if self._tasks.get(loop_key) is task:
+                del self._tasks[loop_key]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Số lần thực thi, số lời gọi được gộp và số khóa đang xử lý"""
+        with self._lock:
+            calls = self._stats["executions"] + self._stats["coalesced"]
+            return {
+                **self._stats,
+                "in_flight": len(self._calls) + len(self._tasks),
+                "coalesce_rate": self._stats["coalesced"] / calls if calls else 0.0
+            }
@@ -6,17 +6,265 @@ Specialized text processing for Vietnamese legal documents and queries.
 Xử lý văn bản chuyên biệt cho tài liệu và truy vấn pháp lý tiếng Việt.
 """
 
+import os
 import re
+import threading
 import unicodedata
-from typing import List, Dict, Optional, Tuple, Set, Any
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from types import MappingProxyType
+from typing import List, Dict, Optional, Tuple, Set, Any, Iterable, Iterator, Type
 from dataclasses import dataclass
 import logging
 
-# TODO: Import khi implement
-# import underthesea
-# from pyvi import ViTokenizer
 # from app.utils.config import settings
 
+try:
+    from app.utils.aho_corasick import AhoCorasickMatcher, KeywordHits
+except ImportError:
+    from utils.aho_corasick import AhoCorasickMatcher, KeywordHits
+
+try:
+    from app.utils.vietnamese_segmenter import LEGAL_LEXICON, VietnameseWordSegmenter, load_segmenter_dictionary
+except ImportError:
+    from utils.vietnamese_segmenter import LEGAL_LEXICON, VietnameseWordSegmenter, load_segmenter_dictionary
+
+# Biểu thức chính quy biên dịch một lần khi import module, dùng chung cho mọi processor
+WHITESPACE_PATTERN = re.compile(r'\s+')
+REPEATED_PUNCTUATION_PATTERN = re.compile(r'([.!?])\s*([.!?]+)')
+DOUBLE_QUOTE_PATTERN = re.compile(r'["""]')
+SINGLE_QUOTE_PATTERN = re.compile(r"[''']")
+TOKEN_EDGE_PATTERN = re.compile(r'^[^\w]+|[^\w]+$')
+
+LEGAL_REFERENCE_PATTERNS = tuple(re.compile(pattern, re.IGNORECASE) for pattern in (
+    r'(Điều\s+\d+)',                          # Article references
+    r'(Khoản\s+\d+)',                         # Clause references
+    r'(Chương\s+[IVX]+)',                     # Chapter references
+    r'(Mục\s+\d+)',                           # Section references
+    r'(Nghị định\s+\d+/\d+/NĐ-CP)',          # Decree references
+    r'(Thông tư\s+\d+/\d+/TT-[A-Z]+)',       # Circular references
+))
+
+LAW_REFERENCE_PATTERN = re.compile(r'(Luật|Bộ luật)\s+([^,.\n]+)', re.IGNORECASE)
+
+MONETARY_PATTERNS = tuple(re.compile(pattern, re.IGNORECASE) for pattern in (
+    r'(\d+(?:\.\d+)?)\s*(đồng|VND)',
+    r'(\d+(?:\.\d+)?)\s*(triệu|tỷ)\s*(đồng|VND)?',
+    r'(\d+(?:,\d+)*)\s*(đồng|VND)',
+))
+
+DATE_PATTERNS = tuple(re.compile(pattern, re.IGNORECASE) for pattern in (
+    r'(\d{1,2})/(\d{1,2})/(\d{4})',                    # dd/mm/yyyy
+    r'(\d{1,2})-(\d{1,2})-(\d{4})',                    # dd-mm-yyyy
+    r'ngày\s+(\d{1,2})\s+tháng\s+(\d{1,2})\s+năm\s+(\d{4})',  # Vietnamese format
+    r'(\d{4})-(\d{1,2})-(\d{1,2})',                    # yyyy-mm-dd
+))
+
+# Vietnamese name patterns (basic)
+# This is a simplified version - real implementation would use NER
+PERSON_NAME_PATTERN = re.compile(r'(ông|bà|anh|chị)\s+([A-ZÀÁẠẢÃÂẦẤẬẨẪĂẰẮẶẲẴÈÉẸẺẼÊỀẾỆỂỄÌÍỊỈĨÒÓỌỎÕÔỒỐỘỔỖƠỜỚỢỞỠÙÚỤỦŨƯỪỨỰỬỮỲÝỴỶỸĐ][a-zàáạảãâầấậẩẫăằắặẳẵèéẹẻẽêềếệểễìíịỉĩòóọỏõôồốộổỗơờớợởỡùúụủũưừứựửữỳýỵỷỹđ]*(?:\s+[A-ZÀÁẠẢÃÂẦẤẬẨẪĂẰẮẶẲẴÈÉẸẺẼÊỀẾỆỂỄÌÍỊỈĨÒÓỌỎÕÔỒỐỘỔỖƠỜỚỢỞỠÙÚỤỦŨƯỪỨỰỬỮỲÝỴỶỸĐ][a-zàáạảãâầấậẩẫăằắặẳẵèéẹẻẽêềếệểễìíịỉĩòóọỏõôồốộổỗơờớợởỡùúụủũưừứựửữỳýỵỷỹđ]*)*)')
+ORGANIZATION_NAME_PATTERN = re.compile(r'(Công ty|Doanh nghiệp|Tập đoàn|Ngân hàng)\s+([A-ZÀÁẠẢÃÂẦẤẬẨẪĂẰẮẶẲẴÈÉẸẺẼÊỀẾỆỂỄÌÍỊỈĨÒÓỌỎÕÔỒỐỘỔỖƠỜỚỢỞỠÙÚỤỦŨƯỪỨỰỬỮỲÝỴỶỸĐ][^,.\n]*)')
+
+# Legal procedure patterns
+LEGAL_PROCEDURES = (
+    'khởi kiện', 'tố tụng', 'phúc thẩm', 'giám đốc thẩm',
+    'hòa giải', 'trọng tài', 'thi hành án', 'cưỡng chế',
+    'kháng cáo', 'kháng nghị', 'tạm giam', 'tạm giữ',
+    'điều tra', 'truy tố', 'xét xử', 'tuyên án'
+)
+PROCEDURE_ORDER = MappingProxyType({procedure: index for index, procedure in enumerate(LEGAL_PROCEDURES)})
+
+# Legal citation patterns
+CITATION_PATTERNS = tuple(re.compile(pattern, re.IGNORECASE) for pattern in (
+    # Law citations
+    r'(Luật|Bộ luật)\s+([^,.\n\d]+)\s+(\d{4})',
+    # Article citations
+    r'Điều\s+(\d+)\s+(Luật|Bộ luật)\s+([^,.\n\d]+)\s+(\d{4})',
+    # Decree citations
+    r'Nghị định\s+(\d+)/(\d{4})/NĐ-CP',
+    # Circular citations
+    r'Thông tư\s+(\d+)/(\d{4})/TT-([A-Z]+)',
+))
+
+VIETNAMESE_CHARACTERS = frozenset('àáạảãâầấậẩẫăằắặẳẵèéẹẻẽêềếệểễìíịỉĩòóọỏõôồốộổỗơờớợởỡùúụủũưừứựửữỳýỵỷỹđ')
+COMMON_VIETNAMESE_WORDS = ('và', 'của', 'trong', 'với', 'về', 'cho', 'từ', 'theo', 'như')
+
+# Standardize common legal term variations
+LEGAL_TERM_REPLACEMENTS = MappingProxyType({
+    'Bộ luật dân sự': 'Bộ luật Dân sự',
+    'bộ luật dân sự': 'Bộ luật Dân sự',
+    'Bộ luật hình sự': 'Bộ luật Hình sự',
+    'bộ luật hình sự': 'Bộ luật Hình sự',
+    'Bộ luật lao động': 'Bộ luật Lao động',
+    'bộ luật lao động': 'Bộ luật Lao động',
+})
+
+# Legal domain keywords
+DOMAIN_KEYWORDS = MappingProxyType({
+    'dan_su': ('dân sự', 'hợp đồng', 'tài sản', 'quyền sở hữu', 'bồi thường', 'thừa kế'),
+    'hinh_su': ('hình sự', 'tội phạm', 'hình phạt', 'án tù', 'vi phạm pháp luật'),
+    'lao_dong': ('lao động', 'người lao động', 'hợp đồng lao động', 'bảo hiểm xã hội', 'thời gian làm việc'),
+    'thuong_mai': ('thương mại', 'kinh doanh', 'công ty', 'doanh nghiệp', 'đăng ký kinh doanh'),
+    'hanh_chinh': ('hành chính', 'thủ tục', 'cấp phép', 'đăng ký', 'giấy phép')
+})
+
+# Query intents, in priority order
+INTENT_KEYWORDS = MappingProxyType({
+    'procedure_inquiry': ('cách', 'làm thế nào', 'thủ tục'),
+    'rights_inquiry': ('có được', 'có thể', 'quyền'),
+    'obligation_inquiry': ('phải', 'bắt buộc', 'nghĩa vụ'),
+    'violation_inquiry': ('vi phạm', 'sai', 'lỗi')
+})
+
+# Legal domain constraints of a query, in priority order
+CONSTRAINT_DOMAIN_KEYWORDS = MappingProxyType({
+    'dan_su': ('dân sự',),
+    'hinh_su': ('hình sự',),
+    'lao_dong': ('lao động',),
+    'thuong_mai': ('thương mại',)
+})
+
+# Legal terms dictionary of the default processor
+LEGAL_TERMS = (
+    'Bộ luật Dân sự', 'Bộ luật Hình sự', 'Bộ luật Lao động',
+    'Hiến pháp', 'Luật Thương mại', 'Luật Hành chính',
+    'hợp đồng', 'tài sản', 'quyền sở hữu', 'nghĩa vụ',
+    'vi phạm', 'trách nhiệm', 'bồi thường', 'tội phạm',
+    'hình phạt', 'an toàn lao động', 'bảo hiểm xã hội',
+    'thủ tục hành chính', 'cấp phép', 'đăng ký kinh doanh'
+)
+
+# Domain keywords for query routing in the RAG pipeline
+ROUTING_DOMAIN_KEYWORDS = MappingProxyType({
+    'dan_su': ('hợp đồng', 'tài sản', 'thừa kế', 'kết hôn', 'ly hôn'),
+    'hinh_su': ('tội phạm', 'án phạt', 'tù giam', 'vi phạm hình sự'),
+    'lao_dong': ('lương', 'bảo hiểm', 'nghỉ việc', 'sa thải', 'hợp đồng lao động'),
+    'thuong_mai': ('kinh doanh', 'doanh nghiệp', 'thương mại', 'đầu tư'),
+    'hanh_chinh': ('thủ tục', 'giấy phép', 'hành chính', 'cơ quan nhà nước'),
+    'thue': ('thuế', 'khai thuế', 'miễn thuế', 'nộp thuế'),
+    'bat_dong_san': ('nhà đất', 'bất động sản', 'quyền sử dụng đất'),
+    'hien_phap': ('hiến pháp', 'quyền công dân', 'nghĩa vụ công dân')
+})
+
+# Query-type keywords by LegalQueryType value, in classification priority order
+QUERY_TYPE_VOCABULARY = MappingProxyType({
+    'interpretation': ('là gì', 'định nghĩa', 'khái niệm'),
+    'procedure': ('thủ tục', 'quy trình', 'làm thế nào'),
+    'compliance': ('vi phạm', 'tuân thủ', 'có được phép'),
+    'specific_law': ('điều', 'luật', 'quy định cụ thể'),
+    'case_analysis': ('trường hợp', 'tình huống', 'phân tích')
+})
+
+# Legal terms noted in search queries
+QUERY_LEGAL_TERMS = (
+    'điều luật', 'quy định', 'nghị định', 'thông tư', 'quyết định',
+    'bộ luật', 'hiến pháp', 'pháp luật', 'văn bản pháp luật',
+    'trách nhiệm', 'quyền lợi', 'nghĩa vụ', 'xử phạt', 'vi phạm'
+)
+
+# Related keywords appended to a search query containing the keyword
+CONTEXT_KEYWORDS = MappingProxyType({
+    'quyền': ('quyền lợi', 'nghĩa vụ', 'bảo vệ'),
+    'trách nhiệm': ('nghĩa vụ', 'vi phạm', 'xử phạt'),
+    'thủ tục': ('quy trình', 'hồ sơ', 'điều kiện'),
+    'hợp đồng': ('thỏa thuận', 'cam kết', 'nghĩa vụ'),
+    'tranh chấp': ('giải quyết', 'tòa án', 'trọng tài')
+})
+
+# Response validation vocabularies
+LEGAL_STRUCTURE_INDICATORS = ('điều', 'khoản', 'điểm', 'chương', 'mục')
+RESPONSE_TERMINOLOGY = (
+    'quyền', 'nghĩa vụ', 'trách nhiệm', 'vi phạm', 'xử phạt',
+    'hợp đồng', 'thỏa thuận', 'tranh chấp', 'giải quyết',
+    'tòa án', 'cơ quan', 'thẩm quyền', 'pháp luật', 'văn bản'
+)
+PROHIBITED_RESPONSE_TERMS = ('chắc chắn 100%', 'hoàn toàn chính xác')
+
+
+def build_keyword_matcher(legal_terms: Iterable[str] = LEGAL_TERMS) -> AhoCorasickMatcher:
+    """
+    One automaton over every keyword vocabulary; each match is tagged with its category.
+    Text processor: term, domain, procedure, intent, constraint_domain.
+    RAG pipeline: routing_domain, query_type, query_term, context.
+    Response validator: structure, terminology, prohibited.
+    Language confidence: common_word.
+    """
+    matcher = AhoCorasickMatcher()
+    matcher.add_vocabulary('term', {None: legal_terms})
+    matcher.add_vocabulary('domain', DOMAIN_KEYWORDS)
+    matcher.add_vocabulary('procedure', {procedure: (procedure,) for procedure in LEGAL_PROCEDURES},
+                           whole_word=True)
+    matcher.add_vocabulary('intent', INTENT_KEYWORDS)
+    matcher.add_vocabulary('constraint_domain', CONSTRAINT_DOMAIN_KEYWORDS)
+    matcher.add_vocabulary('routing_domain', ROUTING_DOMAIN_KEYWORDS)
+    matcher.add_vocabulary('query_type', QUERY_TYPE_VOCABULARY)
+    matcher.add_vocabulary('query_term', {None: QUERY_LEGAL_TERMS})
+    matcher.add_vocabulary('context', {keyword: (keyword,) for keyword in CONTEXT_KEYWORDS})
+    matcher.add_vocabulary('structure', {None: LEGAL_STRUCTURE_INDICATORS})
+    matcher.add_vocabulary('terminology', {None: RESPONSE_TERMINOLOGY})
+    matcher.add_vocabulary('prohibited', {None: PROHIBITED_RESPONSE_TERMS})
+    matcher.add_vocabulary('common_word', {None: COMMON_VIETNAMESE_WORDS})
+    return matcher.build()
+
+
+# Bảng viết tắt pháp lý dùng chung (text processor và RAG pipeline).
+# Không có khóa 2 chữ cái (TT, QĐ, NĐ, TB, CV...): chúng trùng với ký hiệu trong số hiệu văn bản.
+LEGAL_ABBREVIATIONS = MappingProxyType({
+    # Government agencies
+    'BTP': 'Bộ Tư pháp',
+    'BCA': 'Bộ Công an',
+    'TANDTC': 'Tòa án nhân dân tối cao',
+    'VKSTC': 'Viện kiểm sát nhân dân tối cao',
+    'UBND': 'Ủy ban nhân dân',
+    'HĐND': 'Hội đồng nhân dân',
+
+    # Legal documents
+    'NĐ-CP': 'Nghị định của Chính phủ',
+    'QĐ-TTg': 'Quyết định của Thủ tướng',
+    'TT-BTP': 'Thông tư của Bộ Tư pháp',
+
+    # Legal codes
+    'BLHS': 'Bộ luật Hình sự',
+    'BLDS': 'Bộ luật Dân sự',
+    'BLLĐ': 'Bộ luật Lao động',
+    'BLLD': 'Bộ luật Lao động',
+    'BLTM': 'Bộ luật Thương mại',
+
+    # Others
+    'TP.HCM': 'Thành phố Hồ Chí Minh',
+})
+
+# Khóa ngắn hơn độ dài này chỉ khớp đúng hoa thường
+CASE_INSENSITIVE_MIN_LENGTH = 4
+
+
+def compile_abbreviation_pattern(abbreviations: Dict[str, str]) -> re.Pattern:
+    """
+    Biên dịch một biểu thức thay thế cho cả bảng viết tắt
+    One alternation, longest abbreviation first (so "TT-BTP" wins over a shorter key). A match
+    must not touch a letter, digit, "/" or "-", so document numbers such as "145/2020/NĐ-CP"
+    are left intact; keys shorter than CASE_INSENSITIVE_MIN_LENGTH match case-sensitively
+    """
+    alternatives = sorted(abbreviations, key=len, reverse=True)
+    branches = [
+        re.escape(abbrev) if len(abbrev) < CASE_INSENSITIVE_MIN_LENGTH else '(?i:' + re.escape(abbrev) + ')'
+        for abbrev in alternatives
+    ]
+    return re.compile(r'(?<![\w/-])(?:' + '|'.join(branches) + r')(?![\w/-])')
+
+
+ABBREVIATION_PATTERN = compile_abbreviation_pattern(LEGAL_ABBREVIATIONS)
+_ABBREVIATION_LOOKUP = MappingProxyType({abbrev.lower(): full for abbrev, full in LEGAL_ABBREVIATIONS.items()})
+
+
+def expand_legal_abbreviations(text: str) -> str:
+    """
+    Mở rộng mọi từ viết tắt pháp lý trong một lần quét
+    Expand every legal abbreviation of LEGAL_ABBREVIATIONS in a single pass
+    """
+    return ABBREVIATION_PATTERN.sub(lambda match: _ABBREVIATION_LOOKUP[match.group(0).lower()], text)
+
 @dataclass
 class VietnameseTextAnalysis:
     """Analysis result for Vietnamese text"""
@@ -28,13 +276,49 @@ class VietnameseTextAnalysis:
     language_confidence: float
 
 class VietnameseTextProcessor:
-    """Main processor for Vietnamese text in legal context"""
-    
+    """
+    Main processor for Vietnamese text in legal context.
+    Dictionaries are read-only after construction, so one instance (get_text_processor())
+    is shared by all threads.
+    """
+
     def __init__(self):
         """Initialize Vietnamese text processor"""
-        self.legal_terms = self._load_legal_terms()
-        self.stopwords = self._load_vietnamese_stopwords()
-        self.legal_abbreviations = self._load_legal_abbreviations()
+        self.legal_terms = tuple(self._load_legal_terms())
+        self._legal_terms_lower = tuple((term, term.lower()) for term in self.legal_terms)
+        self.stopwords = frozenset(self._load_vietnamese_stopwords())
+        self.legal_abbreviations = MappingProxyType(self._load_legal_abbreviations())
+        if self.legal_abbreviations == LEGAL_ABBREVIATIONS:
+            self._abbreviation_pattern = ABBREVIATION_PATTERN
+            self._abbreviation_lookup = _ABBREVIATION_LOOKUP
+        else:
+            self._abbreviation_pattern = compile_abbreviation_pattern(self.legal_abbreviations)
+            self._abbreviation_lookup = {abbrev.lower(): full for abbrev, full in self.legal_abbreviations.items()}
+        if self.legal_terms == LEGAL_TERMS:
+            self._keyword_matcher = get_keyword_matcher()
+        else:
+            self._keyword_matcher = build_keyword_matcher(self.legal_terms)
+        self.segmenter = self._build_segmenter()
+
+    def _build_segmenter(self) -> VietnameseWordSegmenter:
+        """
+        Word segmenter over the legal lexicon: the compiled dictionary at VIETNAMESE_LEXICON_PATH
+        (memory-mapped) if set, otherwise built from segmenter_lexicon()
+        """
+        trie = load_segmenter_dictionary(self.segmenter_lexicon(), os.getenv("VIETNAMESE_LEXICON_PATH"))
+        return VietnameseWordSegmenter(trie)
+
+    def segmenter_lexicon(self) -> List[str]:
+        """Words of the default segmentation dictionary (legal lexicon and this processor's vocabularies)"""
+        lexicon = [*LEGAL_LEXICON, *self.legal_terms, *self.stopwords, *LEGAL_PROCEDURES,
+                   *self.legal_abbreviations.values()]
+        for keywords in DOMAIN_KEYWORDS.values():
+            lexicon.extend(keywords)
+        return lexicon
+
+    def scan_keywords(self, text: str) -> KeywordHits:
+        """Find every vocabulary keyword in one pass over the text"""
+        return self._keyword_matcher.scan(text)
         
     def _load_legal_terms(self) -> List[str]:
         """Load Vietnamese legal terms dictionary"""
@@ -78,33 +362,6 @@ class VietnameseTextProcessor:
             "tuân thủ", "thực hiện", "áp dụng", "ban hành", "có hiệu lực"
         }
     
-    def _load_legal_abbreviations(self) -> Dict[str, str]:
-        """Load Vietnamese legal abbreviations"""
-        return {
-            # Government agencies
-            "BTP": "Bộ Tư pháp",
-            "BCA": "Bộ Công an", 
-            "TANDTC": "Tòa án nhân dân tối cao",
-            "VKSTC": "Viện kiểm sát nhân dân tối cao",
-            
-            # Legal documents
-            "NĐ-CP": "Nghị định của Chính phủ",
-            "QĐ-TTg": "Quyết định của Thủ tướng",
-            "TT-BTP": "Thông tư của Bộ Tư pháp",
-            "CV": "Công văn",
-            
-            # Legal codes
-            "BLDS": "Bộ luật Dân sự",
-            "BLHS": "Bộ luật Hình sự", 
-            "BLLD": "Bộ luật Lao động",
-            "BLTM": "Bộ luật Thương mại",
-            
-            # Others
-            "TP.HCM": "Thành phố Hồ Chí Minh",
-            "UBND": "Ủy ban nhân dân",
-            "HĐND": "Hội đồng nhân dân"
-        }
-        
     def process_legal_text(self, text: str) -> VietnameseTextAnalysis:
         """Process Vietnamese legal text comprehensively"""
         try:
@@ -114,14 +371,16 @@ class VietnameseTextProcessor:
             # 2. Tokenize
             tokens = self.tokenize_vietnamese(normalized)
             
-            # 3. Extract legal terms
-            legal_terms = self.extract_legal_terms(normalized)
+            # 3. Extract legal terms (one keyword pass shared with entity extraction
+            #    and the language-confidence word check)
+            hits = self.scan_keywords(normalized)
+            legal_terms = self.extract_legal_terms(normalized, hits)
             
             # 4. Extract entities
-            entities = self.extract_legal_entities(normalized)
+            entities = self.extract_legal_entities(normalized, hits)
             
-            # 5. Calculate confidence
-            confidence = self._calculate_language_confidence(text)
+            # 5. Calculate confidence (on the NFC text, so decomposed diacritics still count)
+            confidence = self._calculate_language_confidence(normalized, hits)
             
             return VietnameseTextAnalysis(
                 original_text=text,
@@ -143,6 +402,47 @@ class VietnameseTextProcessor:
                 entities=[],
                 language_confidence=0.5
             )
+
+    def process_legal_texts(
+        self,
+        texts: Iterable[str],
+        workers: int = 1,
+        chunk_size: int = 64
+    ) -> Iterator[VietnameseTextAnalysis]:
+        """
+        Phân tích nhiều văn bản (nạp kho dữ liệu), trả kết quả theo thứ tự đầu vào
+        Stream analyses for many texts, in input order
+
+        Với workers > 1, văn bản được chia thành chunk và phân phối cho một process pool;
+        mỗi process con dựng processor riêng một lần. Số chunk đang xử lý được giới hạn
+        nên `texts` có thể là generator lớn hơn bộ nhớ.
+
+        Args:
+            texts: Các văn bản cần phân tích (đọc lười)
+            workers: Số process; <= 1 xử lý ngay trong process hiện tại
+            chunk_size: Số văn bản mỗi chunk gửi cho một process
+
+        Yields:
+            VietnameseTextAnalysis: Kết quả của từng văn bản
+        """
+        if workers <= 1:
+            for text in texts:
+                yield self.process_legal_text(text)
+            return
+
+        max_pending = workers * 2
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_batch_worker,
+            initargs=(type(self),)
+        ) as executor:
+            pending = deque()
+            for chunk in _chunked(texts, chunk_size):
+                pending.append(executor.submit(_process_batch_chunk, chunk))
+                if len(pending) >= max_pending:
+                    yield from pending.popleft().result()
+            while pending:
+                yield from pending.popleft().result()
     
     def normalize_vietnamese_text(self, text: str) -> str:
         """Normalize Vietnamese text for better processing"""
@@ -151,11 +451,11 @@ class VietnameseTextProcessor:
             text = unicodedata.normalize('NFC', text)
             
             # 2. Clean whitespace
-            text = re.sub(r'\s+', ' ', text)
+            text = WHITESPACE_PATTERN.sub(' ', text)
             text = text.strip()
-            
+
             # 3. Standardize punctuation
-            text = re.sub(r'([.!?])\s*([.!?]+)', r'\1', text)
+            text = REPEATED_PUNCTUATION_PATTERN.sub(r'\1', text)
             
             # 4. Normalize Vietnamese legal terms
             text = self._normalize_legal_terms(text)
@@ -164,8 +464,8 @@ class VietnameseTextProcessor:
             text = self._expand_abbreviations(text)
             
             # 6. Standardize quotes
-            text = re.sub(r'["""]', '"', text)
-            text = re.sub(r"[''']", "'", text)
+            text = DOUBLE_QUOTE_PATTERN.sub('"', text)
+            text = SINGLE_QUOTE_PATTERN.sub("'", text)
             
             return text
             
@@ -173,15 +473,11 @@ class VietnameseTextProcessor:
             logging.error(f"Text normalization failed: {e}")
             return text
     
-    def tokenize_vietnamese(self, text: str) -> List[str]:
-        """Tokenize Vietnamese text using appropriate methods"""
-        # TODO: Implement Vietnamese tokenization
+    def tokenize_vietnamese(self, text: str, decompound: bool = False) -> List[str]:
+        """Tokenize Vietnamese text using appropriate methods (decompound: also emit sub-words of compounds)"""
         try:
-            # Using underthesea or pyvi for better Vietnamese tokenization
-            # tokens = underthesea.word_tokenize(text)
-            
-            # Fallback: simple tokenization
-            tokens = text.split()
+            # Dictionary-based word segmentation (multi-syllable legal terms stay one token)
+            tokens = self.segmenter.segment(text, decompound=decompound)
             
             # Filter out stopwords and clean tokens
             filtered_tokens = []
@@ -196,16 +492,12 @@ class VietnameseTextProcessor:
             logging.error(f"Tokenization failed: {e}")
             return text.split()
     
-    def extract_legal_terms(self, text: str) -> List[str]:
+    def extract_legal_terms(self, text: str, hits: Optional[KeywordHits] = None) -> List[str]:
         """Extract Vietnamese legal terms from text"""
         try:
-            found_terms = []
-            text_lower = text.lower()
-            
-            # Search for legal terms in text
-            for term in self.legal_terms:
-                if term.lower() in text_lower:
-                    found_terms.append(term)
+            hits = hits or self.scan_keywords(text)
+            found = hits.keywords('term')
+            found_terms = [term for term, term_lower in self._legal_terms_lower if term_lower in found]
             
             # Extract legal document references
             legal_refs = self._extract_legal_references(text)
@@ -225,7 +517,7 @@ class VietnameseTextProcessor:
             logging.error(f"Legal term extraction failed: {e}")
             return []
     
-    def extract_legal_entities(self, text: str) -> List[Dict[str, str]]:
+    def extract_legal_entities(self, text: str, hits: Optional[KeywordHits] = None) -> List[Dict[str, str]]:
         """Extract legal entities from Vietnamese text"""
         entities = []
         
@@ -247,7 +539,7 @@ class VietnameseTextProcessor:
             entities.extend(names)
             
             # 5. Extract legal procedures
-            procedures = self._extract_procedures(text)
+            procedures = self._extract_procedures(text, hits)
             entities.extend(procedures)
             
             return entities
@@ -258,32 +550,20 @@ class VietnameseTextProcessor:
     
     def _normalize_legal_terms(self, text: str) -> str:
         """Normalize Vietnamese legal terms"""
-        # Standardize common legal term variations
-        replacements = {
-            'Bộ luật dân sự': 'Bộ luật Dân sự',
-            'bộ luật dân sự': 'Bộ luật Dân sự',
-            'Bộ luật hình sự': 'Bộ luật Hình sự',
-            'bộ luật hình sự': 'Bộ luật Hình sự',
-            'Bộ luật lao động': 'Bộ luật Lao động',
-            'bộ luật lao động': 'Bộ luật Lao động',
-        }
-        
-        for old, new in replacements.items():
+        for old, new in LEGAL_TERM_REPLACEMENTS.items():
             text = text.replace(old, new)
         
         return text
     
     def _expand_abbreviations(self, text: str) -> str:
         """Expand Vietnamese legal abbreviations"""
-        for abbrev, full_form in self.legal_abbreviations.items():
-            text = re.sub(r'\b' + re.escape(abbrev) + r'\b', full_form, text)
-        
-        return text
+        lookup = self._abbreviation_lookup
+        return self._abbreviation_pattern.sub(lambda match: lookup[match.group(0).lower()], text)
     
     def _clean_token(self, token: str) -> str:
         """Clean individual token"""
         # Remove punctuation from ends
-        token = re.sub(r'^[^\w]+|[^\w]+$', '', token)
+        token = TOKEN_EDGE_PATTERN.sub('', token)
         
         # Keep only meaningful tokens
         if len(token) < 2:
@@ -295,19 +575,8 @@ class VietnameseTextProcessor:
         """Extract legal document references"""
         references = []
         
-        # Pattern for Vietnamese legal references
-        patterns = [
-            r'(Điều\s+\d+)',                          # Article references
-            r'(Khoản\s+\d+)',                         # Clause references  
-            r'(Chương\s+[IVX]+)',                     # Chapter references
-            r'(Mục\s+\d+)',                           # Section references
-            r'(Nghị định\s+\d+/\d+/NĐ-CP)',          # Decree references
-            r'(Thông tư\s+\d+/\d+/TT-[A-Z]+)',       # Circular references
-        ]
-        
-        for pattern in patterns:
-            matches = re.finditer(pattern, text, re.IGNORECASE)
-            for match in matches:
+        for pattern in LEGAL_REFERENCE_PATTERNS:
+            for match in pattern.finditer(text):
                 references.append(match.group(1))
         
         return references
@@ -317,9 +586,7 @@ class VietnameseTextProcessor:
         entities = []
         
         # Law references
-        law_pattern = r'(Luật|Bộ luật)\s+([^,.\n]+)'
-        matches = re.finditer(law_pattern, text, re.IGNORECASE)
-        for match in matches:
+        for match in LAW_REFERENCE_PATTERN.finditer(text):
             entities.append({
                 'type': 'legal_document',
                 'subtype': 'law',
@@ -334,16 +601,8 @@ class VietnameseTextProcessor:
         """Extract monetary amounts"""
         entities = []
         
-        # Vietnamese monetary patterns
-        patterns = [
-            r'(\d+(?:\.\d+)?)\s*(đồng|VND)',
-            r'(\d+(?:\.\d+)?)\s*(triệu|tỷ)\s*(đồng|VND)?',
-            r'(\d+(?:,\d+)*)\s*(đồng|VND)',
-        ]
-        
-        for pattern in patterns:
-            matches = re.finditer(pattern, text, re.IGNORECASE)
-            for match in matches:
+        for pattern in MONETARY_PATTERNS:
+            for match in pattern.finditer(text):
                 entities.append({
                     'type': 'monetary_amount',
                     'value': match.group(0),
@@ -357,17 +616,8 @@ class VietnameseTextProcessor:
         """Extract dates in Vietnamese format"""
         entities = []
         
-        # Vietnamese date patterns
-        patterns = [
-            r'(\d{1,2})/(\d{1,2})/(\d{4})',                    # dd/mm/yyyy
-            r'(\d{1,2})-(\d{1,2})-(\d{4})',                    # dd-mm-yyyy
-            r'ngày\s+(\d{1,2})\s+tháng\s+(\d{1,2})\s+năm\s+(\d{4})',  # Vietnamese format
-            r'(\d{4})-(\d{1,2})-(\d{1,2})',                    # yyyy-mm-dd
-        ]
-        
-        for pattern in patterns:
-            matches = re.finditer(pattern, text, re.IGNORECASE)
-            for match in matches:
+        for pattern in DATE_PATTERNS:
+            for match in pattern.finditer(text):
                 entities.append({
                     'type': 'date',
                     'value': match.group(0),
@@ -380,56 +630,38 @@ class VietnameseTextProcessor:
         """Extract person and organization names"""
         entities = []
         
-        # Vietnamese name patterns (basic)
-        # This is a simplified version - real implementation would use NER
-        patterns = [
-            r'(ông|bà|anh|chị)\s+([A-ZÀÁẠẢÃÂẦẤẬẨẪĂẰẮẶẲẴÈÉẸẺẼÊỀẾỆỂỄÌÍỊỈĨÒÓỌỎÕÔỒỐỘỔỖƠỜỚỢỞỠÙÚỤỦŨƯỪỨỰỬỮỲÝỴỶỸĐ][a-zàáạảãâầấậẩẫăằắặẳẵèéẹẻẽêềếệểễìíịỉĩòóọỏõôồốộổỗơờớợởỡùúụủũưừứựửữỳýỵỷỹđ]*(?:\s+[A-ZÀÁẠẢÃÂẦẤẬẨẪĂẰẮẶẲẴÈÉẸẺẼÊỀẾỆỂỄÌÍỊỈĨÒÓỌỎÕÔỒỐỘỔỖƠỜỚỢỞỠÙÚỤỦŨƯỪỨỰỬỮỲÝỴỶỸĐ][a-zàáạảãâầấậẩẫăằắặẳẵèéẹẻẽêềếệểễìíịỉĩòóọỏõôồốộổỗơờớợởỡùúụủũưừứựửữỳýỵỷỹđ]*)*)',
-            r'(Công ty|Doanh nghiệp|Tập đoàn|Ngân hàng)\s+([A-ZÀÁẠẢÃÂẦẤẬẨẪĂẰẮẶẲẴÈÉẸẺẼÊỀẾỆỂỄÌÍỊỈĨÒÓỌỎÕÔỒỐỘỔỖƠỜỚỢỞỠÙÚỤỦŨƯỪỨỰỬỮỲÝỴỶỸĐ][^,.\n]*)',
-        ]
-        
-        for pattern in patterns:
-            matches = re.finditer(pattern, text)
-            for match in matches:
-                if 'ông|bà|anh|chị' in pattern:
-                    entities.append({
-                        'type': 'person',
-                        'value': match.group(0),
-                        'title': match.group(1),
-                        'name': match.group(2)
-                    })
-                else:
-                    entities.append({
-                        'type': 'organization',
-                        'value': match.group(0),
-                        'org_type': match.group(1),
-                        'org_name': match.group(2)
-                    })
+        for match in PERSON_NAME_PATTERN.finditer(text):
+            entities.append({
+                'type': 'person',
+                'value': match.group(0),
+                'title': match.group(1),
+                'name': match.group(2)
+            })
+        for match in ORGANIZATION_NAME_PATTERN.finditer(text):
+            entities.append({
+                'type': 'organization',
+                'value': match.group(0),
+                'org_type': match.group(1),
+                'org_name': match.group(2)
+            })
         
         return entities
     
-    def _extract_procedures(self, text: str) -> List[Dict[str, str]]:
+    def _extract_procedures(self, text: str, hits: Optional[KeywordHits] = None) -> List[Dict[str, str]]:
         """Extract legal procedures and processes"""
-        entities = []
+        hits = hits or self.scan_keywords(text)
+        # Offsets refer to the lowercased text; they match the original unless lowering changed its length
+        same_offsets = len(text.lower()) == len(text)
         
-        # Legal procedure patterns
-        procedures = [
-            'khởi kiện', 'tố tụng', 'phúc thẩm', 'giám đốc thẩm',
-            'hòa giải', 'trọng tài', 'thi hành án', 'cưỡng chế',
-            'kháng cáo', 'kháng nghị', 'tạm giam', 'tạm giữ',
-            'điều tra', 'truy tố', 'xét xử', 'tuyên án'
+        matches = sorted(hits.of('procedure'), key=lambda match: (PROCEDURE_ORDER[match.label], match.start))
+        return [
+            {
+                'type': 'legal_procedure',
+                'value': text[match.start:match.end] if same_offsets else match.keyword,
+                'procedure_type': match.label
+            }
+            for match in matches
         ]
-        
-        for procedure in procedures:
-            pattern = r'\b' + re.escape(procedure) + r'\b'
-            matches = re.finditer(pattern, text, re.IGNORECASE)
-            for match in matches:
-                entities.append({
-                    'type': 'legal_procedure',
-                    'value': match.group(0),
-                    'procedure_type': procedure
-                })
-        
-        return entities
     
     def _get_context_around_keyword(self, text: str, keyword: str, window: int = 50) -> str:
         """Get context around a keyword"""
@@ -441,40 +673,33 @@ class VietnameseTextProcessor:
         # TODO: Implement date normalization
         return date_str
     
-    def _calculate_language_confidence(self, text: str) -> float:
-        """Calculate confidence that text is Vietnamese"""
-        # Simple heuristic based on Vietnamese characters
-        vietnamese_chars = 'àáạảãâầấậẩẫăằắặẳẵèéẹẻẽêềếệểễìíịỉĩòóọỏõôồốộổỗơờớợởỡùúụủũưừứựửữỳýỵỷỹđ'
-        
-        total_chars = len([c for c in text.lower() if c.isalpha()])
+    def _calculate_language_confidence(self, text: str, hits: Optional[KeywordHits] = None) -> float:
+        """Calculate confidence that text is Vietnamese (hits: keyword scan of the same text)"""
+        # Simple heuristic based on Vietnamese characters (one counting pass over the text)
+        text_lower = text.lower()
+        char_counts = Counter(text_lower)
+        total_chars = sum(count for char, count in char_counts.items() if char.isalpha())
         if total_chars == 0:
             return 0.0
         
-        vietnamese_char_count = len([c for c in text.lower() if c in vietnamese_chars])
+        vietnamese_char_count = sum(count for char, count in char_counts.items() if char in VIETNAMESE_CHARACTERS)
         confidence = vietnamese_char_count / total_chars
         
         # Boost confidence if common Vietnamese words are found
-        common_vn_words = ['và', 'của', 'trong', 'với', 'về', 'cho', 'từ', 'theo', 'như']
-        word_boost = sum(1 for word in common_vn_words if word in text.lower()) * 0.05
+        if hits is None:
+            word_boost = sum(1 for word in COMMON_VIETNAMESE_WORDS if word in text_lower) * 0.05
+        else:
+            word_boost = hits.count('common_word') * 0.05
         
         return min(1.0, confidence + word_boost)
     
-    def get_legal_domain(self, text: str) -> str:
+    def get_legal_domain(self, text: str, hits: Optional[KeywordHits] = None) -> str:
         """Determine legal domain from Vietnamese text"""
-        text_lower = text.lower()
-        
-        # Legal domain keywords
-        domain_keywords = {
-            'dan_su': ['dân sự', 'hợp đồng', 'tài sản', 'quyền sở hữu', 'bồi thường', 'thừa kế'],
-            'hinh_su': ['hình sự', 'tội phạm', 'hình phạt', 'án tù', 'vi phạm pháp luật'],
-            'lao_dong': ['lao động', 'người lao động', 'hợp đồng lao động', 'bảo hiểm xã hội', 'thời gian làm việc'],
-            'thuong_mai': ['thương mại', 'kinh doanh', 'công ty', 'doanh nghiệp', 'đăng ký kinh doanh'],
-            'hanh_chinh': ['hành chính', 'thủ tục', 'cấp phép', 'đăng ký', 'giấy phép']
-        }
+        hits = hits or self.scan_keywords(text)
         
         domain_scores = {}
-        for domain, keywords in domain_keywords.items():
-            score = sum(1 for keyword in keywords if keyword in text_lower)
+        for domain in DOMAIN_KEYWORDS:
+            score = hits.count('domain', domain)
             if score > 0:
                 domain_scores[domain] = score
         
@@ -487,21 +712,8 @@ class VietnameseTextProcessor:
         """Extract Vietnamese legal citations"""
         citations = []
         
-        # Legal citation patterns
-        patterns = [
-            # Law citations
-            r'(Luật|Bộ luật)\s+([^,.\n\d]+)\s+(\d{4})',
-            # Article citations  
-            r'Điều\s+(\d+)\s+(Luật|Bộ luật)\s+([^,.\n\d]+)\s+(\d{4})',
-            # Decree citations
-            r'Nghị định\s+(\d+)/(\d{4})/NĐ-CP',
-            # Circular citations
-            r'Thông tư\s+(\d+)/(\d{4})/TT-([A-Z]+)',
-        ]
-        
-        for pattern in patterns:
-            matches = re.finditer(pattern, text, re.IGNORECASE)
-            for match in matches:
+        for pattern in CITATION_PATTERNS:
+            for match in pattern.finditer(text):
                 citation = {
                     'type': 'legal_citation',
                     'full_text': match.group(0),
@@ -525,16 +737,9 @@ class VietnameseTextProcessor:
         return min(vietnamese_count / total_chars * 2, 1.0)  # Scale up for better sensitivity
     
     def _load_legal_terms(self) -> List[str]:
-        """Load Vietnamese legal terms dictionary"""
+        """Load Vietnamese legal terms dictionary (shared LEGAL_TERMS table)"""
         # TODO: Load from external file or database
-        return [
-            'Bộ luật Dân sự', 'Bộ luật Hình sự', 'Bộ luật Lao động',
-            'Hiến pháp', 'Luật Thương mại', 'Luật Hành chính',
-            'hợp đồng', 'tài sản', 'quyền sở hữu', 'nghĩa vụ',
-            'vi phạm', 'trách nhiệm', 'bồi thường', 'tội phạm',
-            'hình phạt', 'an toàn lao động', 'bảo hiểm xã hội',
-            'thủ tục hành chính', 'cấp phép', 'đăng ký kinh doanh'
-        ]
+        return list(LEGAL_TERMS)
     
     def _load_vietnamese_stopwords(self) -> Set[str]:
         """Load Vietnamese stopwords"""
@@ -546,23 +751,14 @@ class VietnameseTextProcessor:
         }
     
     def _load_legal_abbreviations(self) -> Dict[str, str]:
-        """Load Vietnamese legal abbreviations"""
-        return {
-            'NĐ-CP': 'Nghị định của Chính phủ',
-            'TT': 'Thông tư',
-            'QĐ': 'Quyết định',
-            'CV': 'Công văn',
-            'TB': 'Thông báo',
-            'BLHS': 'Bộ luật Hình sự',
-            'BLDS': 'Bộ luật Dân sự',
-            'BLLD': 'Bộ luật Lao động'
-        }
+        """Load Vietnamese legal abbreviations (shared LEGAL_ABBREVIATIONS table)"""
+        return dict(LEGAL_ABBREVIATIONS)
 
 class VietnameseQueryPreprocessor:
     """Preprocessor specifically for Vietnamese legal queries"""
     
-    def __init__(self):
-        self.text_processor = VietnameseTextProcessor()
+    def __init__(self, text_processor: Optional[VietnameseTextProcessor] = None):
+        self.text_processor = text_processor or get_text_processor()
     
     def preprocess_query(self, query: str) -> Dict[str, Any]:
         """Preprocess Vietnamese legal query for better search"""
@@ -570,14 +766,15 @@ class VietnameseQueryPreprocessor:
             # Process text
             analysis = self.text_processor.process_legal_text(query)
             
-            # Extract intent
-            intent = self._extract_query_intent(query)
+            # Extract intent (one keyword pass shared with constraint extraction)
+            hits = self.text_processor.scan_keywords(analysis.normalized_text)
+            intent = self._extract_query_intent(query, hits)
             
             # Generate search keywords
             search_keywords = self._generate_search_keywords(analysis)
             
             # Extract constraints
-            constraints = self._extract_query_constraints(analysis)
+            constraints = self._extract_query_constraints(analysis, hits)
             
             return {
                 'original_query': query,
@@ -603,20 +800,14 @@ class VietnameseQueryPreprocessor:
                 'language_confidence': 0.5
             }
     
-    def _extract_query_intent(self, query: str) -> str:
+    def _extract_query_intent(self, query: str, hits: Optional[KeywordHits] = None) -> str:
         """Extract intent from Vietnamese legal query"""
-        query_lower = query.lower()
-        
-        if any(word in query_lower for word in ['cách', 'làm thế nào', 'thủ tục']):
-            return 'procedure_inquiry'
-        elif any(word in query_lower for word in ['có được', 'có thể', 'quyền']):
-            return 'rights_inquiry'
-        elif any(word in query_lower for word in ['phải', 'bắt buộc', 'nghĩa vụ']):
-            return 'obligation_inquiry'
-        elif any(word in query_lower for word in ['vi phạm', 'sai', 'lỗi']):
-            return 'violation_inquiry'
-        else:
-            return 'information_inquiry'
+        hits = hits or self.text_processor.scan_keywords(query)
+        
+        for intent in INTENT_KEYWORDS:
+            if hits.has('intent', intent):
+                return intent
+        return 'information_inquiry'
     
     def _generate_search_keywords(self, analysis: VietnameseTextAnalysis) -> List[str]:
         """Generate optimized search keywords"""
@@ -636,7 +827,11 @@ class VietnameseQueryPreprocessor:
         
         return list(set(keywords))  # Remove duplicates
     
-    def _extract_query_constraints(self, analysis: VietnameseTextAnalysis) -> Dict[str, Any]:
+    def _extract_query_constraints(
+        self,
+        analysis: VietnameseTextAnalysis,
+        hits: Optional[KeywordHits] = None
+    ) -> Dict[str, Any]:
         """Extract constraints from query"""
         constraints = {}
         
@@ -651,51 +846,123 @@ class VietnameseQueryPreprocessor:
             constraints['amount_range'] = amount_entities
         
         # Legal domain constraints
-        domain_keywords = {
-            'dân sự': 'dan_su',
-            'hình sự': 'hinh_su', 
-            'lao động': 'lao_dong',
-            'thương mại': 'thuong_mai'
-        }
-        
-        for keyword, domain in domain_keywords.items():
-            if keyword in analysis.normalized_text.lower():
+        hits = hits or self.text_processor.scan_keywords(analysis.normalized_text)
+        for domain in CONSTRAINT_DOMAIN_KEYWORDS:
+            if hits.has('constraint_domain', domain):
                 constraints['legal_domain'] = domain
                 break
         
         return constraints
 
 
-# Utility functions for external use
+_text_processor: Optional[VietnameseTextProcessor] = None
+_query_preprocessor: Optional[VietnameseQueryPreprocessor] = None
+_processor_lock = threading.Lock()
+_keyword_matcher: Optional[AhoCorasickMatcher] = None
+_keyword_matcher_lock = threading.Lock()
+
+
+def get_keyword_matcher() -> AhoCorasickMatcher:
+    """
+    Lấy automaton từ khóa dùng chung trong process (text processor, RAG, validator)
+    Get the process-wide keyword automaton built by build_keyword_matcher()
+    """
+    global _keyword_matcher
+    if _keyword_matcher is None:
+        with _keyword_matcher_lock:
+            if _keyword_matcher is None:
+                _keyword_matcher = build_keyword_matcher()
+    return _keyword_matcher
+
+
+def get_text_processor() -> VietnameseTextProcessor:
+    """
+    Lấy processor dùng chung trong process (chỉ đọc, an toàn đa luồng)
+    Get the process-wide shared text processor
+    """
+    global _text_processor
+    if _text_processor is None:
+        with _processor_lock:
+            if _text_processor is None:
+                _text_processor = VietnameseTextProcessor()
+    return _text_processor
+
+
+def get_query_preprocessor() -> VietnameseQueryPreprocessor:
+    """
+    Lấy query preprocessor dùng chung trong process
+    Get the process-wide shared query preprocessor
+    """
+    global _query_preprocessor
+    if _query_preprocessor is None:
+        processor = get_text_processor()
+        with _processor_lock:
+            if _query_preprocessor is None:
+                _query_preprocessor = VietnameseQueryPreprocessor(processor)
+    return _query_preprocessor
+
+
+# Processor của process con trong process_legal_texts
+_batch_processor: Optional[VietnameseTextProcessor] = None
+
+
+def _init_batch_worker(processor_class: Type[VietnameseTextProcessor]) -> None:
+    """Dựng processor một lần cho mỗi process con"""
+    global _batch_processor
+    if processor_class is VietnameseTextProcessor:
+        _batch_processor = get_text_processor()
+    else:
+        _batch_processor = processor_class()
+
+
+def _process_batch_chunk(texts: List[str]) -> List[VietnameseTextAnalysis]:
+    """Phân tích một chunk trong process con"""
+    processor = _batch_processor or get_text_processor()
+    return [processor.process_legal_text(text) for text in texts]
+
+
+def _chunked(texts: Iterable[str], size: int) -> Iterator[List[str]]:
+    """Chia iterable thành các list tối đa `size` phần tử"""
+    iterator = iter(texts)
+    while True:
+        chunk = list(islice(iterator, max(1, size)))
+        if not chunk:
+            return
+        yield chunk
+
+
+# Utility functions for external use (shared processor, no per-call setup)
 def process_vietnamese_legal_text(text: str) -> VietnameseTextAnalysis:
     """Quick function to process Vietnamese legal text"""
-    processor = VietnameseTextProcessor()
-    return processor.process_legal_text(text)
+    return get_text_processor().process_legal_text(text)
+
+def process_vietnamese_legal_texts(
+    texts: Iterable[str],
+    workers: int = 1,
+    chunk_size: int = 64
+) -> Iterator[VietnameseTextAnalysis]:
+    """Quick function to analyze many Vietnamese legal texts (optionally across processes)"""
+    return get_text_processor().process_legal_texts(texts, workers=workers, chunk_size=chunk_size)
 
 def preprocess_vietnamese_query(query: str) -> Dict[str, Any]:
     """Quick function to preprocess Vietnamese legal query"""
-    preprocessor = VietnameseQueryPreprocessor()
-    return preprocessor.preprocess_query(query)
+    return get_query_preprocessor().preprocess_query(query)
 
 def extract_legal_terms(text: str) -> List[str]:
     """Quick function to extract legal terms from text"""
-    processor = VietnameseTextProcessor()
-    return processor.extract_legal_terms(text)
+    return get_text_processor().extract_legal_terms(text)
 
 def get_legal_domain(text: str) -> str:
     """Quick function to get legal domain from text"""
-    processor = VietnameseTextProcessor()
-    return processor.get_legal_domain(text)
+    return get_text_processor().get_legal_domain(text)
 
 def extract_legal_citations(text: str) -> List[Dict[str, str]]:
     """Quick function to extract legal citations"""
-    processor = VietnameseTextProcessor()
-    return processor.extract_legal_citations(text)
+    return get_text_processor().extract_legal_citations(text)
 
 def normalize_vietnamese_text(text: str) -> str:
     """Quick function to normalize Vietnamese text"""
-    processor = VietnameseTextProcessor()
-    return processor.normalize_vietnamese_text(text)
+    return get_text_processor().normalize_vietnamese_text(text)
 
 # Test function
 def test_vietnamese_text_processing():
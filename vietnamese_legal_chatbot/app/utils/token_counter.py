@@ -0,0 +1,104 @@
+"""
+Token Counter for Vietnamese Legal AI Chatbot
+Bộ đếm token cho Chatbot AI Pháp lý Việt Nam
+
+Counts tokens for OpenAI models (tiktoken when available, UTF-8 byte heuristic otherwise)
+and groups texts into token-bounded batches.
+Đếm token cho model OpenAI và chia văn bản thành các batch giới hạn theo số token.
+"""
+
+import math
+import logging
+from functools import lru_cache
+from typing import Any, List, Optional, Sequence
+
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    TIKTOKEN_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ENCODING = "cl100k_base"
+
+
+@lru_cache(maxsize=16)
+def _get_encoding(model: str) -> Optional[Any]:
+    """
+    Lấy tokenizer cho model, None nếu không dùng được tiktoken
+    (kết quả được cache nên cảnh báo dùng ước lượng chỉ ghi một lần cho mỗi model)
+    """
+    if not TIKTOKEN_AVAILABLE:
+        logger.warning(f"tiktoken chưa được cài đặt: số token của {model} được ước lượng theo byte UTF-8")
+        return None
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        pass
+    except Exception as e:
+        logger.warning(f"Không thể tải tokenizer cho {model}, dùng ước lượng theo byte UTF-8: {e}")
+        return None
+    try:
+        return tiktoken.get_encoding(DEFAULT_ENCODING)
+    except Exception as e:
+        logger.warning(f"Không thể tải tokenizer {DEFAULT_ENCODING}, dùng ước lượng theo byte UTF-8: {e}")
+        return None
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Ước lượng số token khi không có tiktoken
+    Byte-level BPE averages ~4 UTF-8 bytes per token; Vietnamese diacritics take 2-3 bytes each,
+    so counting bytes keeps the estimate conservative for Vietnamese text.
+    """
+    if not text:
+        return 0
+    return math.ceil(len(text.encode("utf-8")) / 4)
+
+
+def count_tokens(text: str, model: str = "text-embedding-3-small") -> int:
+    """Đếm số token của văn bản cho model"""
+    encoding = _get_encoding(model)
+    if encoding is None:
+        return estimate_tokens(text)
+    return len(encoding.encode(text or "", disallowed_special=()))
+
+
+def batch_by_tokens(
+    texts: Sequence[str],
+    max_tokens: int,
+    max_items: Optional[int] = None,
+    model: str = "text-embedding-3-small"
+) -> List[List[int]]:
+    """
+    Chia văn bản thành các batch theo giới hạn token (và số lượng)
+    Group texts into batches bounded by total tokens and item count
+
+    Args:
+        texts: Danh sách văn bản
+        max_tokens: Tổng số token tối đa mỗi batch
+        max_items: Số văn bản tối đa mỗi batch
+        model: Model dùng để đếm token
+
+    Returns:
+        List[List[int]]: Chỉ số văn bản của từng batch, giữ nguyên thứ tự
+    """
+    batches: List[List[int]] = []
+    current: List[int] = []
+    current_tokens = 0
+
+    for i, text in enumerate(texts):
+        tokens = count_tokens(text, model)
+        over_tokens = current_tokens + tokens > max_tokens
+        over_items = max_items is not None and len(current) >= max_items
+        if current and (over_tokens or over_items):
+            batches.append(current)
+            current, current_tokens = [], 0
+        # Văn bản vượt giới hạn vẫn được xếp vào một batch riêng
+        current.append(i)
+        current_tokens += tokens
+
+    if current:
+        batches.append(current)
+    return batches
@@ -0,0 +1,384 @@
+"""
+Vietnamese Word Segmenter for Legal AI Chatbot
+Tách từ tiếng Việt cho Chatbot AI Pháp lý
+
+Offline, dictionary-driven word segmentation: multi-syllable words ("người sử dụng lao động",
+"bồi thường thiệt hại") are kept as one token by forward longest matching over a
+syllable-level double-array trie. The compiled dictionary is a flat binary file that is
+memory-mapped, so loading a large lexicon costs no parsing and is shared between processes.
+Tách từ theo từ điển (khớp dài nhất) trên double-array trie, từ điển nạp bằng mmap.
+"""
+
+import os
+import re
+import mmap
+import array
+import struct
+import logging
+import unicodedata
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Cắt dấu câu ở hai đầu âm tiết (giống VietnameseTextProcessor._clean_token)
+SYLLABLE_EDGE_PATTERN = re.compile(r'^[^\w]+|[^\w]+$')
+
+# Magic, số âm tiết, số byte từ vựng, số trạng thái, số từ
+_HEADER = struct.Struct("<8sIIII")
+_MAGIC = b"VNSEG\x00\x01\x00"
+_ROOT = 0
+_TERMINAL_CODE = 0
+
+# Từ ghép pháp lý thông dụng (bổ sung cho từ vựng của VietnameseTextProcessor)
+LEGAL_LEXICON = (
+    # Chủ thể
+    "người lao động", "người sử dụng lao động", "người đại diện", "người đại diện theo pháp luật",
+    "người bị hại", "người bị kết án", "người thừa kế", "người chưa thành niên", "công dân",
+    "cá nhân", "pháp nhân", "tổ chức", "doanh nghiệp", "công ty", "hộ gia đình", "vợ chồng",
+    "cha mẹ", "con cái", "bên mua", "bên bán", "bên thuê", "bên cho thuê", "đương sự",
+    "bị cáo", "bị can", "bị đơn", "nguyên đơn", "người làm chứng", "luật sư",
+
+    # Cơ quan nhà nước
+    "quốc hội", "chính phủ", "thủ tướng", "bộ trưởng", "tòa án", "tòa án nhân dân",
+    "viện kiểm sát", "viện kiểm sát nhân dân", "công an", "cơ quan nhà nước",
+    "cơ quan điều tra", "cơ quan thi hành án", "ủy ban nhân dân", "hội đồng nhân dân",
+    "bộ tư pháp", "bộ công an", "cục pháp chế", "nhà nước",
+
+    # Văn bản pháp luật
+    "hiến pháp", "bộ luật", "nghị quyết", "nghị định", "thông tư", "quyết định",
+    "chỉ thị", "pháp lệnh", "công văn", "thông báo", "văn bản", "văn bản pháp luật",
+    "văn bản quy phạm pháp luật", "pháp luật", "điều khoản", "hiệu lực",
+
+    # Lĩnh vực
+    "dân sự", "hình sự", "lao động", "thương mại", "hành chính", "hôn nhân", "gia đình",
+    "hôn nhân gia đình", "bất động sản", "đất đai", "môi trường", "thuế", "kinh doanh",
+
+    # Quyền, nghĩa vụ, trách nhiệm
+    "quyền dân sự", "quyền con người", "quyền cơ bản", "nghĩa vụ", "nghĩa vụ công dân",
+    "quyền sở hữu", "quyền sử dụng", "quyền sử dụng đất", "quyền thừa kế", "quyền tác giả",
+    "quyền lợi", "lợi ích", "hợp pháp", "trách nhiệm", "trách nhiệm hình sự",
+    "trách nhiệm dân sự", "trách nhiệm bồi thường", "bồi thường", "bồi thường thiệt hại",
+    "thiệt hại", "tài sản", "thừa kế", "di chúc", "sở hữu",
+
+    # Hợp đồng và lao động
+    "hợp đồng", "hợp đồng lao động", "hợp đồng mua bán", "hợp đồng thuê", "giao kết",
+    "chấm dứt", "đơn phương", "thời gian làm việc", "thời giờ làm việc", "thời giờ nghỉ ngơi",
+    "làm thêm giờ", "tiền lương", "tiền công", "bảo hiểm", "bảo hiểm xã hội", "bảo hiểm y tế",
+    "bảo hiểm thất nghiệp", "an toàn lao động", "kỷ luật lao động", "thử việc", "trợ cấp",
+
+    # Vi phạm và chế tài
+    "vi phạm", "vi phạm pháp luật", "vi phạm hành chính", "tội phạm", "hình phạt", "án tù",
+    "xử phạt", "xử phạt vi phạm hành chính", "phạt tiền", "cảnh cáo", "tịch thu",
+
+    # Thủ tục
+    "thủ tục", "thủ tục hành chính", "khởi kiện", "tố tụng", "tố tụng dân sự",
+    "tố tụng hình sự", "sơ thẩm", "phúc thẩm", "giám đốc thẩm", "tái thẩm", "hòa giải",
+    "trọng tài", "thi hành án", "cưỡng chế", "kháng cáo", "kháng nghị", "tạm giam",
+    "tạm giữ", "điều tra", "truy tố", "xét xử", "tuyên án", "án phí", "cấp phép",
+    "giấy phép", "đăng ký", "đăng ký kinh doanh", "hồ sơ", "thời hạn", "thời hiệu",
+    "giải quyết", "tranh chấp", "khiếu nại", "tố cáo",
+
+    # Từ chức năng thường gặp
+    "quy định", "căn cứ", "trên cơ sở", "phù hợp", "tuân thủ", "thực hiện", "áp dụng",
+    "ban hành", "có hiệu lực", "trường hợp", "theo như", "bao gồm", "như thế nào",
+    "làm thế nào", "bao lâu", "bao nhiêu",
+)
+
+
+def split_syllables(word: str) -> List[str]:
+    """Âm tiết (chữ thường, NFC) của một từ"""
+    return unicodedata.normalize('NFC', word).lower().split()
+
+
+class DoubleArrayTrie:
+    """
+    Double-array trie trên mã âm tiết
+    Syllable-level double-array trie: state s moves on syllable code c to t = base[s] + c
+    when check[t] == s; a word ends at s when check[base[s]] == s (code 0 is the terminal)
+    """
+
+    def __init__(
+        self,
+        codes: Dict[str, int],
+        base: Sequence[int],
+        check: Sequence[int],
+        word_count: int,
+        buffer: Optional[mmap.mmap] = None
+    ):
+        self.codes = codes
+        self.base = base
+        self.check = check
+        self.word_count = word_count
+        self._size = len(check)
+        self._buffer = buffer
+        self._view: Optional[memoryview] = None
+
+    @classmethod
+    def build(cls, words: Iterable[str]) -> "DoubleArrayTrie":
+        """Dựng trie từ danh sách từ (mỗi từ gồm các âm tiết cách nhau bởi khoảng trắng)"""
+        # Trie thường: mỗi nút là {mã âm tiết: nút con}
+        codes: Dict[str, int] = {}
+        nodes: List[Dict[int, int]] = [{}]
+        words_seen = set()
+        for word in words:
+            syllables = split_syllables(word)
+            if not syllables or tuple(syllables) in words_seen:
+                continue
+            words_seen.add(tuple(syllables))
+            node = 0
+            for syllable in syllables:
+                code = codes.setdefault(syllable, len(codes) + 1)
+                child = nodes[node].get(code)
+                if child is None:
+                    child = len(nodes)
+                    nodes[node][code] = child
+                    nodes.append({})
+                node = child
+            nodes[node][_TERMINAL_CODE] = -1
+
+        builder = _DoubleArrayBuilder()
+        # BFS: đặt các nút con của mỗi trạng thái vào các ô trống
+        order = deque([(0, _ROOT)])
+        while order:
+            node, state = order.popleft()
+            children = sorted(nodes[node])
+            if not children:
+                continue
+            offset = builder.place(state, children)
+            for code in children:
+                if code != _TERMINAL_CODE:
+                    order.append((nodes[node][code], offset + code))
+
+        base, check = builder.arrays()
+        trie = cls(codes, base, check, len(words_seen))
+        logger.debug(f"Double-array trie built: {trie.word_count} words, {len(codes)} syllables, {len(check)} slots")
+        return trie
+
+    def save(self, path: str) -> None:
+        """Ghi từ điển đã biên dịch ra file nhị phân (nạp lại bằng load)"""
+        syllables = sorted(self.codes, key=self.codes.get)
+        vocabulary = "\n".join(syllables).encode("utf-8")
+        vocabulary += b"\x00" * (-len(vocabulary) % 4)
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(_HEADER.pack(_MAGIC, len(syllables), len(vocabulary), self._size, self.word_count))
+            f.write(vocabulary)
+            f.write(array.array('i', self.base).tobytes())
+            f.write(array.array('i', self.check).tobytes())
+
+    @classmethod
+    def load(cls, path: str) -> "DoubleArrayTrie":
+        """Nạp từ điển bằng mmap (mảng base/check đọc thẳng từ file, không sao chép)"""
+        with open(path, "rb") as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, syllable_count, vocabulary_size, size, word_count = _HEADER.unpack_from(buffer, 0)
+        if magic != _MAGIC:
+            buffer.close()
+            raise ValueError(f"{path} is not a compiled segmenter dictionary")
+
+        offset = _HEADER.size
+        vocabulary = bytes(buffer[offset:offset + vocabulary_size]).rstrip(b"\x00").decode("utf-8")
+        codes = {syllable: code for code, syllable in enumerate(vocabulary.split("\n"), 1)} if syllable_count else {}
+        offset += vocabulary_size
+        view = memoryview(buffer)
+        base = view[offset:offset + 4 * size].cast('i')
+        check = view[offset + 4 * size:offset + 8 * size].cast('i')
+        trie = cls(codes, base, check, word_count, buffer)
+        trie._view = view
+        return trie
+
+    def close(self) -> None:
+        """Giải phóng mmap (nếu nạp từ file)"""
+        if self._buffer is not None:
+            self.base.release()
+            self.check.release()
+            self._view.release()
+            self._buffer.close()
+            self._buffer = None
+
+    def __len__(self) -> int:
+        return self.word_count
+
+    def __contains__(self, word: str) -> bool:
+        syllables = split_syllables(word)
+        return bool(syllables) and self.longest_match(syllables, 0, len(syllables)) == len(syllables)
+
+    def longest_match(self, keys: Sequence[str], start: int, stop: int) -> int:
+        """Số âm tiết của từ dài nhất trong từ điển bắt đầu tại keys[start] (0 nếu không có)"""
+        codes, base, check, size = self.codes, self.base, self.check, self._size
+        state, matched = _ROOT, 0
+        for index in range(start, stop):
+            code = codes.get(keys[index])
+            if code is None:
+                break
+            target = base[state] + code
+            if target >= size or check[target] != state:
+                break
+            state = target
+            terminal = base[state]
+            if terminal < size and check[terminal] == state:
+                matched = index - start + 1
+        return matched
+
+
+class _DoubleArrayBuilder:
+    """Cấp phát ô cho double array; các ô trống nằm trong danh sách liên kết đôi"""
+
+    def __init__(self):
+        self.base = array.array('i', [0])
+        self.check = array.array('i', [_ROOT])
+        self.next_free = array.array('i', [-1])
+        self.prev_free = array.array('i', [-1])
+        self.head = -1
+        self.tail = -1
+
+    def _grow(self, size: int) -> None:
+        old = len(self.check)
+        if size <= old:
+            return
+        new = max(size, old * 2)
+        self.base.extend([0] * (new - old))
+        self.check.extend([-1] * (new - old))
+        self.next_free.extend(range(old + 1, new + 1))
+        self.prev_free.extend(range(old - 1, new - 1))
+        self.next_free[new - 1] = -1
+        self.prev_free[old] = self.tail
+        if self.tail >= 0:
+            self.next_free[self.tail] = old
+        else:
+            self.head = old
+        self.tail = new - 1
+
+    def _occupy(self, position: int, state: int) -> None:
+        self.check[position] = state
+        previous, following = self.prev_free[position], self.next_free[position]
+        if previous >= 0:
+            self.next_free[previous] = following
+        else:
+            self.head = following
+        if following >= 0:
+            self.prev_free[following] = previous
+        else:
+            self.tail = previous
+
+    def place(self, state: int, children: List[int]) -> int:
+        """Tìm base đầu tiên mà mọi ô base + mã con đều trống, rồi chiếm các ô đó"""
+        first, last = children[0], children[-1]
+        if self.head < 0:
+            self._grow(len(self.check) + 1)
+        position = self.head
+        while True:
+            offset = position - first
+            if offset >= 1:
+                self._grow(offset + last + 1)
+                check = self.check
+                if all(check[offset + code] == -1 for code in children):
+                    break
+            following = self.next_free[position]
+            if following < 0:
+                self._grow(len(self.check) + 1)
+                following = self.next_free[position]
+            position = following
+
+        self.base[state] = offset
+        for code in children:
+            self._occupy(offset + code, state)
+        return offset
+
+    def arrays(self) -> Tuple[array.array, array.array]:
+        """Mảng base/check đã bỏ phần trống ở cuối"""
+        size = len(self.check)
+        while size > 1 and self.check[size - 1] == -1:
+            size -= 1
+        return self.base[:size], self.check[:size]
+
+
+class VietnameseWordSegmenter:
+    """
+    Tách từ theo từ điển, khớp dài nhất từ trái sang phải
+    Forward longest-match segmentation; punctuation between syllables ends a word
+    """
+
+    def __init__(self, trie: DoubleArrayTrie):
+        self.trie = trie
+
+    def segment(self, text: str, decompound: bool = False) -> List[str]:
+        """
+        Tách văn bản thành từ (giữ nguyên hoa thường, các âm tiết nối bằng khoảng trắng)
+
+        Args:
+            text: Văn bản (nên đã chuẩn hóa NFC)
+            decompound: Thêm các từ con ngay sau mỗi từ ghép ("hợp đồng mua bán" ->
+                "hợp đồng", "mua bán"), để tìm kiếm từ vựng vẫn khớp từ ngắn hơn
+
+        Returns:
+            List[str]: Các từ, đã bỏ dấu câu ở hai đầu
+        """
+        syllables, keys, breaks = self._syllables(text)
+        words = []
+        index, count = 0, len(syllables)
+        longest_match = self.trie.longest_match
+        while index < count:
+            # Không ghép qua dấu câu: giới hạn ở âm tiết kết thúc cụm
+            stop = breaks[index]
+            length = longest_match(keys, index, stop) or 1
+            if length == 1:
+                words.append(syllables[index])
+            else:
+                words.append(" ".join(syllables[index:index + length]))
+                if decompound:
+                    words.extend(self._parts(syllables, keys, index, index + length))
+            index += length
+        return words
+
+    def _parts(self, syllables: List[str], keys: List[str], start: int, stop: int) -> List[str]:
+        """Tách lại một từ ghép thành các từ ngắn hơn (khớp dài nhất, không lấy cả từ)"""
+        parts = []
+        index = start
+        while index < stop:
+            limit = stop - 1 if index == start else stop
+            length = self.trie.longest_match(keys, index, limit) or 1
+            parts.append(" ".join(syllables[index:index + length]))
+            index += length
+        return parts
+
+    def _syllables(self, text: str) -> Tuple[List[str], List[str], List[int]]:
+        """Âm tiết, khóa tra cứu (chữ thường) và vị trí kết thúc cụm chứa mỗi âm tiết"""
+        syllables: List[str] = []
+        closed_right: List[bool] = []
+        for token in text.split():
+            syllable = SYLLABLE_EDGE_PATTERN.sub('', token)
+            if not syllable:
+                if closed_right:
+                    closed_right[-1] = True
+                continue
+            if syllables and not token.startswith(syllable):
+                closed_right[-1] = True
+            syllables.append(syllable)
+            closed_right.append(not token.endswith(syllable))
+
+        keys = [syllable.lower() for syllable in syllables]
+        breaks = [0] * len(syllables)
+        stop = len(syllables)
+        for index in range(len(syllables) - 1, -1, -1):
+            if closed_right[index]:
+                stop = index + 1
+            breaks[index] = stop
+        return syllables, keys, breaks
+
+
+def load_segmenter_dictionary(words: Iterable[str], path: Optional[str] = None) -> DoubleArrayTrie:
+    """
+    Nạp từ điển biên dịch từ `path` (mmap) nếu có, ngược lại dựng từ `words`
+    Load the compiled dictionary at `path`, falling back to building one from `words`
+    """
+    if path and os.path.exists(path):
+        try:
+            trie = DoubleArrayTrie.load(path)
+            logger.info(f"Loaded segmenter dictionary with {len(trie)} words from {path}")
+            return trie
+        except Exception as e:
+            logger.warning(f"Could not load segmenter dictionary from {path}: {e}")
+    return DoubleArrayTrie.build(words)
@@ -0,0 +1,98 @@
+"""
+ANN Benchmark Script for Vietnamese Legal AI Chatbot
+Script đo hiệu năng chỉ mục gần đúng cho Chatbot AI Pháp lý Việt Nam
+
+Reports recall@k and query latency of the HNSW index against the exact (flat) scorer
+on a held-out query set.
+Báo cáo recall@k và độ trễ truy vấn của HNSW so với tìm kiếm chính xác.
+
+Usage:
+    python scripts/benchmark_ann.py --count 20000 --dimension 128
+    python scripts/benchmark_ann.py --vectors embeddings.npy --queries 500
+"""
+
+import sys
+import time
+import argparse
+from pathlib import Path
+
+import numpy as np
+
+# Add app directory to Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.services.ann_index import HNSWIndex
+
+
+def load_vectors(args) -> np.ndarray:
+    """Nạp vector từ file .npy hoặc sinh dữ liệu phân cụm giả lập"""
+    if args.vectors:
+        vectors = np.load(args.vectors).astype(np.float32)
+    else:
+        rng = np.random.default_rng(args.seed)
+        centers = rng.standard_normal((args.clusters, args.dimension)).astype(np.float32)
+        assignments = rng.integers(0, args.clusters, size=args.count + args.queries)
+        noise = rng.standard_normal((args.count + args.queries, args.dimension)).astype(np.float32)
+        vectors = centers[assignments] + 0.5 * noise
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def percentile_ms(samples, q) -> float:
+    return float(np.percentile(samples, q) * 1000)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HNSW recall/latency benchmark")
+    parser.add_argument("--vectors", help="File .npy chứa vector (mặc định: dữ liệu giả lập)")
+    parser.add_argument("--count", type=int, default=20000, help="Số vector giả lập")
+    parser.add_argument("--dimension", type=int, default=128, help="Số chiều vector giả lập")
+    parser.add_argument("--clusters", type=int, default=64, help="Số cụm của dữ liệu giả lập")
+    parser.add_argument("--queries", type=int, default=200, help="Số truy vấn giữ lại để đánh giá")
+    parser.add_argument("--k", type=int, default=10, help="Số kết quả top-k")
+    parser.add_argument("--M", type=int, default=16)
+    parser.add_argument("--ef-construction", type=int, default=200)
+    parser.add_argument("--ef", type=int, nargs="+", default=[16, 32, 64, 128, 256])
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    vectors = load_vectors(args)
+    base, queries = vectors[:-args.queries], vectors[-args.queries:]
+    print(f"Dataset: {len(base)} vectors x {base.shape[1]} dims, {len(queries)} held-out queries")
+
+    # Exact scorer (ground truth)
+    exact_latencies = []
+    ground_truth = []
+    for query in queries:
+        start = time.perf_counter()
+        scores = base @ query
+        top = np.argpartition(-scores, args.k - 1)[:args.k]
+        exact_latencies.append(time.perf_counter() - start)
+        ground_truth.append(set(top.tolist()))
+
+    # Build HNSW
+    index = HNSWIndex(base.shape[1], M=args.M, ef_construction=args.ef_construction, seed=args.seed)
+    start = time.perf_counter()
+    for label, vector in enumerate(base):
+        index.add(label, vector)
+    build_seconds = time.perf_counter() - start
+    print(f"HNSW build: {build_seconds:.1f}s ({len(base) / build_seconds:.0f} inserts/s)\n")
+
+    print(f"{'scorer':<12}{'recall@' + str(args.k):>10}{'p50 ms':>10}{'p99 ms':>10}")
+    print(f"{'exact':<12}{1.0:>10.3f}{percentile_ms(exact_latencies, 50):>10.2f}"
+          f"{percentile_ms(exact_latencies, 99):>10.2f}")
+
+    for ef in args.ef:
+        latencies = []
+        hits = 0
+        for query, truth in zip(queries, ground_truth):
+            start = time.perf_counter()
+            labels, _ = index.search(query, args.k, ef=ef)
+            latencies.append(time.perf_counter() - start)
+            hits += len(truth & set(labels))
+        recall = hits / (len(queries) * args.k)
+        print(f"{'hnsw ef=' + str(ef):<12}{recall:>10.3f}{percentile_ms(latencies, 50):>10.2f}"
+              f"{percentile_ms(latencies, 99):>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
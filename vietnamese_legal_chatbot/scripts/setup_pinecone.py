@@ -19,6 +19,7 @@ sys.path.append(str(Path(__file__).parent.parent))
 import pinecone
 from app.utils.demo_config import demo_settings
 from app.services.pinecone_service import PineconeService
+from app.services.bm25_index import BM25Index
 
 def setup_logging():
     """Setup logging for setup script"""
@@ -107,27 +108,28 @@ def load_sample_legal_documents():
             openai_api_key=demo_settings.openai_embedding_api_key
         )
         
-        processed_count = 0
-        for doc_info in sample_documents:
-            try:
-                logging.info(f"Processing document: {doc_info['title']}")
-                
-                # Create document structure for Pinecone
-                document_data = {
-                    'id': f"doc_{processed_count}",
-                    'text': doc_info['content'],
-                    'metadata': doc_info['metadata']
-                }
-                
-                # Upload to Pinecone
-                success = pinecone_service.upsert_documents([document_data])
-                
-                if success:
-                    processed_count += 1
-                    logging.info(f"Successfully uploaded: {doc_info['title']}")
-                
-            except Exception as e:
-                logging.error(f"Failed to process document {doc_info['title']}: {e}")
+        # Create document structures for Pinecone and upload them in one batched call
+        documents = [
+            {
+                'id': f"doc_{i}",
+                'content': doc_info['content'],
+                'metadata': doc_info['metadata']
+            }
+            for i, doc_info in enumerate(sample_documents)
+        ]
+        
+        if not pinecone_service.upsert_documents(documents):
+            logging.error("Some sample documents failed to upload")
+            return False
+        processed_count = len(documents)
+        
+        # Build the BM25 index over the same documents for hybrid retrieval
+        bm25_path = os.getenv("BM25_INDEX_PATH")
+        if bm25_path:
+            lexical_index = BM25Index()
+            lexical_index.add_documents(documents)
+            lexical_index.save(bm25_path)
+            logging.info(f"Saved BM25 index to {bm25_path}")
         
         logging.info(f"Successfully loaded {processed_count} sample documents")
         return True
@@ -0,0 +1,56 @@
+"""
+Test cases for AhoCorasickMatcher
+Test cho bộ so khớp nhiều từ khóa Aho-Corasick
+"""
+
+import random
+
+from app.utils.aho_corasick import AhoCorasickMatcher
+
+
+class TestAhoCorasickMatcher:
+    """Test class for AhoCorasickMatcher"""
+
+    def test_overlapping_and_nested_matches(self):
+        """Mọi lần xuất hiện, kể cả chồng lấn và lồng nhau, được tìm trong một lượt"""
+        matcher = AhoCorasickMatcher()
+        for keyword in ("he", "she", "hers", "his"):
+            matcher.add(keyword, "x")
+
+        matches = [(match.keyword, match.start) for match in matcher.scan("ushers").matches]
+
+        assert sorted(matches) == [("he", 2), ("hers", 2), ("she", 1)]
+
+    def test_categories_and_labels(self):
+        """Kết quả gắn nhóm và nhãn; không phân biệt hoa thường"""
+        matcher = AhoCorasickMatcher()
+        matcher.add_vocabulary("domain", {"lao_dong": ["hợp đồng lao động", "lương"], "dan_su": ["hợp đồng"]})
+        matcher.add_vocabulary("prohibited", {None: ["chắc chắn 100%"]})
+
+        hits = matcher.scan("HỢP ĐỒNG LAO ĐỘNG và tiền lương, chắc chắn 100%")
+
+        assert hits.keywords("domain", "lao_dong") == {"hợp đồng lao động", "lương"}
+        assert hits.count("domain", "dan_su") == 1
+        assert hits.has("prohibited")
+        assert hits.labels("domain") == {"lao_dong", "dan_su"}
+
+    def test_whole_word_keywords(self):
+        """whole_word chỉ khớp từ đứng riêng (như \\b)"""
+        matcher = AhoCorasickMatcher()
+        matcher.add("khởi kiện", "procedure", whole_word=True)
+
+        assert len(matcher.scan("khởi kiện; khởi kiệnx").matches) == 1
+
+    def test_agrees_with_substring_search(self):
+        """Tập từ khóa tìm được giống hệt kiểm tra `keyword in text`"""
+        rng = random.Random(7)
+        alphabet = "abcđ "
+        keywords = {"".join(rng.choice(alphabet) for _ in range(rng.randint(1, 4))) for _ in range(40)}
+        keywords = {keyword for keyword in keywords if keyword.strip()}
+        matcher = AhoCorasickMatcher()
+        for keyword in keywords:
+            matcher.add(keyword, "k")
+
+        for _ in range(50):
+            text = "".join(rng.choice(alphabet) for _ in range(60))
+            assert matcher.scan(text).keywords("k") == {keyword for keyword in keywords if keyword in text}
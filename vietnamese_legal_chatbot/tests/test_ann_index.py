@@ -0,0 +1,91 @@
+"""
+Test cases for HNSWIndex
+Test cho chỉ mục HNSW
+"""
+
+import numpy as np
+
+from app.services.ann_index import HNSWIndex
+from app.services.local_vector_store import LocalIndex
+
+
+def random_unit_vectors(count, dimension, seed=0):
+    rng = np.random.default_rng(seed)
+    vectors = rng.standard_normal((count, dimension)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def exact_top_k(vectors, query, k):
+    return set(np.argsort(-(vectors @ query))[:k].tolist())
+
+
+class TestHNSWIndex:
+    """Test class for HNSWIndex"""
+
+    def test_recall_against_exact(self):
+        """Recall@10 cao so với tìm kiếm chính xác"""
+        vectors = random_unit_vectors(800, 24)
+        queries = random_unit_vectors(30, 24, seed=1)
+        index = HNSWIndex(24, M=12, ef_construction=64, ef_search=80)
+        for label, vector in enumerate(vectors):
+            index.add(label, vector)
+
+        recalls = []
+        for query in queries:
+            labels, scores = index.search(query, 10)
+            assert scores == sorted(scores, reverse=True)
+            recalls.append(len(set(labels) & exact_top_k(vectors, query, 10)) / 10)
+
+        assert np.mean(recalls) >= 0.9
+
+    def test_delete_and_filter(self):
+        """Nhãn đã xóa và nhãn bị lọc không xuất hiện trong kết quả"""
+        vectors = random_unit_vectors(300, 16)
+        index = HNSWIndex(16, M=8, ef_construction=64)
+        for label, vector in enumerate(vectors):
+            index.add(label, vector)
+
+        index.remove(5)
+        labels, _ = index.search(vectors[5], 5)
+        assert 5 not in labels
+        assert len(index) == 299
+
+        allowed = np.zeros(300, dtype=bool)
+        allowed[::3] = True
+        labels, _ = index.search(vectors[7], 10, ef=100, allowed_labels=allowed)
+        assert len(labels) == 10
+        assert all(label % 3 == 0 for label in labels)
+
+    def test_round_trip_arrays(self):
+        """Trạng thái đồ thị xuất/nạp lại cho kết quả giống nhau"""
+        vectors = random_unit_vectors(200, 8)
+        index = HNSWIndex(8, M=8, ef_construction=50)
+        for label, vector in enumerate(vectors):
+            index.add(label + 1000, vector)
+        index.remove(1003)
+
+        restored = HNSWIndex.from_arrays(8, index.to_arrays())
+
+        assert restored.search(vectors[10], 5) == index.search(vectors[10], 5)
+        assert 1003 not in restored
+
+    def test_local_index_uses_hnsw_above_threshold(self, tmp_path):
+        """LocalIndex dùng HNSW khi vượt ngưỡng, giữ đúng id sau khi xóa và nạp lại"""
+        vectors = random_unit_vectors(400, 16)
+        index = LocalIndex(16, index_type="hnsw", hnsw_params={"M": 8, "ef_search": 64},
+                           exact_search_threshold=0)
+        index.upsert([
+            {"id": f"doc_{i}", "values": vector.tolist(), "metadata": {"even": i % 2 == 0}}
+            for i, vector in enumerate(vectors)
+        ])
+        index.delete(ids=["doc_0", "doc_1"])
+
+        response = index.query(vectors[2].tolist(), top_k=3, filter={"even": True})
+        assert response.matches[0].id == "doc_2"
+        assert all(match.metadata["even"] for match in response.matches)
+
+        path = str(tmp_path / "hnsw.npz")
+        index.save(path)
+        restored = LocalIndex.load(path)
+        assert restored.index_type == "hnsw"
+        assert restored.query(vectors[3].tolist(), top_k=1).matches[0].id == "doc_3"
@@ -0,0 +1,64 @@
+"""
+Test cases for SemanticAnswerCache
+Test cho bộ nhớ đệm câu trả lời theo ngữ nghĩa
+"""
+
+from app.utils.answer_cache import SemanticAnswerCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestSemanticAnswerCache:
+    """Test class for SemanticAnswerCache"""
+
+    def test_similar_query_hits_within_partition(self):
+        """Câu hỏi gần giống trúng cache, khác lĩnh vực hoặc loại câu hỏi thì không"""
+        cache = SemanticAnswerCache(similarity_threshold=0.95)
+        cache.put([1.0, 0.0, 0.0], "hon_nhan", "procedure", "answer")
+
+        assert cache.get([0.99, 0.05, 0.0], "hon_nhan", "procedure") == "answer"
+        assert cache.get([0.0, 1.0, 0.0], "hon_nhan", "procedure") is None
+        assert cache.get([1.0, 0.0, 0.0], "lao_dong", "procedure") is None
+        assert cache.get([1.0, 0.0, 0.0], "hon_nhan", "general") is None
+        assert cache.get_stats()["hits"] == 1
+
+    def test_scope_separates_identical_vectors(self):
+        """Câu hỏi trích dẫn điều khác nhau không dùng chung câu trả lời dù embedding gần trùng"""
+        cache = SemanticAnswerCache()
+        cache.put([1.0, 0.0], "lao_dong", "general", "điều 34", scope=("điều_34",))
+
+        assert cache.get([1.0, 0.0], "lao_dong", "general", scope=("điều_34",)) == "điều 34"
+        assert cache.get([1.0, 0.0], "lao_dong", "general", scope=("điều_35",)) is None
+        assert cache.get([1.0, 0.0], "lao_dong", "general") is None
+
+    def test_ttl_and_lru_eviction(self):
+        """Hết hạn theo TTL và loại bỏ mục ít dùng nhất khi đầy"""
+        clock = FakeClock()
+        cache = SemanticAnswerCache(ttl_seconds=10, max_entries=2, clock=clock)
+        cache.put([1.0, 0.0, 0.0], "dan_su", "general", "a")
+        cache.put([0.0, 1.0, 0.0], "dan_su", "general", "b")
+        cache.get([1.0, 0.0, 0.0], "dan_su", "general")
+        cache.put([0.0, 0.0, 1.0], "dan_su", "general", "c")
+
+        assert cache.get([0.0, 1.0, 0.0], "dan_su", "general") is None
+        assert cache.get([1.0, 0.0, 0.0], "dan_su", "general") == "a"
+
+        clock.now = 11
+        assert cache.get([0.0, 0.0, 1.0], "dan_su", "general") is None
+        assert len(cache) == 1
+
+    def test_invalidate_domain(self):
+        """Cập nhật tài liệu của một lĩnh vực chỉ xóa câu trả lời của lĩnh vực đó"""
+        cache = SemanticAnswerCache()
+        cache.put([1.0, 0.0], "dan_su", "general", "a")
+        cache.put([1.0, 0.0], "lao_dong", "general", "b")
+
+        assert cache.invalidate_domain("dan_su") == 1
+        assert cache.get([1.0, 0.0], "dan_su", "general") is None
+        assert cache.get([1.0, 0.0], "lao_dong", "general") == "b"
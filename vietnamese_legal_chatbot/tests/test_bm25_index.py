@@ -0,0 +1,65 @@
+"""
+Test cases for BM25Index
+Test cho chỉ mục BM25
+"""
+
+import pytest
+
+from app.services.bm25_index import BM25Index
+
+
+CHUNKS = [
+    {"id": "ld_34", "content": "Điều 34. Các trường hợp chấm dứt hợp đồng lao động",
+     "metadata": {"legal_domain": "lao_dong", "article_number": "34"}},
+    {"id": "ld_35", "content": "Điều 35. Quyền đơn phương chấm dứt hợp đồng lao động của người lao động",
+     "metadata": {"legal_domain": "lao_dong", "article_number": "35"}},
+    {"id": "ds_430", "content": "Điều 430. Hợp đồng mua bán tài sản là sự thỏa thuận giữa các bên",
+     "metadata": {"legal_domain": "dan_su", "article_number": "430"}},
+    {"id": "nd_145", "content": "Nghị định 145/2020/NĐ-CP quy định chi tiết Bộ luật Lao động về điều kiện lao động",
+     "metadata": {"legal_domain": "lao_dong"}},
+]
+
+
+@pytest.fixture
+def index():
+    index = BM25Index()
+    index.add_documents(CHUNKS)
+    return index
+
+
+class TestBM25Index:
+    """Test class for BM25Index"""
+
+    def test_article_citation_ranks_first(self, index):
+        """Term cấu trúc "điều_34" phân biệt Điều 34 với Điều 35"""
+        results = index.search("Điều 34 Bộ luật Lao động", top_k=3)
+
+        assert results[0]["id"] == "ld_34"
+        assert "điều_34" in index.citation_terms("Điều 34 Bộ luật Lao động")
+        assert results[0]["bm25_score"] > results[1]["bm25_score"]
+
+    def test_document_number_lookup(self, index):
+        """Số hiệu văn bản được giữ nguyên thành một term"""
+        terms = index.citation_terms("Nghị định 145/2020/NĐ-CP")
+        results = index.search("Nghị định 145/2020/NĐ-CP", top_k=2, required_terms=terms)
+
+        assert terms == {"145/2020/nđ-cp"}
+        assert [r["id"] for r in results] == ["nd_145"]
+
+    def test_metadata_filter_and_remove(self, index):
+        """Lọc theo domain và xóa chunk khỏi chỉ mục"""
+        results = index.search("hợp đồng", metadata_filter={"legal_domain": {"$in": ["dan_su"]}})
+        assert [r["id"] for r in results] == ["ds_430"]
+
+        index.remove_documents(["ld_34"])
+        assert len(index) == 3
+        assert "ld_34" not in [r["id"] for r in index.search("chấm dứt hợp đồng lao động")]
+
+    def test_save_and_load(self, index, tmp_path):
+        """Lưu và nạp lại cho kết quả giống nhau"""
+        path = str(tmp_path / "bm25.json")
+        index.save(path)
+        restored = BM25Index.load(path)
+
+        query = "chấm dứt hợp đồng lao động"
+        assert [r["id"] for r in restored.search(query)] == [r["id"] for r in index.search(query)]
@@ -0,0 +1,74 @@
+"""
+Test cases for LegalCitationIndex
+Test cho chỉ mục trích dẫn pháp lý
+"""
+
+import pytest
+
+from app.services.citation_index import LegalCitationIndex, normalize_law_name
+
+
+CHUNKS = [
+    {"id": "ld_chunk_0",
+     "content": "Điều 34. Các trường hợp chấm dứt hợp đồng lao động\n"
+                "1. Hết hạn hợp đồng lao động.\n"
+                "2. Đã hoàn thành công việc theo hợp đồng lao động.\n"
+                "Điều 35. Quyền đơn phương chấm dứt hợp đồng lao động của người lao động\n"
+                "1. Người lao động có quyền đơn phương chấm dứt hợp đồng lao động nhưng phải báo trước:\n"
+                "a) Ít nhất 45 ngày nếu làm việc theo hợp đồng không xác định thời hạn;\n"
+                "b) Ít nhất 30 ngày nếu làm việc theo hợp đồng có thời hạn từ 12 tháng đến 36 tháng;",
+     "metadata": {"title": "Bộ luật Lao động 2019", "document_number": "45/2019/QH14",
+                  "article_number": "34"}},
+    {"id": "ld_chunk_1",
+     "content": "c) Ít nhất 03 ngày làm việc nếu làm việc theo hợp đồng có thời hạn dưới 12 tháng;",
+     "metadata": {"title": "Bộ luật Lao động 2019", "clause": "1"}},
+    {"id": "ds_chunk_0",
+     "content": "Điều 34. Quyền được bảo vệ danh dự, nhân phẩm, uy tín",
+     "metadata": {"title": "Bộ luật Dân sự 2015", "article_number": "34"}},
+]
+
+
+@pytest.fixture
+def index():
+    index = LegalCitationIndex()
+    index.add_documents(CHUNKS)
+    return index
+
+
+class TestLegalCitationIndex:
+    """Test class for LegalCitationIndex"""
+
+    def test_normalize_law_name(self):
+        """Bỏ năm, số hiệu và dấu câu khỏi tên luật"""
+        assert normalize_law_name("Bộ luật Lao động 2019") == "bộ luật lao động"
+        assert normalize_law_name("Luật Đất đai số 31/2024/QH15") == "luật đất đai"
+
+    def test_resolve_law_from_question(self, index):
+        """Nhận diện luật qua tên đầy đủ, tên rút gọn và số hiệu"""
+        assert index.resolve_law("Điều 34 Bộ luật Lao động quy định gì?") == "bộ luật lao động"
+        assert index.resolve_law("điều 34 luật lao động") == "bộ luật lao động"
+        assert index.resolve_law("Điều 34 Luật 45/2019/QH14") == "bộ luật lao động"
+        assert index.resolve_law("Điều 34 Luật Đất đai") is None
+
+    def test_resolve_law_from_abbreviation(self, index):
+        """Tên viết tắt trong bảng LEGAL_ABBREVIATIONS được nhận diện như tên đầy đủ"""
+        assert index.resolve_law("Điều 34 BLLĐ quy định gì?") == "bộ luật lao động"
+        assert index.resolve_law("điều 34 blds") == "bộ luật dân sự"
+        assert [doc["id"] for doc in index.lookup(index.resolve_law("Điều 34 BLLĐ"), "34")] == ["ld_chunk_0"]
+
+    def test_lookup_article_clause_point(self, index):
+        """Tra cứu theo điều, khoản, điểm và phân biệt giữa các luật"""
+        article = index.lookup("bộ luật lao động", "34")
+        assert [doc["id"] for doc in article] == ["ld_chunk_0"]
+        assert article[0]["score"] == 1.0
+
+        assert [doc["id"] for doc in index.lookup("bộ luật lao động", "35", "1", "b")] == ["ld_chunk_0"]
+        assert [doc["id"] for doc in index.lookup("bộ luật dân sự", "34")] == ["ds_chunk_0"]
+        assert index.lookup("bộ luật lao động", "35", "2") == []
+
+    def test_remove_documents(self, index):
+        """Xóa chunk khỏi mọi khóa trích dẫn"""
+        index.remove_documents(["ld_chunk_0"])
+
+        assert index.lookup("bộ luật lao động", "34") == []
+        assert len(index) == 1
@@ -0,0 +1,63 @@
+"""
+Test cases for ClientRegistry
+Test cho registry client dùng chung
+"""
+
+from unittest.mock import Mock
+
+import pytest
+
+from app.services.serp_service import SerpAPIService
+from app.utils.client_registry import ClientRegistry, PoolSettings
+
+
+@pytest.fixture
+def registry():
+    registry = ClientRegistry(PoolSettings(max_connections=10, max_keepalive_connections=5, http2=False))
+    yield registry
+    registry.close()
+
+
+class TestClientRegistry:
+    """Test class for ClientRegistry"""
+
+    def test_openai_clients_share_one_connection_pool(self, registry):
+        """Client cùng endpoint được dùng lại; các endpoint khác nhau dùng chung httpx pool"""
+        chat = registry.openai_client("key-a", "https://chat.example/v1")
+
+        assert registry.openai_client("key-a", "https://chat.example/v1") is chat
+        embedding = registry.openai_client("key-b", "https://embed.example/v1")
+        assert embedding is not chat
+        assert chat._client is embedding._client is registry.http_client()
+        assert registry.http_client()._transport._pool._max_connections == 10
+
+    def test_pinecone_client_cached_per_api_key(self, registry):
+        """Pinecone client được tạo một lần cho mỗi api key với pool_threads theo cấu hình"""
+        client_class = Mock(side_effect=lambda **kwargs: Mock())
+
+        first = registry.pinecone_client("pc-key", client_class=client_class)
+
+        assert registry.pinecone_client("pc-key", client_class=client_class) is first
+        client_class.assert_called_once_with(api_key="pc-key", pool_threads=5)
+
+    def test_close_recreates_sync_clients(self, registry):
+        """Sau close() client mới được tạo lại"""
+        session = registry.requests_session()
+        registry.close()
+
+        assert registry.requests_session() is not session
+
+    def test_serp_service_uses_shared_session(self, registry):
+        """SerpAPIService gọi API qua session dùng chung thay vì tạo kết nối mới"""
+        session = Mock()
+        session.get.return_value.json.return_value = {"organic_results": [
+            {"position": 1, "title": "Bộ luật Lao động", "link": "https://thuvienphapluat.vn/a", "snippet": "..."}
+        ]}
+        service = SerpAPIService("serp-key", session=session, base_url="https://serp.example/")
+
+        documents = service.search_legal_documents("hợp đồng lao động", max_results=1)
+
+        assert documents[0]["url"] == "https://thuvienphapluat.vn/a"
+        url = session.get.call_args.args[0]
+        assert url == "https://serp.example/search.json"
+        assert session.get.call_args.kwargs["params"]["api_key"] == "serp-key"
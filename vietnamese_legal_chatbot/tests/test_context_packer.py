@@ -0,0 +1,55 @@
+"""
+Test cases for ContextPacker
+Test cho bộ đóng gói ngữ cảnh theo ngân sách token
+"""
+
+from app.utils.context_packer import ContextPacker, context_window, prompt_token_budget
+
+
+def word_count(text, model):
+    return len(text.split())
+
+
+def make_packer(budget, min_chunk_tokens=2):
+    return ContextPacker(model="gpt-4o-mini", budget=budget, min_chunk_tokens=min_chunk_tokens,
+                         token_counter=word_count)
+
+
+class TestContextPacker:
+    """Test class for ContextPacker"""
+
+    def test_packs_highest_scores_first_within_budget(self):
+        """Tài liệu điểm cao được đưa vào trước, phần vượt ngân sách bị bỏ và được báo cáo"""
+        documents = [
+            {"id": "low", "page_content": "một hai ba bốn", "score": 0.5},
+            {"id": "high", "page_content": "năm sáu bảy tám", "score": 0.9},
+        ]
+        packed = make_packer(budget=5, min_chunk_tokens=4).pack(documents)
+
+        assert [doc["id"] for doc in packed.documents] == ["high"]
+        assert packed.tokens_used == 4
+        assert packed.tokens_dropped == 4
+        assert [doc["id"] for doc in packed.dropped_documents] == ["low"]
+
+    def test_trims_long_chunk_at_clause_boundary(self):
+        """Tài liệu dài bị cắt tại ranh giới khoản, phần tiêu đề cũng được tính"""
+        content = ("Điều 35. Quyền đơn phương chấm dứt hợp đồng.\n"
+                   "1. Người lao động phải báo trước.\n"
+                   "a) Ít nhất 45 ngày;\n"
+                   "b) Ít nhất 30 ngày;")
+        render = lambda doc: f"Tiêu đề: Luật\n{doc['page_content']}"
+        packed = make_packer(budget=20).pack([{"id": "d", "page_content": content, "score": 0.9}], render=render)
+
+        trimmed = packed.documents[0]
+        assert trimmed["truncated"] is True
+        assert trimmed["page_content"] == ("Điều 35. Quyền đơn phương chấm dứt hợp đồng.\n"
+                                           "1. Người lao động phải báo trước. […]")
+        assert packed.tokens_used <= 20
+        assert packed.tokens_used + packed.tokens_dropped == word_count(render({"page_content": content}), None)
+
+    def test_budget_from_model_window(self):
+        """Ngân sách theo cửa sổ ngữ cảnh của model trừ phần output và phần dự trữ"""
+        assert context_window("gpt-4o-mini-2024-07-18") == 128000
+        assert context_window("gpt-4-0613") == 8192
+        assert prompt_token_budget("gpt-4", max_output_tokens=1000) == 5692
+        assert prompt_token_budget("gpt-4o-mini", max_output_tokens=1000) == 6000
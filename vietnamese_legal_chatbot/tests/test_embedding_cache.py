@@ -0,0 +1,159 @@
+"""
+Test cases for EmbeddingCache
+Test cho bộ nhớ đệm embedding
+"""
+
+import pytest
+from unittest.mock import AsyncMock, Mock
+
+from app.utils.embedding_cache import (
+    EmbeddingCache,
+    LRUCacheTier,
+    make_cache_key,
+    get_model_id
+)
+
+
+def make_embeddings(model: str = "text-embedding-3-small") -> Mock:
+    """Mock embeddings trả về vector phụ thuộc độ dài văn bản"""
+    embeddings = Mock()
+    embeddings.model = model
+    embeddings.embed_query.side_effect = lambda text: [float(len(text)), 1.0]
+    embeddings.embed_documents.side_effect = lambda texts: [[float(len(t)), 1.0] for t in texts]
+    return embeddings
+
+
+class TestEmbeddingCache:
+    """Test class for EmbeddingCache"""
+
+    def test_cache_key_normalizes_whitespace(self):
+        """Khóa cache không phụ thuộc khoảng trắng thừa"""
+        assert make_cache_key("m", "  Thủ tục   ly hôn ") == make_cache_key("m", "Thủ tục ly hôn")
+        assert make_cache_key("m", "a") != make_cache_key("other", "a")
+
+    def test_model_id_from_embeddings(self):
+        """Model id lấy từ thuộc tính model"""
+        assert get_model_id(make_embeddings("text-embedding-ada-002")) == "text-embedding-ada-002"
+
+    def test_embed_query_hits_cache(self):
+        """Lần gọi thứ hai không gọi API"""
+        cache = EmbeddingCache(max_entries=10)
+        embeddings = make_embeddings()
+
+        first = cache.embed_query(embeddings, "Thủ tục ly hôn")
+        second = cache.embed_query(embeddings, "Thủ tục  ly hôn")
+
+        assert first == second
+        assert embeddings.embed_query.call_count == 1
+        stats = cache.get_stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+
+    @pytest.mark.asyncio
+    async def test_aembed_query_uses_native_async_and_cache(self):
+        """aembed_query dùng aembed_query gốc và chia sẻ cache với embed_query"""
+        cache = EmbeddingCache(max_entries=10)
+        embeddings = make_embeddings()
+        embeddings.aembed_query = AsyncMock(side_effect=lambda text: [float(len(text)), 2.0])
+
+        first = await cache.aembed_query(embeddings, "Trợ cấp thôi việc")
+        second = cache.embed_query(embeddings, "Trợ cấp thôi việc")
+
+        assert first == second == [17.0, 2.0]
+        embeddings.aembed_query.assert_awaited_once()
+        embeddings.embed_query.assert_not_called()
+
+    def test_cache_shared_across_embedding_instances(self):
+        """Hai instance cùng model dùng chung cache"""
+        cache = EmbeddingCache(max_entries=10)
+        cache.embed_query(make_embeddings(), "Trợ cấp thôi việc")
+
+        other = make_embeddings()
+        cache.embed_query(other, "Trợ cấp thôi việc")
+
+        other.embed_query.assert_not_called()
+
+    def test_embed_documents_only_embeds_misses(self):
+        """Chỉ embed các văn bản chưa có trong cache, mỗi văn bản một lần"""
+        cache = EmbeddingCache(max_entries=10)
+        embeddings = make_embeddings()
+        cache.embed_query(embeddings, "Điều 1")
+
+        vectors = cache.embed_documents(embeddings, ["Điều 1", "Điều 22", "Điều 22"])
+
+        assert len(vectors) == 3
+        assert vectors[1] == vectors[2]
+        embeddings.embed_documents.assert_called_once_with(["Điều 22"])
+
+    def test_lru_eviction(self):
+        """Tầng LRU loại bỏ mục ít dùng nhất"""
+        tier = LRUCacheTier(max_entries=2)
+        tier.put(("m", "a"), (1.0,))
+        tier.put(("m", "b"), (2.0,))
+        tier.get(("m", "a"))
+        tier.put(("m", "c"), (3.0,))
+
+        assert tier.get(("m", "b")) is None
+        assert tier.get(("m", "a")) == (1.0,)
+        assert len(tier) == 2
+
+    def test_disk_tier_survives_restart(self, tmp_path):
+        """Tầng SQLite giữ vector giữa các lần khởi tạo"""
+        path = str(tmp_path / "embeddings.sqlite3")
+        cache = EmbeddingCache(max_entries=10, disk_path=path)
+        cache.embed_query(make_embeddings(), "Bộ luật Lao động")
+
+        restarted = EmbeddingCache(max_entries=10, disk_path=path)
+        embeddings = make_embeddings()
+        vector = restarted.embed_query(embeddings, "Bộ luật Lao động")
+
+        embeddings.embed_query.assert_not_called()
+        assert vector == pytest.approx([float(len("Bộ luật Lao động")), 1.0])
+        assert restarted.get_stats()["disk_hits"] == 1
+
+    def test_embed_documents_writes_disk_tier_in_one_transaction(self, tmp_path):
+        """Các vector mới của một lô được ghi xuống SQLite bằng một executemany và một commit"""
+        cache = EmbeddingCache(max_entries=10, disk_path=str(tmp_path / "embeddings.sqlite3"))
+        tier = cache.disk_tier
+        tier._conn = Mock(wraps=tier._conn)
+
+        cache.embed_documents(make_embeddings(), ["Điều 1", "Điều 22", "Điều 333", "Điều 22"])
+
+        assert not [c for c in tier._conn.execute.call_args_list if c.args[0].startswith("INSERT")]
+        assert tier._conn.executemany.call_count == 1
+        assert len(tier._conn.executemany.call_args.args[1]) == 3
+        assert tier._conn.commit.call_count == 1
+        assert len(tier) == 3
+
+    @pytest.mark.asyncio
+    async def test_aembed_query_keeps_disk_tier_off_event_loop(self, tmp_path):
+        """aembed_query đọc/ghi tầng SQLite trong worker thread, không trên event loop"""
+        import threading
+
+        path = str(tmp_path / "embeddings.sqlite3")
+        cache = EmbeddingCache(max_entries=10, disk_path=path)
+        loop_thread = threading.get_ident()
+        disk_threads = []
+        tier = cache.disk_tier
+        for name in ("get", "put_many"):
+            original = getattr(tier, name)
+
+            def recorded(*args, _original=original):
+                disk_threads.append(threading.get_ident())
+                return _original(*args)
+
+            setattr(tier, name, recorded)
+
+        embeddings = make_embeddings()
+        embeddings.aembed_query = AsyncMock(side_effect=lambda text: [float(len(text)), 2.0])
+        await cache.aembed_query(embeddings, "Trợ cấp thôi việc")
+
+        restarted = EmbeddingCache(max_entries=10, disk_path=path)
+        restarted.disk_tier.get = cache.disk_tier.get
+        vector = await restarted.aembed_query(make_embeddings(), "Trợ cấp thôi việc")
+
+        assert vector == pytest.approx([17.0, 2.0])
+        assert restarted.get_stats()["disk_hits"] == 1
+        # miss đọc đĩa, ghi đĩa, rồi đọc đĩa lần nữa sau khởi động lại
+        assert len(disk_threads) == 3
+        assert loop_thread not in disk_threads
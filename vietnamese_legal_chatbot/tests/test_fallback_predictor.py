@@ -0,0 +1,36 @@
+"""
+Test cases for FallbackPredictor
+Test cho bộ dự đoán cần tìm kiếm web
+"""
+
+from app.utils.fallback_predictor import FallbackPredictor
+
+
+class TestFallbackPredictor:
+    """Test class for FallbackPredictor"""
+
+    def test_static_rules_and_observed_miss_rate(self):
+        """Lĩnh vực chung/ít tài liệu luôn được dự đoán thiếu; lĩnh vực khác theo tỷ lệ quan sát"""
+        predictor = FallbackPredictor(low_coverage_domains=["thue"], min_observations=4)
+
+        assert predictor.predict_miss("general")
+        assert predictor.predict_miss("thue")
+        assert not predictor.predict_miss("lao_dong")
+
+        for missed in (True, True, True, False):
+            predictor.record("lao_dong", predicted_miss=False, missed=missed)
+        assert predictor.predict_miss("lao_dong")
+
+    def test_prediction_accuracy_stats(self):
+        """Thống kê precision/recall theo kết quả thực tế"""
+        predictor = FallbackPredictor()
+        predictor.record("general", predicted_miss=True, missed=True)
+        predictor.record("general", predicted_miss=True, missed=False)
+        predictor.record("dan_su", predicted_miss=False, missed=True)
+        predictor.record("dan_su", predicted_miss=False, missed=False)
+
+        stats = predictor.get_stats()
+        assert stats["precision"] == 0.5
+        assert stats["recall"] == 0.5
+        assert stats["accuracy"] == 0.5
+        assert stats["domain_miss_rates"] == {"general": 0.5, "dan_su": 0.5}
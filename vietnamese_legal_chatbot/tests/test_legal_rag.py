@@ -476,6 +476,27 @@ class TestVietnameseLegalRAGIntegration:
         self.mock_pinecone_service.similarity_search.assert_called()
         self.mock_chat_model.generate_response.assert_called()
     
+    def test_query_records_stage_latency(self):
+        """Test each pipeline stage of a query is timed"""
+        from app.utils.metrics import StageMetrics
+
+        stage_metrics = StageMetrics()
+        rag = VietnameseLegalRAG(
+            pinecone_service=self.mock_pinecone_service,
+            chat_model=self.mock_chat_model,
+            embedding_model=self.mock_embedding_model,
+            text_processor=self.mock_text_processor,
+            stage_metrics=stage_metrics
+        )
+
+        rag.query("Quyền dân sự của công dân được bảo vệ như thế nào?", legal_domain="dan_su")
+
+        stages = stage_metrics.snapshot()
+        for stage in ("total", "preprocess", "domain_detect", "embed", "vector_search",
+                      "context_build", "llm", "citation_extraction", "validation"):
+            assert stages[stage]["count"] >= 1, stage
+        assert rag.get_performance_metrics()["stage_latency"]["total"]["count"] == 1
+    
     def test_query_with_different_types(self):
         """Test query processing with different query types"""
         rag = VietnameseLegalRAG(
@@ -556,6 +577,476 @@ class TestVietnameseLegalRAGIntegration:
         assert len(metrics["metrics"]["domain_distribution"]) > 0
         assert metrics["recent_queries"] == len(queries)
     
+    def test_parallel_domain_retrieval_merges_top_k(self):
+        """Test a sparse primary domain fans out to related domains concurrently, merged into one top-k"""
+        import time
+
+        def search(query_text=None, k=5, metadata_filter=None, **kwargs):
+            domain = metadata_filter["legal_domain"]
+            if domain == "bat_dong_san":
+                time.sleep(0.5)  # misses the deadline
+            docs = {
+                "dan_su": [{"id": "shared", "page_content": "A", "metadata": {}, "score": 0.8}],
+                "thuong_mai": [
+                    {"id": "shared", "page_content": "A", "metadata": {}, "score": 0.9},
+                    {"id": "tm_1", "page_content": "B", "metadata": {}, "score": 0.85}
+                ],
+                "bat_dong_san": [{"id": "late", "page_content": "C", "metadata": {}, "score": 0.99}]
+            }
+            return docs[domain]
+
+        self.mock_pinecone_service.similarity_search.side_effect = search
+        rag = VietnameseLegalRAG(
+            pinecone_service=self.mock_pinecone_service,
+            chat_model=self.mock_chat_model,
+            embedding_model=self.mock_embedding_model,
+            text_processor=self.mock_text_processor,
+            retrieval_timeout=0.2
+        )
+
+        results = rag._search_domains("hợp đồng", [0.1] * 1536, "dan_su", max_results=5)
+
+        assert [doc["id"] for doc in results] == ["shared", "tm_1"]
+        assert results[0]["score"] == 0.9
+        filters = [call.kwargs["metadata_filter"]["legal_domain"]
+                   for call in self.mock_pinecone_service.similarity_search.call_args_list]
+        assert sorted(filters) == ["bat_dong_san", "dan_su", "thuong_mai"]
+
+    def test_related_domains_are_speculative(self):
+        """Test related-domain searches overlap the primary search and are dropped when it is dense"""
+        import asyncio
+        import time
+
+        def search(metadata_filter=None, k=5, **kwargs):
+            time.sleep(0.2)
+            domain = metadata_filter["legal_domain"]
+            if domain == "dan_su":
+                return [{"id": f"ds_{i}", "page_content": f"Điều {i}", "metadata": {}, "score": 0.9} for i in range(3)]
+            return [{"id": f"{domain}_0", "page_content": domain, "metadata": {}, "score": 0.95}]
+
+        self.mock_pinecone_service.similarity_search.side_effect = search
+        del self.mock_pinecone_service.asimilarity_search
+        rag = VietnameseLegalRAG(
+            pinecone_service=self.mock_pinecone_service,
+            chat_model=self.mock_chat_model,
+            embedding_model=self.mock_embedding_model,
+            text_processor=self.mock_text_processor
+        )
+
+        # Dense primary: related-domain hits are ignored
+        results = rag._search_domains("hợp đồng", [0.1] * 1536, "dan_su", max_results=5)
+        assert [doc["id"] for doc in results] == ["ds_0", "ds_1", "ds_2"]
+        results = asyncio.run(rag._asearch_domains("hợp đồng", [0.1] * 1536, "dan_su", max_results=5))
+        assert [doc["id"] for doc in results] == ["ds_0", "ds_1", "ds_2"]
+
+        # Sparse primary: related domains were already searching, so no second round trip
+        for run in (
+            lambda: rag._search_domains("hợp đồng", [0.1] * 1536, "dan_su", max_results=10),
+            lambda: asyncio.run(rag._asearch_domains("hợp đồng", [0.1] * 1536, "dan_su", max_results=10)),
+        ):
+            start = time.perf_counter()
+            results = run()
+            assert time.perf_counter() - start < 0.35  # sequential phases would take 0.4s
+            assert {doc["id"] for doc in results} == {
+                "ds_0", "ds_1", "ds_2", "thuong_mai_0", "bat_dong_san_0"
+            }
+    
+    def test_hybrid_retrieval_with_bm25(self):
+        """Test citation queries skip embedding and other queries fuse BM25 with vector results"""
+        from app.services.bm25_index import BM25Index
+
+        lexical_index = BM25Index()
+        lexical_index.add_documents([
+            {"id": "ld_34", "content": "Điều 34 Bộ luật Lao động: các trường hợp chấm dứt hợp đồng lao động",
+             "metadata": {"legal_domain": "lao_dong"}},
+            {"id": "ld_35", "content": "Điều 35 Bộ luật Lao động: quyền đơn phương chấm dứt hợp đồng",
+             "metadata": {"legal_domain": "lao_dong"}},
+        ])
+        self.mock_pinecone_service.similarity_search.side_effect = lambda **kwargs: (
+            [{"id": "ld_35", "page_content": "B", "metadata": {}, "score": 0.9},
+             {"id": "vec_only", "page_content": "C", "metadata": {}, "score": 0.85}]
+            if kwargs["metadata_filter"]["legal_domain"] == "lao_dong" else []
+        )
+        rag = VietnameseLegalRAG(
+            pinecone_service=self.mock_pinecone_service,
+            chat_model=self.mock_chat_model,
+            embedding_model=self.mock_embedding_model,
+            text_processor=self.mock_text_processor,
+            lexical_index=lexical_index
+        )
+
+        cited = rag._retrieve_documents("điều 34 bộ luật lao động", "lao_dong", 5, 0.7)
+
+        assert [doc["id"] for doc in cited] == ["ld_34"]
+        assert cited[0]["search_type"] == "citation"
+        self.mock_embedding_model.embed_query.assert_not_called()
+        self.mock_pinecone_service.similarity_search.assert_not_called()
+
+        fused = rag._retrieve_documents("quyền đơn phương chấm dứt hợp đồng", "lao_dong", 2, 0.5)
+
+        assert [doc["id"] for doc in fused] == ["ld_35", "vec_only"]
+        assert fused[0]["score"] == 1.0  # full BM25 term coverage beats the vector score
+        assert fused[1]["score"] == 0.85
+        assert fused[0]["rrf_score"] > fused[1]["rrf_score"]
+
+    def test_document_number_question_skips_embedding_through_query(self):
+        """Test exact citations are detected on the original question, not the processed query"""
+        from app.services.bm25_index import BM25Index
+
+        lexical_index = BM25Index()
+        lexical_index.add_documents([
+            {"id": "nd_145", "content": "Nghị định 145/2020/NĐ-CP quy định chi tiết điều kiện lao động",
+             "metadata": {"legal_domain": "lao_dong"}},
+            {"id": "ld_34", "content": "Điều 34 Bộ luật Lao động: các trường hợp chấm dứt hợp đồng lao động",
+             "metadata": {"legal_domain": "lao_dong"}},
+        ])
+        rag = VietnameseLegalRAG(
+            pinecone_service=self.mock_pinecone_service,
+            chat_model=self.mock_chat_model,
+            embedding_model=self.mock_embedding_model,
+            text_processor=self.mock_text_processor,  # processed query loses the citation
+            lexical_index=lexical_index
+        )
+
+        result = rag.query("Nghị định 145/2020/NĐ-CP quy định điều kiện lao động", legal_domain="lao_dong")
+
+        assert [source["id"] for source in result.sources] == ["nd_145"]
+        self.mock_embedding_model.embed_query.assert_not_called()
+        self.mock_pinecone_service.similarity_search.assert_not_called()
+
+    def test_citation_question_uses_citation_index(self):
+        """Test citation-shaped questions are answered without embedding or similarity search"""
+        from app.services.citation_index import LegalCitationIndex
+
+        citation_index = LegalCitationIndex()
+        citation_index.add_documents([
+            {"id": "ds_15", "content": "Điều 15. Quyền dân sự của công dân được pháp luật bảo vệ",
+             "metadata": {"title": "Bộ luật Dân sự 2015", "legal_domain": "dan_su"}}
+        ])
+        rag = VietnameseLegalRAG(
+            pinecone_service=self.mock_pinecone_service,
+            chat_model=self.mock_chat_model,
+            embedding_model=self.mock_embedding_model,
+            text_processor=self.mock_text_processor,
+            citation_index=citation_index
+        )
+
+        result = rag.query("Điều 15 Bộ luật Dân sự quy định gì?", legal_domain="dan_su")
+
+        assert [source["id"] for source in result.sources] == ["ds_15"]
+        self.mock_embedding_model.embed_query.assert_not_called()
+        self.mock_pinecone_service.similarity_search.assert_not_called()
+
+        # Abbreviated law names resolve through LEGAL_ABBREVIATIONS
+        result = rag.query("Điều 15 BLDS quy định gì?", legal_domain="dan_su")
+        assert [source["id"] for source in result.sources] == ["ds_15"]
+        self.mock_pinecone_service.similarity_search.assert_not_called()
+
+        rag.query("Điều 99 Bộ luật Dân sự quy định gì?", legal_domain="dan_su")
+        self.mock_pinecone_service.similarity_search.assert_called()
+
+    def test_answer_cache_skips_generation_until_invalidated(self):
+        """Test repeated questions are served from the answer cache until the domain changes"""
+        from app.utils.answer_cache import SemanticAnswerCache
+
+        rag = VietnameseLegalRAG(
+            pinecone_service=self.mock_pinecone_service,
+            chat_model=self.mock_chat_model,
+            embedding_model=self.mock_embedding_model,
+            text_processor=self.mock_text_processor,
+            answer_cache=SemanticAnswerCache()
+        )
+        question = "Quyền dân sự của công dân được bảo vệ như thế nào?"
+
+        first = rag.query(question, legal_domain="dan_su")
+        second = rag.query(question, legal_domain="dan_su")
+
+        assert second.answer == first.answer
+        assert self.mock_chat_model.generate_response.call_count == 1
+        assert rag.performance_metrics["total_queries"] == 2
+
+        self.mock_pinecone_service.upsert_documents.return_value = True
+        rag.add_legal_documents([DocumentChunk(content="Điều 16", metadata={"legal_domain": "dan_su"},
+                                               embedding=[0.1] * 1536)])
+        rag.query(question, legal_domain="dan_su")
+
+        assert self.mock_chat_model.generate_response.call_count == 2
+
+    def test_answer_cache_is_keyed_by_citation_and_returns_copies(self):
+        """Test cited articles partition the answer cache, citation hits skip the cache embedding,
+        and cache hits do not share mutable lists with the stored answer"""
+        from app.services.bm25_index import BM25Index
+        from app.services.citation_index import LegalCitationIndex
+        from app.utils.answer_cache import SemanticAnswerCache
+
+        index = BM25Index()
+        index.add_documents([{
+            "id": "ld_34",
+            "content": "Điều 34. Các trường hợp chấm dứt hợp đồng lao động",
+            "metadata": {"legal_domain": "lao_dong", "document_name": "Bộ luật Lao động", "article_number": "34"}
+        }])
+        rag = VietnameseLegalRAG(
+            pinecone_service=self.mock_pinecone_service,
+            chat_model=self.mock_chat_model,
+            embedding_model=self.mock_embedding_model,
+            text_processor=self.mock_text_processor,
+            lexical_index=index,
+            citation_index=LegalCitationIndex(),
+            answer_cache=SemanticAnswerCache()
+        )
+
+        # Answered by the BM25 citation shortcut: no embedding call, nothing cached
+        rag.query("Điều 34 quy định các trường hợp chấm dứt hợp đồng lao động", legal_domain="lao_dong")
+        self.mock_embedding_model.embed_query.assert_not_called()
+        assert len(rag.answer_cache) == 0
+
+        # Same embedding (mock), different cited article: separate cache entries
+        rag.query("Điều 35 quy định gì?", legal_domain="lao_dong")
+        rag.query("Điều 36 quy định gì?", legal_domain="lao_dong")
+        assert self.mock_chat_model.generate_response.call_count == 3
+        assert len(rag.answer_cache) == 2
+
+        hit = rag.query("Điều 36 quy định gì?", legal_domain="lao_dong")
+        assert self.mock_chat_model.generate_response.call_count == 3
+        hit.sources.append("mutated")
+        hit.warnings.append("mutated")
+        again = rag.query("Điều 36 quy định gì?", legal_domain="lao_dong")
+        assert "mutated" not in again.sources
+        assert "mutated" not in again.warnings
+
+    def test_query_stream_yields_tokens_then_final_result(self):
+        """Test streaming query yields model tokens, then one final frame scored from the same text"""
+        self.mock_chat_model.generate_response_stream.return_value = iter(
+            ["Theo quy định tại Điều 15 ", "của Luật Dân sự, ", "quyền dân sự được bảo vệ."]
+        )
+        rag = VietnameseLegalRAG(
+            pinecone_service=self.mock_pinecone_service,
+            chat_model=self.mock_chat_model,
+            embedding_model=self.mock_embedding_model,
+            text_processor=self.mock_text_processor
+        )
+
+        frames = list(rag.query_stream("Quyền dân sự là gì?", legal_domain="dan_su",
+                                       query_type=LegalQueryType.GENERAL))
+
+        assert [frame["type"] for frame in frames] == ["token", "token", "token", "final"]
+        result = frames[-1]["result"]
+        assert isinstance(result, LegalQueryResult)
+        assert result.answer == "".join(frame["content"] for frame in frames[:-1])
+        assert result.confidence_score > 0
+        self.mock_chat_model.generate_response.assert_not_called()
+        assert rag.performance_metrics["total_queries"] == 1
+
+    def test_identical_concurrent_queries_are_coalesced(self):
+        """Test concurrent identical questions share one retrieval and generation"""
+        import time
+        from concurrent.futures import ThreadPoolExecutor
+
+        answer = self.mock_chat_model.generate_response.return_value
+        self.mock_chat_model.generate_response.side_effect = lambda prompt: time.sleep(0.2) or answer
+        rag = VietnameseLegalRAG(
+            pinecone_service=self.mock_pinecone_service,
+            chat_model=self.mock_chat_model,
+            embedding_model=self.mock_embedding_model,
+            text_processor=self.mock_text_processor
+        )
+
+        questions = ["Quyền dân sự là gì?", "  quyền dân sự   là gì?"] * 4
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(
+                lambda q: rag.query(q, legal_domain="dan_su", query_type=LegalQueryType.GENERAL), questions
+            ))
+
+        assert self.mock_chat_model.generate_response.call_count == 1
+        assert len({id(result) for result in results}) == len(results)
+        assert all(result.answer == results[0].answer for result in results)
+        assert rag.get_performance_metrics()["single_flight"]["coalesced"] == 7
+
+    def test_coalesced_results_are_independent(self):
+        """Test one caller mutating its coalesced result does not leak into the others"""
+        import time
+        from concurrent.futures import ThreadPoolExecutor
+
+        answer = self.mock_chat_model.generate_response.return_value
+        self.mock_chat_model.generate_response.side_effect = lambda prompt: time.sleep(0.2) or answer
+        rag = VietnameseLegalRAG(
+            pinecone_service=self.mock_pinecone_service,
+            chat_model=self.mock_chat_model,
+            embedding_model=self.mock_embedding_model,
+            text_processor=self.mock_text_processor
+        )
+
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            first, second = pool.map(
+                lambda q: rag.query(q, legal_domain="dan_su", query_type=LegalQueryType.GENERAL),
+                ["Quyền dân sự là gì?"] * 2
+            )
+
+        assert self.mock_chat_model.generate_response.call_count == 1
+        original_sources = len(second.sources)
+        original_citations = len(second.citations)
+        first.sources.append({"page_content": "mutated"})
+        first.citations.clear()
+        first.warnings.append("mutated")
+
+        assert len(second.sources) == original_sources
+        assert len(second.citations) == original_citations
+        assert "mutated" not in second.warnings
+
+    def test_speculative_fallback_races_vector_search(self):
+        """Test predicted misses run SerpAPI in parallel, and sufficient vector results cancel it"""
+        import time
+        from app.services.bm25_index import BM25Index
+
+        serp_service = Mock()
+        serp_service.search_legal_documents.side_effect = lambda question, max_results: time.sleep(0.3) or [
+            {"title": "Kết quả web", "content": "Nội dung web", "source": "https://example.vn/a"}
+        ]
+        vector_doc = self.mock_pinecone_service.similarity_search.return_value[0]
+        self.mock_pinecone_service.similarity_search.side_effect = lambda **kwargs: time.sleep(0.3) or [vector_doc]
+        rag = VietnameseLegalRAG(
+            pinecone_service=self.mock_pinecone_service,
+            chat_model=self.mock_chat_model,
+            embedding_model=self.mock_embedding_model,
+            text_processor=self.mock_text_processor,
+            serp_service=serp_service,
+            speculative_fallback=True,
+            lexical_index=BM25Index()
+        )
+
+        # "general" is predicted to miss: web search overlaps the vector search
+        start = time.perf_counter()
+        documents = rag._retrieve_documents("Câu hỏi chung", "general", 5, 0.7)
+        elapsed = time.perf_counter() - start
+        assert elapsed < 0.55  # serial vector search + web search would take 0.6s
+        assert documents[-1]["search_type"] == "serp_api"
+        assert len(documents) == 2
+
+        # Sufficient vector results: the speculative web search result is dropped
+        self.mock_pinecone_service.similarity_search.side_effect = lambda **kwargs: [
+            dict(vector_doc, id=f"doc_{i}", page_content=f"Điều {i}. Nội dung {i}") for i in range(4)
+        ]
+        documents = rag._retrieve_documents("Câu hỏi chung khác", "general", 5, 0.7)
+        assert all(doc.get("search_type") != "serp_api" for doc in documents)
+
+        stats = rag.get_performance_metrics()["speculative_fallback"]
+        assert stats["launched"] == 2
+        assert stats["used"] == 1
+        # Dropped either before the worker picked it up or while the web call was already running
+        assert stats["cancelled"] + stats["wasted"] == 1
+        assert stats["predictor"]["true_positive"] == 1
+        assert stats["predictor"]["false_positive"] == 1
+
+    def test_speculative_fallback_accounting(self):
+        """Test a running web search counts as wasted, not cancelled, and a late one is bounded by the deadline"""
+        import threading
+        import time
+        from app.services.bm25_index import BM25Index
+
+        started = threading.Event()
+        release = threading.Event()
+
+        def slow_search(question, max_results):
+            started.set()
+            release.wait(2)
+            return [{"title": "Kết quả web", "content": "Nội dung web", "source": "https://example.vn/a"}]
+
+        serp_service = Mock(deadline=0.2)
+        serp_service.search_legal_documents.side_effect = slow_search
+        vector_doc = self.mock_pinecone_service.similarity_search.return_value[0]
+        sufficient = [dict(vector_doc, id=f"doc_{i}", page_content=f"Điều {i}. Nội dung {i}") for i in range(4)]
+
+        def vector_search(**kwargs):
+            started.wait(1)
+            return sufficient
+
+        self.mock_pinecone_service.similarity_search.side_effect = vector_search
+        rag = VietnameseLegalRAG(
+            pinecone_service=self.mock_pinecone_service,
+            chat_model=self.mock_chat_model,
+            embedding_model=self.mock_embedding_model,
+            text_processor=self.mock_text_processor,
+            serp_service=serp_service,
+            speculative_fallback=True,
+            lexical_index=BM25Index()
+        )
+
+        # The web call is already running when vector search turns out sufficient
+        rag._retrieve_documents("Câu hỏi chung", "general", 5, 0.7)
+        stats = rag.get_performance_metrics()["speculative_fallback"]
+        assert stats["cancelled"] == 0
+        assert stats["wasted"] == 1
+
+        # Vector search misses and the web call overruns the SerpAPI deadline
+        self.mock_pinecone_service.similarity_search.side_effect = lambda **kwargs: []
+        start = time.perf_counter()
+        documents = rag._retrieve_documents("Câu hỏi chung khác", "general", 5, 0.7)
+        elapsed = time.perf_counter() - start
+        release.set()
+
+        assert elapsed < 1.0
+        assert documents == []
+        stats = rag.get_performance_metrics()["speculative_fallback"]
+        assert stats["timed_out"] == 1
+        assert stats["used"] == 0
+
+    def test_retrieve_context_does_not_generate(self):
+        """Test retrieval-only mode returns documents, citations and scores without an LLM call"""
+        rag = VietnameseLegalRAG(
+            pinecone_service=self.mock_pinecone_service,
+            chat_model=self.mock_chat_model,
+            embedding_model=self.mock_embedding_model,
+            text_processor=self.mock_text_processor
+        )
+
+        retrieval = rag.retrieve_context("Quyền dân sự là gì?", legal_domain="dan_su",
+                                         query_type=LegalQueryType.GENERAL)
+
+        assert retrieval.legal_domain == "dan_su"
+        assert retrieval.scores == [0.85]
+        assert retrieval.retrieval_confidence == 0.85
+        assert "Điều 15. Quyền dân sự" in retrieval.context_text
+        self.mock_chat_model.generate_response.assert_not_called()
+        assert rag.performance_metrics["total_queries"] == 0
+
+    @pytest.mark.asyncio
+    async def test_aquery_runs_concurrently_on_one_loop(self):
+        """Test async queries await search and generation instead of blocking the event loop"""
+        import asyncio
+        import time
+        from unittest.mock import AsyncMock
+
+        async def search(**kwargs):
+            await asyncio.sleep(0.2)
+            return [{"id": "ds_15", "page_content": "Điều 15. Quyền dân sự", "metadata": {}, "score": 0.9}]
+
+        async def generate(prompt):
+            await asyncio.sleep(0.2)
+            return "Theo quy định tại Điều 15 của Luật Dân sự, quyền dân sự được bảo vệ."
+
+        self.mock_pinecone_service.asimilarity_search = AsyncMock(side_effect=search)
+        self.mock_chat_model.agenerate_response = AsyncMock(side_effect=generate)
+        rag = VietnameseLegalRAG(
+            pinecone_service=self.mock_pinecone_service,
+            chat_model=self.mock_chat_model,
+            embedding_model=self.mock_embedding_model,
+            text_processor=self.mock_text_processor
+        )
+
+        start = time.perf_counter()
+        results = await asyncio.gather(*[
+            rag.aquery(f"Quyền dân sự {i} là gì?", legal_domain="dan_su", query_type=LegalQueryType.GENERAL)
+            for i in range(20)
+        ])
+        elapsed = time.perf_counter() - start
+
+        assert elapsed < 2.0  # 20 sequential queries would take 8s
+        assert all(result.sources[0]["id"] == "ds_15" for result in results)
+        assert results[0].answer.startswith("Theo quy định tại Điều 15")
+        self.mock_chat_model.generate_response.assert_not_called()
+        self.mock_pinecone_service.similarity_search.assert_not_called()
+        assert rag.performance_metrics["total_queries"] == 20
+
     def test_error_handling(self):
         """Test error handling in RAG system"""
         # Setup RAG with failing mock
@@ -0,0 +1,350 @@
+"""
+Test cases for LocalVectorStore
+Test cho kho vector cục bộ
+"""
+
+import hashlib
+import pytest
+
+from app.services.local_vector_store import LocalVectorStore, LocalIndex
+from app.services.pinecone_service import PineconeServiceError, VectorSearchResult
+from app.utils.embedding_cache import EmbeddingCache
+
+
+DIMENSION = 16
+
+
+class KeywordEmbeddings:
+    """Embeddings giả lập: mỗi từ bật một chiều theo hash, đủ để kiểm tra xếp hạng"""
+
+    model = "keyword-test"
+
+    def embed_query(self, text):
+        vector = [0.0] * DIMENSION
+        for word in text.lower().split():
+            vector[int(hashlib.md5(word.encode("utf-8")).hexdigest(), 16) % DIMENSION] += 1.0
+        return vector
+
+    def embed_documents(self, texts):
+        return [self.embed_query(text) for text in texts]
+
+
+@pytest.fixture
+def store():
+    store = LocalVectorStore(
+        dimension=DIMENSION,
+        embeddings=KeywordEmbeddings(),
+        embedding_cache=EmbeddingCache()
+    )
+    store.upsert_documents([
+        {"id": "ds_1", "content": "hợp đồng mua bán tài sản",
+         "metadata": {"legal_domain": "dan_su", "article_number": "430", "title": "Bộ luật Dân sự"}},
+        {"id": "ld_1", "content": "thời giờ làm việc bình thường",
+         "metadata": {"legal_domain": "lao_dong", "article_number": "105", "title": "Bộ luật Lao động"}},
+        {"id": "ld_2", "content": "hợp đồng lao động",
+         "metadata": {"legal_domain": "lao_dong", "article_number": "13", "title": "Bộ luật Lao động"}},
+    ])
+    return store
+
+
+class TestLocalVectorStore:
+    """Test class for LocalVectorStore"""
+
+    def test_search_ranks_by_cosine(self, store):
+        """Kết quả sắp xếp theo độ tương đồng cosine"""
+        results = store.search_similar_documents("hợp đồng lao động", top_k=3, score_threshold=0.0)
+
+        assert isinstance(results[0], VectorSearchResult)
+        assert results[0].id == "ld_2"
+        assert results[0].score == pytest.approx(1.0, abs=1e-5)
+        assert results[0].citation == "Bộ luật Lao động, Điều 13"
+        assert [r.score for r in results] == sorted((r.score for r in results), reverse=True)
+
+    def test_metadata_filters(self, store):
+        """Filter theo domain và toán tử kiểu Pinecone"""
+        results = store.search_similar_documents(
+            "hợp đồng", legal_domain="dan_su", top_k=5, score_threshold=0.0
+        )
+        assert [r.id for r in results] == ["ds_1"]
+
+        by_metadata = store.search_by_metadata({"article_number": {"$in": ["105", "13"]}})
+        assert {r.id for r in by_metadata} == {"ld_1", "ld_2"}
+
+        excluded = store.search_by_metadata({"legal_domain": {"$ne": "lao_dong"}})
+        assert [r.id for r in excluded] == ["ds_1"]
+
+    def test_similarity_search_returns_documents(self, store):
+        """similarity_search trả về dict tài liệu như RAG cần"""
+        documents = store.similarity_search(
+            query="hợp đồng lao động", k=1, score_threshold=0.5, return_documents=True
+        )
+
+        assert documents[0]["id"] == "ld_2"
+        assert documents[0]["metadata"]["legal_domain"] == "lao_dong"
+
+    @pytest.mark.asyncio
+    async def test_async_search_matches_sync_search(self, store):
+        """Tìm kiếm async (chạy trong worker thread) cho kết quả giống bản sync"""
+        documents = await store.asimilarity_search(
+            query="hợp đồng lao động", k=2, score_threshold=0.0, return_documents=True
+        )
+        results = await store.asearch_similar_documents("hợp đồng lao động", top_k=2, score_threshold=0.0)
+
+        expected = store.search_similar_documents("hợp đồng lao động", top_k=2, score_threshold=0.0)
+        assert [doc["id"] for doc in documents] == [r.id for r in expected]
+        assert [r.id for r in results] == [r.id for r in expected]
+
+    def test_batch_search_matches_single_search(self, store):
+        """Tìm kiếm theo lô cho kết quả giống tìm kiếm từng vector"""
+        embeddings = KeywordEmbeddings()
+        queries = [embeddings.embed_query("hợp đồng"), embeddings.embed_query("thời giờ làm việc")]
+
+        batched = store.search_by_vectors(queries, top_k=2)
+        single = [store.search_by_vector(q, top_k=2) for q in queries]
+
+        assert [[r.id for r in rs] for rs in batched] == [[r.id for r in rs] for rs in single]
+
+    def test_delete_and_stats(self, store):
+        """Xóa theo id và filter, thống kê phản ánh đúng số vector"""
+        store.upsert_documents([
+            {"id": "other", "content": "thuế thu nhập", "metadata": {"legal_domain": "thue"}}
+        ], namespace="tax")
+
+        store.delete_documents(["ds_1"])
+        store.delete_by_filter({"legal_domain": "lao_dong", "article_number": "105"})
+
+        stats = store.get_index_stats()
+        assert stats["total_vectors"] == 2
+        assert stats["namespaces"] == {"": {"vector_count": 1}, "tax": {"vector_count": 1}}
+        remaining = store.search_by_metadata({})
+        assert [r.id for r in remaining] == ["ld_2"]
+        assert remaining[0].metadata["article_number"] == "13"
+
+    def test_health_check(self, store):
+        """Health check dùng chung logic với PineconeService"""
+        health = store.health_check()
+
+        assert health["service"] == "LocalVectorStore"
+        assert health["status"] == "healthy"
+        assert health["total_vectors"] == 3
+
+    def test_save_and_load(self, store, tmp_path):
+        """Index lưu ra đĩa và nạp lại giữ nguyên kết quả"""
+        path = str(tmp_path / "index.npz")
+        store.save(path)
+
+        restored = LocalVectorStore(
+            dimension=DIMENSION,
+            embeddings=KeywordEmbeddings(),
+            embedding_cache=EmbeddingCache(),
+            persist_path=path
+        )
+        results = restored.search_similar_documents("hợp đồng lao động", top_k=1)
+
+        assert results[0].id == "ld_2"
+        assert results[0].metadata["title"] == "Bộ luật Lao động"
+
+    def test_writes_are_persisted(self, tmp_path):
+        """Các lần ghi được gom lại, lưu khi flush/aclose; khởi động lại vẫn còn dữ liệu"""
+        import asyncio
+
+        path = str(tmp_path / "index.npz")
+
+        def open_store(**kwargs):
+            return LocalVectorStore(
+                dimension=DIMENSION,
+                embeddings=KeywordEmbeddings(),
+                embedding_cache=EmbeddingCache(),
+                persist_path=path,
+                **kwargs
+            )
+
+        store = open_store(autosave_interval=60)
+        store.upsert_documents([
+            {"id": "ld_2", "content": "hợp đồng lao động", "metadata": {"legal_domain": "lao_dong"}},
+            {"id": "ds_1", "content": "hợp đồng mua bán", "metadata": {"legal_domain": "dan_su"}},
+        ])
+        store.delete_documents(["ds_1"])
+        # Chưa hết interval: chưa ghi file nào
+        assert not (tmp_path / "index.npz").exists()
+
+        assert store.flush()
+        assert [r.id for r in open_store().search_similar_documents("hợp đồng", top_k=5)] == ["ld_2"]
+
+        store.upsert_documents([
+            {"id": "ds_1", "content": "hợp đồng mua bán", "metadata": {"legal_domain": "dan_su"}},
+        ])
+        asyncio.run(store.aclose())
+        assert {r.id for r in open_store().search_similar_documents("hợp đồng", top_k=5)} == {"ld_2", "ds_1"}
+        # Ghi qua file tạm rồi os.replace: không còn file tạm sót lại
+        assert [p.name for p in tmp_path.iterdir()] == ["index.npz"]
+
+    def test_autosave_interval_batches_writes(self, tmp_path):
+        """Nhiều lần ghi trong một interval chỉ dẫn tới một lần lưu"""
+        import time
+        from unittest.mock import patch
+
+        path = str(tmp_path / "index.npz")
+        store = LocalVectorStore(
+            dimension=DIMENSION,
+            embeddings=KeywordEmbeddings(),
+            embedding_cache=EmbeddingCache(),
+            persist_path=path,
+            autosave_interval=0.1
+        )
+        with patch.object(LocalIndex, "save", wraps=store.index.save) as save:
+            for i in range(5):
+                store.upsert_documents([{"id": f"ld_{i}", "content": "hợp đồng lao động", "metadata": {}}])
+            deadline = time.monotonic() + 2.0
+            while save.call_count == 0 and time.monotonic() < deadline:
+                time.sleep(0.02)
+            time.sleep(0.2)
+
+        assert save.call_count == 1
+        assert LocalIndex.load(path).describe_index_stats().total_vector_count == 5
+
+    def test_queries_run_concurrently(self, store):
+        """Truy vấn chỉ giữ khóa đọc: nhiều truy vấn chấm điểm cùng lúc, ghi vẫn an toàn"""
+        import threading
+        from concurrent.futures import ThreadPoolExecutor
+        from unittest.mock import patch
+
+        barrier = threading.Barrier(2, timeout=2)
+        original = LocalIndex._search_exact
+
+        def rendezvous(self, namespace_store, queries, top_k, mask):
+            # Hai truy vấn chỉ gặp nhau ở đây nếu cùng được chấm điểm một lúc
+            barrier.wait()
+            return original(self, namespace_store, queries, top_k, mask)
+
+        with patch.object(LocalIndex, "_search_exact", rendezvous):
+            with ThreadPoolExecutor(max_workers=2) as pool:
+                results = list(pool.map(
+                    lambda _: store.search_similar_documents("hợp đồng lao động", top_k=1), range(2)
+                ))
+        assert [r[0].id for r in results] == ["ld_2", "ld_2"]
+
+        def write(i):
+            store.upsert_documents([{"id": f"tmp_{i}", "content": "thuế", "metadata": {}}])
+            store.delete_documents([f"tmp_{i}"])
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(lambda i: write(i) if i % 2 else store.search_similar_documents("hợp đồng"), range(40)))
+        assert store.index.describe_index_stats().total_vector_count == 3
+
+    def test_direct_writes_invalidate_answer_cache(self, store):
+        """Ghi thẳng vào kho vector (không qua RAG) vẫn xóa câu trả lời cũ của domain bị ảnh hưởng"""
+        from unittest.mock import Mock
+        from app.models.legal_rag import VietnameseLegalRAG
+        from app.services.bm25_index import BM25Index
+        from app.utils.answer_cache import SemanticAnswerCache
+
+        cache = SemanticAnswerCache()
+        VietnameseLegalRAG(
+            pinecone_service=store,
+            chat_model=Mock(),
+            embedding_model=KeywordEmbeddings(),
+            answer_cache=cache,
+            lexical_index=BM25Index()
+        )
+        cache.put([1.0, 0.0], "dan_su", "general", "a")
+        cache.put([1.0, 0.0], "lao_dong", "general", "b")
+
+        store.upsert_documents([
+            {"id": "ld_3", "content": "tiền lương", "metadata": {"legal_domain": "lao_dong"}}
+        ])
+        assert cache.get([1.0, 0.0], "lao_dong", "general") is None
+        assert cache.get([1.0, 0.0], "dan_su", "general") == "a"
+
+        store.delete_documents(["ld_3"])
+        assert len(cache) == 0
+
+    def test_dimension_mismatch(self):
+        """Vector sai số chiều bị từ chối"""
+        index = LocalIndex(dimension=4)
+        with pytest.raises(PineconeServiceError):
+            index.upsert([{"id": "x", "values": [1.0, 2.0]}])
+
+    def test_factory_selects_local_backend(self):
+        """Factory chọn backend local theo cấu hình"""
+        from types import SimpleNamespace
+        from app.services.pinecone_service import PineconeServiceFactory
+
+        settings = SimpleNamespace(
+            vector_store_backend="local",
+            pinecone_dimension=DIMENSION,
+            openai_embedding_api_key=None,
+            local_vector_store_path=None
+        )
+        service = PineconeServiceFactory.create_from_settings(settings)
+
+        assert isinstance(service, LocalVectorStore)
+        assert service.dimension == DIMENSION
+
+    def test_chatbot_uses_configured_backend(self, monkeypatch):
+        """Chatbot dựng vector store qua factory nên VECTOR_STORE_BACKEND=local có hiệu lực"""
+        from unittest.mock import Mock
+        from app.models import vietnamese_legal_chatbot as chatbot_module
+
+        monkeypatch.setattr(chatbot_module.demo_settings, "vector_store_backend", "local", raising=False)
+        monkeypatch.setattr(chatbot_module.demo_settings, "local_vector_store_path", None, raising=False)
+
+        chatbot = chatbot_module.VietnameseLegalChatbot(chat_model=Mock(), rag_system=Mock())
+
+        assert isinstance(chatbot.pinecone_service, LocalVectorStore)
+
+
+class TestBitmapFilters:
+    """Test bitmap index cho filter metadata"""
+
+    def test_bitmap_matches_column_scan(self):
+        """Bitmap cho kết quả giống quét cột, kể cả sau khi cập nhật và xóa"""
+        from app.services.local_vector_store import _NamespaceStore, build_filter_mask
+        import numpy as np
+
+        indexed = _NamespaceStore(4, capacity=2)
+        scanned = _NamespaceStore(4, capacity=2, bitmap_fields=())
+        domains = ["dan_su", "hien_phap", "lao_dong", "dan_su", "thue", "hien_phap", "dan_su"]
+        for store in (indexed, scanned):
+            for i, domain in enumerate(domains):
+                store.upsert(f"doc_{i}", np.ones(4, dtype=np.float32), {
+                    "legal_domain": domain,
+                    "language": "vietnamese",
+                    "article_number": str(i),
+                    "tags": ["a", "b"] if i % 2 else ["c"]
+                })
+            store.upsert("doc_3", np.ones(4, dtype=np.float32), {"legal_domain": "hinh_su", "language": "vietnamese"})
+            store.remove("doc_1")
+            store.remove("doc_6")
+
+        filters = [
+            {"legal_domain": "dan_su", "language": "vietnamese"},
+            {"legal_domain": {"$in": ["hien_phap", "hinh_su"]}},
+            {"legal_domain": {"$ne": "dan_su"}},
+            {"article_number": {"$nin": ["0", "2"]}},
+            {"$or": [{"legal_domain": "thue"}, {"tags": "a"}]},
+        ]
+        for metadata_filter in filters:
+            expected = build_filter_mask(scanned, metadata_filter)
+            assert build_filter_mask(indexed, metadata_filter).tolist() == expected.tolist()
+
+        mask = build_filter_mask(indexed, {"legal_domain": "hien_phap"})
+        assert [indexed.ids[row] for row in np.flatnonzero(mask)] == ["doc_5"]
+
+    def test_small_domain_scores_only_its_rows(self, store):
+        """Truy vấn giới hạn domain chỉ chấm điểm các hàng của domain đó"""
+        from unittest.mock import patch
+        from app.services.local_vector_store import LocalIndex
+
+        scored = []
+        original = LocalIndex._search_exact
+
+        def spy(self, namespace_store, queries, top_k, mask):
+            scored.append(int(mask.sum()))
+            return original(self, namespace_store, queries, top_k, mask)
+
+        with patch.object(LocalIndex, "_search_exact", spy):
+            results = store.search_similar_documents("hợp đồng", legal_domain="dan_su", score_threshold=0.0)
+
+        assert [r.id for r in results] == ["ds_1"]
+        assert scored == [1]
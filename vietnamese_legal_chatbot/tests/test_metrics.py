@@ -0,0 +1,51 @@
+"""
+Test cases for StageMetrics
+Test cho bộ đo độ trễ theo bước
+"""
+
+import pytest
+
+from app.utils.metrics import LatencyHistogram, StageMetrics
+
+
+class TestStageMetrics:
+    """Test class for StageMetrics"""
+
+    def test_histogram_quantiles_and_buckets(self):
+        """Phân vị nearest-rank và bucket tích lũy (le bao gồm cận trên)"""
+        histogram = LatencyHistogram(buckets=(0.1, 1.0))
+        for ms in range(1, 101):
+            histogram.observe(ms / 1000)
+
+        snapshot = histogram.snapshot()
+        assert snapshot["count"] == 100
+        assert snapshot["p50"] == pytest.approx(0.050)
+        assert snapshot["p95"] == pytest.approx(0.095)
+        assert snapshot["p99"] == pytest.approx(0.099)
+        assert histogram.cumulative_buckets()[0] == (0.1, 100)
+
+        histogram.observe(5.0)
+        assert [count for _, count in histogram.cumulative_buckets()] == [100, 100, 101]
+
+    def test_time_records_failed_stages(self):
+        """Khối lệnh lỗi vẫn được đo"""
+        metrics = StageMetrics()
+        with pytest.raises(ValueError):
+            with metrics.time("llm"):
+                raise ValueError("timeout")
+
+        assert metrics.snapshot()["llm"]["count"] == 1
+
+    def test_render_prometheus(self):
+        """Xuất định dạng văn bản Prometheus cho /metrics"""
+        metrics = StageMetrics(buckets=(0.5,))
+        metrics.observe("embed", 0.2)
+        metrics.observe("embed", 0.7)
+
+        text = metrics.render_prometheus()
+
+        assert "# TYPE legal_rag_stage_duration_seconds histogram" in text
+        assert 'legal_rag_stage_duration_seconds_bucket{stage="embed",le="0.5"} 1' in text
+        assert 'legal_rag_stage_duration_seconds_bucket{stage="embed",le="+Inf"} 2' in text
+        assert 'legal_rag_stage_duration_seconds_count{stage="embed"} 2' in text
+        assert 'legal_rag_stage_duration_quantile_seconds{stage="embed",quantile="0.99"} 0.700000' in text
@@ -18,6 +18,7 @@ from app.services.pinecone_service import (
     PineconeServiceFactory
 )
 from app.utils.config import Settings
+from app.utils.embedding_cache import EmbeddingCache
 
 
 class TestPineconeService:
@@ -171,6 +172,68 @@ class TestPineconeService:
             assert health["embeddings_ready"] == False  # No OpenAI key provided
             assert "timestamp" in health
 
+    def test_search_with_precomputed_vector(self):
+        """Test tìm kiếm bằng vector đã tính sẵn không gọi embedding"""
+        with patch('app.services.pinecone_service.PINECONE_AVAILABLE', True), \
+             patch('app.services.pinecone_service.Pinecone'), \
+             patch('app.services.pinecone_service.OpenAIEmbeddings'):
+
+            service = PineconeService("test", "test", "test-index")
+            service.embeddings = Mock()
+            service.index = Mock()
+            service.index.query.return_value = Mock(matches=[
+                Mock(id="a", score=0.9, metadata={"content": "Điều 1", "legal_domain": "dan_su"}),
+                Mock(id="b", score=0.5, metadata={"content": "Điều 2", "legal_domain": "dan_su"})
+            ])
+
+            results = service.search_by_vector([0.1, 0.2], top_k=2, score_threshold=0.7)
+            documents = service.similarity_search(
+                query_vector=[0.1, 0.2],
+                metadata_filter={"legal_domain": "dan_su"},
+                return_documents=True
+            )
+
+            service.embeddings.embed_query.assert_not_called()
+            assert [r.id for r in results] == ["a"]
+            assert documents == [{
+                "id": "a",
+                "page_content": "Điều 1",
+                "metadata": {"content": "Điều 1", "legal_domain": "dan_su"},
+                "score": 0.9
+            }]
+            assert service.index.query.call_args.kwargs["filter"] == {"legal_domain": "dan_su"}
+            assert len(service.search_by_vectors([[0.1, 0.2], [0.3, 0.4]])) == 2
+
+    def test_upsert_documents_embeds_in_token_batches(self):
+        """Test upsert tính embedding theo batch thay vì từng tài liệu"""
+        with patch('app.services.pinecone_service.PINECONE_AVAILABLE', True), \
+             patch('app.services.pinecone_service.Pinecone'), \
+             patch('app.services.pinecone_service.OpenAIEmbeddings'):
+
+            service = PineconeService("test", "test", "test-index", embedding_cache=EmbeddingCache())
+            service.index = Mock()
+            service.embeddings = Mock(model="test-model")
+            service.embeddings.embed_documents.side_effect = lambda texts: [[0.1, 0.2] for _ in texts]
+
+            documents = [
+                {"id": f"doc_{i}", "content": f"Điều {i}. Nội dung", "metadata": {"legal_domain": "dan_su"}}
+                for i in range(10)
+            ]
+            documents.append({"id": "empty", "content": "", "metadata": {}})
+
+            success = service.upsert_documents(
+                documents, batch_size=3, embedding_batch_tokens=20, max_concurrent_batches=2
+            )
+
+            assert success is True
+            service.embeddings.embed_query.assert_not_called()
+            embedded = [t for call in service.embeddings.embed_documents.call_args_list for t in call.args[0]]
+            assert len(embedded) == 10
+            assert 1 < service.embeddings.embed_documents.call_count < 10
+            upserted = [v["id"] for call in service.index.upsert.call_args_list for v in call.kwargs["vectors"]]
+            assert sorted(upserted) == sorted(f"doc_{i}" for i in range(10))
+            assert all(len(call.kwargs["vectors"]) <= 3 for call in service.index.upsert.call_args_list)
+
 
 class TestLegalDocumentProcessor:
     """Test class for LegalDocumentProcessor"""
@@ -0,0 +1,63 @@
+"""
+Test cases for QueryStats
+Test cho lịch sử truy vấn có giới hạn và số liệu tổng hợp
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.utils.query_stats import QuantileSketch, QueryStats
+
+
+class TestQueryStats:
+    """Test class for QueryStats"""
+
+    def test_history_is_bounded(self):
+        """Bộ đệm vòng chỉ giữ các truy vấn gần nhất; số liệu tổng hợp vẫn đếm tất cả"""
+        stats = QueryStats(history_size=3)
+        for i in range(10):
+            stats.record("dan_su" if i % 2 else "lao_dong", "general", confidence_score=0.5, latency=0.1)
+
+        assert len(stats.history) == 3
+        summary = stats.summary()
+        assert summary["total_queries"] == 10
+        assert summary["avg_confidence"] == pytest.approx(0.5)
+        assert summary["domain_distribution"] == {"dan_su": 5, "lao_dong": 5}
+        assert stats.rates()["per_minute_1m"] == pytest.approx(3.0)
+
+    def test_concurrent_records_are_not_lost(self):
+        """Ghi nhận đồng thời từ nhiều luồng không mất bản ghi"""
+        stats = QueryStats(history_size=100, shards=4)
+
+        def work(_):
+            for _ in range(500):
+                stats.record("dan_su", "general", confidence_score=0.8, latency=0.2)
+                stats.add_tokens_dropped(1)
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(work, range(8)))
+
+        summary = stats.summary()
+        assert summary["total_queries"] == 4000
+        assert summary["context_tokens_dropped"] == 4000
+        assert len(stats.history) == 100
+
+    def test_sketch_quantiles_within_relative_accuracy(self):
+        """Phân vị của sketch sai lệch không quá relative_accuracy"""
+        sketch = QuantileSketch(relative_accuracy=0.01)
+        for ms in range(1, 1001):
+            sketch.add(ms / 1000)
+
+        for q, expected in ((0.5, 0.5), (0.95, 0.95), (0.99, 0.99)):
+            assert sketch.quantile(q) == pytest.approx(expected, rel=0.01)
+
+    def test_reset(self):
+        """reset() xóa lịch sử và số liệu"""
+        stats = QueryStats()
+        stats.record("dan_su", "general", confidence_score=0.9, latency=0.3)
+        stats.reset()
+
+        assert len(stats.history) == 0
+        assert stats.summary()["total_queries"] == 0
+        assert stats.quantiles()["latency"]["p99"] == 0.0
@@ -0,0 +1,136 @@
+"""
+Test cases for SerpAPIService against a local stub server
+Test cho dịch vụ SerpAPI với server giả lập cục bộ
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+import requests
+
+from app.services.serp_service import SerpAPIService
+from app.utils.circuit_breaker import CircuitBreaker
+
+
+class StubSerpAPI:
+    """Server SerpAPI giả lập: trả kết quả theo truy vấn, có thể chậm hoặc lỗi"""
+
+    def __init__(self):
+        self.requests = []
+        self.delay = 0.0
+        self.slow_marker = None
+        self.status = 200
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                query = parse_qs(urlparse(self.path).query)["q"][0]
+                stub.requests.append(query)
+                if stub.delay or (stub.slow_marker and stub.slow_marker in query):
+                    time.sleep(stub.delay or 1.0)
+                body = json.dumps({"organic_results": [
+                    {"position": 1, "title": "Bộ luật Lao động", "link": "https://thuvienphapluat.vn/bo-luat-lao-dong"},
+                    {"position": 2, "title": query, "link": f"https://example.vn/{len(query)}"},
+                ]}).encode("utf-8")
+                self.send_response(stub.status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stub():
+    stub = StubSerpAPI()
+    yield stub
+    stub.close()
+
+
+def make_service(stub, **kwargs):
+    return SerpAPIService("serp-key", session=requests.Session(), base_url=stub.base_url, **kwargs)
+
+
+class TestSerpAPIService:
+    """Test class for SerpAPIService"""
+
+    def test_concurrent_queries_deduplicated_and_cached(self, stub):
+        """Các truy vấn chạy song song, kết quả loại trùng URL và được cache theo câu hỏi"""
+        stub.delay = 0.2
+        service = make_service(stub)
+
+        start = time.perf_counter()
+        documents = service.search_legal_documents("Hợp đồng lao động", max_results=10)
+        elapsed = time.perf_counter() - start
+
+        assert elapsed < 0.8  # 5 sequential round trips would take 1s
+        urls = [doc["url"] for doc in documents]
+        assert len(urls) == len(set(urls))
+        assert urls.count("https://thuvienphapluat.vn/bo-luat-lao-dong") == 1
+        assert len(stub.requests) == 5
+
+        cached = service.search_legal_documents("  hợp đồng  lao động ", max_results=10)
+        assert cached == documents
+        assert len(stub.requests) == 5
+
+    def test_deadline_returns_partial_results(self, stub):
+        """Truy vấn chậm quá thời hạn bị bỏ qua, các kết quả đã có vẫn được trả về"""
+        stub.slow_marker = "filetype:pdf"
+        service = make_service(stub, deadline=0.5)
+
+        start = time.perf_counter()
+        documents = service.search_legal_documents("Thuế thu nhập cá nhân", max_results=10)
+
+        assert time.perf_counter() - start < 0.9
+        assert documents
+        assert all("filetype:pdf" not in doc["search_query"] for doc in documents)
+
+    def test_circuit_breaker_skips_failing_upstream(self, stub):
+        """Upstream lỗi liên tiếp làm mở mạch, các lần sau không gọi SerpAPI"""
+        stub.status = 500
+        service = make_service(stub, circuit_breaker=CircuitBreaker("serpapi", failure_threshold=2))
+
+        assert service.search_legal_documents("câu hỏi 1") == []
+        assert service.search_legal_documents("câu hỏi 2") == []
+        calls = len(stub.requests)
+
+        assert service.search_legal_documents("câu hỏi 3") == []
+        assert len(stub.requests) == calls
+        assert service.circuit_breaker.state == "open"
+
+
+class TestCircuitBreaker:
+    """Test class for CircuitBreaker"""
+
+    def test_half_open_trial_closes_or_reopens(self):
+        """Hết reset_timeout cho một lời gọi thử; thành công thì đóng mạch"""
+        now = [0.0]
+        breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=10, clock=lambda: now[0])
+        breaker.record_failure()
+        assert not breaker.allow()
+
+        now[0] = 11
+        assert breaker.allow()
+        assert not breaker.allow()  # only one trial call
+        breaker.record_failure()
+        assert breaker.state == "open"
+
+        now[0] = 22
+        assert breaker.allow()
+        breaker.record_success()
+        assert breaker.state == "closed"
+        assert breaker.allow()
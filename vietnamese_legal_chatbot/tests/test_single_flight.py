@@ -0,0 +1,80 @@
+"""
+Test cases for SingleFlight request coalescing
+Test cho cơ chế gộp yêu cầu trùng lặp
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.utils.single_flight import SingleFlight, normalize_question
+
+
+class TestSingleFlight:
+    """Test class for SingleFlight"""
+
+    def test_normalize_question(self):
+        """Khóa gộp không phân biệt hoa thường và khoảng trắng"""
+        assert normalize_question("  Thuế   TNCN là gì? ") == normalize_question("thuế tncn là gì?")
+
+    def test_concurrent_sync_calls_share_one_execution(self):
+        """Các thread gọi cùng khóa chỉ thực thi một lần và nhận cùng kết quả"""
+        flight = SingleFlight()
+        executions = []
+        release = threading.Event()
+
+        def work():
+            executions.append(1)
+            release.wait(2)
+            return "answer"
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            futures = [pool.submit(flight.do, "key", work) for _ in range(8)]
+            time.sleep(0.1)
+            release.set()
+            results = [future.result() for future in futures]
+
+        assert results == ["answer"] * 8
+        assert len(executions) == 1
+        assert flight.get_stats()["coalesced"] == 7
+        assert flight.get_stats()["in_flight"] == 0
+
+        # Sau khi hoàn tất, lời gọi mới được thực thi lại
+        assert flight.do("key", lambda: "fresh") == "fresh"
+
+    def test_sync_error_propagates_to_all_callers(self):
+        """Lỗi của lần thực thi được trả về cho mọi lời gọi đang chờ"""
+        flight = SingleFlight()
+
+        def fail():
+            time.sleep(0.1)
+            raise ValueError("boom")
+
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            futures = [pool.submit(flight.do, "key", fail) for _ in range(3)]
+            for future in futures:
+                with pytest.raises(ValueError):
+                    future.result()
+
+    @pytest.mark.asyncio
+    async def test_concurrent_async_calls_share_one_task(self):
+        """Các coroutine cùng khóa await một task chung; khóa khác chạy riêng"""
+        flight = SingleFlight()
+        executions = []
+
+        async def work(value):
+            executions.append(value)
+            await asyncio.sleep(0.05)
+            return value
+
+        results = await asyncio.gather(
+            *[flight.ado("a", lambda: work("a")) for _ in range(5)],
+            flight.ado("b", lambda: work("b"))
+        )
+
+        assert results == ["a"] * 5 + ["b"]
+        assert sorted(executions) == ["a", "b"]
+        assert flight.get_stats()["coalesced"] == 4
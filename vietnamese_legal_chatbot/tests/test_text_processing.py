@@ -0,0 +1,172 @@
+"""
+Test cases for Vietnamese text processing helpers
+Test cho bộ xử lý văn bản tiếng Việt dùng chung
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.utils.text_processing import (
+    VietnameseTextProcessor,
+    expand_legal_abbreviations,
+    extract_legal_citations,
+    get_keyword_matcher,
+    get_legal_domain,
+    get_query_preprocessor,
+    get_text_processor,
+    normalize_vietnamese_text,
+    process_vietnamese_legal_text,
+    process_vietnamese_legal_texts,
+)
+
+
+class TestSharedTextProcessor:
+    """Test class for the shared VietnameseTextProcessor"""
+
+    def test_helpers_share_one_processor(self):
+        """Các helper dùng chung một processor thay vì tạo mới mỗi lần gọi"""
+        processor = get_text_processor()
+
+        assert get_text_processor() is processor
+        assert get_query_preprocessor().text_processor is processor
+
+    def test_dictionaries_are_read_only(self):
+        """Từ điển của processor dùng chung không thể bị sửa"""
+        processor = get_text_processor()
+
+        with pytest.raises(TypeError):
+            processor.legal_abbreviations["BLDS"] = "khác"
+        with pytest.raises(AttributeError):
+            processor.stopwords.add("luật")
+
+    def test_one_keyword_automaton_for_all_components(self):
+        """Processor, RAG và validator dùng chung một automaton; mỗi kết quả gắn nhóm từ khóa"""
+        from unittest.mock import Mock
+        from app.models.legal_rag import VietnameseLegalRAG, VietnameseLegalValidator
+
+        matcher = get_keyword_matcher()
+        rag = VietnameseLegalRAG(pinecone_service=Mock(), chat_model=Mock(), text_processor=get_text_processor())
+
+        assert get_text_processor()._keyword_matcher is matcher
+        assert rag._keyword_matcher is matcher
+        assert VietnameseLegalValidator()._keyword_matcher is matcher
+
+        hits = matcher.scan("Thủ tục giải quyết tranh chấp hợp đồng theo quy định, chắc chắn 100%")
+        assert hits.has("context", "tranh chấp")
+        assert hits.has("routing_domain", "dan_su")
+        assert hits.has("query_type", "procedure")
+        assert hits.keywords("query_term") == {"quy định"}
+        assert hits.has("prohibited")
+
+        assert rag._extract_legal_terms("vi phạm quy định về nghĩa vụ") == ["quy định", "nghĩa vụ", "vi phạm"]
+        assert rag._add_context_keywords("thủ tục khởi kiện") == "thủ tục khởi kiện quy trình hồ sơ điều kiện"
+
+    def test_custom_terms_get_their_own_automaton(self):
+        """Processor có từ điển riêng không làm thay đổi automaton dùng chung"""
+        class CustomProcessor(VietnameseTextProcessor):
+            def _load_legal_terms(self):
+                return ["quyền riêng tư"]
+
+        processor = CustomProcessor()
+
+        assert processor._keyword_matcher is not get_keyword_matcher()
+        assert processor.extract_legal_terms("bảo vệ quyền riêng tư") == ["quyền riêng tư"]
+        assert get_text_processor().extract_legal_terms("bảo vệ quyền riêng tư") == []
+
+    def test_helpers_are_thread_safe(self):
+        """Gọi đồng thời cho kết quả giống gọi tuần tự"""
+        text = "Theo Điều 15 Bộ luật Dân sự 2015 và Nghị định 145/2020/NĐ-CP về hợp đồng"
+        expected = (get_legal_domain(text), extract_legal_citations(text), normalize_vietnamese_text(text))
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(
+                lambda _: (get_legal_domain(text), extract_legal_citations(text), normalize_vietnamese_text(text)),
+                range(64)
+            ))
+
+        assert all(result == expected for result in results)
+        assert expected[0] == "dan_su"
+        assert [citation["citation_type"] for citation in expected[1]] == ["law", "law", "decree"]
+
+
+class TestAbbreviationExpansion:
+    """Test class for single-pass legal abbreviation expansion"""
+
+    def test_expands_whole_words_only(self):
+        """Không sửa các từ chỉ chứa chuỗi viết tắt"""
+        text = expand_legal_abbreviations("Theo UBND và BLHS, xem http://blhsx.vn")
+
+        assert text == "Theo Ủy ban nhân dân và Bộ luật Hình sự, xem http://blhsx.vn"
+
+    def test_longest_abbreviation_wins(self):
+        assert expand_legal_abbreviations("theo QĐ-TTg") == "theo Quyết định của Thủ tướng"
+        assert expand_legal_abbreviations("TP.HCM") == "Thành phố Hồ Chí Minh"
+
+    @pytest.mark.parametrize("text", [
+        "Nghị định 145/2020/NĐ-CP",
+        "Thông tư 10/2020/TT-BTP",
+        "Quyết định 22/2021/QĐ-TTg",
+        "TT-TT",
+        "TB-01",
+        "BLHS-2015",
+    ])
+    def test_document_numbers_are_untouched(self, text):
+        """Ký hiệu nằm trong số hiệu văn bản (sát '/', '-' hoặc chữ số) không bị mở rộng"""
+        assert expand_legal_abbreviations(text) == text
+        assert normalize_vietnamese_text(text) == text
+
+    def test_case_insensitive_lookup(self):
+        """Mã dài viết thường vẫn được mở rộng, mã ngắn phải đúng hoa thường"""
+        assert expand_legal_abbreviations("blds và bllđ") == "Bộ luật Dân sự và Bộ luật Lao động"
+        assert expand_legal_abbreviations("btp và BTP") == "btp và Bộ Tư pháp"
+
+    def test_processor_uses_custom_table(self):
+        """Bảng viết tắt của lớp con được biên dịch thành một biểu thức"""
+        class CustomProcessor(VietnameseTextProcessor):
+            def _load_legal_abbreviations(self):
+                return {"LĐ": "Lao động", "LĐ-TBXH": "Lao động - Thương binh và Xã hội"}
+
+        processor = CustomProcessor()
+
+        assert processor.normalize_vietnamese_text("Bộ LĐ-TBXH và LĐ") == "Bộ Lao động - Thương binh và Xã hội và Lao động"
+
+
+class TestBatchProcessing:
+    """Test class for process_legal_texts"""
+
+    TEXTS = [
+        "Điều {n} Bộ luật Dân sự 2015 quy định về hợp đồng, phạt 5 triệu đồng ngày 1/1/2020".format(n=n)
+        for n in range(40)
+    ]
+
+    def test_matches_single_text_processing(self):
+        """Kết quả theo lô giống xử lý từng văn bản, đúng thứ tự"""
+        expected = [process_vietnamese_legal_text(text) for text in self.TEXTS]
+
+        assert list(process_vietnamese_legal_texts(iter(self.TEXTS))) == expected
+
+    def test_process_pool_preserves_order(self):
+        """Chia chunk cho process pool vẫn giữ thứ tự đầu vào"""
+        expected = [process_vietnamese_legal_text(text) for text in self.TEXTS]
+
+        results = list(process_vietnamese_legal_texts(self.TEXTS, workers=2, chunk_size=3))
+
+        assert results == expected
+
+    def test_empty_input(self):
+        assert list(process_vietnamese_legal_texts([], workers=2)) == []
+
+    def test_confidence_reuses_normalized_text_and_keyword_scan(self):
+        """Độ tin cậy tính trên văn bản đã chuẩn hóa và dùng lại lượt quét từ khóa"""
+        import unicodedata
+
+        processor = get_text_processor()
+        text = "Người lao động và người sử dụng lao động theo hợp đồng"
+        normalized = processor.normalize_vietnamese_text(text)
+
+        analysis = processor.process_legal_text(text)
+        assert analysis.language_confidence == processor._calculate_language_confidence(normalized)
+        # Decomposed (NFD) input scores like its NFC form
+        decomposed = processor.process_legal_text(unicodedata.normalize("NFD", text))
+        assert decomposed.language_confidence == analysis.language_confidence
@@ -0,0 +1,39 @@
+"""
+Test cases for token counting and batching
+Test cho bộ đếm token và chia batch
+"""
+
+from unittest.mock import patch
+
+from app.utils.token_counter import batch_by_tokens, count_tokens, estimate_tokens
+
+
+class TestTokenCounter:
+    """Test class for token counter"""
+
+    def test_estimate_counts_utf8_bytes(self):
+        """Ước lượng dựa trên số byte UTF-8"""
+        assert estimate_tokens("") == 0
+        assert estimate_tokens("abcd") == 1
+        assert estimate_tokens("Điều") > estimate_tokens("Dieu")
+
+    @patch('app.utils.token_counter.TIKTOKEN_AVAILABLE', False)
+    def test_count_tokens_falls_back_without_tiktoken(self, caplog):
+        """Không có tiktoken thì dùng ước lượng và ghi cảnh báo một lần"""
+        from app.utils.token_counter import _get_encoding
+        _get_encoding.cache_clear()
+        try:
+            with caplog.at_level("WARNING", logger="app.utils.token_counter"):
+                assert count_tokens("Bộ luật Dân sự", "other-model") == estimate_tokens("Bộ luật Dân sự")
+                count_tokens("Bộ luật Hình sự", "other-model")
+            assert len([r for r in caplog.records if "tiktoken" in r.getMessage()]) == 1
+        finally:
+            _get_encoding.cache_clear()
+
+    @patch('app.utils.token_counter.count_tokens', side_effect=lambda text, model: len(text))
+    def test_batch_by_tokens_respects_limits(self, _):
+        """Batch bị giới hạn bởi cả token và số lượng, giữ thứ tự"""
+        texts = ["aaa", "bbb", "cccc", "d", "eeeeeeeeee", "f"]
+
+        assert batch_by_tokens(texts, max_tokens=7) == [[0, 1], [2, 3], [4], [5]]
+        assert batch_by_tokens(texts, max_tokens=100, max_items=4) == [[0, 1, 2, 3], [4, 5]]
@@ -0,0 +1,54 @@
+"""
+Test cases for VietnameseLegalChatbot
+Test cho chatbot pháp lý Việt Nam
+"""
+
+from unittest.mock import Mock
+
+from app.models.legal_rag import LegalCitation, LegalQueryType, LegalRetrievalContext
+from app.models.vietnamese_legal_chatbot import VietnameseLegalChatbot
+
+
+def make_retrieval(question: str) -> LegalRetrievalContext:
+    documents = [{
+        "id": "ld_34",
+        "page_content": "Điều 34. Các trường hợp chấm dứt hợp đồng lao động",
+        "metadata": {"document_name": "Bộ luật Lao động 2019"},
+        "score": 0.9
+    }]
+    return LegalRetrievalContext(
+        query=question,
+        processed_query=question,
+        legal_domain="lao_dong",
+        query_type=LegalQueryType.GENERAL,
+        documents=documents,
+        citations=[LegalCitation(document_type="Bộ luật", document_name="Lao động", article="34")],
+        context_text="--- Tài liệu 1 ---\nNội dung:\nĐiều 34. Các trường hợp chấm dứt hợp đồng lao động"
+    )
+
+
+class TestVietnameseLegalChatbot:
+    """Test class for VietnameseLegalChatbot"""
+
+    def test_process_message_uses_single_llm_call(self):
+        """Một lượt chat chỉ gọi LLM một lần với lịch sử hội thoại và tài liệu trong cùng prompt"""
+        chat_model = Mock()
+        chat_model.generate_response.return_value = "Theo Điều 34 Bộ luật Lao động, hợp đồng chấm dứt khi hết hạn."
+        rag_system = Mock()
+        rag_system.retrieve_context.side_effect = make_retrieval
+        rag_system._score_response.return_value = ("reasoning", 0.8)
+        chatbot = VietnameseLegalChatbot(chat_model=chat_model, rag_system=rag_system,
+                                         pinecone_service=Mock())
+
+        session_id = chatbot.create_session()
+        chatbot.process_message(session_id, "Hợp đồng lao động chấm dứt khi nào?")
+        result = chatbot.process_message(session_id, "Còn trường hợp nào khác không?")
+
+        assert chat_model.generate_response.call_count == 2
+        rag_system.query.assert_not_called()
+        prompt = chat_model.generate_response.call_args.kwargs["prompt"]
+        assert "Điều 34. Các trường hợp chấm dứt hợp đồng lao động" in prompt
+        assert "Hợp đồng lao động chấm dứt khi nào?" in prompt
+        assert result["metadata"]["response_type"] == "rag_enhanced"
+        assert result["metadata"]["confidence"] == 0.8
+        assert result["metadata"]["retrieval_scores"] == [0.9]
@@ -0,0 +1,77 @@
+"""
+Test cases for the Vietnamese word segmenter
+Test cho bộ tách từ tiếng Việt dựa trên từ điển
+"""
+
+import pytest
+
+from app.utils.text_processing import VietnameseTextProcessor
+from app.utils.vietnamese_segmenter import DoubleArrayTrie, VietnameseWordSegmenter, load_segmenter_dictionary
+
+
+WORDS = ["lao động", "người lao động", "người sử dụng lao động", "hợp đồng", "hợp đồng lao động", "bồi thường"]
+
+
+@pytest.fixture
+def segmenter():
+    return VietnameseWordSegmenter(DoubleArrayTrie.build(WORDS))
+
+
+class TestDoubleArrayTrie:
+    """Test class for DoubleArrayTrie"""
+
+    def test_membership(self):
+        trie = DoubleArrayTrie.build(WORDS)
+
+        assert len(trie) == len(WORDS)
+        assert "Người sử dụng lao động" in trie
+        assert "người sử dụng" not in trie
+        assert "thuế" not in trie
+
+    def test_save_and_mmap_load(self, tmp_path):
+        """File biên dịch nạp bằng mmap cho kết quả giống trie gốc"""
+        path = str(tmp_path / "lexicon.dat")
+        DoubleArrayTrie.build(WORDS).save(path)
+
+        trie = DoubleArrayTrie.load(path)
+        try:
+            assert all(word in trie for word in WORDS)
+            assert trie.longest_match(["người", "lao", "động", "x"], 0, 4) == 3
+        finally:
+            trie.close()
+
+    def test_invalid_file_falls_back_to_build(self, tmp_path):
+        path = tmp_path / "broken.dat"
+        path.write_bytes(b"not a dictionary" * 4)
+
+        trie = load_segmenter_dictionary(WORDS, str(path))
+
+        assert "hợp đồng lao động" in trie
+
+
+class TestVietnameseWordSegmenter:
+    """Test class for VietnameseWordSegmenter"""
+
+    def test_longest_match(self, segmenter):
+        """Từ ghép nhiều âm tiết được giữ nguyên, giữ hoa thường gốc"""
+        words = segmenter.segment("Người sử dụng lao động ký hợp đồng lao động")
+
+        assert words == ["Người sử dụng lao động", "ký", "hợp đồng lao động"]
+
+    def test_punctuation_ends_words(self, segmenter):
+        """Không ghép âm tiết qua dấu câu"""
+        assert segmenter.segment("hợp đồng, lao động (người) lao động.") == [
+            "hợp đồng", "lao động", "người", "lao động"
+        ]
+
+    def test_decompound(self, segmenter):
+        """Thêm các từ con sau từ ghép cho tìm kiếm từ vựng"""
+        words = segmenter.segment("hợp đồng lao động", decompound=True)
+
+        assert words == ["hợp đồng lao động", "hợp đồng", "lao động"]
+
+    def test_processor_tokenizes_legal_terms(self):
+        tokens = VietnameseTextProcessor().tokenize_vietnamese("Người sử dụng lao động phải bồi thường thiệt hại.")
+
+        assert "Người sử dụng lao động" in tokens
+        assert "bồi thường thiệt hại" in tokens